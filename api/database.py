@@ -1,53 +1,91 @@
 """
 Database connection module
 """
-import os
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
+from functools import partial
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from dotenv import load_dotenv
 
-# Загрузка переменных окружения
-load_dotenv()
+from database.connection import db_connector
+from database.connection.db_config import API_CONNECTION_STRING
+from database.connection.connection_pool import ConnectionPool
+from database.connection.statement_cache import PreparedStatementCursor
+from database.connection.async_pool import async_connection_pool, AsyncCursor
 
-# Параметры подключения к БД
-DB_PARAMS = {
-    "dbname": os.getenv("DB_NAME", "iset_katalog"),
-    "user": os.getenv("DB_USER", "postgres"),
-    "password": os.getenv("DB_PASSWORD", ""),
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": os.getenv("DB_PORT", "5432")
-}
+# Синхронный пул API подключается к базе API (по умолчанию iset_katalog).
+# Общий пул пакета database не изменяется: утилиты и CLI, импортированные
+# вместе с API, по-прежнему работают со своей базой
+api_connection_pool = ConnectionPool(
+    connection_factory=partial(db_connector.get_connection, API_CONNECTION_STRING)
+)
 
 
 @contextmanager
 def get_db_connection():
     """
-    Контекстный менеджер для работы с подключением к базе данных
+    Контекстный менеджер для работы с подключением к базе данных.
+    Соединение берется из синхронного пула API и возвращается в него после использования.
     """
     conn = None
     try:
-        conn = psycopg2.connect(**DB_PARAMS)
+        conn = api_connection_pool.get_connection()
         yield conn
     except psycopg2.DatabaseError as error:
-        if conn is not None:
+        if conn is not None and not conn.closed:
             conn.rollback()
         raise Exception(f"Ошибка базы данных: {error}")
     finally:
         if conn is not None:
-            conn.close()
+            api_connection_pool.release_connection(conn)
 
 
 @contextmanager
 def get_db_cursor(commit=False):
     """
-    Контекстный менеджер для работы с курсором базы данных
+    Контекстный менеджер для работы с курсором базы данных.
+    Повторяющиеся запросы выполняются через кэш подготовленных выражений соединения.
     """
     with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = conn.cursor(cursor_factory=PreparedStatementCursor)
         try:
             yield cursor
             if commit:
                 conn.commit()
         finally:
-            cursor.close() 
\ No newline at end of file
+            cursor.close()
+
+
+@asynccontextmanager
+async def get_async_db_connection():
+    """
+    Асинхронный контекстный менеджер для работы с подключением к базе данных.
+    Соединение берется из асинхронного пула и не блокирует цикл событий.
+    """
+    conn = None
+    try:
+        conn = await async_connection_pool.acquire()
+        yield conn
+    except psycopg2.DatabaseError as error:
+        raise Exception(f"Ошибка базы данных: {error}")
+    finally:
+        if conn is not None:
+            await async_connection_pool.release(conn)
+
+
+@asynccontextmanager
+async def get_async_db_cursor(commit=False):
+    """
+    Асинхронный контекстный менеджер для работы с курсором базы данных.
+    Асинхронные соединения работают в режиме autocommit, поэтому явная
+    транзакция открывается только при commit=True.
+    """
+    async with get_async_db_connection() as conn:
+        cursor = AsyncCursor(conn, conn.cursor(cursor_factory=RealDictCursor))
+        try:
+            if commit:
+                await cursor.execute("BEGIN")
+            yield cursor
+            if commit:
+                await cursor.execute("COMMIT")
+        finally:
+            cursor.close()
@@ -1,12 +1,22 @@
 """
 Main FastAPI application module
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import logging
 import os
 import sys
 
-from api.routers import groups, products, images, documents
+from api.routers import groups, products, images, documents, diagnostics
+from database.connection.async_pool import async_connection_pool
+from api.database import api_connection_pool
+from api.services.catalog_version import catalog_version
+from api.services.dictionaries import dictionaries
+from api.services.suggest import suggest_index
+from api.services.compatibility import compatibility_graph
+from api.services.lifetime import lifetime_calculator
+from api.services.read_model import connectors_read_model
+from api.services.assets import asset_manifest
 
 # Настройка логирования
 log_level = os.environ.get("LOG_LEVEL", "INFO")
@@ -31,6 +41,60 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.info("API сервер запущен с уровнем логирования: %s", log_level)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Открытие и закрытие ресурсов приложения
+    """
+    # Если БД недоступна, API все равно запускается: соединения пула
+    # создаются при первых запросах, а ошибки возвращаются в ответах
+    try:
+        await async_connection_pool.open()
+        logger.info("Асинхронный пул соединений с БД открыт")
+    except Exception:
+        logger.exception("Ошибка открытия асинхронного пула соединений с БД")
+    # Отслеживание изменений каталога для инвалидации кэшей
+    try:
+        await catalog_version.start()
+    except Exception:
+        logger.exception("Ошибка запуска отслеживания изменений каталога")
+    # Справочники для проверки фильтров загружаются один раз при запуске
+    try:
+        await dictionaries.load()
+    except Exception:
+        logger.exception("Ошибка загрузки справочников каталога")
+    # Индекс автодополнения строится до первого запроса подсказок
+    try:
+        await suggest_index.refresh()
+    except Exception:
+        logger.exception("Ошибка построения индекса автодополнения")
+    try:
+        await compatibility_graph.load()
+    except Exception:
+        logger.exception("Ошибка построения графа совместимости")
+    try:
+        await lifetime_calculator.load()
+    except Exception:
+        logger.exception("Ошибка загрузки кривой наработки")
+    # Материализованное представление соединителей обновляется при изменениях каталога
+    try:
+        await connectors_read_model.start()
+    except Exception:
+        logger.exception("Ошибка проверки представления соединителей")
+    # Манифест изображений и документов строится до первого запроса файлов
+    await asset_manifest.start()
+    try:
+        yield
+    finally:
+        await asset_manifest.stop()
+        await connectors_read_model.stop()
+        await catalog_version.stop()
+        await async_connection_pool.close()
+        api_connection_pool.close_all()
+        logger.info("Пулы соединений с БД закрыты")
+
+
 app = FastAPI(
     title="Iset Katalog API",
     description="""
@@ -51,7 +115,8 @@ app = FastAPI(
     """,
     version="0.2.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Добавляем глобальный префикс /api для всех маршрутов
@@ -59,6 +124,7 @@ app.include_router(groups.router, prefix="/api")
 app.include_router(products.router, prefix="/api")
 app.include_router(images.router, prefix="/api")
 app.include_router(documents.router, prefix="/api")
+app.include_router(diagnostics.router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -1,7 +1,7 @@
 """
 Product models for API
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, confloat
 from typing import List, Optional, Dict, Union, Any
 
 
@@ -19,9 +19,10 @@ class ProductPage(BaseModel):
     Модель страницы с продуктами
     """
     items: List[ProductPreview] = Field(..., description="Список продуктов на странице")
-    total_count: int = Field(..., description="Общее количество продуктов")
+    total_count: Optional[int] = Field(None, description="Общее количество продуктов")
     page: int = Field(..., description="Текущая страница")
     page_size: int = Field(..., description="Размер страницы")
+    next_cursor: Optional[str] = Field(None, description="Токен продолжения для следующей страницы")
 
 
 class ContactInfo(BaseModel):
@@ -53,7 +54,7 @@ class ContactRow(BaseModel):
     contacts_quantity: int = Field(..., description="Количество контактов")
     combination_code: str = Field(..., description="Номер сочетания контактов")
     max_current_summary: float = Field(..., description="Максимальная суммарная токовая нагрузка, А")
-    max_current_contact: float = Field(..., description="Максимальная токовая нагрузка, А")
+    max_current_contact: Optional[float] = Field(None, description="Максимальная токовая нагрузка на одиночный контакт, А")
     max_working_voltage: int = Field(..., description="Максимальное рабочее напряжение, В")
 
 
@@ -173,4 +174,248 @@ class ProductDetail(BaseModel):
     
     # Метаданные
     created_at: str = Field(..., description="Дата создания записи")
-    updated_at: str = Field(..., description="Дата последнего обновления") 
\ No newline at end of file
+    updated_at: str = Field(..., description="Дата последнего обновления") 
+
+class CatalogItem(BaseModel):
+    """
+    Соединитель в результатах фасетного просмотра каталога
+    """
+    connector_id: int = Field(..., description="Уникальный идентификатор соединителя")
+    full_code: str = Field(..., description="Полный код соединителя")
+    connector_type: str = Field(..., description="Тип соединителя (2РМТ, 2РМДТ и др.)")
+    body_size: str = Field(..., description="Размер корпуса")
+    body_type: str = Field(..., description="Тип корпуса (блочный, кабельный)")
+    connector_part: str = Field(..., description="Часть соединителя (вилка, розетка)")
+    contact_coating: str = Field(..., description="Покрытие контактов")
+    contacts_quantity: int = Field(..., description="Количество контактов")
+
+
+class FacetValue(BaseModel):
+    """
+    Значение фасета и количество соединителей, которое вернет выбор этого значения
+    """
+    value: str = Field(..., description="Значение фильтра (код или число)")
+    name: str = Field(..., description="Наименование значения")
+    count: int = Field(..., description="Количество соединителей с учетом остальных фильтров")
+    selected: bool = Field(False, description="Значение выбрано в текущем запросе")
+
+
+class CatalogBrowsePage(BaseModel):
+    """
+    Страница фасетного просмотра каталога
+    """
+    items: List[CatalogItem] = Field(..., description="Соединители на странице")
+    total_count: int = Field(..., description="Количество соединителей, удовлетворяющих всем фильтрам")
+    page: int = Field(..., description="Текущая страница")
+    page_size: int = Field(..., description="Размер страницы")
+    facets: Dict[str, List[FacetValue]] = Field(..., description="Значения фасетов с количеством соединителей")
+
+
+class SearchResult(ProductPreview):
+    """
+    Результат поиска продуктов
+    """
+    score: Optional[float] = Field(None, description="Оценка релевантности (больше — точнее)")
+
+
+class SuggestItem(BaseModel):
+    """
+    Подсказка автодополнения
+    """
+    value: str = Field(..., description="Обозначение серии или полный код соединителя")
+    kind: str = Field(..., description="Вид подсказки: series или connector")
+    product_id: Optional[int] = Field(None, description="Идентификатор продукта (для серии)")
+    connector_id: Optional[int] = Field(None, description="Идентификатор соединителя")
+    popularity: int = Field(0, description="Количество просмотров карточек с момента запуска API")
+
+
+class ParseCodesRequest(BaseModel):
+    """
+    Набор обозначений соединителей для разбора
+    """
+    codes: List[str] = Field(..., min_items=1, max_items=10000, description="Обозначения соединителей")
+
+
+class CodeComponent(BaseModel):
+    """
+    Сегмент обозначения соединителя
+    """
+    name: str = Field(..., description="Имя сегмента")
+    title: str = Field(..., description="Наименование сегмента")
+    value: str = Field(..., description="Код значения в обозначении")
+    description: str = Field("", description="Описание значения из справочника")
+
+
+class ParsedCode(BaseModel):
+    """
+    Результат разбора обозначения соединителя
+    """
+    code: str = Field(..., description="Исходное обозначение")
+    normalized_code: str = Field(..., description="Обозначение без пробелов в верхнем регистре")
+    valid: bool = Field(..., description="Обозначение соответствует справочникам")
+    components: List[CodeComponent] = Field([], description="Разобранные сегменты")
+    errors: List[str] = Field([], description="Ошибки разбора")
+    connector_id: Optional[int] = Field(None, description="Идентификатор соединителя, если он есть в каталоге")
+
+
+class ParseCodesResponse(BaseModel):
+    """
+    Результаты разбора набора обозначений
+    """
+    results: List[ParsedCode] = Field(..., description="Результаты в порядке обозначений запроса")
+    valid_count: int = Field(..., description="Количество корректных обозначений")
+    invalid_count: int = Field(..., description="Количество обозначений с ошибками")
+
+
+class ProductBatchItem(BaseModel):
+    """
+    Карточка продукта в пакетном ответе или ошибка ее получения
+    """
+    product_id: int = Field(..., description="Идентификатор продукта из запроса")
+    product: Optional[ProductDetail] = Field(None, description="Детальная информация о продукте")
+    error: Optional[str] = Field(None, description="Ошибка получения карточки")
+
+
+class ParametricItem(BaseModel):
+    """
+    Исполнение серии с электромеханическими параметрами в результатах параметрического поиска
+    """
+    param_id: int = Field(..., description="Идентификатор строки электромеханических параметров")
+    product_id: int = Field(..., description="Идентификатор продукта (серии)")
+    product_name: str = Field(..., description="Наименование серии")
+    size_code: int = Field(..., description="Размер корпуса")
+    contact_diameter: float = Field(..., description="Диаметр контакта, мм")
+    contact_quantity: int = Field(..., description="Количество контактов")
+    contact_combination_code: int = Field(..., description="Код сочетания контактов")
+    max_current_contact: Optional[float] = Field(None, description="Максимальный ток на контакт, А")
+    max_current_summary: float = Field(..., description="Максимальный суммарный ток, А")
+    max_working_voltage: int = Field(..., description="Рабочее напряжение, В")
+    heat_resistance: List[int] = Field([], description="Теплостойкость соединителей серии, °C")
+
+
+class ParametricPage(BaseModel):
+    """
+    Страница результатов параметрического поиска
+    """
+    items: List[ParametricItem] = Field(..., description="Найденные исполнения")
+    total_count: int = Field(..., description="Общее количество найденных исполнений")
+    page: int = Field(..., description="Текущая страница")
+    page_size: int = Field(..., description="Размер страницы")
+
+
+class MatesRequest(BaseModel):
+    """
+    Набор соединителей для поиска совместимых
+    """
+    items: List[str] = Field(..., min_items=1, max_items=1000, description="Обозначения или идентификаторы соединителей")
+    depth: int = Field(1, ge=1, le=5, description="Количество шагов по графу совместимости (1 — только ответные части)")
+
+
+class Mate(BaseModel):
+    """
+    Совместимый соединитель
+    """
+    connector_id: int = Field(..., description="Идентификатор соединителя")
+    full_code: Optional[str] = Field(None, description="Полный код соединителя")
+    depth: int = Field(..., description="Количество шагов от исходного соединителя")
+    via_connector_id: Optional[int] = Field(None, description="Соединитель, через который найдена совместимость")
+    description: Optional[str] = Field(None, description="Описание совместимости")
+
+
+class MateLookup(BaseModel):
+    """
+    Совместимые соединители для одного соединителя запроса
+    """
+    input: str = Field(..., description="Обозначение или идентификатор из запроса")
+    found: bool = Field(..., description="Соединитель найден в каталоге")
+    connector_id: Optional[int] = Field(None, description="Идентификатор соединителя")
+    full_code: Optional[str] = Field(None, description="Полный код соединителя")
+    mates: List[Mate] = Field([], description="Совместимые соединители в порядке удаления")
+    error: Optional[str] = Field(None, description="Ошибка поиска")
+
+
+class LifetimeRequest(BaseModel):
+    """
+    Пакет температур для расчета срока службы
+    """
+    temperatures: List[confloat(ge=-273, le=1000)] = Field(
+        ..., min_items=1, max_items=100000, description="Температуры, °C"
+    )
+
+
+class LifetimeResponse(BaseModel):
+    """
+    Срок службы соединителей для пакета температур
+    """
+    lifetime_hours: List[Optional[int]] = Field(
+        ..., description="Минимальная наработка, ч, в порядке температур запроса (null — температура ниже диапазона кривой)"
+    )
+
+
+class HarnessConnector(BaseModel):
+    """
+    Соединитель жгута с токами по контактам
+    """
+    connector: str = Field(..., description="Обозначение или идентификатор соединителя")
+    currents: List[confloat(ge=0, le=10000)] = Field(
+        ..., min_items=1, description="Токи по контактам в порядке номеров контактов, А"
+    )
+
+
+class DeratingRequest(BaseModel):
+    """
+    Жгут для проверки токовой нагрузки контактов
+    """
+    items: List[HarnessConnector] = Field(..., min_items=1, max_items=10000, description="Соединители жгута")
+    ambient_temperature: Optional[confloat(ge=-273, le=1000)] = Field(
+        None, description="Температура окружающей среды, °C (для проверки теплостойкости)"
+    )
+
+
+class ContactViolation(BaseModel):
+    """
+    Контакт с недопустимой нагрузкой
+    """
+    contact: int = Field(..., description="Номер контакта")
+    current: float = Field(..., description="Ток, А")
+    max_current: float = Field(..., description="Допустимый ток контакта, А")
+    load_percent: float = Field(..., description="Нагрузка, %")
+    overheat_temperature: float = Field(..., description="Перегрев контакта, °C")
+    contact_temperature: Optional[float] = Field(None, description="Температура контакта, °C")
+    reasons: List[str] = Field(..., description="Нарушения: overload — ток выше допустимого, overheat — температура выше теплостойкости")
+
+
+class ConnectorDerating(BaseModel):
+    """
+    Результат проверки нагрузки контактов соединителя
+    """
+    input: str = Field(..., description="Обозначение или идентификатор из запроса")
+    found: bool = Field(..., description="Соединитель найден в каталоге")
+    connector_id: Optional[int] = Field(None, description="Идентификатор соединителя")
+    full_code: Optional[str] = Field(None, description="Полный код соединителя")
+    contacts: int = Field(..., description="Количество нагруженных контактов")
+    max_load_percent: Optional[float] = Field(None, description="Наибольшая нагрузка контакта, %")
+    max_overheat_temperature: Optional[float] = Field(None, description="Наибольший перегрев контакта, °C")
+    max_contact_temperature: Optional[float] = Field(None, description="Наибольшая температура контакта, °C")
+    heat_resistance: Optional[int] = Field(None, description="Теплостойкость соединителя, °C")
+    ok: bool = Field(..., description="Нарушений нет")
+    violations: List[ContactViolation] = Field([], description="Контакты с нарушениями")
+    error: Optional[str] = Field(None, description="Ошибка проверки")
+
+
+class DeratingSummary(BaseModel):
+    """
+    Итоги проверки жгута
+    """
+    connectors: int = Field(..., description="Количество соединителей")
+    failed_connectors: int = Field(..., description="Соединители с нарушениями или ошибками")
+    contacts: int = Field(..., description="Количество проверенных контактов")
+    violations: int = Field(..., description="Количество контактов с нарушениями")
+
+
+class DeratingReport(BaseModel):
+    """
+    Результат проверки токовой нагрузки жгута
+    """
+    items: List[ConnectorDerating] = Field(..., description="Результаты в порядке соединителей запроса")
+    summary: DeratingSummary = Field(..., description="Итоги")
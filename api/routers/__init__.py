@@ -4,4 +4,5 @@ Router modules
 from . import groups
 from . import products
 from . import images
-from . import documents 
\ No newline at end of file
+from . import documents
+from . import diagnostics
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Router for service diagnostics
+"""
+from fastapi import APIRouter
+
+from api.database import api_connection_pool
+from database.connection.async_pool import async_connection_pool
+from database.connection.statement_cache import statement_cache_stats
+from api.services.product_cache import product_cache
+from api.services.dictionaries import dictionaries
+from api.services.suggest import suggest_index
+from api.services.search_cache import search_cache
+from api.services.compatibility import compatibility_graph
+from api.services.lifetime import lifetime_calculator
+from api.services.derating import derating_engine
+from api.services.read_model import connectors_read_model
+from api.services.assets import asset_manifest
+
+router = APIRouter(
+    prefix="/Diagnostics",
+    tags=["diagnostics"],
+)
+
+
+@router.get("/Pool")
+async def get_pool_stats():
+    """
+    Состояние пулов соединений с базой данных и статистика ожидания соединений
+    """
+    return {
+        "sync": api_connection_pool.get_stats(),
+        "async": async_connection_pool.get_stats(),
+    }
+
+
+@router.get("/StatementCache")
+async def get_statement_cache_stats():
+    """
+    Статистика кэша подготовленных выражений: попадания, промахи и вытеснения
+    """
+    return statement_cache_stats.as_dict()
+
+
+@router.get("/ProductCache")
+async def get_product_cache_stats():
+    """
+    Статистика кэша карточек продуктов: доля попаданий, количество записей и занятый объем
+    """
+    return product_cache.get_stats()
+
+
+@router.get("/Dictionaries")
+async def get_dictionary_cache_stats():
+    """
+    Состояние кэша справочников: версия снимка, количество строк и число загрузок
+    """
+    return dictionaries.get_stats()
+
+
+@router.get("/Suggest")
+async def get_suggest_index_stats():
+    """
+    Состояние индекса автодополнения: количество записей, построений и обновлений
+    """
+    return suggest_index.get_stats()
+
+
+@router.get("/SearchCache")
+async def get_search_cache_stats():
+    """
+    Статистика кэша результатов поиска
+    """
+    return search_cache.get_stats()
+
+
+@router.get("/Compatibility")
+async def get_compatibility_graph_stats():
+    """
+    Состояние графа совместимости: версия, количество связей и загрузок
+    """
+    return compatibility_graph.get_stats()
+
+
+@router.get("/Lifetime")
+async def get_lifetime_curve_stats():
+    """
+    Состояние кривой наработки: версия, количество точек и рассчитанных значений
+    """
+    return lifetime_calculator.get_stats()
+
+
+@router.get("/Derating")
+async def get_derating_stats():
+    """
+    Состояние данных для проверки нагрузки контактов: версия, число загрузок и проверенных контактов
+    """
+    return derating_engine.get_stats()
+
+
+@router.get("/ReadModel")
+async def get_read_model_stats():
+    """
+    Состояние материализованного представления соединителей: длительность последнего
+    обновления и изменения каталога, еще не попавшие в представление
+    """
+    return await connectors_read_model.get_stats()
+
+
+@router.get("/Assets")
+async def get_asset_manifest_stats():
+    """
+    Состояние манифеста файлов: количество файлов по каталогам, число и длительность построений
+    """
+    return asset_manifest.get_stats()
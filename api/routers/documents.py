@@ -1,14 +1,12 @@
 """
 Router for product documentation
 """
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-import os
-from pathlib import Path
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import List
 
 from api.models.product import Documentation
-from api.database import get_db_cursor
+from api.database import get_async_db_cursor
+from api.services.assets import asset_manifest, asset_response, cache_headers, is_not_modified
 
 router = APIRouter(
     prefix="/Documents",
@@ -19,11 +17,8 @@ router = APIRouter(
     },
 )
 
-# Корневая папка для хранения документов
-DOCUMENTS_ROOT = Path("database/Zapchasti")
-
 @router.get("/GetDocumentById/{doc_id}")
-async def get_document_by_id(doc_id: int):
+async def get_document_by_id(request: Request, doc_id: int):
     """
     Получение документа по его идентификатору
     
@@ -31,13 +26,26 @@ async def get_document_by_id(doc_id: int):
     - **doc_id**: Идентификатор документа
     
     Returns:
-    - Файл документа (PDF, DOCX и т.д.)
+    - Файл документа (PDF, DOCX и т.д.) или 304, если копия клиента актуальна
     """
     try:
+        # Файл выбирается по манифесту, без обращений к файловой системе
+        snapshot = asset_manifest.snapshot
+        asset = snapshot.get("pdf", f"doc_{doc_id}.pdf") or snapshot.get("word", f"doc_{doc_id}.docx")
+        # Если документ не найден, для демонстрации отдаем любой доступный PDF
+        if asset is None:
+            asset = snapshot.first("pdf", ".pdf")
+
+        # Копия клиента актуальна: 304 без обращения к базе данных
+        if asset is not None:
+            headers = cache_headers(asset, request)
+            if is_not_modified(request, headers["ETag"], asset.mtime):
+                return Response(status_code=304, headers=headers)
+
         # Здесь должна быть логика получения пути к документу из БД по doc_id
         # Пока просто заглушка
-        with get_db_cursor() as cursor:
-            cursor.execute(
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(
                 """
                 SELECT * FROM connector_documentation
                 WHERE doc_id = %s
@@ -49,41 +57,11 @@ async def get_document_by_id(doc_id: int):
             if not doc:
                 raise HTTPException(status_code=404, detail="Документ не найден")
             
-            # В реальной системе здесь будет doc_path из БД
-            # Для демонстрации проверим несколько путей
-            doc_path = None
-            
-            # Проверяем физические пути
-            test_paths = [
-                DOCUMENTS_ROOT / "2РМТ, 2РМДТ/ishodniki/PNG/PDF" / f"doc_{doc_id}.pdf",
-                DOCUMENTS_ROOT / "2РМТ, 2РМДТ/ishodniki/PNG/PDF/WORD" / f"doc_{doc_id}.docx"
-            ]
-            
-            for path in test_paths:
-                if path.exists():
-                    doc_path = path
-                    break
-            
-            # Если документ не найден в проверяемых путях, ищем любой доступный PDF для демонстрации
-            if not doc_path:
-                pdf_dir = DOCUMENTS_ROOT / "2РМТ, 2РМДТ/ishodniki/PNG/PDF"
-                if pdf_dir.exists():
-                    for file in pdf_dir.glob("*.pdf"):
-                        doc_path = file
-                        break
-            
-            if doc_path and doc_path.exists():
-                # Определяем тип контента на основе расширения
-                extension = doc_path.suffix.lower()
-                media_type = "application/pdf" if extension == ".pdf" else "application/octet-stream"
-                
-                if extension == ".docx":
-                    media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    
-                return FileResponse(str(doc_path), media_type=media_type)
+        if asset is not None:
+            return asset_response(asset, request)
             
-            # Если документ не найден, вернем 404
-            raise HTTPException(status_code=404, detail="Файл документа не найден")
+        # Если документ не найден, вернем 404
+        raise HTTPException(status_code=404, detail="Файл документа не найден")
             
     except HTTPException:
         raise
@@ -103,9 +81,9 @@ async def get_documents_by_product_id(product_id: int):
     - Список документов с метаданными
     """
     try:
-        with get_db_cursor() as cursor:
+        async with get_async_db_cursor() as cursor:
             # Получаем инфо о соединителе
-            cursor.execute(
+            await cursor.execute(
                 """
                 SELECT cs.series_name, ct.type_id 
                 FROM connector_series cs
@@ -120,7 +98,7 @@ async def get_documents_by_product_id(product_id: int):
                 raise HTTPException(status_code=404, detail="Продукт не найден")
             
             # Получаем документы по соединителю или по его типу
-            cursor.execute(
+            await cursor.execute(
                 """
                 SELECT 
                     doc_id,
@@ -186,8 +164,8 @@ async def get_all_technical_documents():
     - Список всех доступных технических документов
     """
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute(
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(
                 """
                 SELECT 
                     doc_id,
@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException
 from typing import List
 
 from api.models.group import Group
-from api.database import get_db_cursor
+from api.database import get_async_db_cursor
 
 router = APIRouter(
     prefix="/Groups",
@@ -20,8 +20,8 @@ async def get_groups():
     Получение списка групп изделий (Электрические низкочастотные цилиндрические соединители)
     """
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute(
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(
                 """
                 SELECT type_id AS group_id, type_name AS group_name 
                 FROM connector_types 
@@ -1,12 +1,11 @@
 """
 Router for product images
 """
-from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import StreamingResponse, FileResponse
-import os
-from pathlib import Path
+from fastapi import APIRouter, HTTPException, Request
 from typing import List
 
+from api.services.assets import asset_manifest, asset_response
+
 router = APIRouter(
     prefix="/Images",
     tags=["images"],
@@ -16,83 +15,36 @@ router = APIRouter(
     },
 )
 
-# Корневая папка для хранения изображений
-IMAGES_ROOT = Path("database/Zapchasti")
+
+def _versioned_url(url, asset):
+    """Адрес файла с версией содержимого: такой адрес кэшируется как неизменяемый"""
+    if asset is None:
+        return url
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}v={asset.content_hash}"
+
 
 @router.get("/GetProductImage/{product_id}")
-async def get_product_image(product_id: int, view: str = None):
+async def get_product_image(request: Request, product_id: int, view: str = None):
     """
     Получение изображения продукта по его идентификатору
     
     Parameters:
     - **product_id**: Идентификатор продукта
     - **view**: Вид изображения (front, side и т.д.)
+    - **v**: Версия содержимого (хэш из GetProductImages); ответ кэшируется как неизменяемый
     
     Returns:
-    - Файл изображения (PNG, JPG)
+    - Файл изображения (PNG, JPG) или 304, если копия клиента актуальна
     """
     try:
-        # Базовая директория с изображениями
-        png_dir = IMAGES_ROOT / "2РМТ, 2РМДТ/ishodniki/PNG"
-        
-        # Сначала проверяем наличие специфичного изображения для продукта
-        product_specific_path = png_dir / f"product_{product_id}.png"
-        
-        # Если запрошен определенный вид и это число
-        if view and view.isdigit():
-            view_image_path = png_dir / f"{view}.png"
-            if view_image_path.exists():
-                return FileResponse(str(view_image_path), media_type="image/png")
-        
-        # Если запрошен определенный вид (front, side и т.д.)
-        if view:
-            # Для каталога с сериями 2РМТ/2РМДТ используем нумерованные изображения
-            view_mapping = {
-                "front": "1.png",  # Фронтальное изображение
-                "side": "2.png",   # Боковое изображение
-                "details": "3.png", # Детали
-                "specs": "4.png",   # Спецификации
-                "table": "5.png"    # Таблица размеров
-            }
-            
-            if view in view_mapping:
-                view_image_path = png_dir / view_mapping[view]
-                if view_image_path.exists():
-                    return FileResponse(str(view_image_path), media_type="image/png")
-        
-        # Если есть конкретное изображение для продукта
-        if product_specific_path.exists():
-            return FileResponse(str(product_specific_path), media_type="image/png")
-        
-        # Если нет конкретного изображения, проверяем по идентификатору продукта
-        if product_id == 5:  # 2РМТ
-            # Используем общее изображение 2РМТ
-            general_image = png_dir / "1.png"
-            if general_image.exists():
-                return FileResponse(str(general_image), media_type="image/png")
-        
-        elif product_id == 6:  # 2РМДТ
-            # Используем общее изображение 2РМДТ
-            general_image = png_dir / "1.png"
-            if general_image.exists():
-                return FileResponse(str(general_image), media_type="image/png")
-        
-        # По умолчанию используем одно из доступных изображений в зависимости от product_id
-        numbered_images = [f"{i}.png" for i in range(1, 6)]
-        image_index = (product_id % 5)  # Используем остаток от деления для циклического выбора
-        selected_image = numbered_images[image_index]
-        
-        selected_path = png_dir / selected_image
-        if selected_path.exists():
-            return FileResponse(str(selected_path), media_type="image/png")
-        
-        # Если ни одно из вышеуказанных изображений не найдено, 
-        # используем любое доступное изображение
-        for file in png_dir.glob("*.png"):
-            return FileResponse(str(file), media_type="image/png")
-        
-        # Если изображение не найдено, вернем 404
-        raise HTTPException(status_code=404, detail=f"Изображение для продукта {product_id} не найдено")
+        # Файл выбирается по манифесту, без обращений к файловой системе
+        asset = asset_manifest.snapshot.product_image(product_id, view)
+        if asset is None:
+            raise HTTPException(status_code=404, detail=f"Изображение для продукта {product_id} не найдено")
+        return asset_response(asset, request)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка при получении изображения: {str(e)}")
 
@@ -106,26 +58,30 @@ async def get_product_images(product_id: int):
     - **product_id**: Идентификатор продукта
     
     Returns:
-    - Список URL изображений
+    - Список URL изображений; URL содержат версию содержимого (v=<хэш>) и
+      кэшируются как неизменяемые
     """
     try:
+        snapshot = asset_manifest.snapshot
         # Формируем список URL доступных изображений для продукта
         base_url = f"/api/Images/GetProductImage/{product_id}"
         
         # Базовое изображение продукта
-        image_urls = [base_url]
+        image_urls = [_versioned_url(base_url, snapshot.product_image(product_id))]
         
         # Стандартные виды для всех продуктов
         views = ["front", "side", "details", "specs", "table"]
         for view in views:
-            image_urls.append(f"{base_url}?view={view}")
+            image_urls.append(_versioned_url(f"{base_url}?view={view}", snapshot.product_image(product_id, view)))
         
         # Добавляем URL для чертежа
-        image_urls.append(f"/api/Images/GetTechnicalDrawing/{product_id}")
+        image_urls.append(_versioned_url(
+            f"/api/Images/GetTechnicalDrawing/{product_id}", snapshot.technical_drawing(product_id)
+        ))
         
         # Дополнительно проверяем, существуют ли нумерованные изображения
         for i in range(1, 6):
-            image_urls.append(f"{base_url}?view={i}")
+            image_urls.append(_versioned_url(f"{base_url}?view={i}", snapshot.product_image(product_id, str(i))))
             
         return image_urls
     except Exception as e:
@@ -133,7 +89,7 @@ async def get_product_images(product_id: int):
 
 
 @router.get("/GetTechnicalDrawing/{product_id}")
-async def get_technical_drawing(product_id: int):
+async def get_technical_drawing(request: Request, product_id: int):
     """
     Получение технического чертежа продукта
     
@@ -141,51 +97,15 @@ async def get_technical_drawing(product_id: int):
     - **product_id**: Идентификатор продукта
     
     Returns:
-    - Файл чертежа (PDF или изображение)
+    - Файл чертежа (PDF или изображение) или 304, если копия клиента актуальна
     """
     try:
-        # Базовая директория для чертежей
-        # Сначала проверяем в PDF директории
-        pdf_dir = IMAGES_ROOT / "2РМТ, 2РМДТ/ishodniki/PNG/PDF"
-        
-        # Проверяем наличие специфичного чертежа для продукта
-        drawing_path = pdf_dir / f"drawing_{product_id}.pdf"
-        
-        # Если есть конкретный чертеж для продукта, возвращаем его
-        if drawing_path.exists():
-            return FileResponse(str(drawing_path), media_type="application/pdf")
-        
-        # Если нет чертежа в PDF, используем PNG изображения для чертежей
-        png_dir = IMAGES_ROOT / "2РМТ, 2РМДТ/ishodniki/PNG"
-        
-        # Проверяем наличие специфичного изображения чертежа для продукта
-        drawing_png = png_dir / f"drawing_{product_id}.png"
-        if drawing_png.exists():
-            return FileResponse(str(drawing_png), media_type="image/png")
-        
-        # Если нет, используем изображения с техническими данными (предполагаем, что это 5.png)
-        tech_drawing = png_dir / "5.png"
-        if tech_drawing.exists():
-            return FileResponse(str(tech_drawing), media_type="image/png")
-        
-        # Если нет, пробуем изображение с размерами (предполагаем, что это 4.png)
-        dimensions = png_dir / "4.png"
-        if dimensions.exists():
-            return FileResponse(str(dimensions), media_type="image/png")
-            
-        # Если ни один из вышеуказанных файлов не найден, ищем любой PDF
-        if pdf_dir.exists():
-            pdfs = list(pdf_dir.glob("*.pdf"))
-            if pdfs:
-                return FileResponse(str(pdfs[0]), media_type="application/pdf")
-        
-        # Если PDF не найден, ищем любую картинку из нумерованных
-        for i in range(1, 6):
-            img_path = png_dir / f"{i}.png"
-            if img_path.exists():
-                return FileResponse(str(img_path), media_type="image/png")
-                
-        # Если ничего не найдено, вернем 404
-        raise HTTPException(status_code=404, detail=f"Технический чертеж для продукта {product_id} не найден")
+        # Файл выбирается по манифесту, без обращений к файловой системе
+        asset = asset_manifest.snapshot.technical_drawing(product_id)
+        if asset is None:
+            raise HTTPException(status_code=404, detail=f"Технический чертеж для продукта {product_id} не найден")
+        return asset_response(asset, request)
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ошибка при получении чертежа: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Ошибка при получении чертежа: {str(e)}")
@@ -1,17 +1,56 @@
 """
 Router for products
 """
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Response, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
+import json
 import logging
+import time
 
 from api.models.product import (
-    ProductPreview, ProductPage, ProductDetail, ContactInfo, 
-    TechnicalSpecification, LifetimeByTemperature, OverheatByLoad,
-    MechanicalFactor, ClimaticFactor, DimensionTable, ConnectorOrderInfo,
-    ContactRow, Documentation
+    ProductPreview, ProductPage, ProductDetail, ContactInfo, Documentation,
+    CatalogBrowsePage, SearchResult, SuggestItem, ParseCodesRequest, ParseCodesResponse,
+    ProductBatchItem, ParametricPage, MatesRequest, MateLookup, LifetimeRequest, LifetimeResponse,
+    DeratingRequest, DeratingReport
 )
-from api.database import get_db_cursor
+from api.database import get_async_db_cursor
+from api.services.catalog_version import catalog_version
+from api.services.product_cache import product_cache, serialize_response
+from api.services.catalog_browse import (
+    resolve_filters, build_browse_query, build_browse_page, InvalidFacetValueError
+)
+from api.services.dictionaries import dictionaries
+from api.services.pagination import (
+    encode_cursor, decode_cursor, InvalidCursorError, group_counts
+)
+from api.services.product_detail import fetch_product_rows, build_product_detail
+from api.services.suggest import suggest_index
+from api.services.search_planner import (
+    classify_query, execute_plan, server_timing, KIND_TITLES, NUMERIC, TEXT
+)
+from api.services.search_cache import search_cache, search_cache_key
+from api.services.parametric import (
+    build_parametric_query, validate_ranges, InvalidRangeError, SORT_COLUMNS
+)
+from api.services.compatibility import compatibility_graph
+from api.services.lifetime import lifetime_calculator
+from api.services.derating import derating_engine
+from api.services.bom import spool_request_body, iter_bom_entries, resolve_bom
+from api.services.static_sections import static_sections, STATIC_SECTIONS
+from database.connector_code import CODE_SEGMENTS
+from database.order_codes import UnknownSegmentValueError
+
+# Заголовок ответа с количеством обращений к базе данных
+ROUND_TRIPS_HEADER = "X-DB-Round-Trips"
+
+# Максимальное количество продуктов в одном запросе GetByIds
+MAX_BATCH_IDS = 500
+
+# Количество обозначений в одном фрагменте потока OrderCodes
+ORDER_CODES_CHUNK_SIZE = 1000
+
+SUGGEST_INDEX_UNAVAILABLE = "Индекс обозначений временно недоступен, повторите запрос позже"
 
 router = APIRouter(
     prefix="/Products",
@@ -24,49 +63,91 @@ router = APIRouter(
 async def get_products_by_group_id(
     group_id: int,
     page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1, le=100)
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Токен продолжения из next_cursor предыдущей страницы"),
+    include_total: bool = Query(True, description="Возвращать общее количество изделий")
 ):
     """
     Получение списка изделий по идентификатору группы с пагинацией
     
     Parameters:
     - **group_id**: Идентификатор группы изделий
-    - **page**: Номер страницы (начиная с 1)
+    - **page**: Номер страницы (начиная с 1), используется без токена продолжения
     - **page_size**: Количество элементов на странице (от 1 до 100)
+    - **cursor**: Токен продолжения; следующая страница читается поиском по индексу без OFFSET
+    - **include_total**: Возвращать общее количество изделий (берется из кэша)
     """
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, group_id, (str, int))
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        with get_db_cursor() as cursor:
-            # Получаем общее количество соединителей заданного типа
-            cursor.execute(
-                """
-                SELECT COUNT(*) AS total_count 
-                FROM connector_series cs
-                WHERE cs.type_id = %s
-                """, 
-                (group_id,)
-            )
-            total_count = cursor.fetchone()["total_count"]
-            
-            # Вычисляем смещение для пагинации
-            offset = (page - 1) * page_size
+        async with get_async_db_cursor() as db_cursor:
+            total_count = None
+            if include_total:
+                total_count = group_counts.get(group_id)
+                if total_count is None:
+                    # Версию каталога запоминаем до чтения данных
+                    version = catalog_version.version
+                    await db_cursor.execute(
+                        """
+                        SELECT COUNT(*) AS total_count 
+                        FROM connector_series cs
+                        WHERE cs.type_id = %s
+                        """, 
+                        (group_id,)
+                    )
+                    total_count = db_cursor.fetchone()["total_count"]
+                    group_counts.put(group_id, total_count, version)
+            
+            # Лишняя строка показывает, есть ли следующая страница
+            if after is not None:
+                # Следующая страница по токену: поиск по индексу (type_id, series_name, series_id)
+                await db_cursor.execute(
+                    """
+                    SELECT 
+                        cs.series_id AS product_id,
+                        cs.series_name AS product_name
+                    FROM 
+                        connector_series cs
+                    WHERE 
+                        cs.type_id = %s
+                        AND (cs.series_name, cs.series_id) > (%s, %s)
+                    ORDER BY 
+                        cs.series_name, cs.series_id
+                    LIMIT %s
+                    """, 
+                    (group_id, after[0], after[1], page_size + 1)
+                )
+            else:
+                # Вычисляем смещение для пагинации по номеру страницы
+                offset = (page - 1) * page_size
+                
+                await db_cursor.execute(
+                    """
+                    SELECT 
+                        cs.series_id AS product_id,
+                        cs.series_name AS product_name
+                    FROM 
+                        connector_series cs
+                    WHERE 
+                        cs.type_id = %s
+                    ORDER BY 
+                        cs.series_name, cs.series_id
+                    LIMIT %s OFFSET %s
+                    """, 
+                    (group_id, page_size + 1, offset)
+                )
+            products = db_cursor.fetchall()
             
-            # Получаем список изделий с пагинацией
-            cursor.execute(
-                """
-                SELECT 
-                    cs.series_id AS product_id,
-                    cs.series_name AS product_name
-                FROM 
-                    connector_series cs
-                WHERE 
-                    cs.type_id = %s
-                ORDER BY 
-                    cs.series_name
-                LIMIT %s OFFSET %s
-                """, 
-                (group_id, page_size, offset)
-            )
-            products = cursor.fetchall()
+            next_cursor = None
+            if len(products) > page_size:
+                products = products[:page_size]
+                last = products[-1]
+                next_cursor = encode_cursor(group_id, last["product_name"], last["product_id"])
             
             # Обновляем пути к изображениям
             for product in products:
@@ -76,12 +157,24 @@ async def get_products_by_group_id(
                 "items": products,
                 "total_count": total_count,
                 "page": page,
-                "page_size": page_size
+                "page_size": page_size,
+                "next_cursor": next_cursor
             }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {str(e)}")
 
 
+def _product_response(body, round_trips):
+    """
+    Формирует ответ из готового тела карточки продукта
+    """
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={ROUND_TRIPS_HEADER: str(round_trips)}
+    )
+
+
 @router.get("/GetById", response_model=ProductDetail)
 async def get_product_by_id(product_id: int):
     """
@@ -90,142 +183,25 @@ async def get_product_by_id(product_id: int):
     Parameters:
     - **product_id**: Идентификатор продукта
     """
+    body = product_cache.get(product_id, "base")
+    if body is not None:
+        suggest_index.record_view(product_id)
+        return _product_response(body, 0)
+    
     try:
-        with get_db_cursor() as cursor:
-            # Проверка наличия продукта в базе данных
-            cursor.execute(
-                """
-                SELECT COUNT(*) as count
-                FROM connector_series
-                WHERE series_id = %s
-                """,
-                (product_id,)
-            )
-            
-            count = cursor.fetchone()["count"]
-            if count == 0:
+        # Версию каталога запоминаем до чтения данных
+        version = catalog_version.version
+        async with get_async_db_cursor() as cursor:
+            # Все данные карточки получаем одним составным запросом
+            row = (await fetch_product_rows(cursor, [product_id])).get(product_id)
+            if row is None:
                 raise HTTPException(status_code=404, detail="Продукт не найден")
+            # Просмотр учитывается только для существующего продукта
+            suggest_index.record_view(product_id)
             
-            # Получаем основную информацию о продукте
-            cursor.execute(
-                """
-                SELECT series_id, series_name, description 
-                FROM connector_series 
-                WHERE series_id = %s
-                """, 
-                (product_id,)
-            )
-            
-            base_product = cursor.fetchone()
-            
-            # Получаем тип соединителя из имени серии
-            connector_code = base_product["series_name"].split()[0] if ' ' in base_product["series_name"] else base_product["series_name"]
-            
-            cursor.execute(
-                """
-                SELECT type_id, type_name
-                FROM connector_types
-                WHERE code = %s
-                """,
-                (connector_code,)
-            )
-            
-            connector_type = cursor.fetchone()
-            connector_type_name = connector_type["type_name"] if connector_type else "Неизвестный тип"
-            
-            # Получаем параметры из электромеханической таблицы (если доступно)
-            cursor.execute(
-                """
-                SELECT *
-                FROM electromechanical_parameters
-                WHERE series_name = %s
-                """, 
-                (base_product["series_name"],)
-            )
-            
-            em_params = cursor.fetchone()
-            
-            # Формируем базовый результат
-            result = {
-                "connector_id": base_product["series_id"],
-                "full_code": base_product["series_name"],
-                "gost": "ГОСТ В 23476.8-86" if not em_params else em_params.get("gost", "ГОСТ В 23476.8-86"),
-                "connector_type": connector_type_name,
-                "body_size": "стандартный" if not em_params else em_params.get("body_size", "стандартный"),
-                "body_type": "стандартный" if not em_params else em_params.get("body_type", "стандартный"),
-                "nozzle_type": None,
-                "nut_type": None,
-                "contacts_quantity": 0 if not em_params else em_params.get("contacts_quantity", 0),
-                "connector_part": "розетка" if not em_params else em_params.get("connector_part", "розетка"),
-                "contact_combination": "стандартное" if not em_params else em_params.get("contact_combination", "стандартное"),
-                "contact_coating": "золото" if not em_params else em_params.get("contact_coating", "золото"),
-                "heat_resistance": 100 if not em_params else em_params.get("heat_resistance", 100),
-                "special_design": None, 
-                "climate_design": "УХЛ" if not em_params else em_params.get("climate_design", "УХЛ"),
-                "connection_type": "резьбовое" if not em_params else em_params.get("connection_type", "резьбовое"),
-                "contacts_info": [],
-                "documentation": [],
-                "created_at": "2024-01-01",  # Заглушка
-                "updated_at": "2024-01-01"   # Заглушка
-            }
-            
-            # Получаем информацию о контактах напрямую из таблиц диаметров и характеристик
-            try:
-                cursor.execute(
-                    """
-                    SELECT 
-                        cd.diameter,
-                        cr.max_resistance,
-                        cmc.max_current
-                    FROM 
-                        contact_diameters cd
-                    LEFT JOIN
-                        contact_resistance cr ON cd.diameter_id = cr.diameter_id
-                    LEFT JOIN
-                        contact_max_current cmc ON cd.diameter_id = cmc.diameter_id
-                    ORDER BY 
-                        cd.diameter
-                    """)
-                
-                contacts = cursor.fetchall()
-                if contacts:
-                    result["contacts_info"] = [
-                        {
-                            "diameter": float(c["diameter"]) if c["diameter"] else None,
-                            "max_resistance": float(c["max_resistance"]) if c["max_resistance"] else None,
-                            "max_current": float(c["max_current"]) if c["max_current"] else None
-                        } 
-                        for c in contacts
-                    ]
-            except Exception as e:
-                # Если произошла ошибка, используем данные из представления
-                try:
-                    cursor.execute("SELECT * FROM v_contact_specs")
-                    contacts = cursor.fetchall()
-                    if contacts:
-                        result["contacts_info"] = [
-                            {
-                                "diameter": float(c["diameter"]) if c["diameter"] else None,
-                                "max_resistance": float(c["max_resistance"]) if c["max_resistance"] else None,
-                                "max_current": float(c["max_current"]) if c["max_current"] else None
-                            } 
-                            for c in contacts
-                        ]
-                except Exception:
-                    # В случае любых ошибок оставляем пустой список
-                    pass
-                
-            # Добавляем документацию
-            result["documentation"] = [
-                {
-                    "doc_name": "Техническая спецификация",
-                    "doc_path": None,
-                    "description": base_product["description"] or f"Спецификация для {base_product['series_name']}",
-                    "upload_date": "2024-01-01"
-                }
-            ]
-            
-            return result
+            body = serialize_response(ProductDetail(**build_product_detail(row)))
+            product_cache.put(product_id, "base", row["type_id"], body, version)
+            return _product_response(body, cursor.round_trips)
             
     except HTTPException:
         # Пробрасываем HTTPException дальше
@@ -235,6 +211,62 @@ async def get_product_by_id(product_id: int):
         raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {str(e)}")
 
 
+@router.get("/GetByIds", response_model=List[ProductBatchItem])
+async def get_products_by_ids(
+    ids: List[int] = Query(..., description="Идентификаторы продуктов")
+):
+    """
+    Получение детальной информации о нескольких продуктах одним запросом
+    
+    Карточки, которых нет в кэше, собираются тем же составным запросом, что и
+    в GetById, но сразу для всех идентификаторов. Результаты возвращаются в
+    порядке идентификаторов запроса; для отсутствующих продуктов вместо
+    карточки возвращается ошибка.
+    
+    Parameters:
+    - **ids**: Идентификаторы продуктов (параметр повторяется, не более 500)
+    """
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Слишком много идентификаторов: {len(ids)}, допускается не более {MAX_BATCH_IDS}"
+        )
+
+    bodies = {}
+    for product_id in ids:
+        if product_id not in bodies:
+            body = product_cache.get(product_id, "base")
+            if body is not None:
+                bodies[product_id] = body
+    missing = [product_id for product_id in dict.fromkeys(ids) if product_id not in bodies]
+
+    round_trips = 0
+    if missing:
+        try:
+            # Версию каталога запоминаем до чтения данных
+            version = catalog_version.version
+            async with get_async_db_cursor() as cursor:
+                rows = await fetch_product_rows(cursor, missing)
+                round_trips = cursor.round_trips
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {str(e)}")
+        for product_id, row in rows.items():
+            body = serialize_response(ProductDetail(**build_product_detail(row)))
+            product_cache.put(product_id, "base", row["type_id"], body, version)
+            bodies[product_id] = body
+
+    # Ответ собирается из готовых тел карточек, как в GetById
+    not_found = serialize_response("Продукт не найден")
+    items = []
+    for product_id in ids:
+        body = bodies.get(product_id)
+        if body is not None:
+            items.append(b'{"product_id":%d,"product":%s,"error":null}' % (product_id, body))
+        else:
+            items.append(b'{"product_id":%d,"product":null,"error":%s}' % (product_id, not_found))
+    return _product_response(b"[" + b",".join(items) + b"]", round_trips)
+
+
 @router.get("/GetDetailedById/{product_id}", response_model=ProductDetail)
 async def get_detailed_product_by_id(
     product_id: int = Path(..., description="Идентификатор продукта")
@@ -248,27 +280,23 @@ async def get_detailed_product_by_id(
     Returns:
     - Подробная информация о продукте, включая технические характеристики, таблицы и схемы
     """
+    body = product_cache.get(product_id, "detailed")
+    if body is not None:
+        suggest_index.record_view(product_id)
+        return _product_response(body, 0)
+    
     try:
-        with get_db_cursor() as cursor:
-            # Проверяем наличие продукта
-            cursor.execute(
-                """
-                SELECT COUNT(*) as count
-                FROM connector_series
-                WHERE series_id = %s
-                """,
-                (product_id,)
-            )
-            
-            count = cursor.fetchone()["count"]
-            if count == 0:
+        # Версию каталога запоминаем до чтения данных
+        version = catalog_version.version
+        async with get_async_db_cursor() as cursor:
+            # Базовую карточку получаем тем же составным запросом, что и GetById
+            row = (await fetch_product_rows(cursor, [product_id])).get(product_id)
+            if row is None:
                 raise HTTPException(status_code=404, detail="Продукт не найден")
+            # Просмотр учитывается только для существующего продукта
+            suggest_index.record_view(product_id)
             
-            # Получаем базовую информацию о продукте методом GetById
-            base_product = await get_product_by_id(product_id)
-            
-            # Расширяем базовый результат
-            result = dict(base_product)
+            result = build_product_detail(row)
             
             # Добавляем описание на основе типа соединителя
             result["description"] = f"Соединители электрические цилиндрические низкочастотные {result['connector_type']}"
@@ -277,248 +305,6 @@ async def get_detailed_product_by_id(
 Конструктивные особенности определяются исполнениями: так и кабельными, как и приборными частями.
 Соединители {result['connector_type']} имеют различные схемы расположения контактов и взаимосочетания."""
             
-            # Добавляем технические характеристики
-            result["technical_specs"] = [
-                {
-                    "param_name": "Сопротивление контактов",
-                    "param_value": {
-                        "диаметр контакта, 1,0 мм": "не более 5,0 мОм",
-                        "диаметр контакта, 1,5 мм": "не более 2,5 мОм",
-                        "диаметр контакта, 2,0 мм": "не более 1,6 мОм",
-                        "диаметр контакта, 3,0 мм": "не более 0,8 мОм"
-                    }
-                },
-                {
-                    "param_name": "Сопротивление изоляции",
-                    "param_value": "не менее 5 000 МОм"
-                },
-                {
-                    "param_name": "Максимальный ток на одиночный контакт",
-                    "param_value": {
-                        "диаметр контакта, 1,0 мм": "8,0 А",
-                        "диаметр контакта, 1,5 мм": "15,0 А",
-                        "диаметр контакта, 2,0 мм": "18,0 А",
-                        "диаметр контакта, 3,0 мм": "32,0 А"
-                    }
-                },
-                {
-                    "param_name": "Максимальное рабочее напряжение",
-                    "param_value": "560 В"
-                },
-                {
-                    "param_name": "Количество сочленений - расчленений",
-                    "param_value": "500"
-                },
-                {
-                    "param_name": "Минимальный срок сохраняемости соединителей",
-                    "param_value": "15 лет"
-                }
-            ]
-            
-            # Добавляем таблицу минимальной наработки
-            result["lifetime_table"] = [
-                {"lifetime_hours": 1000, "max_temperature": 150},
-                {"lifetime_hours": 3000, "max_temperature": 125},
-                {"lifetime_hours": 5000, "max_temperature": 120},
-                {"lifetime_hours": 7500, "max_temperature": 113},
-                {"lifetime_hours": 10000, "max_temperature": 105},
-                {"lifetime_hours": 15000, "max_temperature": 100},
-                {"lifetime_hours": 20000, "max_temperature": 96},
-                {"lifetime_hours": 25000, "max_temperature": 94},
-                {"lifetime_hours": 30000, "max_temperature": 92},
-                {"lifetime_hours": 40000, "max_temperature": 88},
-                {"lifetime_hours": 50000, "max_temperature": 84},
-                {"lifetime_hours": 80000, "max_temperature": 79},
-                {"lifetime_hours": 100000, "max_temperature": 75}
-            ]
-            
-            # Добавляем таблицу перегрева
-            result["overheat_table"] = [
-                {"load_percent": 220, "overheat_temperature": 150},
-                {"load_percent": 180, "overheat_temperature": 130},
-                {"load_percent": 150, "overheat_temperature": 120},
-                {"load_percent": 120, "overheat_temperature": 80},
-                {"load_percent": 110, "overheat_temperature": 65},
-                {"load_percent": 100, "overheat_temperature": 50},
-                {"load_percent": 85, "overheat_temperature": 40},
-                {"load_percent": 75, "overheat_temperature": 30},
-                {"load_percent": 50, "overheat_temperature": 25},
-                {"load_percent": 25, "overheat_temperature": 20}
-            ]
-            
-            # Добавляем механические факторы
-            result["mechanical_factors"] = [
-                {
-                    "name": "Синусоидальная вибрация",
-                    "parameters": {
-                        "диапазон частот": "1 – 5 000 Гц",
-                        "амплитуда ускорения": "490 м/с² (50 g)"
-                    }
-                },
-                {
-                    "name": "Механический удар одиночного действия",
-                    "parameters": {
-                        "пиковое ударное ускорение": "5 000 м/с² (500 g)"
-                    }
-                },
-                {
-                    "name": "Механический удар многократного действия",
-                    "parameters": {
-                        "пиковое ударное ускорение": "1 000 м/с² (100 g)"
-                    }
-                }
-            ]
-            
-            # Добавляем климатические факторы
-            result["climatic_factors"] = [
-                {
-                    "name": "Повышенная рабочая температура среды",
-                    "value": "100 °C"
-                },
-                {
-                    "name": "Пониженная предельная температура среды",
-                    "value": "минус 60 °C"
-                },
-                {
-                    "name": "Атмосферное пониженное рабочее давление",
-                    "value": "1,33х10⁻⁴ Па (1х10⁻⁶ мм рт. ст.)"
-                },
-                {
-                    "name": "Повышенная относительная влажность воздуха при температуре +40 °C (без конденсации влаги)",
-                    "value": "98 %"
-                }
-            ]
-            
-            # Добавляем схемы расположения контактов
-            result["contact_layout"] = [
-                {
-                    "size_code": 14,
-                    "connector_type": "2РМТ",
-                    "contact_diameter": 1.0,
-                    "contacts_quantity": 4,
-                    "combination_code": "1",
-                    "max_current_summary": 27.0,
-                    "max_current_contact": 8.0,
-                    "max_working_voltage": 560
-                },
-                {
-                    "size_code": 18,
-                    "connector_type": "2РМДТ",
-                    "contact_diameter": 1.5,
-                    "contacts_quantity": 4,
-                    "combination_code": "5",
-                    "max_current_summary": 50.0,
-                    "max_current_contact": 15.0,
-                    "max_working_voltage": 560
-                },
-                {
-                    "size_code": 18,
-                    "connector_type": "2РМТ",
-                    "contact_diameter": 1.0,
-                    "contacts_quantity": 7,
-                    "combination_code": "1",
-                    "max_current_summary": 40.0,
-                    "max_current_contact": 7.0,
-                    "max_working_voltage": 560
-                },
-                {
-                    "size_code": 22,
-                    "connector_type": "2РМТ",
-                    "contact_diameter": 2.0,
-                    "contacts_quantity": 2,
-                    "combination_code": "3",
-                    "max_current_summary": 80.0,
-                    "max_current_contact": 18.0,
-                    "max_working_voltage": 560
-                },
-                {
-                    "size_code": 22,
-                    "connector_type": "2РМТ",
-                    "contact_diameter": 1.0,
-                    "contacts_quantity": 10,
-                    "combination_code": "1",
-                    "max_current_summary": 58.0,
-                    "max_current_contact": 7.0,
-                    "max_working_voltage": 560
-                }
-            ]
-            
-            # Добавляем таблицы размеров
-            result["dimension_tables"] = [
-                {
-                    "title": "Приборная часть без патрубка",
-                    "headers": ["D*", "L max", "D гайки", "D1", "A", "B"],
-                    "rows": [
-                        {"D*": "14", "L max": "25", "D гайки": "M14x1", "D1": "M16x1", "A": "17±0.1", "B": "24"},
-                        {"D*": "18", "L max": "25", "D гайки": "M18x1", "D1": "M20x1", "A": "20±0.1", "B": "27"},
-                        {"D*": "22", "L max": "27", "D гайки": "M22x1", "D1": "M24x1", "A": "23±0.1", "B": "30"}
-                    ]
-                },
-                {
-                    "title": "Кабельная часть без патрубка",
-                    "headers": ["D гайки", "D1", "L max"],
-                    "rows": [
-                        {"D гайки": "M14x1", "D1": "22", "L max": "25"},
-                        {"D гайки": "M18x1", "D1": "25", "L max": "25"},
-                        {"D гайки": "M22x1", "D1": "29", "L max": "27"}
-                    ]
-                },
-                {
-                    "title": "Патрубок прямой с экранированной гайкой (ПЭ)",
-                    "headers": ["D гайки", "d1", "L max"],
-                    "rows": [
-                        {"D гайки": "M14x1", "d1": "6,5", "L max": "28,7"},
-                        {"D гайки": "M18x1", "d1": "10,5", "L max": "28,7"},
-                        {"D гайки": "M22x1", "d1": "14", "L max": "28,7"}
-                    ]
-                }
-            ]
-            
-            # Добавляем информацию для заказа
-            result["order_info"] = {
-                "connector_type": "2РМТ, 2РМДТ",
-                "size_codes": ["14", "18", "22"],
-                "body_types": {
-                    "Б": "блочный (приборный)",
-                    "К": "кабельный"
-                },
-                "nozzle_types": {
-                    "П": "прямой",
-                    "У": "угловой"
-                },
-                "nut_types": {
-                    "Э": "для экранированного кабеля",
-                    "Н": "для неэкранированного кабеля"
-                },
-                "contacts_quantity": ["4", "7", "10"],
-                "connector_parts": {
-                    "Г": "розетка",
-                    "Ш": "вилка"
-                },
-                "contact_combinations": {
-                    "1": "все контакты Ø 1,0 мм",
-                    "2": "все контакты Ø 1,5 мм",
-                    "3": "все контакты Ø 2,0 мм или Ø 3,0 мм",
-                    "5": "все контакты Ø 1,5 мм"
-                },
-                "contact_coatings": {
-                    "А": "золото",
-                    "В": "серебро"
-                },
-                "heat_resistance": {
-                    "1": "100° C"
-                },
-                "special_designs": {
-                    "Д": "левая розетка (только для проходных вилок)",
-                    "В": "корпус блочный (приборный) без левой резьбы"
-                },
-                "climate_designs": "Всеклиматическое исполнение",
-                "example_connector": [
-                    "Вилка 2РМТ18БП1В1В  ГЕО.364.126ТУ.",
-                    "Розетка 2РМТ18КП3Г1В1В  ГЕО.364.126ТУ"
-                ]
-            }
-            
             # Добавляем пути к изображениям
             result["images"] = [
                 f"/api/Images/GetProductImage/{product_id}",
@@ -549,7 +335,16 @@ async def get_detailed_product_by_id(
                 }
             ]
             
-            return result
+            round_trips = cursor.round_trips
+        
+        # Статические разделы (характеристики, таблицы, размеры, информация для заказа)
+        # загружаются из базы один раз и вставляются готовыми JSON-фрагментами
+        sections = await static_sections.get(row["type_id"])
+        body = sections.splice(
+            serialize_response(ProductDetail(**result), exclude=set(STATIC_SECTIONS))
+        )
+        product_cache.put(product_id, "detailed", row["type_id"], body, version)
+        return _product_response(body, round_trips)
             
     except HTTPException:
         raise
@@ -577,122 +372,104 @@ async def get_catalog_items(
     try:
         logging.info(f"GetCatalogItems вызван с параметрами: type_filter={type_filter}, size_filter={size_filter}, limit={limit}")
         
-        # Пробуем использовать прямое подключение к БД с правильной кодировкой
+        # Соединения пула уже используют кодировку UTF-8
         try:
-            import psycopg2
-            from database.connection.db_connector import get_db_connection
-            
-            # Получаем соединение с UTF-8 кодировкой
-            conn = get_db_connection()
-            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
-                # Базовый запрос без фильтров
-                query = """
-                SELECT 
-                    cs.series_id AS product_id,
-                    cs.series_name AS product_name,
-                    '' AS product_image_path
-                FROM 
-                    connector_series cs
-                """
-                
-                params = []
-                where_clauses = []
-                joins = []
-                
-                # Добавляем JOIN к типам соединителей всегда
-                joins.append("JOIN connector_types ct ON cs.type_id = ct.type_id")
-                
-                # Фильтр по типу соединителя
-                if type_filter:
-                    logging.info(f"Применение фильтра по типу: {type_filter}")
-                    if type_filter.isdigit():
-                        # Числовой фильтр - ищем по ID типа
-                        # Проверяем существование типа
-                        cursor.execute("""
-                            SELECT EXISTS(SELECT 1 FROM connector_types WHERE type_id = %s)
-                        """, (int(type_filter),))
-                        type_exists = cursor.fetchone()[0]
-                        
-                        if not type_exists:
-                            logging.warning(f"Тип с ID {type_filter} не найден в базе данных")
-                            raise HTTPException(status_code=400, detail=f"Тип соединителя с ID {type_filter} не найден в базе данных")
-                            
-                        where_clauses.append("cs.type_id = %s")
-                        params.append(int(type_filter))
-                    else:
-                        # Текстовый фильтр - проверяем существование в базе
-                        cursor.execute("""
-                            SELECT EXISTS(SELECT 1 FROM connector_types 
-                                         WHERE code = %s OR type_name = %s)
-                        """, (type_filter, type_filter))
-                        type_exists = cursor.fetchone()[0]
+            # Базовый запрос без фильтров
+            query = """
+            SELECT 
+                cs.series_id AS product_id,
+                cs.series_name AS product_name,
+                '' AS product_image_path
+            FROM 
+                connector_series cs
+            """
+            
+            params = []
+            where_clauses = []
+            joins = []
+            
+            # Добавляем JOIN к типам соединителей всегда
+            joins.append("JOIN connector_types ct ON cs.type_id = ct.type_id")
+            
+            # Фильтры проверяются по кэшу справочников до получения соединения из пула:
+            # ответ 400 не занимает соединение, а перезагрузка справочников не ждет
+            # второе соединение, удерживая первое
+            dictionary = await dictionaries.get()
+            
+            # Фильтр по типу соединителя
+            if type_filter:
+                logging.info(f"Применение фильтра по типу: {type_filter}")
+                if type_filter.isdigit():
+                    # Числовой фильтр - ищем по ID типа
+                    if dictionary.find_type(int(type_filter)) is None:
+                        logging.warning(f"Тип с ID {type_filter} не найден в базе данных")
+                        raise HTTPException(status_code=400, detail=f"Тип соединителя с ID {type_filter} не найден в базе данных")
                         
-                        if not type_exists:
-                            logging.warning(f"Тип '{type_filter}' не найден в базе данных")
-                            raise HTTPException(status_code=400, detail=f"Тип соединителя '{type_filter}' не найден в базе данных")
-                            
-                        # Текстовый фильтр - ищем по названию или коду типа
-                        where_clauses.append("(ct.code = %s OR ct.type_name = %s)")
-                        params.append(type_filter)
-                        params.append(type_filter)
-                
-                # Фильтр по размеру корпуса
-                if size_filter:
-                    logging.info(f"Применение фильтра по размеру: {size_filter}")
-                    try:
-                        # Преобразуем в число для проверки, если возможно
-                        size_code = int(size_filter)
-                        
-                        # Сначала проверяем, есть ли такой размер в базе
-                        cursor.execute("""
-                            SELECT size_id, size_code 
-                            FROM connector_sizes 
-                            WHERE size_code = %s
-                        """, (size_code,))
+                    where_clauses.append("cs.type_id = %s")
+                    params.append(int(type_filter))
+                else:
+                    # Текстовый фильтр - проверяем существование по коду или названию типа
+                    if dictionary.find_type(type_filter) is None:
+                        logging.warning(f"Тип '{type_filter}' не найден в базе данных")
+                        raise HTTPException(status_code=400, detail=f"Тип соединителя '{type_filter}' не найден в базе данных")
                         
-                        size_row = cursor.fetchone()
-                        if size_row:
-                            logging.info(f"Найден размер с id={size_row['size_id']} и кодом {size_row['size_code']}")
-                            
-                            # Добавляем JOIN к таблице series_sizes напрямую
-                            joins.append("""
-                                JOIN series_sizes ss ON cs.series_id = ss.series_id
-                            """)
-                            where_clauses.append("ss.size_id = %s")
-                            params.append(size_row['size_id'])
-                        else:
-                            # Если размер не найден, возвращаем ошибку вместо всех продуктов
-                            logging.warning(f"Размер с кодом {size_code} не найден в таблице connector_sizes")
-                            raise HTTPException(
-                                status_code=400, 
-                                detail=f"Размер корпуса {size_code} не найден в базе данных. Доступные размеры: 14, 18, 22"
-                            )
-                    except ValueError:
-                        # Если не число, возвращаем ошибку
-                        logging.warning(f"Размер '{size_filter}' не является числом, некорректный формат")
-                        raise HTTPException(
-                            status_code=400, 
-                            detail=f"Некорректный формат размера '{size_filter}'. Размер должен быть числом. Доступные размеры: 14, 18, 22"
-                        )
+                    # Текстовый фильтр - ищем по названию или коду типа
+                    where_clauses.append("(ct.code = %s OR ct.type_name = %s)")
+                    params.append(type_filter)
+                    params.append(type_filter)
+            
+            # Фильтр по размеру корпуса
+            if size_filter:
+                logging.info(f"Применение фильтра по размеру: {size_filter}")
+                available_sizes = ", ".join(str(code) for code in dictionary.size_codes())
+                try:
+                    # Преобразуем в число для проверки, если возможно
+                    size_code = int(size_filter)
+                except ValueError:
+                    # Если не число, возвращаем ошибку
+                    logging.warning(f"Размер '{size_filter}' не является числом, некорректный формат")
+                    raise HTTPException(
+                        status_code=400, 
+                        detail=f"Некорректный формат размера '{size_filter}'. Размер должен быть числом. Доступные размеры: {available_sizes}"
+                    )
                 
-                # Собираем полный запрос
-                if joins:
-                    query += " " + " ".join(joins)
+                size_row = dictionary.find_size(size_code)
+                if size_row:
+                    logging.info(f"Найден размер с id={size_row['size_id']} и кодом {size_row['size_code']}")
                     
-                if where_clauses:
-                    query += " WHERE " + " AND ".join(where_clauses)
-                
-                # Добавляем сортировку и лимит
-                query += " ORDER BY cs.series_name LIMIT %s"
-                params.append(limit)
-                
-                # Логируем финальный запрос для отладки
-                logging.info(f"SQL запрос: {query}")
-                logging.info(f"Параметры: {params}")
+                    # Добавляем JOIN к таблице series_sizes напрямую
+                    joins.append("""
+                        JOIN series_sizes ss ON cs.series_id = ss.series_id
+                    """)
+                    where_clauses.append("ss.size_id = %s")
+                    params.append(size_row['size_id'])
+                else:
+                    # Если размер не найден, возвращаем ошибку вместо всех продуктов
+                    logging.warning(f"Размер с кодом {size_code} не найден в таблице connector_sizes")
+                    raise HTTPException(
+                        status_code=400, 
+                        detail=f"Размер корпуса {size_code} не найден в базе данных. Доступные размеры: {available_sizes}"
+                    )
+            
+            # Собираем полный запрос
+            if joins:
+                query += " " + " ".join(joins)
                 
+            if where_clauses:
+                query += " WHERE " + " AND ".join(where_clauses)
+            
+            # Добавляем сортировку и лимит
+            query += " ORDER BY cs.series_name LIMIT %s"
+            params.append(limit)
+            
+            # Логируем финальный запрос для отладки
+            logging.info(f"SQL запрос: {query}")
+            logging.info(f"Параметры: {params}")
+            
+            async with get_async_db_cursor() as cursor:
                 # Выполняем запрос
-                cursor.execute(query, tuple(params))
-                products = [dict(row) for row in cursor.fetchall()]
+                await cursor.execute(query, tuple(params))
+                products = cursor.fetchall()
                 logging.info(f"Найдено продуктов: {len(products)}")
                 
                 # Если ничего не найдено, возвращаем пустой список с информацией
@@ -703,7 +480,6 @@ async def get_catalog_items(
                 for product in products:
                     product["product_image_path"] = f"/api/Images/GetProductImage/{product['product_id']}"
                 
-                conn.close()
                 return products
                 
         except HTTPException:
@@ -730,8 +506,356 @@ async def get_catalog_items(
         raise HTTPException(status_code=500, detail=f"Ошибка при получении элементов каталога: {error_detail}")
 
 
-@router.get("/Search", response_model=List[ProductPreview])
+@router.get("/Suggest", response_model=List[SuggestItem])
+async def suggest_products(
+    q: str = Query(..., min_length=1, description="Начало обозначения серии или кода соединителя"),
+    limit: int = Query(10, ge=1, le=50, description="Максимальное количество подсказок")
+):
+    """
+    Автодополнение обозначений серий и кодов соединителей
+    
+    Подсказки выбираются из индекса в памяти без обращений к базе данных.
+    Регистр и пробелы во введенном тексте не учитываются; подсказки
+    упорядочены по популярности (количеству просмотров карточек).
+    
+    Parameters:
+    - **q**: Введенный текст
+    - **limit**: Максимальное количество подсказок
+    """
+    try:
+        if not await suggest_index.refresh():
+            raise HTTPException(status_code=503, detail=SUGGEST_INDEX_UNAVAILABLE)
+        return suggest_index.suggest(q, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Ошибка автодополнения: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ошибка автодополнения: {str(e)}")
+
+
+@router.get("/Parametric", response_model=ParametricPage)
+async def get_parametric(
+    current_min: Optional[float] = Query(None, ge=0, description="Минимальный ток на контакт, А"),
+    current_max: Optional[float] = Query(None, ge=0, description="Максимальный ток на контакт, А"),
+    diameter_min: Optional[float] = Query(None, ge=0, description="Минимальный диаметр контакта, мм"),
+    diameter_max: Optional[float] = Query(None, ge=0, description="Максимальный диаметр контакта, мм"),
+    contacts_min: Optional[int] = Query(None, ge=0, description="Минимальное количество контактов"),
+    contacts_max: Optional[int] = Query(None, ge=0, description="Максимальное количество контактов"),
+    voltage_min: Optional[int] = Query(None, ge=0, description="Минимальное рабочее напряжение, В"),
+    voltage_max: Optional[int] = Query(None, ge=0, description="Максимальное рабочее напряжение, В"),
+    heat_min: Optional[int] = Query(None, description="Минимальная теплостойкость, °C"),
+    heat_max: Optional[int] = Query(None, description="Максимальная теплостойкость, °C"),
+    sort: str = Query("series", regex="^(" + "|".join(SORT_COLUMNS) + ")$", description="Столбец сортировки"),
+    descending: bool = Query(False, description="Сортировка по убыванию"),
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(50, ge=1, le=500, description="Размер страницы")
+):
+    """
+    Параметрический поиск по электромеханическим параметрам
+    
+    Каждый параметр задается диапазоном: минимум, максимум или обе границы.
+    Например, ток от 15 А, от 4 до 10 контактов, диаметр 1,5 мм:
+    `current_min=15&contacts_min=4&contacts_max=10&diameter_min=1.5&diameter_max=1.5`.
+    Условия проверяются по индексам (миграция 011), страница и общее количество
+    получаются одним запросом.
+    
+    Parameters:
+    - **current_min**, **current_max**: Максимальный ток на контакт, А
+    - **diameter_min**, **diameter_max**: Диаметр контакта, мм
+    - **contacts_min**, **contacts_max**: Количество контактов
+    - **voltage_min**, **voltage_max**: Рабочее напряжение, В
+    - **heat_min**, **heat_max**: Теплостойкость, °C
+    - **sort**: series, size, current, diameter, contacts, voltage или heat_resistance
+    - **descending**: Сортировка по убыванию
+    - **page**, **page_size**: Страница результатов
+    """
+    bounds = {
+        "current": (current_min, current_max),
+        "diameter": (diameter_min, diameter_max),
+        "contacts": (contacts_min, contacts_max),
+        "voltage": (voltage_min, voltage_max),
+        "heat_resistance": (heat_min, heat_max),
+    }
+    try:
+        validate_ranges(bounds)
+    except InvalidRangeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        query, params = build_parametric_query(
+            bounds, sort, descending, page_size, (page - 1) * page_size
+        )
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(query, params)
+            row = cursor.fetchone()
+            return {
+                "items": row["items"],
+                "total_count": row["total_count"],
+                "page": page,
+                "page_size": page_size,
+            }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {str(e)}")
+
+
+@router.post("/Mates", response_model=List[MateLookup])
+async def find_mates(request: MatesRequest):
+    """
+    Поиск совместимых соединителей для набора соединителей
+    
+    Совместимость проверяется по графу compatible_connectors в памяти процесса.
+    При depth=1 возвращаются ответные части, при большей глубине — также
+    соединители, совместимые с найденными (с указанием шага и соединителя,
+    через который найдена совместимость).
+    
+    Parameters:
+    - **items**: Обозначения или идентификаторы соединителей (до 1000)
+    - **depth**: Количество шагов по графу (от 1 до 5)
+    """
+    try:
+        graph = await compatibility_graph.get()
+        results = graph.lookup(request.items, request.depth)
+        # Результаты уже имеют форму MateLookup, проверка моделью не нужна
+        body = json.dumps(results, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logging.error(f"Ошибка поиска совместимых соединителей: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ошибка поиска совместимых соединителей: {str(e)}")
+
+
+@router.post("/LifetimeAtTemperature", response_model=LifetimeResponse)
+async def calculate_lifetime(request: LifetimeRequest):
+    """
+    Расчет минимальной наработки соединителей для пакета температур
+    
+    Наработка интерполируется по кривой connector_lifetime_by_temperature,
+    загруженной в память процесса; результаты совпадают с функцией
+    calculate_lifetime_at_temperature базы данных (температура округляется
+    до целого градуса).
+    
+    Parameters:
+    - **temperatures**: Температуры, °C (до 100000 значений)
+    """
+    try:
+        lifetimes = await lifetime_calculator.calculate(request.temperatures)
+        body = json.dumps({"lifetime_hours": lifetimes}, separators=(",", ":")).encode("utf-8")
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logging.error(f"Ошибка расчета срока службы: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ошибка расчета срока службы: {str(e)}")
+
+
+@router.post("/Derating", response_model=DeratingReport)
+async def check_harness_derating(request: DeratingRequest):
+    """
+    Проверка токовой нагрузки контактов жгута
+    
+    Для каждого соединителя диаметры контактов определяются по сочетанию
+    контактов, нагрузка — отношением тока к допустимому току контакта,
+    перегрев — по кривой зависимости перегрева от нагрузки. Нагрузка и
+    перегрев всех контактов жгута рассчитываются одним векторным проходом.
+    
+    Parameters:
+    - **items**: Соединители (обозначение или идентификатор, до 10000) с токами по контактам, А
+    - **ambient_temperature**: Температура окружающей среды, °C; если задана, температура
+      контактов проверяется по теплостойкости соединителя
+    """
+    try:
+        report = await derating_engine.evaluate(
+            [(item.connector, item.currents) for item in request.items],
+            request.ambient_temperature
+        )
+        # Результат уже имеет форму DeratingReport, проверка моделью не нужна
+        body = json.dumps(report, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logging.error(f"Ошибка проверки нагрузки контактов: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ошибка проверки нагрузки контактов: {str(e)}")
+
+
+@router.post("/ResolveBom")
+async def resolve_bill_of_materials(request: Request):
+    """
+    Пакетное сопоставление спецификации с каталогом соединителей
+    
+    Тело запроса — текст, одна строка на позицию спецификации: обозначение
+    соединителя (например, 2РМТ18Б7Ш1В1В) или его идентификатор. Позиции
+    разрешаются порциями запросами с параметрами-массивами, ответ передается
+    потоком в формате NDJSON: по одной строке на позицию (line, input, found и
+    данные соединителя либо error) и итоговая строка summary.
+    """
+    spool = await spool_request_body(request.stream())
+
+    async def generate():
+        try:
+            async for data in resolve_bom(iter_bom_entries(spool)):
+                yield data
+        except Exception as e:
+            # Ответ уже начат, поэтому ошибка передается последней строкой потока
+            logging.error(f"Ошибка сопоставления спецификации: {e}", exc_info=True)
+            yield (json.dumps({"error": f"Ошибка базы данных: {str(e)}"}, ensure_ascii=False) + "\n").encode("utf-8")
+        finally:
+            spool.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/OrderCodes")
+async def list_order_codes(
+    type: Optional[str] = Query(None, description="Тип соединителя"),
+    size: Optional[str] = Query(None, description="Размер корпуса"),
+    body_type: Optional[str] = Query(None, description="Код типа корпуса"),
+    nozzle_type: Optional[str] = Query(None, description="Код типа патрубка (только для кабельного корпуса)"),
+    quantity: Optional[str] = Query(None, description="Количество контактов"),
+    part: Optional[str] = Query(None, description="Код части соединителя"),
+    combination: Optional[str] = Query(None, description="Код сочетания контактов"),
+    coating: Optional[str] = Query(None, description="Код покрытия контактов"),
+    heat_resistance: Optional[str] = Query(None, description="Код теплостойкости"),
+    climate: Optional[str] = Query(None, description="Код климатического исполнения"),
+    format: str = Query("text", regex="^(text|ndjson)$", description="Формат: text — обозначение в строке, ndjson — с кодами сегментов")
+):
+    """
+    Все допустимые обозначения для заказа соединителей
+    
+    Обозначения перечисляются по справочникам и передаются потоком, без
+    построения полного списка в памяти. Каждый параметр фиксирует значение
+    сегмента обозначения. Общее количество обозначений возвращается в
+    заголовке X-Total-Count.
+    """
+    filters = {
+        "type": type, "size": size, "body_type": body_type, "nozzle_type": nozzle_type,
+        "quantity": quantity, "part": part, "combination": combination, "coating": coating,
+        "heat_resistance": heat_resistance, "climate": climate,
+    }
+    try:
+        configurator = (await dictionaries.get()).order_codes()
+        total = configurator.count(filters)
+    except UnknownSegmentValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Ошибка перечисления обозначений: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ошибка перечисления обозначений: {str(e)}")
+
+    if format == "ndjson":
+        names = [segment.name for segment in CODE_SEGMENTS]
+
+        def render(components):
+            code = "".join(value for value in components if value is not None)
+            return json.dumps({"code": code, **dict(zip(names, components))},
+                              ensure_ascii=False, separators=(",", ":"))
+        media_type = "application/x-ndjson"
+    else:
+        def render(components):
+            return "".join(value for value in components if value is not None)
+        media_type = "text/plain; charset=utf-8"
+
+    def generate():
+        # Обычный генератор: StreamingResponse выполняет его в пуле потоков
+        lines = []
+        for components in configurator.iter_components(filters):
+            lines.append(render(components))
+            if len(lines) >= ORDER_CODES_CHUNK_SIZE:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    return StreamingResponse(generate(), media_type=media_type, headers={"X-Total-Count": str(total)})
+
+
+@router.post("/ParseCodes", response_model=ParseCodesResponse)
+async def parse_codes(request: ParseCodesRequest):
+    """
+    Разбор и проверка набора обозначений соединителей
+    
+    Обозначения разбираются в процессе API по справочникам из кэша, без
+    обращений к базе данных для каждого обозначения. Для каждого обозначения
+    возвращаются сегменты, ошибки и идентификатор соединителя, если такой
+    соединитель есть в каталоге.
+    
+    Parameters:
+    - **codes**: Список обозначений (до 10000)
+    """
+    try:
+        dictionary = await dictionaries.get()
+        # Идентификаторы соединителей берутся из индекса автодополнения
+        if not await suggest_index.refresh():
+            raise HTTPException(status_code=503, detail=SUGGEST_INDEX_UNAVAILABLE)
+        results = dictionary.code_parser().parse_many(request.codes)
+        valid_count = 0
+        for result in results:
+            result["connector_id"] = None
+            if result["valid"]:
+                valid_count += 1
+                result["connector_id"] = suggest_index.find_connector(result["normalized_code"])
+        # Результаты разборщика состоят из строк и чисел и уже имеют форму
+        # ParseCodesResponse: проверка моделью и jsonable_encoder для тысяч
+        # обозначений дороже самого разбора
+        body = json.dumps({
+            "results": results,
+            "valid_count": valid_count,
+            "invalid_count": len(results) - valid_count,
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return Response(content=body, media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Ошибка разбора обозначений: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ошибка разбора обозначений: {str(e)}")
+
+
+@router.get("/Browse", response_model=CatalogBrowsePage)
+async def browse_catalog(
+    types: List[str] = Query([], alias="type", description="Типы соединителей (код или наименование)"),
+    sizes: List[str] = Query([], alias="size", description="Размеры корпуса"),
+    body_types: List[str] = Query([], alias="body_type", description="Коды видов корпуса"),
+    parts: List[str] = Query([], alias="part", description="Коды частей соединителя (вилка, розетка)"),
+    coatings: List[str] = Query([], alias="coating", description="Коды покрытий контактов"),
+    contacts: List[str] = Query([], description="Количество контактов"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100)
+):
+    """
+    Фасетный просмотр каталога соединителей
+    
+    Каждый фильтр принимает несколько значений (например, `?size=14&size=18`):
+    значения одного фильтра объединяются по ИЛИ, разные фильтры — по И.
+    Вместе со страницей результатов возвращается количество соединителей
+    для каждого значения каждого фасета с учетом остальных фильтров.
+    Страница и счетчики получаются одним запросом к базе данных.
+    
+    Parameters:
+    - **type**, **size**, **body_type**, **part**, **coating**, **contacts**: Значения фильтров
+    - **page**: Номер страницы (начиная с 1)
+    - **page_size**: Количество элементов на странице (от 1 до 100)
+    """
+    try:
+        # Значения фильтров проверяются по кэшу справочников без обращений к базе
+        dictionary = await dictionaries.get()
+        try:
+            selected = resolve_filters(dictionary, {
+                "type": types, "size": sizes, "body_type": body_types,
+                "part": parts, "coating": coatings, "contacts": contacts,
+            })
+        except InvalidFacetValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        query, params = build_browse_query(selected, page_size, (page - 1) * page_size)
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(query, params)
+            row = cursor.fetchone()
+        
+        return build_browse_page(dictionary, selected, row, page, page_size)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Ошибка фасетного просмотра каталога: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ошибка при просмотре каталога: {str(e)}")
+
+
+@router.get("/Search", response_model=List[SearchResult])
 async def search_products(
+    response: Response,
     query: str = Query(..., min_length=2, description="Поисковый запрос"),
     limit: int = Query(30, ge=1, le=100, description="Максимальное количество результатов")
 ):
@@ -745,6 +869,12 @@ async def search_products(
     - Размер корпуса
     - Параметры в таблице electromechanical_parameters
     
+    Запрос классифицируется в памяти (обозначение соединителя, тип, серия,
+    размер, числовой параметр, текст). Обозначения и размеры разрешаются по
+    кэшу справочников без обращений к базе, остальные запросы выполняются
+    одним ранжированным запросом по индексу catalog_search (миграция 010).
+    Длительность этапов возвращается в заголовке Server-Timing.
+    
     Parameters:
     - **query**: Текст для поиска
     - **limit**: Максимальное количество результатов
@@ -755,122 +885,36 @@ async def search_products(
     try:
         logging.info(f"[SEARCH] Начало поиска по запросу: '{query}', limit={limit}")
         
-        # Проверяем, является ли запрос числом
-        is_numeric = False
-        numeric_value = None
-        try:
-            numeric_value = float(query)
-            is_numeric = True
-            logging.info(f"[SEARCH] Запрос интерпретирован как числовое значение: {numeric_value}")
-        except ValueError:
-            # Не число, продолжаем обработку как текста
-            logging.info(f"[SEARCH] Запрос интерпретирован как текст")
-            pass
+        # Запрос классифицируется по кэшу справочников без обращений к базе
+        started = time.perf_counter()
+        dictionary = await dictionaries.get()
+        plan = classify_query(dictionary, query)
+        classify_duration = time.perf_counter() - started
+        logging.info(f"[SEARCH] Запрос распознан как {plan.kind}, этапы: {', '.join(plan.stages)}")
         
-        # Нормализуем строку запроса для улучшения поиска
-        # Удаляем пробелы внутри строки соединителя (например, "2РМТ 14" -> "2РМТ14")
-        normalized_query = query.replace(" ", "")
-        logging.info(f"[SEARCH] Нормализованный запрос: '{normalized_query}'")
+        # Выполняются только этапы, нужные для этого класса запроса; повторные
+        # и одновременные одинаковые запросы обслуживаются кэшем
+        started = time.perf_counter()
+        results, timings, round_trips, source = await search_cache.get_or_search(
+            search_cache_key(plan, limit),
+            lambda: execute_plan(dictionary, plan, limit)
+        )
+        if source != "miss":
+            timings = [(source, time.perf_counter() - started)]
         
-        with get_db_cursor() as cursor:
-            # Проверяем существование данных в базе
-            valid_query = False
-            valid_reasons = []
-            available_values = []
-            
-            # 1. Проверка на существование типа соединителя в БД
-            cursor.execute(
-                """
-                SELECT code, type_name 
-                FROM connector_types 
-                WHERE code = %s OR type_name = %s OR code ILIKE %s OR type_name ILIKE %s
-                """, 
-                (query, query, f"%{query}%", f"%{query}%")
-            )
-            connector_types = cursor.fetchall()
-            if connector_types:
-                valid_query = True
-                valid_reasons.append("тип соединителя")
-                available_values.extend([t["code"] for t in connector_types])
-                available_values.extend([t["type_name"] for t in connector_types])
-            
-            # 2. Проверка на существование серии соединителя в БД
-            cursor.execute(
-                """
-                SELECT series_name 
-                FROM connector_series 
-                WHERE series_name = %s OR series_name ILIKE %s OR REPLACE(series_name, ' ', '') = %s
-                """, 
-                (query, f"%{query}%", normalized_query)
-            )
-            series = cursor.fetchall()
-            if series:
-                valid_query = True
-                valid_reasons.append("серия соединителя")
-                available_values.extend([s["series_name"] for s in series])
-            
-            # 3. Если запрос числовой, проверяем существование такого размера
-            if is_numeric and numeric_value.is_integer():
-                size_code = int(numeric_value)
-                cursor.execute(
-                    """
-                    SELECT size_code 
-                    FROM connector_sizes 
-                    WHERE size_code = %s
-                    """, 
-                    (size_code,)
-                )
-                sizes = cursor.fetchall()
-                if sizes:
-                    valid_query = True
-                    valid_reasons.append("размер корпуса")
-                    available_values.extend([str(s["size_code"]) for s in sizes])
-                else:
-                    # Получаем доступные размеры для сообщения об ошибке
-                    cursor.execute("SELECT size_code FROM connector_sizes ORDER BY size_code")
-                    all_sizes = cursor.fetchall()
-                    all_available_sizes = [str(s["size_code"]) for s in all_sizes]
-                    
-                    # Если запрос числовой, но размер не найден - сообщаем, что такой размер не существует
-                    if not valid_query:
-                        raise HTTPException(
-                            status_code=400, 
-                            detail=f"Размер корпуса {size_code} не найден в базе данных. Доступные размеры: {', '.join(all_available_sizes)}"
-                        )
-            
-            # 4. Проверка на наличие в electromechanical_parameters
-            # Проверяем существование таблицы
-            cursor.execute("SELECT EXISTS(SELECT 1 FROM information_schema.tables WHERE table_name = 'electromechanical_parameters')")
-            table_exists = cursor.fetchone()["exists"]
-            
-            if table_exists:
-                search_term = f"%{query}%"
-                cursor.execute(
-                    """
-                    SELECT DISTINCT series_name
-                    FROM electromechanical_parameters
-                    WHERE series_name ILIKE %s
-                    LIMIT 5
-                    """, 
-                    (search_term,)
+        # Если результаты отсутствуют, возвращаем ошибку с доступными значениями
+        if not results:
+            if plan.kind == NUMERIC and plan.numeric_value.is_integer():
+                all_available_sizes = [str(code) for code in dictionary.size_codes()]
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Размер корпуса {int(plan.numeric_value)} не найден в базе данных. Доступные размеры: {', '.join(all_available_sizes)}"
                 )
-                em_params = cursor.fetchall()
-                if em_params:
-                    valid_query = True
-                    valid_reasons.append("электромеханические параметры")
-                    available_values.extend([p["series_name"] for p in em_params])
-            
-            # Если запрос невалидный, возвращаем ошибку с доступными значениями
-            if not valid_query:
-                # Получаем примеры допустимых значений для справки
-                cursor.execute("SELECT code FROM connector_types LIMIT 5")
-                type_examples = [row["code"] for row in cursor.fetchall()]
-                
-                cursor.execute("SELECT series_name FROM connector_series LIMIT 5")
-                series_examples = [row["series_name"] for row in cursor.fetchall()]
-                
-                cursor.execute("SELECT size_code FROM connector_sizes ORDER BY size_code LIMIT 5")
-                size_examples = [str(row["size_code"]) for row in cursor.fetchall()]
+            if plan.kind == TEXT:
+                # Примеры допустимых значений для справки
+                type_examples = [row["code"] for row in dictionary.table("connector_types")[:5]]
+                series_examples = [row["series_name"] for row in dictionary.table("connector_series")[:5]]
+                size_examples = [str(code) for code in dictionary.size_codes()[:5]]
                 
                 error_msg = (
                     f"Запрос '{query}' не найден в базе данных. Примеры допустимых значений: "
@@ -879,209 +923,16 @@ async def search_products(
                     f"размеры: {', '.join(size_examples)}."
                 )
                 raise HTTPException(status_code=400, detail=error_msg)
-            
-            # Создаем словарь для отслеживания уникальных результатов
-            results_dict = {}
-            
-            # 1. Ищем точное совпадение по имени серии
-            logging.info(f"[SEARCH] Выполнение поиска по имени серии")
-            cursor.execute(
-                """
-                SELECT 
-                    cs.series_id, 
-                    cs.series_name,
-                    cs.description,
-                    ct.type_name,
-                    ct.code as type_code
-                FROM 
-                    connector_series cs
-                JOIN 
-                    connector_types ct ON cs.type_id = ct.type_id
-                WHERE 
-                    cs.series_name = %s OR
-                    cs.series_name = %s OR
-                    REPLACE(cs.series_name, ' ', '') = %s
-                LIMIT %s
-                """, 
-                (query, query.upper(), normalized_query, limit)
-            )
-            exact_matches = cursor.fetchall()
-            
-            for match in exact_matches:
-                results_dict[match["series_id"]] = {
-                    "product_id": match["series_id"],
-                    "product_name": match["series_name"],
-                    "product_image_path": f"/api/Images/GetProductImage/{match['series_id']}",
-                    "rank": 1,  # Наивысший ранг для точных совпадений
-                    "match_type": "exact_name"
-                }
-                
-            # 2. Ищем по подстроке в имени серии и описании
-            logging.info(f"[SEARCH] Поиск по подстроке в имени серии и описании")
-            search_term = f"%{query}%"
-            normalized_search_term = f"%{normalized_query}%"
-            
-            cursor.execute(
-                """
-                SELECT 
-                    cs.series_id, 
-                    cs.series_name,
-                    cs.description,
-                    ct.type_name,
-                    ct.code as type_code
-                FROM 
-                    connector_series cs
-                JOIN 
-                    connector_types ct ON cs.type_id = ct.type_id
-                WHERE 
-                    cs.series_name ILIKE %s OR
-                    cs.description ILIKE %s OR
-                    REPLACE(cs.series_name, ' ', '') ILIKE %s OR
-                    ct.type_name ILIKE %s OR
-                    ct.code ILIKE %s
-                LIMIT %s
-                """, 
-                (search_term, search_term, normalized_search_term, search_term, search_term, limit)
+            raise HTTPException(
+                status_code=400, 
+                detail=f"По запросу '{query}' не найдено конкретных продуктов, хотя запрос был распознан как {KIND_TITLES[plan.kind]}."
             )
-            
-            partial_matches = cursor.fetchall()
-            
-            for match in partial_matches:
-                if match["series_id"] not in results_dict:
-                    results_dict[match["series_id"]] = {
-                        "product_id": match["series_id"],
-                        "product_name": match["series_name"],
-                        "product_image_path": f"/api/Images/GetProductImage/{match['series_id']}",
-                        "rank": 2,  # Средний ранг для частичных совпадений
-                        "match_type": "partial_match"
-                    }
-            
-            # 3. Если запрос числовой, ищем по размеру корпуса
-            if is_numeric and numeric_value.is_integer():
-                size_code = int(numeric_value)
-                logging.info(f"[SEARCH] Поиск по размеру корпуса: {size_code}")
-                
-                # Так как мы уже проверили существование размера выше,
-                # здесь не требуется дополнительная проверка
-                cursor.execute(
-                    """
-                    SELECT 
-                        cs.series_id, 
-                        cs.series_name,
-                        cs.description,
-                        ct.type_name,
-                        ct.code as type_code,
-                        csz.size_code
-                    FROM 
-                        connector_series cs
-                    JOIN 
-                        connector_types ct ON cs.type_id = ct.type_id
-                    JOIN 
-                        series_sizes ss ON cs.series_id = ss.series_id
-                    JOIN 
-                        connector_sizes csz ON ss.size_id = csz.size_id
-                    WHERE 
-                        csz.size_code = %s
-                    LIMIT %s
-                    """, 
-                    (size_code, limit)
-                )
-                
-                size_matches = cursor.fetchall()
-                
-                for match in size_matches:
-                    if match["series_id"] not in results_dict:
-                        results_dict[match["series_id"]] = {
-                            "product_id": match["series_id"],
-                            "product_name": match["series_name"],
-                            "product_image_path": f"/api/Images/GetProductImage/{match['series_id']}",
-                            "rank": 3,  # Низкий ранг для совпадений по размеру
-                            "match_type": "size_match"
-                        }
-            
-            # 4. Ищем в таблице electromechanical_parameters, если таблица существует
-            if table_exists:
-                try:
-                    logging.info(f"[SEARCH] Поиск в таблице электромеханических параметров")
-                    
-                    params = []
-                    conditions = []
-                    
-                    # Добавляем условие поиска по имени серии
-                    conditions.append("ep.series_name ILIKE %s")
-                    params.append(search_term)
-                    
-                    # Если запрос числовой, ищем также по числовым параметрам
-                    if is_numeric:
-                        conditions.append("CAST(ep.contact_quantity AS TEXT) = %s")
-                        params.append(query)
-                        
-                        conditions.append("(ep.contact_diameter IS NOT NULL AND ABS(ep.contact_diameter - %s) < 0.01)")
-                        params.append(numeric_value)
-                        
-                        conditions.append("(ep.max_current IS NOT NULL AND ABS(ep.max_current - %s) < 0.01)")
-                        params.append(numeric_value)
-                    
-                    sql_query = f"""
-                    SELECT DISTINCT
-                        cs.series_id, 
-                        cs.series_name,
-                        cs.description,
-                        ep.contact_quantity,
-                        ep.contact_diameter,
-                        ep.max_current
-                    FROM 
-                        connector_series cs
-                    JOIN 
-                        electromechanical_parameters ep ON cs.series_name = ep.series_name
-                    WHERE 
-                        {" OR ".join(conditions)}
-                    LIMIT %s
-                    """
-                    
-                    params.append(limit)
-                    
-                    cursor.execute(sql_query, tuple(params))
-                    
-                    param_matches = cursor.fetchall()
-                    
-                    for match in param_matches:
-                        if match["series_id"] not in results_dict:
-                            results_dict[match["series_id"]] = {
-                                "product_id": match["series_id"],
-                                "product_name": match["series_name"],
-                                "product_image_path": f"/api/Images/GetProductImage/{match['series_id']}",
-                                "rank": 4,  # Самый низкий ранг для совпадений по параметрам
-                                "match_type": "param_match"
-                            }
-                except Exception as e:
-                    logging.error(f"[SEARCH] Ошибка при поиске в таблице electromechanical_parameters: {e}")
-            
-            # Преобразуем результаты в список и сортируем по рангу (сначала самые релевантные)
-            results = list(results_dict.values())
-            results.sort(key=lambda x: x["rank"])
-            
-            # Удаляем поля ранга и типа совпадения из конечного результата
-            for result in results:
-                if "rank" in result:
-                    del result["rank"]
-                if "match_type" in result:
-                    del result["match_type"]
-            
-            # Ограничиваем количество результатов
-            results = results[:limit]
-            
-            # Если после всех проверок результаты отсутствуют, возвращаем ошибку
-            if not results:
-                found_in = ", ".join(valid_reasons)
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"По запросу '{query}' не найдено конкретных продуктов, хотя запрос был распознан как {found_in}."
-                )
-            
-            logging.info(f"[SEARCH] Найдено {len(results)} результатов для запроса '{query}'")
-            
-            return results
+        
+        logging.info(f"[SEARCH] Найдено {len(results)} результатов для запроса '{query}'")
+        
+        response.headers["Server-Timing"] = server_timing(plan, [("classify", classify_duration)] + timings)
+        response.headers[ROUND_TRIPS_HEADER] = str(round_trips)
+        return results
             
     except HTTPException:
         # Пробрасываем HTTP исключения дальше
@@ -1089,4 +940,4 @@ async def search_products(
     except Exception as e:
         error_message = str(e)
         logging.error(f"[SEARCH] Ошибка при поиске продуктов: {error_message}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Ошибка при поиске продуктов: {error_message}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Ошибка при поиске продуктов: {error_message}")
@@ -0,0 +1,3 @@
+"""
+Service modules: data assembly and in-process caches used by the routers
+"""
@@ -0,0 +1,414 @@
+"""
+Манифест файлов изображений, чертежей и документов.
+Каталоги с файлами сканируются при запуске API: для каждого файла
+запоминаются путь, размер, время изменения и хэш содержимого. Выбор
+изображения или чертежа по идентификатору продукта выполняется по
+манифесту, без обращений к файловой системе при обработке запроса.
+Фоновая задача периодически пересканирует каталоги и пересчитывает хэши
+только у файлов, размер или время изменения которых изменились.
+Ответы с файлами содержат валидаторы кэша (ETag по хэшу содержимого и
+Last-Modified); условные запросы с совпадающим валидатором получают 304 без
+открытия файла.
+"""
+import asyncio
+import collections
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from starlette.responses import FileResponse, Response
+
+logger = logging.getLogger(__name__)
+
+# Корневая папка для хранения изображений и документов
+ASSETS_ROOT = Path("database/Zapchasti")
+PNG_DIR = ASSETS_ROOT / "2РМТ, 2РМДТ/ishodniki/PNG"
+PDF_DIR = PNG_DIR / "PDF"
+WORD_DIR = PDF_DIR / "WORD"
+
+# Каталоги манифеста: имя -> путь
+ASSET_DIRECTORIES = {
+    "png": PNG_DIR,
+    "pdf": PDF_DIR,
+    "word": WORD_DIR,
+}
+
+# Интервал проверки каталогов на изменения, с
+ASSET_MANIFEST_POLL_INTERVAL = float(os.getenv("ASSET_MANIFEST_POLL_INTERVAL", "30"))
+
+# Время хранения файла в кэше браузера и прокси без повторной проверки, с
+ASSET_CACHE_MAX_AGE = int(os.getenv("ASSET_CACHE_MAX_AGE", "86400"))
+# Время хранения для адресов с версией содержимого (?v=<хэш>): такой адрес
+# всегда указывает на одно и то же содержимое
+ASSET_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Размер блока чтения при вычислении хэша
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Нумерованные изображения видов продукта
+VIEW_IMAGES = {
+    "front": "1.png",    # Фронтальное изображение
+    "side": "2.png",     # Боковое изображение
+    "details": "3.png",  # Детали
+    "specs": "4.png",    # Спецификации
+    "table": "5.png",    # Таблица размеров
+}
+NUMBERED_IMAGES = tuple(f"{i}.png" for i in range(1, 6))
+
+Asset = collections.namedtuple("Asset", ["path", "size", "mtime", "content_hash", "media_type", "stat"])
+
+
+def _content_hash(path):
+    """Хэш содержимого файла"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _media_type(name):
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".docx":
+        return "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def scan_directory(directory, previous=None):
+    """
+    Сканирует каталог и строит записи манифеста для его файлов.
+
+    Args:
+        directory (Path): Каталог
+        previous (Mapping): Записи предыдущего сканирования; хэш файла с тем же
+            размером и временем изменения не пересчитывается
+
+    Returns:
+        dict: Имя файла -> Asset (пустой словарь, если каталога нет)
+    """
+    previous = previous or {}
+    assets = {}
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return assets
+    for entry in entries:
+        if not entry.is_file():
+            continue
+        stat = entry.stat()
+        known = previous.get(entry.name)
+        if known is not None and known.size == stat.st_size and known.stat.st_mtime_ns == stat.st_mtime_ns:
+            content_hash = known.content_hash
+        else:
+            content_hash = _content_hash(entry.path)
+        assets[entry.name] = Asset(
+            entry.path, stat.st_size, stat.st_mtime, content_hash, _media_type(entry.name), stat
+        )
+    return assets
+
+
+def _signature(directories):
+    """Состав файлов каталогов без учета времени доступа из stat"""
+    return {
+        name: {
+            file_name: (asset.size, asset.stat.st_mtime_ns, asset.content_hash)
+            for file_name, asset in assets.items()
+        }
+        for name, assets in directories.items()
+    }
+
+
+def _etag_matches(header, etag):
+    """Проверка If-None-Match (слабое сравнение, RFC 7232)"""
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header, mtime):
+    """Проверка If-Modified-Since: файл не изменялся после указанного момента"""
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None or since.tzinfo is None:
+        return False
+    # Last-Modified передается с точностью до секунды
+    return int(mtime) <= since.timestamp()
+
+
+def is_not_modified(request, etag, mtime):
+    """
+    Проверяет, актуальна ли копия файла у клиента.
+    If-None-Match имеет приоритет: при его наличии If-Modified-Since не учитывается.
+
+    Args:
+        request (Request): Запрос
+        etag (str): ETag файла (в кавычках)
+        mtime (float): Время изменения файла
+
+    Returns:
+        bool: Можно ответить 304 Not Modified
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        return _not_modified_since(if_modified_since, mtime)
+    return False
+
+
+def cache_headers(asset, request):
+    """
+    Заголовки кэширования файла.
+
+    Args:
+        asset (Asset): Файл манифеста
+        request (Request): Запрос; адрес с параметром v, равным хэшу
+            содержимого, кэшируется как неизменяемый
+
+    Returns:
+        dict: ETag, Last-Modified и Cache-Control
+    """
+    if request.query_params.get("v") == asset.content_hash:
+        cache_control = f"public, max-age={ASSET_IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = f"public, max-age={ASSET_CACHE_MAX_AGE}"
+    return {
+        "ETag": f'"{asset.content_hash}"',
+        "Last-Modified": formatdate(asset.mtime, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+
+def asset_response(asset, request):
+    """
+    Ответ с файлом из манифеста. Размер и время изменения берутся из манифеста,
+    поэтому FileResponse не вызывает stat для файла; на условный запрос с
+    актуальным валидатором возвращается 304 без открытия файла.
+
+    Args:
+        asset (Asset): Файл манифеста
+        request (Request): Запрос
+
+    Returns:
+        Response: FileResponse или пустой ответ 304
+    """
+    headers = cache_headers(asset, request)
+    if is_not_modified(request, headers["ETag"], asset.mtime):
+        return Response(status_code=304, headers=headers)
+    # Заголовки переданы явно: FileResponse не заменяет их своим ETag по времени изменения
+    return FileResponse(asset.path, media_type=asset.media_type, stat_result=asset.stat, headers=headers)
+
+
+class AssetSnapshot:
+    """
+    Неизменяемый манифест файлов.
+
+    Attributes:
+        directories (dict): Имя каталога -> (имя файла -> Asset)
+        built_at (float): Момент построения (time.time)
+    """
+
+    def __init__(self, directories):
+        self.directories = directories
+        self.built_at = time.time()
+
+    def get(self, directory, name):
+        """
+        Возвращает файл каталога манифеста.
+
+        Args:
+            directory (str): Имя каталога из ASSET_DIRECTORIES
+            name (str): Имя файла
+
+        Returns:
+            Asset: Файл или None
+        """
+        return self.directories.get(directory, {}).get(name)
+
+    def first(self, directory, extension):
+        """Первый по имени файл каталога с указанным расширением"""
+        names = sorted(name for name in self.directories.get(directory, {}) if name.endswith(extension))
+        return self.directories[directory][names[0]] if names else None
+
+    def product_image(self, product_id, view=None):
+        """
+        Выбирает изображение продукта.
+
+        Порядок выбора: нумерованный вид (view=1..5), именованный вид (front,
+        side, details, specs, table), изображение product_{id}.png, общее
+        изображение серии, нумерованное изображение по остатку от деления
+        идентификатора, любое изображение PNG.
+
+        Args:
+            product_id (int): Идентификатор продукта
+            view (str): Вид изображения
+
+        Returns:
+            Asset: Файл изображения или None
+        """
+        if view and view.isdigit():
+            asset = self.get("png", f"{view}.png")
+            if asset is not None:
+                return asset
+        if view and view in VIEW_IMAGES:
+            asset = self.get("png", VIEW_IMAGES[view])
+            if asset is not None:
+                return asset
+        asset = self.get("png", f"product_{product_id}.png")
+        if asset is not None:
+            return asset
+        # Общее изображение серий 2РМТ (5) и 2РМДТ (6)
+        if product_id in (5, 6):
+            asset = self.get("png", "1.png")
+            if asset is not None:
+                return asset
+        # Нумерованное изображение выбирается циклически по идентификатору продукта
+        asset = self.get("png", NUMBERED_IMAGES[product_id % len(NUMBERED_IMAGES)])
+        if asset is not None:
+            return asset
+        return self.first("png", ".png")
+
+    def technical_drawing(self, product_id):
+        """
+        Выбирает технический чертеж продукта.
+
+        Порядок выбора: drawing_{id}.pdf, drawing_{id}.png, таблица размеров
+        (5.png), спецификации (4.png), любой PDF, любое нумерованное изображение.
+
+        Args:
+            product_id (int): Идентификатор продукта
+
+        Returns:
+            Asset: Файл чертежа или None
+        """
+        for directory, name in (
+            ("pdf", f"drawing_{product_id}.pdf"),
+            ("png", f"drawing_{product_id}.png"),
+            ("png", "5.png"),
+            ("png", "4.png"),
+        ):
+            asset = self.get(directory, name)
+            if asset is not None:
+                return asset
+        asset = self.first("pdf", ".pdf")
+        if asset is not None:
+            return asset
+        for name in NUMBERED_IMAGES:
+            asset = self.get("png", name)
+            if asset is not None:
+                return asset
+        return None
+
+    def file_count(self):
+        """Количество файлов в манифесте"""
+        return sum(len(assets) for assets in self.directories.values())
+
+
+class AssetManifest:
+    """
+    Манифест файлов, обновляемый фоновой задачей. Строится при запуске API.
+    """
+
+    def __init__(self, directories=None, poll_interval=ASSET_MANIFEST_POLL_INTERVAL):
+        self.paths = dict(directories or ASSET_DIRECTORIES)
+        self.poll_interval = poll_interval
+        self._snapshot = AssetSnapshot({name: {} for name in self.paths})
+        self._task = None
+        self.builds = 0
+        self.build_duration = None
+
+    @property
+    def snapshot(self):
+        """Текущий манифест"""
+        return self._snapshot
+
+    def _scan(self):
+        """Сканирует каталоги; возвращает новый манифест или None, если изменений нет"""
+        previous = self._snapshot.directories
+        directories = {
+            name: scan_directory(path, previous.get(name)) for name, path in self.paths.items()
+        }
+        if self.builds and _signature(directories) == _signature(previous):
+            return None
+        return AssetSnapshot(directories)
+
+    async def refresh(self):
+        """
+        Пересканирует каталоги в пуле потоков и заменяет манифест, если файлы изменились.
+
+        Returns:
+            bool: Манифест изменился
+        """
+        started = time.perf_counter()
+        snapshot = await asyncio.to_thread(self._scan)
+        if snapshot is None:
+            return False
+        self._snapshot = snapshot
+        self.builds += 1
+        self.build_duration = time.perf_counter() - started
+        logger.info("Манифест файлов построен: файлов %s за %.1f мс",
+                    snapshot.file_count(), self.build_duration * 1000)
+        return True
+
+    async def _poll(self):
+        """Фоновая проверка каталогов"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка обновления манифеста файлов")
+
+    async def start(self):
+        """Строит манифест и запускает фоновую проверку каталогов"""
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Ошибка построения манифеста файлов")
+        self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def stop(self):
+        """Останавливает фоновую проверку"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self):
+        """
+        Возвращает состояние манифеста.
+
+        Returns:
+            dict: Количество файлов по каталогам, число и длительность построений
+        """
+        snapshot = self._snapshot
+        return {
+            "files": {name: len(assets) for name, assets in snapshot.directories.items()},
+            "builds": self.builds,
+            "last_build_ms": round(self.build_duration * 1000, 3) if self.build_duration is not None else None,
+            "built_at": snapshot.built_at,
+        }
+
+
+# Общий манифест файлов
+asset_manifest = AssetManifest()
@@ -0,0 +1,125 @@
+"""
+Пакетное сопоставление спецификаций (BOM) с каталогом соединителей.
+Строки спецификации читаются из временного файла и разрешаются порциями:
+одна порция — один запрос к mv_connectors_full с параметрами-массивами
+(= ANY(%s)), результаты сразу отдаются клиенту в формате NDJSON. В памяти
+процесса одновременно находится не больше одной порции, поэтому расход
+памяти не зависит от длины спецификации.
+"""
+import itertools
+import json
+import os
+import tempfile
+
+from api.database import get_async_db_cursor
+from api.services.read_model import connectors_read_model
+from database.connector_code import normalize_connector_code
+
+BOM_CHUNK_SIZE = int(os.getenv("BOM_CHUNK_SIZE", "1000"))
+# Тело запроса до этого объема хранится в памяти, больший — во временном файле
+BOM_SPOOL_SIZE = int(os.getenv("BOM_SPOOL_SIZE", str(1024 * 1024)))
+
+_RESOLVE_QUERY = """
+    SELECT connector_id, full_code, type_name, size_value, body_type, nozzle_type,
+           contact_quantity, connector_part, contact_coating
+    FROM {relation}
+    WHERE full_code = ANY(%(codes)s) OR connector_id = ANY(%(ids)s)
+"""
+
+
+async def spool_request_body(stream):
+    """
+    Сохраняет тело запроса во временный файл по мере получения.
+
+    Args:
+        stream (AsyncIterator[bytes]): Тело запроса (Request.stream())
+
+    Returns:
+        SpooledTemporaryFile: Файл, установленный на начало
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=BOM_SPOOL_SIZE)
+    async for data in stream:
+        spool.write(data)
+    spool.seek(0)
+    return spool
+
+
+def iter_bom_entries(lines):
+    """
+    Разбирает строки спецификации: одна строка — одно обозначение соединителя
+    или его идентификатор (строка из цифр). Пустые строки пропускаются.
+
+    Args:
+        lines (Iterable[bytes]): Строки тела запроса
+
+    Yields:
+        tuple: (номер строки, исходный текст, обозначение или None, идентификатор или None)
+    """
+    for line_number, raw in enumerate(lines, 1):
+        text = raw.decode("utf-8", errors="replace").strip()
+        if not text:
+            continue
+        # isdigit() принимает и надстрочные цифры ("²"), которые int() не разбирает
+        if text.isascii() and text.isdigit():
+            yield line_number, text, None, int(text)
+        else:
+            yield line_number, text, normalize_connector_code(text), None
+
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+async def resolve_bom(entries, chunk_size=BOM_CHUNK_SIZE):
+    """
+    Разрешает строки спецификации порциями по chunk_size.
+
+    Args:
+        entries (Iterable[tuple]): Строки спецификации (iter_bom_entries)
+        chunk_size (int): Количество строк в одном запросе к базе
+
+    Yields:
+        bytes: Строки NDJSON — по одной на строку спецификации и итоговая строка summary
+    """
+    total = found = 0
+    chunks = 0
+    entries = iter(entries)
+    # Материализованное представление, пока миграция 015 не применена — v_connectors_full
+    query = _RESOLVE_QUERY.format(relation=connectors_read_model.relation)
+    while True:
+        chunk = list(itertools.islice(entries, chunk_size))
+        if not chunk:
+            break
+        codes = sorted({code for _, _, code, _ in chunk if code is not None})
+        ids = sorted({item_id for _, _, _, item_id in chunk if item_id is not None})
+
+        # Соединение берется на одну порцию и не удерживается, пока клиент читает ответ
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(query, {"codes": codes, "ids": ids})
+            rows = cursor.fetchall()
+        chunks += 1
+        by_code = {row["full_code"]: row for row in rows}
+        by_id = {row["connector_id"]: row for row in rows}
+
+        lines = []
+        for line_number, text, code, item_id in chunk:
+            row = by_code.get(code) if code is not None else by_id.get(item_id)
+            record = {"line": line_number, "input": text, "found": row is not None}
+            if row is not None:
+                record.update(row)
+                found += 1
+            else:
+                record["error"] = (
+                    f"Соединитель с идентификатором {item_id} не найден" if item_id is not None
+                    else f"Соединитель с обозначением {code} не найден"
+                )
+            lines.append(_dumps(record))
+        total += len(chunk)
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    yield (_dumps({"summary": {
+        "total": total,
+        "found": found,
+        "not_found": total - found,
+        "queries": chunks,
+    }}) + "\n").encode("utf-8")
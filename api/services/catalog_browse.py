@@ -0,0 +1,214 @@
+"""
+Фасетный просмотр каталога соединителей.
+Страница результатов и количество соединителей для каждого значения каждого
+фасета получаются одним запросом: строки, которые нарушают не более одного
+фильтра, отбираются по индексам idx_connectors_*, а счетчики фасетов
+вычисляются через GROUPING SETS. Значение фасета учитывает все фильтры,
+кроме фильтра самого фасета, поэтому показывает, сколько соединителей
+вернет выбор этого значения.
+"""
+import collections
+
+Facet = collections.namedtuple(
+    "Facet", ["name", "column", "table", "key", "value_column", "label_column"]
+)
+
+# Фасеты: параметр запроса, столбец connectors и справочник значений
+FACETS = (
+    Facet("type", "type_id", "connector_types", "type_id", "code", "type_name"),
+    Facet("size", "size_id", "body_sizes", "size_id", "size_value", "size_value"),
+    Facet("body_type", "body_type_id", "body_types", "body_type_id", "code", "name"),
+    Facet("part", "part_id", "connector_parts", "part_id", "code", "name"),
+    Facet("coating", "coating_id", "contact_coatings", "coating_id", "code", "material"),
+    Facet("contacts", "quantity_id", "contact_quantities", "quantity_id", "quantity", "quantity"),
+)
+
+
+class InvalidFacetValueError(ValueError):
+    """Значение фильтра отсутствует в справочнике"""
+
+
+def resolve_filters(dictionary, filters):
+    """
+    Преобразует значения фильтров (коды, наименования, числа) в идентификаторы справочников.
+
+    Args:
+        dictionary (DictionarySnapshot): Снимок справочников
+        filters (dict): Имя фасета -> список значений из запроса
+
+    Returns:
+        dict: Имя фасета -> список идентификаторов
+
+    Raises:
+        InvalidFacetValueError: Если значение не найдено в справочнике
+    """
+    selected = {}
+    for facet in FACETS:
+        values = filters.get(facet.name)
+        if not values:
+            continue
+        rows = dictionary.table(facet.table)
+        by_value = {}
+        for row in rows:
+            by_value.setdefault(str(row[facet.value_column]), row[facet.key])
+            by_value.setdefault(str(row[facet.label_column]), row[facet.key])
+        ids = []
+        for value in values:
+            key = by_value.get(value.strip())
+            if key is None:
+                available = ", ".join(str(row[facet.value_column]) for row in rows)
+                raise InvalidFacetValueError(
+                    f"Значение '{value}' фильтра {facet.name} не найдено в базе данных. "
+                    f"Доступные значения: {available}"
+                )
+            if key not in ids:
+                ids.append(key)
+        selected[facet.name] = ids
+    return selected
+
+
+def build_browse_query(selected, limit, offset):
+    """
+    Строит запрос страницы результатов и счетчиков фасетов.
+
+    Args:
+        selected (dict): Имя фасета -> список идентификаторов выбранных значений
+        limit (int): Размер страницы
+        offset (int): Смещение страницы
+
+    Returns:
+        tuple: (SQL запрос, параметры)
+    """
+    params = {"limit": limit, "offset": offset}
+    matches = {}
+    for facet in FACETS:
+        if selected.get(facet.name):
+            params[facet.name] = selected[facet.name]
+            matches[facet.name] = f"c.{facet.column} = ANY(%({facet.name})s)"
+
+    # Для счетчиков фасета нужны строки, нарушающие только его фильтр:
+    # условие "выполнены все фильтры, кроме одного" записывается через OR
+    # конъюнкций, каждую из которых планировщик проверяет по индексам
+    active = list(matches)
+    if len(active) > 1:
+        where = " OR ".join(
+            "(" + " AND ".join(matches[name] for name in active if name != skipped) + ")"
+            for skipped in active
+        )
+    else:
+        where = "TRUE"
+
+    flags = ",\n            ".join(
+        f"{matches.get(facet.name, 'TRUE')} AS m_{facet.name}" for facet in FACETS
+    )
+    all_match = " AND ".join(f"m_{facet.name}" for facet in FACETS)
+    columns = ", ".join(facet.column for facet in FACETS)
+    counts = ",\n            ".join(
+        "COUNT(*) FILTER (WHERE "
+        + " AND ".join(f"m_{other.name}" for other in FACETS if other is not facet)
+        + f") AS n_{facet.name}"
+        for facet in FACETS
+    )
+    grouping_sets = ", ".join(f"({facet.column})" for facet in FACETS)
+
+    query = f"""
+        WITH base AS (
+            SELECT
+            c.connector_id, c.full_code, {", ".join(f"c.{facet.column}" for facet in FACETS)},
+            {flags}
+            FROM connectors c
+            WHERE {where}
+        ),
+        facet_counts AS (
+            SELECT
+            GROUPING({columns}) AS grouping_mask,
+            {columns},
+            {counts},
+            COUNT(*) FILTER (WHERE {all_match}) AS n_all
+            FROM base
+            GROUP BY GROUPING SETS ({grouping_sets}, ())
+        ),
+        page AS (
+            SELECT connector_id, full_code, {columns}
+            FROM base
+            WHERE {all_match}
+            ORDER BY full_code, connector_id
+            LIMIT %(limit)s OFFSET %(offset)s
+        )
+        SELECT
+            (SELECT COALESCE(jsonb_agg(to_jsonb(p) ORDER BY p.full_code, p.connector_id), '[]'::JSONB)
+             FROM page p) AS items,
+            (SELECT COALESCE(jsonb_agg(to_jsonb(f)), '[]'::JSONB)
+             FROM facet_counts f) AS facets
+    """
+    return query, params
+
+
+def build_browse_page(dictionary, selected, row, page, page_size):
+    """
+    Формирует страницу фасетного просмотра из результата запроса.
+
+    Args:
+        dictionary (DictionarySnapshot): Снимок справочников для наименований значений
+        selected (dict): Имя фасета -> список идентификаторов выбранных значений
+        row (dict): Строка результата build_browse_query
+        page (int): Номер страницы
+        page_size (int): Размер страницы
+
+    Returns:
+        dict: Данные для модели CatalogBrowsePage
+    """
+    lookups = {facet.name: dictionary.lookup(facet.table, facet.key) for facet in FACETS}
+
+    def label(facet_name, key, column):
+        entry = lookups[facet_name].get(key)
+        return str(entry[column]) if entry is not None else ""
+
+    # Бит GROUPING равен 0 для столбца, по которому сгруппирован набор
+    total_count = 0
+    counts = {facet.name: {} for facet in FACETS}
+    full_mask = (1 << len(FACETS)) - 1
+    for facet_row in row["facets"]:
+        mask = facet_row["grouping_mask"]
+        if mask == full_mask:
+            total_count = facet_row["n_all"]
+            continue
+        for position, facet in enumerate(FACETS):
+            if not mask & (1 << (len(FACETS) - 1 - position)):
+                counts[facet.name][facet_row[facet.column]] = facet_row[f"n_{facet.name}"]
+                break
+
+    facets = {}
+    for facet in FACETS:
+        chosen = selected.get(facet.name, ())
+        facets[facet.name] = [
+            {
+                "value": str(entry[facet.value_column]),
+                "name": str(entry[facet.label_column]),
+                "count": counts[facet.name].get(entry[facet.key], 0),
+                "selected": entry[facet.key] in chosen,
+            }
+            for entry in dictionary.table(facet.table)
+        ]
+
+    items = [
+        {
+            "connector_id": item["connector_id"],
+            "full_code": item["full_code"],
+            "connector_type": label("type", item["type_id"], "code"),
+            "body_size": label("size", item["size_id"], "size_value"),
+            "body_type": label("body_type", item["body_type_id"], "name"),
+            "connector_part": label("part", item["part_id"], "name"),
+            "contact_coating": label("coating", item["coating_id"], "material"),
+            "contacts_quantity": int(label("contacts", item["quantity_id"], "quantity") or 0),
+        }
+        for item in row["items"]
+    ]
+
+    return {
+        "items": items,
+        "total_count": total_count,
+        "page": page,
+        "page_size": page_size,
+        "facets": facets,
+    }
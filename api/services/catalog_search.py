@@ -0,0 +1,139 @@
+"""
+Индексированный поиск по каталогу.
+Поисковые документы серий хранятся в таблице catalog_search (миграция 010)
+и пересчитываются триггерами. Поиск выполняется одним ранжированным запросом:
+точное совпадение наименования — по B-tree индексу, слова и их начала — по
+GIN индексу tsvector, подстроки — по триграммному индексу (если установлено
+расширение pg_trgm).
+"""
+import re
+
+from api.services.catalog_version import catalog_version
+
+# Слова запроса: буквы и цифры, в том числе десятичные числа (1,5 или 1.5)
+_TOKEN_RE = re.compile(r"\w+(?:[.,]\d+)*")
+
+
+def escape_like(value):
+    """Экранирует спецсимволы шаблона LIKE"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def prefix_tsquery(query):
+    """
+    Строит текст tsquery, в котором каждое слово запроса ищется по началу.
+
+    Args:
+        query (str): Поисковый запрос
+
+    Returns:
+        str: Текст для to_tsquery или None, если в запросе нет слов
+    """
+    tokens = [token.replace(",", ".") for token in _TOKEN_RE.findall(query.lower())]
+    if not tokens:
+        return None
+    return " & ".join(f"'{token}':*" for token in tokens)
+
+
+class CatalogSearch:
+    """
+    Поиск по таблице catalog_search. Наличие таблицы и расширения pg_trgm
+    проверяется один раз и сбрасывается при полном обновлении каталога.
+    """
+
+    def __init__(self):
+        self._features = None
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Сбрасывает сведения о возможностях базы после полного обновления каталога"""
+        if full:
+            self._features = None
+
+    async def features(self, cursor):
+        """
+        Проверяет наличие поискового индекса и триграммного поиска.
+
+        Returns:
+            dict: available — таблица catalog_search существует, trigram — установлен pg_trgm
+        """
+        if self._features is None:
+            await cursor.execute(
+                """
+                SELECT
+                    to_regclass('catalog_search') IS NOT NULL AS available,
+                    EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') AS trigram
+                """
+            )
+            self._features = dict(cursor.fetchone())
+        return self._features
+
+    def build_query(self, query, limit, trigram):
+        """
+        Строит ранжированный поисковый запрос.
+
+        Args:
+            query (str): Поисковый запрос
+            limit (int): Максимальное количество результатов
+            trigram (bool): Использовать триграммный поиск по подстроке
+
+        Returns:
+            tuple: (SQL запрос, параметры)
+        """
+        params = {
+            "query": query,
+            "normalized": query.replace(" ", "").upper(),
+            "limit": limit,
+        }
+        conditions = ["s.normalized_name = %(normalized)s"]
+        score = ["CASE WHEN s.normalized_name = %(normalized)s THEN 1 ELSE 0 END"]
+
+        prefix = prefix_tsquery(query)
+        if prefix is not None:
+            # Слова ищутся по началу, описание — с учетом морфологии
+            params["prefix"] = prefix
+            tsquery = "(to_tsquery('simple', %(prefix)s) || plainto_tsquery('russian', %(query)s))"
+            conditions.append(f"s.document @@ {tsquery}")
+            score.append(f"ts_rank(s.document, {tsquery})")
+
+        if trigram:
+            params["like"] = f"%{escape_like(query)}%"
+            conditions.append("s.search_text ILIKE %(like)s")
+            score.append("similarity(s.search_text, %(query)s)")
+
+        sql = f"""
+            SELECT
+                s.series_id AS product_id,
+                s.series_name AS product_name,
+                {" + ".join(score)} AS score
+            FROM catalog_search s
+            WHERE {" OR ".join(conditions)}
+            ORDER BY score DESC, s.series_name
+            LIMIT %(limit)s
+        """
+        return sql, params
+
+    async def search(self, cursor, query, limit):
+        """
+        Выполняет поиск.
+
+        Args:
+            cursor (AsyncCursor): Курсор базы данных
+            query (str): Поисковый запрос
+            limit (int): Максимальное количество результатов
+
+        Returns:
+            list: Найденные продукты с оценкой релевантности
+        """
+        features = await self.features(cursor)
+        sql, params = self.build_query(query, limit, features["trigram"])
+        await cursor.execute(sql, params)
+        results = cursor.fetchall()
+        for result in results:
+            result["score"] = round(float(result["score"]), 4)
+            result["product_image_path"] = f"/api/Images/GetProductImage/{result['product_id']}"
+        return results
+
+
+# Общий поиск по каталогу
+catalog_search = CatalogSearch()
+catalog_version.subscribe(catalog_search.on_catalog_change)
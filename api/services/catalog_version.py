@@ -0,0 +1,161 @@
+"""
+Отслеживание версии каталога.
+Журнал catalog_changes (миграция 006) пополняется триггерами при изменении
+серий, соединителей и справочников. Трекер периодически читает новые записи
+журнала и передает их подписчикам — кэшам, которые инвалидируют только
+затронутые изменениями данные.
+"""
+import asyncio
+import collections
+import logging
+import os
+
+from api.database import get_async_db_cursor
+
+logger = logging.getLogger(__name__)
+
+# Интервал опроса журнала изменений, с
+CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", "5"))
+# Сколько последних записей журнала перечитывается при каждом опросе:
+# транзакция может зафиксировать запись с меньшим номером позже записи с большим
+CATALOG_POLL_OVERLAP = 100
+
+CatalogChange = collections.namedtuple(
+    "CatalogChange", ["change_id", "table_name", "row_id", "type_id"]
+)
+
+
+class CatalogVersionTracker:
+    """
+    Версия каталога — локальный счетчик, который увеличивается каждый раз,
+    когда трекер обнаруживает новые записи в журнале изменений.
+    Данные, загруженные при версии N, устарели, если затрагивающее их изменение
+    получило версию больше N.
+    """
+
+    def __init__(self, poll_interval=CATALOG_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.version = 0
+        # Журнал изменений доступен (миграция 006 применена)
+        self.available = False
+        self._last_change_id = 0
+        self._seen = collections.deque(maxlen=CATALOG_POLL_OVERLAP * 10)
+        self._seen_set = set()
+        self._subscribers = []
+        self._task = None
+        self._warned = False
+
+    def subscribe(self, callback):
+        """
+        Подписывает обработчик на изменения каталога.
+
+        Args:
+            callback (callable): Функция callback(changes, version, full), где changes —
+                список CatalogChange, version — новая версия каталога, full — признак
+                того, что устаревшими нужно считать все данные
+        """
+        self._subscribers.append(callback)
+
+    def _remember(self, change_id):
+        """Запоминает обработанную запись журнала"""
+        if len(self._seen) == self._seen.maxlen:
+            self._seen_set.discard(self._seen[0])
+        self._seen.append(change_id)
+        self._seen_set.add(change_id)
+
+    async def refresh(self):
+        """
+        Читает новые записи журнала изменений и уведомляет подписчиков.
+
+        Returns:
+            int: Текущая версия каталога
+        """
+        async with get_async_db_cursor() as cursor:
+            if not self.available:
+                await cursor.execute("SELECT to_regclass('catalog_changes') IS NOT NULL AS available")
+                if not cursor.fetchone()["available"]:
+                    if not self._warned:
+                        logger.warning("Журнал изменений каталога не найден (миграция 006 не применена), "
+                                       "кэши каталога отключены")
+                        self._warned = True
+                    return self.version
+                # Достаточно последних записей журнала: более ранние уже отражены в базе
+                await cursor.execute("SELECT COALESCE(MAX(change_id), 0) AS last_change_id FROM catalog_changes")
+                self._last_change_id = cursor.fetchone()["last_change_id"]
+
+            await cursor.execute(
+                """
+                SELECT change_id, table_name, row_id, type_id
+                FROM catalog_changes
+                WHERE change_id > %s
+                ORDER BY change_id
+                """,
+                (max(0, self._last_change_id - CATALOG_POLL_OVERLAP),)
+            )
+            rows = cursor.fetchall()
+
+        if not self.available:
+            for row in rows:
+                self._remember(row["change_id"])
+                self._last_change_id = max(self._last_change_id, row["change_id"])
+            self.available = True
+            self.version += 1
+            self._notify([], full=True)
+            return self.version
+
+        changes = []
+        for row in rows:
+            if row["change_id"] in self._seen_set:
+                continue
+            self._remember(row["change_id"])
+            self._last_change_id = max(self._last_change_id, row["change_id"])
+            changes.append(CatalogChange(
+                row["change_id"], row["table_name"], row["row_id"], row["type_id"]
+            ))
+
+        if changes:
+            self.version += 1
+            logger.info("Обнаружено изменений каталога: %s, версия %s", len(changes), self.version)
+            self._notify(changes)
+        return self.version
+
+    def _notify(self, changes, full=False):
+        """Передает изменения подписчикам; full=True означает сброс всех данных"""
+        for callback in self._subscribers:
+            try:
+                callback(changes, self.version, full)
+            except Exception:
+                logger.exception("Ошибка обработчика изменений каталога")
+
+    async def _poll(self):
+        """Фоновый опрос журнала изменений"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка чтения журнала изменений каталога")
+
+    async def start(self):
+        """Читает текущее состояние журнала и запускает фоновый опрос"""
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Ошибка чтения журнала изменений каталога")
+        self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def stop(self):
+        """Останавливает фоновый опрос"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Общий трекер версии каталога; запускается при старте API
+catalog_version = CatalogVersionTracker()
@@ -0,0 +1,226 @@
+"""
+Граф совместимости соединителей.
+Отношение compatible_connectors загружается в память процесса в виде
+списков смежности, проиндексированных по идентификатору и обозначению
+соединителя. Ответные части и соединители, совместимые через несколько
+шагов, находятся обходом графа в ширину без обращений к базе данных.
+Граф перестраивается при первом обращении после изменения
+compatible_connectors или connectors в журнале каталога.
+"""
+import asyncio
+import collections
+import logging
+import time
+
+from api.database import get_async_db_cursor
+from api.services.catalog_version import catalog_version
+from database.connector_code import normalize_connector_code
+
+logger = logging.getLogger(__name__)
+
+# Таблицы, изменение которых требует перестроения графа
+_TRACKED_TABLES = {"compatible_connectors", "connectors"}
+
+# Максимальная глубина обхода
+MAX_MATE_DEPTH = 5
+
+
+class CompatibilitySnapshot:
+    """
+    Неизменяемый граф совместимости.
+
+    Attributes:
+        version (int): Версия каталога, при которой загружен граф
+        loaded_at (float): Момент загрузки (time.monotonic)
+    """
+
+    def __init__(self, connectors, edges, version):
+        # connector_id -> полное обозначение
+        self._codes = {row["connector_id"]: row["full_code"] for row in connectors}
+        # нормализованное обозначение -> connector_id
+        self._ids = {normalize_connector_code(code): connector_id for connector_id, code in self._codes.items()}
+        adjacency = collections.defaultdict(list)
+        self._descriptions = {}
+        for row in edges:
+            adjacency[row["connector_id"]].append(row["compatible_connector_id"])
+            self._descriptions[(row["connector_id"], row["compatible_connector_id"])] = row["description"]
+        # connector_id -> кортеж совместимых соединителей в порядке обозначений
+        self._adjacency = {
+            connector_id: tuple(sorted(mates, key=lambda mate: self._codes.get(mate, "")))
+            for connector_id, mates in adjacency.items()
+        }
+        self.edge_count = len(self._descriptions)
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def resolve(self, value):
+        """
+        Находит соединитель по обозначению или идентификатору.
+
+        Args:
+            value (str): Обозначение соединителя или идентификатор (строка из цифр)
+
+        Returns:
+            int: Идентификатор соединителя или None
+        """
+        value = value.strip()
+        # isdigit() принимает и надстрочные цифры ("²"), которые int() не разбирает
+        if value.isascii() and value.isdigit():
+            connector_id = int(value)
+            return connector_id if connector_id in self._codes else None
+        return self._ids.get(normalize_connector_code(value))
+
+    def code(self, connector_id):
+        """Полное обозначение соединителя"""
+        return self._codes.get(connector_id)
+
+    def mates(self, connector_id, depth=1):
+        """
+        Находит совместимые соединители обходом в ширину.
+
+        Args:
+            connector_id (int): Исходный соединитель
+            depth (int): Максимальное количество шагов (1 — только ответные части)
+
+        Returns:
+            list: Словари connector_id, full_code, depth, via_connector_id и description
+                в порядке удаления от исходного соединителя
+        """
+        result = []
+        seen = {connector_id}
+        frontier = [connector_id]
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for source in frontier:
+                for mate in self._adjacency.get(source, ()):
+                    if mate in seen:
+                        continue
+                    seen.add(mate)
+                    next_frontier.append(mate)
+                    result.append({
+                        "connector_id": mate,
+                        "full_code": self._codes.get(mate),
+                        "depth": level,
+                        "via_connector_id": source if level > 1 else None,
+                        "description": self._descriptions.get((source, mate)),
+                    })
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return result
+
+    def lookup(self, values, depth=1):
+        """
+        Находит совместимые соединители для набора обозначений или идентификаторов.
+
+        Args:
+            values (Iterable[str]): Обозначения соединителей или идентификаторы
+            depth (int): Максимальное количество шагов
+
+        Returns:
+            list: Результаты в порядке values
+        """
+        results = []
+        for value in values:
+            connector_id = self.resolve(value)
+            if connector_id is None:
+                results.append({
+                    "input": value,
+                    "found": False,
+                    "connector_id": None,
+                    "full_code": None,
+                    "mates": [],
+                    "error": f"Соединитель {value} не найден",
+                })
+                continue
+            results.append({
+                "input": value,
+                "found": True,
+                "connector_id": connector_id,
+                "full_code": self._codes[connector_id],
+                "mates": self.mates(connector_id, depth),
+                "error": None,
+            })
+        return results
+
+
+class CompatibilityGraph:
+    """
+    Версионированный граф совместимости. Загружается при запуске API и
+    перестраивается при первом обращении после изменения связанных таблиц.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._stale_since = 0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.load_duration = None
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Помечает граф устаревшим при изменении соединителей или совместимости"""
+        if full or any(change.table_name in _TRACKED_TABLES for change in changes):
+            self._stale_since = version
+
+    def _is_fresh(self, snapshot):
+        return snapshot is not None and snapshot.version >= self._stale_since
+
+    async def get(self):
+        """
+        Возвращает актуальный граф совместимости.
+
+        Returns:
+            CompatibilitySnapshot: Граф совместимости
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            if not self._is_fresh(self._snapshot):
+                self._snapshot = await self._load()
+            return self._snapshot
+
+    async def load(self):
+        """Загружает граф; вызывается при запуске API"""
+        async with self._lock:
+            self._snapshot = await self._load()
+
+    async def _load(self):
+        # Версию каталога запоминаем до чтения данных
+        version = catalog_version.version
+        started = time.perf_counter()
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute("SELECT connector_id, full_code FROM connectors")
+            connectors = cursor.fetchall()
+            await cursor.execute(
+                "SELECT connector_id, compatible_connector_id, description FROM compatible_connectors"
+            )
+            edges = cursor.fetchall()
+        snapshot = CompatibilitySnapshot(connectors, edges, version)
+        self.loads += 1
+        self.load_duration = time.perf_counter() - started
+        logger.info("Граф совместимости построен: соединителей %s, связей %s, версия %s",
+                    len(connectors), snapshot.edge_count, version)
+        return snapshot
+
+    def get_stats(self):
+        """
+        Возвращает состояние графа.
+
+        Returns:
+            dict: Версия, количество связей, число и длительность загрузок
+        """
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "fresh": self._is_fresh(snapshot),
+            "version": snapshot.version if snapshot else None,
+            "edges": snapshot.edge_count if snapshot else 0,
+            "loads": self.loads,
+            "last_load_ms": round(self.load_duration * 1000, 3) if self.load_duration is not None else None,
+        }
+
+
+# Общий граф совместимости
+compatibility_graph = CompatibilityGraph()
+catalog_version.subscribe(compatibility_graph.on_catalog_change)
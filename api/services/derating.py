@@ -0,0 +1,393 @@
+"""
+Проверка токовой нагрузки контактов жгута.
+Для каждого соединителя жгута задаются токи по контактам. Диаметры контактов
+определяются по сочетанию контактов (combination_diameter_map), допустимый
+ток — по contact_max_current, перегрев — интерполяцией кривой
+contact_overheat_by_load. Нагрузка и перегрев всех контактов запроса
+вычисляются одним набором операций над массивами NumPy.
+Справочные данные загружаются в память процесса и перечитываются при первом
+обращении после изменения связанных таблиц в журнале каталога.
+"""
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from api.database import get_async_db_cursor
+from api.services.catalog_version import catalog_version
+from database.connector_code import normalize_connector_code
+
+logger = logging.getLogger(__name__)
+
+# Таблицы, изменение которых требует перечитать справочные данные
+_TRACKED_TABLES = {
+    "connectors", "connector_types", "body_sizes", "contact_quantities",
+    "contact_combinations", "combination_diameter_map", "contact_diameters",
+    "contact_max_current", "electromechanical_parameters", "contact_overheat_by_load",
+    "heat_resistance",
+}
+
+# Причины нарушений
+OVERLOAD = "overload"
+OVERHEAT = "overheat"
+
+
+def _diameter_key(value):
+    return round(float(value), 1)
+
+
+class DeratingSnapshot:
+    """
+    Справочные данные для проверки нагрузки контактов.
+
+    Attributes:
+        version (int): Версия каталога, при которой загружены данные
+        loaded_at (float): Момент загрузки (time.monotonic)
+    """
+
+    def __init__(self, connectors, positions, parameters, overheat, version):
+        # combination_id -> [(диаметр, допустимый ток)] в порядке позиций
+        combinations = {}
+        for row in positions:
+            max_current = float(row["max_current"]) if row["max_current"] is not None else None
+            combinations.setdefault(row["combination_id"], []).append(
+                (_diameter_key(row["diameter"]), max_current)
+            )
+        # (серия, размер, код сочетания, диаметр) -> количество контактов
+        quantities = {
+            (row["series_name"], str(row["size_code"]), str(row["contact_combination_code"]),
+             _diameter_key(row["contact_diameter"])): row["contact_quantity"]
+            for row in parameters
+        }
+
+        self._codes = {}
+        self._ids = {}
+        self._heat_resistance = {}
+        # connector_id -> (массив допустимых токов по контактам или None, ошибка)
+        self._layouts = {}
+        for row in connectors:
+            connector_id = row["connector_id"]
+            self._codes[connector_id] = row["full_code"]
+            self._ids[normalize_connector_code(row["full_code"])] = connector_id
+            self._heat_resistance[connector_id] = row["heat_resistance"]
+            self._layouts[connector_id] = self._build_layout(
+                row, combinations.get(row["combination_id"], []), quantities
+            )
+
+        self.overheat_loads = np.array([row["load_percent"] for row in overheat], dtype=np.float64)
+        self.overheat_temperatures = np.array(
+            [row["overheat_temperature"] for row in overheat], dtype=np.float64
+        )
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def _build_layout(connector, positions, quantities):
+        """
+        Строит массив допустимых токов по контактам соединителя.
+
+        Контакты сочетания одного диаметра занимают все места соединителя. Для
+        сочетаний нескольких диаметров количество контактов каждого диаметра
+        берется из electromechanical_parameters, контакты нумеруются по позициям
+        combination_diameter_map.
+        """
+        if not positions:
+            return None, "Диаметры контактов сочетания не заданы"
+        if any(max_current is None for _, max_current in positions):
+            return None, "Допустимый ток контакта не задан"
+        if len(positions) == 1:
+            counts = [connector["contact_quantity"]]
+        else:
+            counts = [
+                quantities.get((connector["type_name"], connector["size_value"],
+                                connector["combination_code"], diameter))
+                for diameter, _ in positions
+            ]
+            if any(count is None for count in counts):
+                return None, "Количество контактов каждого диаметра не задано"
+        layout = np.repeat(
+            np.array([max_current for _, max_current in positions], dtype=np.float64),
+            counts
+        )
+        return layout, None
+
+    def resolve(self, value):
+        """
+        Находит соединитель по обозначению или идентификатору.
+
+        Args:
+            value (str): Обозначение соединителя или идентификатор (строка из цифр)
+
+        Returns:
+            int: Идентификатор соединителя или None
+        """
+        value = value.strip()
+        # isdigit() принимает и надстрочные цифры ("²"), которые int() не разбирает
+        if value.isascii() and value.isdigit():
+            connector_id = int(value)
+            return connector_id if connector_id in self._codes else None
+        return self._ids.get(normalize_connector_code(value))
+
+    def evaluate(self, items, ambient_temperature=None):
+        """
+        Проверяет нагрузку контактов соединителей жгута.
+
+        Нагрузка контакта — отношение тока к допустимому току его диаметра, %.
+        Перегрев интерполируется по кривой contact_overheat_by_load; за
+        пределами кривой берется значение крайней точки. Нарушения: ток
+        больше допустимого (overload) и, если задана температура среды,
+        температура контакта выше теплостойкости соединителя (overheat).
+
+        Args:
+            items (list): Пары (обозначение или идентификатор, токи по контактам, А)
+            ambient_temperature (float): Температура окружающей среды, °C
+
+        Returns:
+            dict: Результаты по соединителям в порядке items и итоги
+        """
+        results = []
+        # Индексы результатов, контакты которых участвуют в расчете
+        evaluated = []
+        currents = []
+        limits = []
+        heat_limits = []
+        for value, item_currents in items:
+            connector_id = self.resolve(value)
+            result = {
+                "input": value,
+                "found": connector_id is not None,
+                "connector_id": connector_id,
+                "full_code": self._codes.get(connector_id),
+                "contacts": len(item_currents),
+                "max_load_percent": None,
+                "max_overheat_temperature": None,
+                "max_contact_temperature": None,
+                "heat_resistance": self._heat_resistance.get(connector_id),
+                "ok": False,
+                "violations": [],
+                "error": None,
+            }
+            results.append(result)
+            if connector_id is None:
+                result["error"] = f"Соединитель {value} не найден"
+                continue
+            layout, error = self._layouts[connector_id]
+            if error:
+                result["error"] = error
+                continue
+            if len(item_currents) > len(layout):
+                result["error"] = (
+                    f"Задано токов: {len(item_currents)}, контактов у соединителя: {len(layout)}"
+                )
+                continue
+            evaluated.append(len(results) - 1)
+            currents.append(item_currents)
+            limits.append(layout[:len(item_currents)])
+            heat_limits.append(result["heat_resistance"])
+
+        contacts = sum(len(item_currents) for item_currents in currents)
+        violation_count = 0
+        if contacts:
+            violation_count = self._evaluate_contacts(
+                results, evaluated, currents, limits, heat_limits, ambient_temperature
+            )
+        return {
+            "items": results,
+            "summary": {
+                "connectors": len(results),
+                "failed_connectors": sum(1 for result in results if not result["ok"]),
+                "contacts": contacts,
+                "violations": violation_count,
+            },
+        }
+
+    def _evaluate_contacts(self, results, evaluated, currents, limits, heat_limits, ambient_temperature):
+        sizes = np.fromiter((len(item_currents) for item_currents in currents), dtype=np.int64,
+                            count=len(currents))
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        current = np.fromiter(
+            (value for item_currents in currents for value in item_currents),
+            dtype=np.float64, count=int(sizes.sum())
+        )
+        limit = np.concatenate(limits)
+
+        load = current / limit * 100
+        if len(self.overheat_loads):
+            overheat = np.interp(load, self.overheat_loads, self.overheat_temperatures)
+        else:
+            overheat = np.zeros_like(load)
+        overload = load > 100
+        violation = overload
+        temperature = None
+        overheated = None
+        if ambient_temperature is not None:
+            temperature = ambient_temperature + overheat
+            # Теплостойкость соединителя для каждого контакта; без нее перегрев не проверяется
+            heat_limit = np.repeat(
+                np.array([np.inf if value is None else value for value in heat_limits], dtype=np.float64),
+                sizes
+            )
+            overheated = temperature > heat_limit
+            violation = overload | overheated
+
+        max_load = np.maximum.reduceat(load, starts)
+        max_overheat = np.maximum.reduceat(overheat, starts)
+        max_temperature = np.maximum.reduceat(temperature, starts) if temperature is not None else None
+        violations = np.add.reduceat(violation.astype(np.int64), starts)
+
+        for position, index in enumerate(evaluated):
+            result = results[index]
+            result["max_load_percent"] = round(float(max_load[position]), 2)
+            result["max_overheat_temperature"] = round(float(max_overheat[position]), 1)
+            if max_temperature is not None:
+                result["max_contact_temperature"] = round(float(max_temperature[position]), 1)
+            result["ok"] = not violations[position]
+
+        # Подробности только по нарушениям: их обычно намного меньше, чем контактов
+        flagged = np.flatnonzero(violation)
+        owners = np.searchsorted(starts, flagged, side="right") - 1
+        for contact, owner in zip(flagged.tolist(), owners.tolist()):
+            reasons = []
+            if overload[contact]:
+                reasons.append(OVERLOAD)
+            if overheated is not None and overheated[contact]:
+                reasons.append(OVERHEAT)
+            results[evaluated[owner]]["violations"].append({
+                "contact": contact - int(starts[owner]) + 1,
+                "current": float(current[contact]),
+                "max_current": float(limit[contact]),
+                "load_percent": round(float(load[contact]), 2),
+                "overheat_temperature": round(float(overheat[contact]), 1),
+                "contact_temperature": round(float(temperature[contact]), 1) if temperature is not None else None,
+                "reasons": reasons,
+            })
+        return len(flagged)
+
+
+class DeratingEngine:
+    """
+    Версионированные справочные данные для проверки нагрузки контактов.
+    Загружаются при первом обращении и перечитываются после изменения
+    связанных таблиц.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._stale_since = 0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.load_duration = None
+        self.contacts_evaluated = 0
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Помечает данные устаревшими при изменении соединителей, контактов или кривой перегрева"""
+        if full or any(change.table_name in _TRACKED_TABLES for change in changes):
+            self._stale_since = version
+
+    def _is_fresh(self, snapshot):
+        return snapshot is not None and snapshot.version >= self._stale_since
+
+    async def get(self):
+        """
+        Возвращает актуальные справочные данные.
+
+        Returns:
+            DeratingSnapshot: Справочные данные
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            if not self._is_fresh(self._snapshot):
+                self._snapshot = await self._load()
+            return self._snapshot
+
+    async def evaluate(self, items, ambient_temperature=None):
+        """
+        Проверяет нагрузку контактов жгута по актуальным данным.
+
+        Args:
+            items (list): Пары (обозначение или идентификатор, токи по контактам, А)
+            ambient_temperature (float): Температура окружающей среды, °C
+
+        Returns:
+            dict: Результаты по соединителям и итоги
+        """
+        snapshot = await self.get()
+        report = snapshot.evaluate(items, ambient_temperature)
+        self.contacts_evaluated += report["summary"]["contacts"]
+        return report
+
+    async def _load(self):
+        # Версию каталога запоминаем до чтения данных
+        version = catalog_version.version
+        started = time.perf_counter()
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute("""
+                SELECT
+                    c.connector_id,
+                    c.full_code,
+                    c.combination_id,
+                    ct.type_name,
+                    bs.size_value,
+                    cq.quantity AS contact_quantity,
+                    cc.code AS combination_code,
+                    h.temperature AS heat_resistance
+                FROM connectors c
+                JOIN connector_types ct ON ct.type_id = c.type_id
+                JOIN body_sizes bs ON bs.size_id = c.size_id
+                JOIN contact_quantities cq ON cq.quantity_id = c.quantity_id
+                JOIN contact_combinations cc ON cc.combination_id = c.combination_id
+                LEFT JOIN heat_resistance h ON h.resistance_id = c.resistance_id
+            """)
+            connectors = cursor.fetchall()
+            await cursor.execute("""
+                SELECT m.combination_id, d.diameter, mc.max_current
+                FROM combination_diameter_map m
+                JOIN contact_diameters d ON d.diameter_id = m.diameter_id
+                LEFT JOIN (
+                    SELECT diameter_id, MIN(max_current) AS max_current
+                    FROM contact_max_current
+                    GROUP BY diameter_id
+                ) mc ON mc.diameter_id = m.diameter_id
+                ORDER BY m.combination_id, m.position
+            """)
+            positions = cursor.fetchall()
+            await cursor.execute("""
+                SELECT series_name, size_code, contact_combination_code, contact_diameter, contact_quantity
+                FROM electromechanical_parameters
+            """)
+            parameters = cursor.fetchall()
+            await cursor.execute(
+                "SELECT load_percent, overheat_temperature FROM contact_overheat_by_load ORDER BY load_percent"
+            )
+            overheat = cursor.fetchall()
+        snapshot = DeratingSnapshot(connectors, positions, parameters, overheat, version)
+        self.loads += 1
+        self.load_duration = time.perf_counter() - started
+        logger.info("Данные для проверки нагрузки контактов загружены: соединителей %s, версия %s",
+                    len(connectors), version)
+        return snapshot
+
+    def get_stats(self):
+        """
+        Возвращает состояние справочных данных.
+
+        Returns:
+            dict: Версия, число загрузок и проверенных контактов
+        """
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "fresh": self._is_fresh(snapshot),
+            "version": snapshot.version if snapshot else None,
+            "loads": self.loads,
+            "last_load_ms": round(self.load_duration * 1000, 3) if self.load_duration is not None else None,
+            "contacts_evaluated": self.contacts_evaluated,
+        }
+
+
+# Общие данные для проверки нагрузки контактов
+derating_engine = DeratingEngine()
+catalog_version.subscribe(derating_engine.on_catalog_change)
@@ -0,0 +1,283 @@
+"""
+Кэш справочных таблиц каталога.
+Справочники из database/schema/01_base_tables.sql, размеры корпуса connector_sizes
+и наименования серий из electromechanical_parameters содержат несколько десятков
+строк. Они загружаются при запуске API и хранятся в памяти процесса, поэтому
+проверка фильтров и сообщения о допустимых значениях не требуют обращений к базе.
+Снимок перезагружается после изменения любой из таблиц в журнале каталога.
+"""
+import asyncio
+import logging
+import os
+import time
+from types import MappingProxyType
+
+from api.database import get_async_db_cursor
+from database.connector_code import ConnectorCodeParser
+from database.order_codes import OrderCodeConfigurator
+from api.services.catalog_version import catalog_version
+
+logger = logging.getLogger(__name__)
+
+# Срок жизни снимка, с, если журнал изменений каталога недоступен
+DICTIONARY_CACHE_TTL = float(os.getenv("DICTIONARY_CACHE_TTL", "60"))
+
+# Справочные таблицы и столбец, задающий порядок строк
+DICTIONARY_TABLES = {
+    "connector_types": "type_id",
+    "body_sizes": "size_id",
+    "body_types": "body_type_id",
+    "nozzle_types": "nozzle_type_id",
+    "nut_types": "nut_type_id",
+    "contact_quantities": "quantity_id",
+    "connector_parts": "part_id",
+    "contact_diameters": "diameter_id",
+    "contact_combinations": "combination_id",
+    "combination_diameter_map": "map_id",
+    "contact_coatings": "coating_id",
+    "heat_resistance": "resistance_id",
+    "special_designs": "special_design_id",
+    "climate_designs": "climate_id",
+    "connection_types": "connection_type_id",
+    "connector_series": "series_id",
+    "series_sizes": "id",
+    "connector_sizes": "size_id",
+}
+
+# Таблицы, изменение которых требует перезагрузки снимка
+_TRACKED_TABLES = set(DICTIONARY_TABLES) | {"electromechanical_parameters"}
+
+
+class DictionarySnapshot:
+    """
+    Неизменяемый снимок справочников с индексами для проверки фильтров.
+
+    Attributes:
+        tables (Mapping): Строки каждой таблицы (кортеж неизменяемых словарей)
+        em_series_names (tuple): Наименования серий из electromechanical_parameters
+        has_em_parameters (bool): Таблица electromechanical_parameters существует
+        version (int): Версия каталога, при которой загружен снимок
+    """
+
+    def __init__(self, tables, em_series_names, version):
+        self.tables = MappingProxyType({
+            name: tuple(MappingProxyType(row) for row in rows)
+            for name, rows in tables.items()
+        })
+        self.has_em_parameters = em_series_names is not None
+        self.em_series_names = tuple(em_series_names or ())
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        types = self.table("connector_types")
+        self._types_by_id = {row["type_id"]: row for row in types}
+        self._types_by_name = {}
+        for row in types:
+            self._types_by_name.setdefault(row["code"], row)
+            self._types_by_name.setdefault(row["type_name"], row)
+        self._sizes_by_code = {row["size_code"]: row for row in self.table("connector_sizes")}
+        self._lookups = {}
+        self._code_parser = None
+        self._order_codes = None
+
+    def table(self, name):
+        """
+        Возвращает строки справочной таблицы.
+
+        Args:
+            name (str): Имя таблицы
+
+        Returns:
+            tuple: Строки таблицы или пустой кортеж, если таблицы нет в базе
+        """
+        return self.tables.get(name, ())
+
+    def lookup(self, name, key):
+        """
+        Возвращает строки справочной таблицы, проиндексированные по столбцу.
+
+        Args:
+            name (str): Имя таблицы
+            key (str): Столбец индекса
+
+        Returns:
+            dict: Значение столбца -> строка таблицы
+        """
+        index = self._lookups.get((name, key))
+        if index is None:
+            index = self._lookups[(name, key)] = {row[key]: row for row in self.table(name)}
+        return index
+
+    def code_parser(self):
+        """
+        Возвращает разборщик обозначений соединителей, скомпилированный по справочникам снимка.
+
+        Returns:
+            ConnectorCodeParser: Разборщик обозначений
+        """
+        if self._code_parser is None:
+            self._code_parser = ConnectorCodeParser(self.tables)
+        return self._code_parser
+
+    def order_codes(self):
+        """
+        Возвращает перечислитель допустимых обозначений, построенный по справочникам снимка.
+
+        Returns:
+            OrderCodeConfigurator: Перечислитель обозначений
+        """
+        if self._order_codes is None:
+            self._order_codes = OrderCodeConfigurator(self.tables)
+        return self._order_codes
+
+    def find_type(self, value):
+        """
+        Находит тип соединителя по идентификатору, коду или наименованию.
+
+        Args:
+            value (int, str): Идентификатор типа или точный код/наименование
+
+        Returns:
+            Mapping: Строка connector_types или None
+        """
+        if isinstance(value, int):
+            return self._types_by_id.get(value)
+        return self._types_by_name.get(value)
+
+    def find_size(self, size_code):
+        """
+        Находит размер корпуса по коду.
+
+        Args:
+            size_code (int): Код размера (14, 18, 22...)
+
+        Returns:
+            Mapping: Строка connector_sizes или None
+        """
+        return self._sizes_by_code.get(size_code)
+
+    def size_codes(self):
+        """Возвращает доступные коды размеров по возрастанию"""
+        return sorted(self._sizes_by_code)
+
+    def match_types(self, query):
+        """Типы соединителей, код или наименование которых совпадает с запросом или содержит его"""
+        needle = query.lower()
+        return [
+            row for row in self.table("connector_types")
+            if row["code"] == query or row["type_name"] == query
+            or needle in row["code"].lower() or needle in row["type_name"].lower()
+        ]
+
+    def match_series(self, query, normalized_query):
+        """Серии, наименование которых совпадает с запросом или содержит его"""
+        needle = query.lower()
+        return [
+            row for row in self.table("connector_series")
+            if needle in row["series_name"].lower()
+            or row["series_name"].replace(" ", "") == normalized_query
+        ]
+
+    def match_em_series(self, query, limit=5):
+        """Наименования серий из electromechanical_parameters, содержащие запрос"""
+        needle = query.lower()
+        return [name for name in self.em_series_names if needle in name.lower()][:limit]
+
+
+class DictionaryCache:
+    """
+    Версионированный кэш справочников. Загружается при запуске API и
+    перезагружается при первом обращении после изменения справочников.
+    """
+
+    def __init__(self, ttl=DICTIONARY_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshot = None
+        self._stale_since = 0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Помечает снимок устаревшим при изменении справочных таблиц"""
+        if full or any(change.table_name in _TRACKED_TABLES for change in changes):
+            self._stale_since = version
+
+    def _is_fresh(self, snapshot):
+        if snapshot is None:
+            return False
+        if not catalog_version.available:
+            return time.monotonic() - snapshot.loaded_at < self.ttl
+        return snapshot.version >= self._stale_since
+
+    async def get(self):
+        """
+        Возвращает актуальный снимок справочников.
+
+        Returns:
+            DictionarySnapshot: Снимок справочников
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            if not self._is_fresh(self._snapshot):
+                self._snapshot = await self._load()
+            return self._snapshot
+
+    async def load(self):
+        """Загружает справочники; вызывается при запуске API"""
+        async with self._lock:
+            self._snapshot = await self._load()
+
+    async def _load(self):
+        """Загружает все справочники за два обращения к базе"""
+        # Версию каталога запоминаем до чтения данных
+        version = catalog_version.version
+        async with get_async_db_cursor() as cursor:
+            names = list(DICTIONARY_TABLES) + ["electromechanical_parameters"]
+            await cursor.execute(
+                "SELECT name FROM unnest(%s::TEXT[]) AS name WHERE to_regclass(name) IS NOT NULL",
+                (names,)
+            )
+            existing = {row["name"] for row in cursor.fetchall()}
+
+            columns = [
+                f"(SELECT COALESCE(jsonb_agg(to_jsonb(t) ORDER BY t.{key}), '[]'::JSONB) "
+                f"FROM {name} t) AS {name}"
+                for name, key in DICTIONARY_TABLES.items() if name in existing
+            ]
+            if "electromechanical_parameters" in existing:
+                columns.append(
+                    "(SELECT COALESCE(jsonb_agg(DISTINCT series_name), '[]'::JSONB) "
+                    "FROM electromechanical_parameters) AS electromechanical_parameters"
+                )
+            row = {}
+            if columns:
+                await cursor.execute("SELECT " + ", ".join(columns))
+                row = cursor.fetchone()
+
+        em_series_names = row.pop("electromechanical_parameters", None)
+        self.loads += 1
+        logger.info("Загружены справочники каталога: %s таблиц, версия %s", len(row), version)
+        return DictionarySnapshot(row, em_series_names, version)
+
+    def get_stats(self):
+        """
+        Возвращает состояние кэша справочников.
+
+        Returns:
+            dict: Версия снимка, количество строк по таблицам и число загрузок
+        """
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "fresh": self._is_fresh(snapshot),
+            "version": snapshot.version if snapshot else None,
+            "loads": self.loads,
+            "tables": {name: len(rows) for name, rows in snapshot.tables.items()} if snapshot else {},
+        }
+
+
+# Общий кэш справочников
+dictionaries = DictionaryCache()
+catalog_version.subscribe(dictionaries.on_catalog_change)
@@ -0,0 +1,146 @@
+"""
+Расчет срока службы соединителей при заданной температуре.
+Кривая наработки (connector_lifetime_by_temperature) загружается в массивы
+NumPy один раз и перечитывается при первом обращении после ее изменения
+в журнале каталога. Наработка для пакета температур вычисляется
+векторизованно (database/lifetime_curve.py) без обращений к базе данных.
+"""
+import asyncio
+import logging
+import time
+
+from api.database import get_async_db_cursor
+from api.services.catalog_version import catalog_version
+from database.lifetime_curve import LifetimeCurve
+
+logger = logging.getLogger(__name__)
+
+# Таблица, изменение которой требует перечитать кривую
+_TRACKED_TABLE = "connector_lifetime_by_temperature"
+
+
+class LifetimeSnapshot:
+    """
+    Кривая наработки, загруженная при определенной версии каталога.
+
+    Attributes:
+        curve (LifetimeCurve): Кривая наработки
+        version (int): Версия каталога, при которой загружена кривая
+        loaded_at (float): Момент загрузки (time.monotonic)
+    """
+
+    def __init__(self, rows, version):
+        self.curve = LifetimeCurve(rows)
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def calculate(self, temperatures):
+        """
+        Вычисляет наработку для пакета температур.
+
+        Args:
+            temperatures (list): Температуры, °C
+
+        Returns:
+            list: Наработка, ч (None — температура ниже диапазона кривой)
+        """
+        lifetimes, defined = self.curve.evaluate(temperatures)
+        return [
+            hours if is_defined else None
+            for hours, is_defined in zip(lifetimes.tolist(), defined.tolist())
+        ]
+
+
+class LifetimeCalculator:
+    """
+    Версионированная кривая наработки. Загружается при запуске API и
+    перечитывается при первом обращении после изменения кривой.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._stale_since = 0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.load_duration = None
+        self.points_calculated = 0
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Помечает кривую устаревшей при изменении connector_lifetime_by_temperature"""
+        if full or any(change.table_name == _TRACKED_TABLE for change in changes):
+            self._stale_since = version
+
+    def _is_fresh(self, snapshot):
+        return snapshot is not None and snapshot.version >= self._stale_since
+
+    async def get(self):
+        """
+        Возвращает актуальную кривую наработки.
+
+        Returns:
+            LifetimeSnapshot: Кривая наработки
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            if not self._is_fresh(self._snapshot):
+                self._snapshot = await self._load()
+            return self._snapshot
+
+    async def load(self):
+        """Загружает кривую; вызывается при запуске API"""
+        async with self._lock:
+            self._snapshot = await self._load()
+
+    async def calculate(self, temperatures):
+        """
+        Вычисляет наработку для пакета температур по актуальной кривой.
+
+        Args:
+            temperatures (list): Температуры, °C
+
+        Returns:
+            list: Наработка, ч (None — температура ниже диапазона кривой)
+        """
+        snapshot = await self.get()
+        self.points_calculated += len(temperatures)
+        return snapshot.calculate(temperatures)
+
+    async def _load(self):
+        # Версию каталога запоминаем до чтения данных
+        version = catalog_version.version
+        started = time.perf_counter()
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(
+                "SELECT lifetime_hours, max_temperature FROM connector_lifetime_by_temperature"
+            )
+            rows = cursor.fetchall()
+        snapshot = LifetimeSnapshot(rows, version)
+        self.loads += 1
+        self.load_duration = time.perf_counter() - started
+        logger.info("Кривая наработки загружена: точек %s, версия %s", len(rows), version)
+        return snapshot
+
+    def get_stats(self):
+        """
+        Возвращает состояние кривой.
+
+        Returns:
+            dict: Версия, количество точек, число и длительность загрузок
+        """
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "fresh": self._is_fresh(snapshot),
+            "version": snapshot.version if snapshot else None,
+            "points": len(snapshot.curve) if snapshot else 0,
+            "loads": self.loads,
+            "last_load_ms": round(self.load_duration * 1000, 3) if self.load_duration is not None else None,
+            "points_calculated": self.points_calculated,
+        }
+
+
+# Общая кривая наработки
+lifetime_calculator = LifetimeCalculator()
+catalog_version.subscribe(lifetime_calculator.on_catalog_change)
@@ -0,0 +1,142 @@
+"""
+Постраничная навигация по спискам каталога.
+Страницы выбираются поиском по ключу (series_name, series_id) вместо OFFSET:
+клиент получает непрозрачный токен продолжения, а следующая страница читается
+по составному индексу с той же скоростью, что и первая. Общее количество
+элементов группы кэшируется и сбрасывается при изменении серий этой группы.
+"""
+import base64
+import binascii
+import collections
+import json
+import os
+
+from api.services.catalog_version import catalog_version
+
+# Кэш ключуется идентификатором группы из запроса клиента, поэтому его размер ограничен
+GROUP_COUNT_CACHE_MAX_ENTRIES = int(os.getenv("GROUP_COUNT_CACHE_MAX_ENTRIES", "1000"))
+
+
+class InvalidCursorError(ValueError):
+    """Токен продолжения поврежден или относится к другому списку"""
+
+
+def encode_cursor(scope, *key):
+    """
+    Кодирует позицию последнего элемента страницы в токен продолжения.
+
+    Args:
+        scope: Идентификатор списка (например, группа), к которому относится токен
+        *key: Значения ключа сортировки последнего элемента
+
+    Returns:
+        str: Токен продолжения
+    """
+    raw = json.dumps([scope, *key], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, scope, key_types):
+    """
+    Декодирует токен продолжения.
+
+    Args:
+        token (str): Токен продолжения
+        scope: Ожидаемый идентификатор списка
+        key_types (tuple): Типы значений ключа сортировки
+
+    Returns:
+        tuple: Значения ключа сортировки
+
+    Raises:
+        InvalidCursorError: Если токен поврежден или выдан для другого списка
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Некорректный токен продолжения")
+    if (not isinstance(values, list) or len(values) != len(key_types) + 1
+            or values[0] != scope):
+        raise InvalidCursorError("Токен продолжения относится к другому списку")
+    key = tuple(values[1:])
+    if not all(type(value) is value_type for value, value_type in zip(key, key_types)):
+        raise InvalidCursorError("Некорректный токен продолжения")
+    return key
+
+
+class GroupCountCache:
+    """
+    LRU-кэш количества серий в группах (типах соединителей).
+    Значение, прочитанное при версии каталога N, не сохраняется, если группа
+    изменилась после N.
+    """
+
+    def __init__(self, max_entries=GROUP_COUNT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._counts = collections.OrderedDict()
+        self._group_versions = {}
+        self._global_version = 0
+        self.evictions = 0
+
+    def get(self, group_id):
+        """
+        Возвращает закэшированное количество или None.
+
+        Args:
+            group_id (int): Идентификатор группы
+
+        Returns:
+            int: Количество серий в группе или None
+        """
+        if not catalog_version.available:
+            return None
+        count = self._counts.get(group_id)
+        if count is not None:
+            self._counts.move_to_end(group_id)
+        return count
+
+    def put(self, group_id, count, version):
+        """
+        Сохраняет количество серий в группе.
+
+        Args:
+            group_id (int): Идентификатор группы
+            count (int): Количество серий
+            version (int): Версия каталога, полученная до чтения данных из базы
+        """
+        if not catalog_version.available or self.max_entries <= 0:
+            return
+        if version < max(self._global_version, self._group_versions.get(group_id, 0)):
+            return
+        self._counts[group_id] = count
+        self._counts.move_to_end(group_id)
+        while len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+            self.evictions += 1
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Сбрасывает количество для групп, серии которых изменились"""
+        groups = set()
+        for change in changes:
+            if change.table_name != "connector_series":
+                continue
+            if change.type_id is None:
+                full = True
+            else:
+                groups.add(change.type_id)
+
+        if full:
+            # Версии отдельных групп перекрываются общей версией
+            self._global_version = version
+            self._group_versions.clear()
+            self._counts.clear()
+            return
+        for group_id in groups:
+            self._group_versions[group_id] = version
+            self._counts.pop(group_id, None)
+
+
+# Общий кэш количества серий в группах
+group_counts = GroupCountCache()
+catalog_version.subscribe(group_counts.on_catalog_change)
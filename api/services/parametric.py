@@ -0,0 +1,151 @@
+"""
+Параметрический поиск по электрическим характеристикам.
+Каждый параметр задается диапазоном (минимум и/или максимум). Условия
+записываются как сравнения столбцов с параметрами того же типа, поэтому
+проверяются по B-tree индексам миграции 011_parametric_indexes.sql. Ток на
+контакт берется из небольшой таблицы contact_max_current по диаметру контакта.
+Страница результатов и общее количество получаются одним запросом.
+"""
+import collections
+import math
+
+RangeParameter = collections.namedtuple("RangeParameter", ["name", "title", "expression", "sql_type"])
+
+# Параметры диапазонного поиска: имя параметра запроса, наименование,
+# выражение SQL и тип, к которому приводится граница.
+# Ток на один контакт определяется диаметром контакта (contact_max_current)
+RANGE_PARAMETERS = (
+    RangeParameter("current", "Максимальный ток на контакт, А", "cmc.max_current", "NUMERIC"),
+    RangeParameter("diameter", "Диаметр контакта, мм", "ep.contact_diameter", "NUMERIC"),
+    RangeParameter("contacts", "Количество контактов", "ep.contact_quantity", "INTEGER"),
+    RangeParameter("voltage", "Рабочее напряжение, В", "ep.max_working_voltage", "INTEGER"),
+    RangeParameter("heat_resistance", "Теплостойкость, °C", "h.temperature", "INTEGER"),
+)
+
+# Столбцы сортировки результатов
+SORT_COLUMNS = {
+    "series": "product_name",
+    "size": "size_code",
+    "current": "max_current_contact",
+    "diameter": "contact_diameter",
+    "contacts": "contact_quantity",
+    "voltage": "max_working_voltage",
+    "heat_resistance": "max_temperature",
+}
+
+
+class InvalidRangeError(ValueError):
+    """Минимум диапазона больше максимума"""
+
+
+def validate_ranges(bounds):
+    """
+    Проверяет границы диапазонов.
+
+    Args:
+        bounds (dict): Имя параметра -> (минимум, максимум), границы могут быть None
+
+    Raises:
+        InvalidRangeError: Если минимум больше максимума
+    """
+    for parameter in RANGE_PARAMETERS:
+        low, high = bounds.get(parameter.name, (None, None))
+        if low is not None and high is not None and low > high:
+            raise InvalidRangeError(
+                f"{parameter.title}: минимум {low} больше максимума {high}"
+            )
+
+
+def _range_conditions(parameters, bounds, params):
+    conditions = []
+    for parameter in parameters:
+        low, high = bounds.get(parameter.name, (None, None))
+        if parameter.sql_type == "INTEGER":
+            # Дробные границы целочисленного столбца сужаются до целых значений
+            low = math.ceil(low) if low is not None else None
+            high = math.floor(high) if high is not None else None
+        if low is not None:
+            params[f"{parameter.name}_min"] = low
+            conditions.append(f"{parameter.expression} >= %({parameter.name}_min)s::{parameter.sql_type}")
+        if high is not None:
+            params[f"{parameter.name}_max"] = high
+            conditions.append(f"{parameter.expression} <= %({parameter.name}_max)s::{parameter.sql_type}")
+    return conditions
+
+
+def build_parametric_query(bounds, sort, descending, limit, offset):
+    """
+    Строит запрос параметрического поиска.
+
+    Args:
+        bounds (dict): Имя параметра -> (минимум, максимум)
+        sort (str): Ключ SORT_COLUMNS
+        descending (bool): Сортировка по убыванию
+        limit (int): Размер страницы
+        offset (int): Смещение страницы
+
+    Returns:
+        tuple: (SQL запрос, параметры)
+    """
+    params = {"limit": limit, "offset": offset}
+    electrical = [parameter for parameter in RANGE_PARAMETERS if parameter.name != "heat_resistance"]
+    heat = [parameter for parameter in RANGE_PARAMETERS if parameter.name == "heat_resistance"]
+
+    conditions = _range_conditions(electrical, bounds, params)
+    heat_conditions = _range_conditions(heat, bounds, params)
+    if heat_conditions:
+        # Теплостойкость задана для соединителей типа серии
+        conditions.append(f"""EXISTS (
+                SELECT 1
+                FROM connectors c
+                JOIN heat_resistance h ON h.resistance_id = c.resistance_id
+                WHERE c.type_id = cs.type_id AND {" AND ".join(heat_conditions)}
+            )""")
+    where = " AND ".join(conditions) if conditions else "TRUE"
+    direction = "DESC" if descending else "ASC"
+
+    query = f"""
+        WITH matched AS (
+            SELECT
+                ep.param_id,
+                cs.series_id AS product_id,
+                cs.series_name AS product_name,
+                ep.size_code,
+                ep.contact_diameter,
+                ep.contact_quantity,
+                ep.contact_combination_code,
+                cmc.max_current AS max_current_contact,
+                ep.max_current AS max_current_summary,
+                ep.max_working_voltage,
+                cs.type_id
+            FROM electromechanical_parameters ep
+            JOIN connector_series cs ON cs.series_name = ep.series_name
+            LEFT JOIN (
+                SELECT cd.diameter, MIN(c.max_current) AS max_current
+                FROM contact_diameters cd
+                JOIN contact_max_current c ON c.diameter_id = cd.diameter_id
+                GROUP BY cd.diameter
+            ) cmc ON cmc.diameter = ep.contact_diameter
+            WHERE {where}
+        ),
+        page AS (
+            SELECT m.*, heat.temperatures AS heat_resistance, heat.max_temperature
+            FROM matched m
+            LEFT JOIN LATERAL (
+                SELECT
+                    COALESCE(array_agg(DISTINCT h.temperature ORDER BY h.temperature), '{{}}') AS temperatures,
+                    MAX(h.temperature) AS max_temperature
+                FROM connectors c
+                JOIN heat_resistance h ON h.resistance_id = c.resistance_id
+                WHERE c.type_id = m.type_id
+            ) heat ON TRUE
+            ORDER BY {SORT_COLUMNS[sort]} {direction} NULLS LAST, m.param_id
+            LIMIT %(limit)s OFFSET %(offset)s
+        )
+        SELECT
+            (SELECT COUNT(*) FROM matched) AS total_count,
+            (SELECT COALESCE(jsonb_agg(to_jsonb(p) - 'type_id' - 'max_temperature'
+                                       ORDER BY p.{SORT_COLUMNS[sort]} {direction} NULLS LAST, p.param_id), '[]'::JSONB)
+             FROM page p) AS items
+    """
+    return query, params
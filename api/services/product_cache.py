@@ -0,0 +1,242 @@
+"""
+Кэш карточек продуктов.
+Хранит готовые к отправке байты JSON-ответа, привязанные к версии каталога,
+при которой они были построены. Изменения каталога инвалидируют только
+затронутые продукты: изменение серии — карточку этой серии, изменение
+соединителя — карточки продуктов его типа, изменение справочников — все карточки.
+"""
+import collections
+import json
+import os
+
+from fastapi.encoders import jsonable_encoder
+
+from api.services.catalog_version import catalog_version
+
+PRODUCT_CACHE_MAX_ENTRIES = int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "1000"))
+PRODUCT_CACHE_MAX_BYTES = int(os.getenv("PRODUCT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Таблицы, изменение строки которых затрагивает одну серию или один тип
+_SERIES_TABLES = {"connector_series"}
+_TYPE_TABLES = {"connectors"}
+# Таблицы, данные которых не входят в карточку продукта
+_IGNORED_TABLES = {"compatible_connectors"}
+
+
+def serialize_response(model, exclude=None):
+    """
+    Сериализует модель ответа так же, как JSONResponse FastAPI.
+
+    Args:
+        model (BaseModel): Модель ответа
+        exclude (set, optional): Поля, не включаемые в ответ
+
+    Returns:
+        bytes: Тело ответа в формате JSON
+    """
+    return json.dumps(
+        jsonable_encoder(model, exclude=exclude),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class _CacheEntry:
+    """Тело ответа, тип продукта и версия каталога, при которой оно построено"""
+    __slots__ = ("body", "type_id", "version")
+
+    def __init__(self, body, type_id, version):
+        self.body = body
+        self.type_id = type_id
+        self.version = version
+
+
+class ProductDetailCache:
+    """
+    Ограниченный по количеству записей и объему LRU-кэш карточек продуктов.
+    Ключ записи — идентификатор продукта и вариант ответа (например, краткая
+    или расширенная карточка).
+    """
+
+    def __init__(self, max_entries=PRODUCT_CACHE_MAX_ENTRIES, max_bytes=PRODUCT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        # Ключи записей каждого продукта и каждого типа: вытеснение и
+        # инвалидация не просматривают весь кэш
+        self._product_keys = {}
+        self._type_keys = {}
+        # Версии каталога, начиная с которых устарели данные продукта, типа или всего каталога
+        self._product_versions = collections.OrderedDict()
+        self._type_versions = {}
+        self._global_version = 0
+        # Наибольшая версия продукта, удаленная из _product_versions: запись,
+        # построенная раньше нее, не сохраняется, так как ее продукт мог измениться
+        self._forgotten_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _is_valid(self, product_id, entry):
+        """Проверяет, что после построения записи затрагивающих ее изменений не было"""
+        stale_since = max(
+            self._global_version,
+            self._type_versions.get(entry.type_id, 0),
+            self._product_versions.get(product_id, 0),
+        )
+        return entry.version >= stale_since
+
+    def _add(self, key, entry):
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        self._product_keys.setdefault(key[0], set()).add(key)
+        self._type_keys.setdefault(entry.type_id, set()).add(key)
+
+    @staticmethod
+    def _unindex(index, index_key, key):
+        keys = index[index_key]
+        keys.discard(key)
+        if not keys:
+            del index[index_key]
+
+    def _discard(self, key, entry):
+        """
+        Учитывает запись, удаленную из _entries.
+
+        Returns:
+            bool: У продукта не осталось записей
+        """
+        self._bytes -= len(entry.body)
+        self._unindex(self._product_keys, key[0], key)
+        self._unindex(self._type_keys, entry.type_id, key)
+        return key[0] not in self._product_keys
+
+    def _remove(self, key):
+        self._discard(key, self._entries.pop(key))
+
+    def _forget_product(self, product_id):
+        """Удаляет версию продукта, у которого не осталось записей в кэше"""
+        version = self._product_versions.pop(product_id, None)
+        if version is not None:
+            self._forgotten_version = max(self._forgotten_version, version)
+
+    def get(self, product_id, variant):
+        """
+        Возвращает закэшированное тело ответа.
+
+        Args:
+            product_id (int): Идентификатор продукта
+            variant (str): Вариант ответа
+
+        Returns:
+            bytes: Тело ответа или None, если актуальной записи нет
+        """
+        key = (product_id, variant)
+        entry = self._entries.get(key)
+        if entry is not None and catalog_version.available and self._is_valid(product_id, entry):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.body
+        if entry is not None:
+            self._remove(key)
+        self.misses += 1
+        return None
+
+    def put(self, product_id, variant, type_id, body, version):
+        """
+        Сохраняет тело ответа.
+
+        Args:
+            product_id (int): Идентификатор продукта
+            variant (str): Вариант ответа
+            type_id (int): Тип соединителя продукта
+            body (bytes): Тело ответа
+            version (int): Версия каталога, полученная до чтения данных из базы
+        """
+        if not catalog_version.available or len(body) > self.max_bytes:
+            return
+        entry = _CacheEntry(body, type_id, version)
+        if version < self._forgotten_version or not self._is_valid(product_id, entry):
+            # Каталог изменился, пока строился ответ
+            return
+        key = (product_id, variant)
+        if key in self._entries:
+            self._remove(key)
+        self._add(key, entry)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            old_key, old_entry = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self._discard(old_key, old_entry):
+                self._forget_product(old_key[0])
+
+    def on_catalog_change(self, changes, version, full=False):
+        """
+        Инвалидирует записи, затронутые изменениями каталога.
+        Вызывается трекером версии каталога.
+        """
+        products = set()
+        types = set()
+        for change in changes:
+            if change.table_name in _IGNORED_TABLES:
+                continue
+            if change.table_name in _SERIES_TABLES and change.row_id is not None:
+                products.add(change.row_id)
+            elif change.table_name in _TYPE_TABLES and change.type_id is not None:
+                types.add(change.type_id)
+            else:
+                full = True
+
+        if full:
+            self._global_version = version
+            # Версии отдельных продуктов не новее общей версии
+            self._product_versions.clear()
+            stale = list(self._entries)
+        else:
+            for product_id in products:
+                self._product_versions[product_id] = version
+                self._product_versions.move_to_end(product_id)
+            # Версии продуктов хранятся не дольше, чем поместилось бы записей в кэше
+            while len(self._product_versions) > self.max_entries:
+                self._forget_product(next(iter(self._product_versions)))
+            for type_id in types:
+                self._type_versions[type_id] = version
+            stale = set()
+            for product_id in products:
+                stale.update(self._product_keys.get(product_id, ()))
+            for type_id in types:
+                stale.update(self._type_keys.get(type_id, ()))
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+
+    def get_stats(self):
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            dict: Попадания, промахи, доля попаданий, количество записей и занятый объем
+        """
+        total = self.hits + self.misses
+        return {
+            "enabled": catalog_version.available,
+            "catalog_version": catalog_version.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "tracked_products": len(self._product_versions),
+        }
+
+
+# Общий кэш карточек продуктов
+product_cache = ProductDetailCache()
+catalog_version.subscribe(product_cache.on_catalog_change)
@@ -0,0 +1,162 @@
+"""
+Обновление материализованного представления соединителей.
+При изменении таблиц, из которых строится v_connectors_full, API запускает
+REFRESH MATERIALIZED VIEW CONCURRENTLY mv_connectors_full в фоне. Изменения,
+пришедшие за время ожидания и обновления, объединяются в одно следующее
+обновление. Пока миграция 015 не применена, чтение идет из v_connectors_full.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from api.database import get_async_db_cursor
+from api.services.catalog_version import catalog_version
+from database.read_model import (
+    CONNECTORS_VIEW, CONNECTORS_FALLBACK_VIEW, CONNECTORS_VIEW_SOURCES,
+    AVAILABLE_QUERY, LAST_CHANGE_QUERY, REFRESH_QUERY, RECORD_REFRESH_QUERY, STATUS_QUERY,
+    refresh_params, status_params
+)
+
+logger = logging.getLogger(__name__)
+
+# Задержка обновления после изменения, с: серия изменений дает одно обновление
+READ_MODEL_REFRESH_DELAY = float(os.getenv("READ_MODEL_REFRESH_DELAY", "1"))
+
+_TRACKED_TABLES = set(CONNECTORS_VIEW_SOURCES)
+
+
+class ConnectorsReadModel:
+    """
+    Состояние mv_connectors_full в процессе API: доступность представления,
+    запланированные и выполненные обновления.
+    """
+
+    def __init__(self, delay=READ_MODEL_REFRESH_DELAY):
+        self.delay = delay
+        self.available = False
+        self.refreshes = 0
+        self.failures = 0
+        self.last_duration = None
+        # Последняя версия каталога с изменением исходных таблиц и версия,
+        # до которой изменения учтены обновлением
+        self._changed_version = 0
+        self._refreshed_version = 0
+        self._task = None
+
+    @property
+    def relation(self):
+        """Имя представления для чтения соединителей"""
+        return CONNECTORS_VIEW if self.available else CONNECTORS_FALLBACK_VIEW
+
+    async def start(self):
+        """
+        Проверяет наличие представления и планирует обновление, если в журнале
+        есть не учтенные им изменения; вызывается при запуске API
+        """
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(AVAILABLE_QUERY)
+            self.available = cursor.fetchone()["available"]
+            if not self.available:
+                logger.warning("Представление %s не найдено (миграция 015 не применена), "
+                               "соединители читаются из %s", CONNECTORS_VIEW, CONNECTORS_FALLBACK_VIEW)
+                return
+            await cursor.execute(STATUS_QUERY, status_params())
+            row = cursor.fetchone()
+        if row is None or row["pending_changes"]:
+            self._schedule(catalog_version.version)
+
+    async def stop(self):
+        """Отменяет запланированное обновление"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Планирует обновление при изменении соединителей или их справочников"""
+        if not self.available:
+            return
+        if full or any(change.table_name in _TRACKED_TABLES for change in changes):
+            self._schedule(version)
+
+    def _schedule(self, version):
+        """Запоминает изменение и запускает фоновое обновление, если оно не запущено"""
+        self._changed_version = max(self._changed_version, version)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        """Обновляет представление, пока в нем не будут учтены все изменения"""
+        while self._changed_version > self._refreshed_version:
+            await asyncio.sleep(self.delay)
+            # Изменения, обнаруженные после этого момента, потребуют нового обновления
+            version = self._changed_version
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("Ошибка обновления представления %s", CONNECTORS_VIEW)
+                return
+            self._refreshed_version = version
+
+    async def refresh(self):
+        """
+        Обновляет представление и записывает обновление в materialized_view_refreshes.
+
+        Returns:
+            float: Длительность обновления, с
+        """
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(LAST_CHANGE_QUERY)
+            last_change_id = cursor.fetchone()["last_change_id"]
+            started = time.perf_counter()
+            await cursor.execute(REFRESH_QUERY)
+            duration = time.perf_counter() - started
+            await cursor.execute(RECORD_REFRESH_QUERY, refresh_params(duration, last_change_id))
+        self.refreshes += 1
+        self.last_duration = duration
+        logger.info("Представление %s обновлено за %.1f мс", CONNECTORS_VIEW, duration * 1000)
+        return duration
+
+    async def get_stats(self):
+        """
+        Возвращает состояние представления.
+
+        Returns:
+            dict: Доступность, число и длительность обновлений в процессе, момент
+                последнего обновления и устаревание по журналу изменений
+        """
+        stats = {
+            "available": self.available,
+            "relation": self.relation,
+            "refresh_pending": self._task is not None and not self._task.done(),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh_ms": round(self.last_duration * 1000, 3) if self.last_duration is not None else None,
+            "refreshed_at": None,
+            "pending_changes": None,
+            "stale_seconds": None,
+        }
+        if not self.available:
+            return stats
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute(STATUS_QUERY, status_params())
+            row = cursor.fetchone()
+        if row is not None:
+            # Последнее обновление могло быть выполнено другим процессом или из командной строки
+            stats["refreshed_at"] = row["refreshed_at"].isoformat()
+            stats["last_refresh_ms"] = float(row["duration_ms"]) if row["duration_ms"] is not None else None
+            stats["pending_changes"] = row["pending_changes"]
+            stats["stale_seconds"] = round(float(row["stale_seconds"]), 3) if row["stale_seconds"] is not None else 0.0
+        return stats
+
+
+# Общее состояние представления соединителей
+connectors_read_model = ConnectorsReadModel()
+catalog_version.subscribe(connectors_read_model.on_catalog_change)
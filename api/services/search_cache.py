@@ -0,0 +1,175 @@
+"""
+Кэш результатов поиска по каталогу.
+Небольшой набор запросов (коды типов и размеры корпуса) составляет основную
+часть поискового трафика, поэтому ранжированные результаты хранятся в
+LRU-кэше с ограниченным сроком жизни. Одновременные промахи по одному ключу
+объединяются: поиск выполняется один раз, остальные запросы ждут его результат.
+Любое изменение каталога сбрасывает кэш.
+"""
+import asyncio
+import collections
+import os
+import time
+
+from api.services.catalog_version import catalog_version
+from api.services.search_planner import search_text
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+
+
+def search_cache_key(plan, limit):
+    """
+    Ключ кэша для плана поиска.
+    Для этапов поиска в базе ключом служит ровно тот текст, с которым они
+    выполняются (search_text). Результаты этапов по обозначению и размеру
+    корпуса определяются найденными в справочниках значениями, поэтому для
+    них регистр не влияет на результат.
+
+    Args:
+        plan (SearchPlan): План поиска
+        limit (int): Максимальное количество результатов
+
+    Returns:
+        tuple: Ключ кэша
+    """
+    if "index" in plan.stages:
+        text = search_text(plan)
+    else:
+        text = plan.normalized_query.upper()
+    return plan.kind, text, limit
+
+
+class _CacheEntry:
+    """Результаты поиска, версия каталога и момент истечения срока жизни"""
+    __slots__ = ("results", "version", "expires_at")
+
+    def __init__(self, results, version, expires_at):
+        self.results = results
+        self.version = version
+        self.expires_at = expires_at
+
+
+class SearchResultCache:
+    """
+    TTL+LRU кэш результатов поиска с объединением одновременных промахов.
+    """
+
+    def __init__(self, ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        # Ключ -> задача выполняющегося поиска
+        self._inflight = {}
+        self._global_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Возвращает закэшированные результаты.
+
+        Args:
+            key (tuple): Ключ (search_cache_key)
+
+        Returns:
+            list: Результаты поиска или None, если актуальной записи нет
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic() or entry.version < self._global_version:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.results
+
+    def _put(self, key, results, version):
+        if self.max_entries <= 0 or version < self._global_version:
+            # Каталог изменился, пока выполнялся поиск
+            return
+        self._entries[key] = _CacheEntry(results, version, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _compute(self, key, search):
+        # Версию каталога запоминаем до выполнения поиска
+        version = catalog_version.version
+        try:
+            value = await search()
+            self._put(key, value[0], version)
+            return value
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    async def get_or_search(self, key, search):
+        """
+        Возвращает результаты из кэша или выполняет поиск.
+
+        Args:
+            key (tuple): Ключ (search_cache_key)
+            search (Callable): Корутина-функция без аргументов, возвращающая
+                (результаты, этапы, количество обращений к базе)
+
+        Returns:
+            tuple: (результаты, этапы, количество обращений к базе, источник: hit, miss или coalesced)
+        """
+        results = self.get(key)
+        if results is not None:
+            self.hits += 1
+            return results, [], 0, "hit"
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            results, _, _ = await asyncio.shield(task)
+            return results, [], 0, "coalesced"
+
+        self.misses += 1
+        # Поиск выполняется отдельной задачей, чтобы отмена одного из ожидающих
+        # запросов не прерывала его для остальных
+        task = asyncio.ensure_future(self._compute(key, search))
+        self._inflight[key] = task
+        results, timings, round_trips = await asyncio.shield(task)
+        return results, timings, round_trips, "miss"
+
+    def on_catalog_change(self, changes, version, full=False):
+        """Сбрасывает кэш при любом изменении каталога"""
+        self._global_version = version
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        # Поиск, начатый до изменения, не должен обслуживать новые запросы
+        self._inflight.clear()
+
+    def get_stats(self):
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            dict: Попадания, промахи, объединенные промахи и количество записей
+        """
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "catalog_version": catalog_version.version,
+            "ttl": self.ttl,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+# Общий кэш результатов поиска
+search_cache = SearchResultCache()
+catalog_version.subscribe(search_cache.on_catalog_change)
@@ -0,0 +1,336 @@
+"""
+Планировщик поиска по каталогу (/api/Products/Search).
+Запрос классифицируется в памяти по снимку справочников: полное обозначение
+соединителя, код типа, наименование серии, размер корпуса, числовой параметр
+или произвольный текст. Для каждого класса выполняется минимальный набор
+этапов: обозначения и размеры разрешаются по снимку без обращений к базе,
+остальные запросы — одним запросом к поисковому индексу catalog_search, а без
+индекса — одним объединенным запросом по таблицам каталога.
+"""
+import collections
+import math
+import time
+
+from api.database import get_async_db_cursor
+from api.services.catalog_search import catalog_search, escape_like
+from database.connector_code import normalize_connector_code
+
+# Классы запросов
+FULL_CODE = "full_code"
+TYPE_CODE = "type_code"
+SERIES = "series"
+SIZE = "size"
+NUMERIC = "numeric"
+TEXT = "text"
+
+# Как запрос был распознан — для сообщений об ошибках
+KIND_TITLES = {
+    FULL_CODE: "обозначение соединителя",
+    TYPE_CODE: "тип соединителя",
+    SERIES: "серия соединителя",
+    SIZE: "размер корпуса",
+    NUMERIC: "числовой параметр",
+    TEXT: "текст",
+}
+
+# Диапазон типа INTEGER PostgreSQL: большие числа не сравниваются с целыми столбцами
+INT4_MIN = -2 ** 31
+INT4_MAX = 2 ** 31 - 1
+
+SearchPlan = collections.namedtuple(
+    "SearchPlan", ["kind", "query", "normalized_query", "numeric_value", "match", "stages", "components"]
+)
+
+
+def _parse_number(query):
+    """Конечное число из запроса (десятичный разделитель — точка или запятая) или None"""
+    try:
+        value = float(query.strip().replace(",", "."))
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def integer_value(value):
+    """
+    Целое значение числового запроса, если оно помещается в INTEGER, иначе None.
+
+    Args:
+        value (float): Число из запроса или None
+
+    Returns:
+        int: Целое значение или None
+    """
+    if value is None or not value.is_integer() or not INT4_MIN <= value <= INT4_MAX:
+        return None
+    return int(value)
+
+
+def classify_query(dictionary, query):
+    """
+    Классифицирует поисковый запрос и выбирает этапы поиска.
+
+    Args:
+        dictionary (DictionarySnapshot): Снимок справочников
+        query (str): Поисковый запрос
+
+    Returns:
+        SearchPlan: Класс запроса, значение, найденное в справочниках, и этапы поиска
+    """
+    normalized_query = query.replace(" ", "")
+    numeric_value = _parse_number(query)
+    kind = TEXT
+    match = None
+    components = None
+
+    if numeric_value is not None:
+        integer = integer_value(numeric_value)
+        size = dictionary.find_size(integer) if integer is not None else None
+        if size is not None:
+            kind, match = SIZE, size
+        else:
+            kind = NUMERIC
+    else:
+        code = normalize_connector_code(query)
+        parsed = dictionary.code_parser().parse(code)
+        connector_type = dictionary.find_type(query.strip()) or dictionary.find_type(code)
+        if parsed["valid"]:
+            kind = FULL_CODE
+            components = {component["name"]: component["value"] for component in parsed["components"]}
+            match = dictionary.find_type(components["type"])
+        elif connector_type is not None:
+            kind, match = TYPE_CODE, connector_type
+        else:
+            for row in dictionary.table("connector_series"):
+                if normalize_connector_code(row["series_name"]) == code:
+                    kind, match = SERIES, row
+                    break
+
+    if kind == FULL_CODE:
+        stages = ("code",)
+    elif kind == SIZE:
+        stages = ("size",)
+    else:
+        stages = ("index",)
+    return SearchPlan(kind, query, normalized_query, numeric_value, match, stages, components)
+
+
+def search_text(plan):
+    """
+    Текст, с которым выполняются этапы поиска в базе (индекс catalog_search
+    или объединенный запрос по таблицам каталога).
+    Обозначения, коды и числа ищутся без пробелов; в произвольном тексте
+    пробелы разделяют слова, поэтому они сохраняются (повторяющиеся пробелы
+    схлопываются).
+
+    Args:
+        plan (SearchPlan): План поиска
+
+    Returns:
+        str: Текст поискового запроса
+    """
+    if plan.kind == TEXT:
+        return " ".join(plan.query.split())
+    return plan.normalized_query
+
+
+def _preview(series, score):
+    return {
+        "product_id": series["series_id"],
+        "product_name": series["series_name"],
+        "product_image_path": f"/api/Images/GetProductImage/{series['series_id']}",
+        "score": score,
+    }
+
+
+def _series_size_code(series_name, type_code):
+    """Размер корпуса из наименования серии вида "2РМТ18" или None"""
+    name = normalize_connector_code(series_name)
+    if not name.startswith(type_code):
+        return None
+    digits = ""
+    for char in name[len(type_code):]:
+        if not char.isdigit():
+            break
+        digits += char
+    return digits or None
+
+
+def _search_by_code(dictionary, plan, limit):
+    """
+    Серии типа, указанного в обозначении соединителя. Первыми идут серии,
+    выпускаемые в размере корпуса из обозначения (по series_sizes или по
+    наименованию серии), а среди них — серия, наименование которой совпадает
+    с типом и размером обозначения; серии других размеров получают меньший вес.
+    """
+    if plan.match is None:
+        return []
+    type_code = normalize_connector_code(plan.match["code"])
+    size_code = plan.components["size"]
+    size = dictionary.find_size(int(size_code)) if size_code.isdigit() else None
+    series_sizes = collections.defaultdict(set)
+    for row in dictionary.table("series_sizes"):
+        series_sizes[row["series_id"]].add(row["size_id"])
+
+    ranked = []
+    for row in dictionary.table("connector_series"):
+        if row["type_id"] != plan.match["type_id"]:
+            continue
+        name_size = _series_size_code(row["series_name"], type_code)
+        if name_size is not None:
+            matches_size = name_size == size_code
+        elif row["series_id"] in series_sizes:
+            matches_size = size is not None and size["size_id"] in series_sizes[row["series_id"]]
+        else:
+            # Размеры серии неизвестны
+            matches_size = True
+        exact = name_size == size_code
+        ranked.append((not matches_size, not exact, row["series_name"], row))
+    ranked.sort(key=lambda item: item[:3])
+    return [
+        _preview(row, 0.5 if other_size else 1.0)
+        for other_size, _, _, row in ranked[:limit]
+    ]
+
+
+def _search_by_size(dictionary, plan, limit):
+    """Серии, выпускаемые в указанном размере корпуса"""
+    size_id = plan.match["size_id"]
+    series_ids = {row["series_id"] for row in dictionary.table("series_sizes") if row["size_id"] == size_id}
+    series = [row for row in dictionary.table("connector_series") if row["series_id"] in series_ids]
+    return [_preview(row, 1.0) for row in sorted(series, key=lambda row: row["series_name"])[:limit]]
+
+
+def build_catalog_query(dictionary, plan, limit):
+    """
+    Строит объединенный запрос по таблицам каталога для базы без поискового индекса.
+    Этапы (точное совпадение наименования, подстрока, электромеханические
+    параметры) выполняются одним запросом и ранжируются по номеру этапа.
+
+    Args:
+        dictionary (DictionarySnapshot): Снимок справочников
+        plan (SearchPlan): План поиска
+        limit (int): Максимальное количество результатов
+
+    Returns:
+        tuple: (SQL запрос, параметры)
+    """
+    text = search_text(plan)
+    params = {
+        "query": text,
+        "upper": text.upper(),
+        "normalized": plan.normalized_query,
+        "like": f"%{escape_like(text)}%",
+        "normalized_like": f"%{escape_like(plan.normalized_query)}%",
+        "limit": limit,
+    }
+    stages = []
+    if plan.kind != NUMERIC:
+        stages.append("""
+            SELECT cs.series_id, cs.series_name, 1 AS rank
+            FROM connector_series cs
+            WHERE cs.series_name = %(query)s OR cs.series_name = %(upper)s
+               OR REPLACE(cs.series_name, ' ', '') = %(normalized)s
+        """)
+        stages.append("""
+            SELECT cs.series_id, cs.series_name, 2 AS rank
+            FROM connector_series cs
+            JOIN connector_types ct ON cs.type_id = ct.type_id
+            WHERE cs.series_name ILIKE %(like)s OR cs.description ILIKE %(like)s
+               OR REPLACE(cs.series_name, ' ', '') ILIKE %(normalized_like)s
+               OR ct.type_name ILIKE %(like)s OR ct.code ILIKE %(like)s
+        """)
+    if dictionary.has_em_parameters:
+        conditions = ["ep.series_name ILIKE %(like)s"]
+        if plan.numeric_value is not None:
+            params["number"] = plan.numeric_value
+            # Диапазоны вместо ABS(...) < 0.01 проверяются по индексам миграции 011
+            params["number_low"] = plan.numeric_value - 0.01
+            params["number_high"] = plan.numeric_value + 0.01
+            if integer_value(plan.numeric_value) is not None:
+                conditions.append("ep.contact_quantity = %(number)s::INTEGER")
+            conditions.append("ep.contact_diameter > %(number_low)s::NUMERIC AND ep.contact_diameter < %(number_high)s::NUMERIC")
+            conditions.append("ep.max_current > %(number_low)s::NUMERIC AND ep.max_current < %(number_high)s::NUMERIC")
+        stages.append(f"""
+            SELECT cs.series_id, cs.series_name, 4 AS rank
+            FROM connector_series cs
+            JOIN electromechanical_parameters ep ON cs.series_name = ep.series_name
+            WHERE {" OR ".join(conditions)}
+        """)
+    if not stages:
+        return None, None
+
+    sql = f"""
+        SELECT series_id AS product_id, series_name AS product_name
+        FROM ({" UNION ALL ".join(stages)}) matches
+        GROUP BY series_id, series_name
+        ORDER BY MIN(rank), series_name
+        LIMIT %(limit)s
+    """
+    return sql, params
+
+
+async def _search_in_database(dictionary, plan, limit, timings):
+    """Поиск по индексу catalog_search или объединенным запросом по таблицам каталога"""
+    async with get_async_db_cursor() as cursor:
+        started = time.perf_counter()
+        features = await catalog_search.features(cursor)
+        timings.append(("features", time.perf_counter() - started))
+
+        started = time.perf_counter()
+        if features["available"]:
+            results = await catalog_search.search(cursor, search_text(plan), limit)
+            timings.append(("index", time.perf_counter() - started))
+        else:
+            sql, params = build_catalog_query(dictionary, plan, limit)
+            results = []
+            if sql is not None:
+                await cursor.execute(sql, params)
+                results = cursor.fetchall()
+                for result in results:
+                    result["product_image_path"] = f"/api/Images/GetProductImage/{result['product_id']}"
+            timings.append(("catalog", time.perf_counter() - started))
+        return results, cursor.round_trips
+
+
+async def execute_plan(dictionary, plan, limit):
+    """
+    Выполняет этапы плана поиска.
+
+    Args:
+        dictionary (DictionarySnapshot): Снимок справочников
+        plan (SearchPlan): План поиска
+        limit (int): Максимальное количество результатов
+
+    Returns:
+        tuple: (результаты, [(этап, длительность в секундах)], количество обращений к базе)
+    """
+    timings = []
+    if "code" in plan.stages:
+        started = time.perf_counter()
+        results = _search_by_code(dictionary, plan, limit)
+        timings.append(("code", time.perf_counter() - started))
+        return results, timings, 0
+    if "size" in plan.stages:
+        started = time.perf_counter()
+        results = _search_by_size(dictionary, plan, limit)
+        timings.append(("size", time.perf_counter() - started))
+        return results, timings, 0
+    results, round_trips = await _search_in_database(dictionary, plan, limit, timings)
+    return results, timings, round_trips
+
+
+def server_timing(plan, timings):
+    """
+    Формирует заголовок Server-Timing с классом запроса и длительностью этапов.
+
+    Args:
+        plan (SearchPlan): План поиска
+        timings (list): Этапы и их длительность в секундах
+
+    Returns:
+        str: Значение заголовка
+    """
+    entries = [f'plan;desc="{plan.kind}"']
+    entries.extend(f"{name};dur={duration * 1000:.3f}" for name, duration in timings)
+    return ", ".join(entries)
@@ -0,0 +1,462 @@
+"""
+Статические разделы расширенной карточки продукта.
+Технические характеристики, таблицы наработки и перегрева, условия эксплуатации,
+схемы расположения контактов, габаритные размеры и информация для заказа
+загружаются из базы данных один раз и хранятся для каждого типа соединителя
+в виде готовых JSON-фрагментов, которые вставляются в тело ответа без
+повторного построения и валидации.
+"""
+import asyncio
+import json
+import logging
+from decimal import Decimal
+from types import MappingProxyType
+from typing import List, Optional
+
+from psycopg2 import errors
+from pydantic import parse_obj_as
+
+from api.database import get_async_db_cursor
+from api.models.product import (
+    TechnicalSpecification, LifetimeByTemperature, OverheatByLoad,
+    MechanicalFactor, ClimaticFactor, ContactRow, DimensionTable, ConnectorOrderInfo
+)
+from api.services.catalog_version import catalog_version
+
+logger = logging.getLogger(__name__)
+
+# Разделы карточки и модели для их однократной проверки при загрузке
+STATIC_SECTIONS = {
+    "technical_specs": List[TechnicalSpecification],
+    "lifetime_table": List[LifetimeByTemperature],
+    "overheat_table": List[OverheatByLoad],
+    "mechanical_factors": List[MechanicalFactor],
+    "climatic_factors": List[ClimaticFactor],
+    "contact_layout": List[ContactRow],
+    "dimension_tables": List[DimensionTable],
+    "order_info": Optional[ConnectorOrderInfo],
+}
+
+# Таблицы габаритных размеров: заголовок таблицы и столбцы (заголовок, столбец БД)
+_DIMENSION_TABLES = (
+    ("device_part_dimensions", "Приборная часть без патрубка", (
+        ("D*", "size_value"), ("L max", "length_l"), ("D гайки", "thread_d"),
+        ("D1", "thread_d1"), ("A", "length_a"), ("B", "width_b"),
+    )),
+    ("cable_part_dimensions", "Кабельная часть без патрубка", (
+        ("D гайки", "thread_d"), ("D1", "diameter_d1"), ("L max", "length_l"),
+    )),
+    ("straight_shielded_nozzle_dimensions", "Патрубок прямой с экранированной гайкой (ПЭ)", (
+        ("D гайки", "thread_d"), ("d1", "diameter_d1"), ("L max", "length_l"),
+    )),
+    ("straight_unshielded_nozzle_dimensions", "Патрубок прямой с неэкранированной гайкой (ПН)", (
+        ("D гайки", "thread_d"), ("d1", "diameter_d1"), ("L max", "length_l"),
+    )),
+    ("angled_shielded_nozzle_dimensions", "Патрубок угловой с экранированной гайкой (УЭ)", (
+        ("D гайки", "thread_d"), ("d1", "diameter_d1"), ("L max", "length_l"),
+    )),
+    ("angled_unshielded_nozzle_dimensions", "Патрубок угловой с неэкранированной гайкой (УН)", (
+        ("D гайки", "thread_d"), ("d1", "diameter_d1"), ("L max", "length_l"),
+    )),
+)
+
+
+# Значения разделов для базы, в которой нет таблиц, создаваемых скриптами
+# database/Zapchasti (таблицы размеров, connector_sizes) или миграцией 017
+# (условия эксплуатации); совпадают с прежними постоянными ответами API
+_DEFAULT_MECHANICAL_FACTORS = (
+    {"factor_name": "Синусоидальная вибрация", "parameter_name": "диапазон частот",
+     "parameter_value": "1 – 5 000 Гц"},
+    {"factor_name": "Синусоидальная вибрация", "parameter_name": "амплитуда ускорения",
+     "parameter_value": "490 м/с² (50 g)"},
+    {"factor_name": "Механический удар одиночного действия", "parameter_name": "пиковое ударное ускорение",
+     "parameter_value": "5 000 м/с² (500 g)"},
+    {"factor_name": "Механический удар многократного действия", "parameter_name": "пиковое ударное ускорение",
+     "parameter_value": "1 000 м/с² (100 g)"},
+)
+_DEFAULT_CLIMATIC_FACTORS = (
+    {"name": "Повышенная рабочая температура среды", "value": "100 °C"},
+    {"name": "Пониженная предельная температура среды", "value": "минус 60 °C"},
+    {"name": "Атмосферное пониженное рабочее давление", "value": "1,33х10⁻⁴ Па (1х10⁻⁶ мм рт. ст.)"},
+    {"name": "Повышенная относительная влажность воздуха при температуре +40 °C (без конденсации влаги)",
+     "value": "98 %"},
+)
+_DEFAULT_DIMENSION_TABLES = (
+    {
+        "title": "Приборная часть без патрубка",
+        "headers": ["D*", "L max", "D гайки", "D1", "A", "B"],
+        "rows": [
+            {"D*": "14", "L max": "25", "D гайки": "M14x1", "D1": "M16x1", "A": "17±0.1", "B": "24"},
+            {"D*": "18", "L max": "25", "D гайки": "M18x1", "D1": "M20x1", "A": "20±0.1", "B": "27"},
+            {"D*": "22", "L max": "27", "D гайки": "M22x1", "D1": "M24x1", "A": "23±0.1", "B": "30"},
+        ],
+    },
+    {
+        "title": "Кабельная часть без патрубка",
+        "headers": ["D гайки", "D1", "L max"],
+        "rows": [
+            {"D гайки": "M14x1", "D1": "22", "L max": "25"},
+            {"D гайки": "M18x1", "D1": "25", "L max": "25"},
+            {"D гайки": "M22x1", "D1": "29", "L max": "27"},
+        ],
+    },
+    {
+        "title": "Патрубок прямой с экранированной гайкой (ПЭ)",
+        "headers": ["D гайки", "d1", "L max"],
+        "rows": [
+            {"D гайки": "M14x1", "d1": "6,5", "L max": "28,7"},
+            {"D гайки": "M18x1", "d1": "10,5", "L max": "28,7"},
+            {"D гайки": "M22x1", "d1": "14", "L max": "28,7"},
+        ],
+    },
+)
+_DEFAULT_SIZE_CODES = ({"size_code": "14"}, {"size_code": "18"}, {"size_code": "22"})
+
+# Признак обязательного раздела: отсутствие его таблицы является ошибкой
+_REQUIRED = object()
+
+
+def format_number(value):
+    """
+    Форматирует число так, как оно записано в документации: без лишних нулей
+    и с запятой в качестве десятичного разделителя (25.0 -> "25", 28.7 -> "28,7").
+    """
+    if value is None:
+        return ""
+    if not isinstance(value, (int, float, Decimal)):
+        return str(value)
+    text = format(Decimal(str(value)).normalize(), "f")
+    return text.replace(".", ",")
+
+
+def _dump(value):
+    """Сериализует значение раздела в JSON-фрагмент"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+class StaticSnapshot:
+    """
+    Неизменяемый набор JSON-фрагментов статических разделов для одного типа соединителя.
+    """
+    __slots__ = ("fragments", "body")
+
+    def __init__(self, fragments):
+        self.fragments = MappingProxyType(dict(fragments))
+        # Готовая часть тела ответа: "раздел":значение,... без внешних скобок
+        self.body = ",".join(
+            f"{_dump(name)}:{fragment}" for name, fragment in self.fragments.items()
+        ).encode("utf-8")
+
+    def splice(self, body):
+        """
+        Вставляет статические разделы в сериализованный JSON-объект.
+
+        Args:
+            body (bytes): Тело ответа без статических разделов
+
+        Returns:
+            bytes: Тело ответа со статическими разделами
+        """
+        return body[:-1] + b"," + self.body + b"}"
+
+
+class StaticSectionStore:
+    """
+    Хранилище статических разделов. Загружается при первом обращении и
+    перезагружается после изменений каталога.
+    """
+
+    def __init__(self):
+        # Версия каталога, при которой загружены разделы, разделы по типам и разделы по умолчанию
+        self._loaded = None
+        self._stale_since = 0
+        self._lock = asyncio.Lock()
+
+    def on_catalog_change(self, changes, version, full=False):
+        """
+        Помечает разделы устаревшими: размеры, примеры обозначений и справочники
+        зависят от серий, соединителей и справочных таблиц, а изменения каталога редки
+        """
+        self._stale_since = version
+
+    def _is_fresh(self, loaded):
+        return loaded is not None and loaded[0] >= self._stale_since
+
+    async def get(self, type_id):
+        """
+        Возвращает статические разделы для типа соединителя.
+
+        Args:
+            type_id (int): Идентификатор типа соединителя
+
+        Returns:
+            StaticSnapshot: Разделы для вставки в ответ
+        """
+        loaded = self._loaded
+        if not self._is_fresh(loaded):
+            async with self._lock:
+                if not self._is_fresh(self._loaded):
+                    self._loaded = await self._load()
+                loaded = self._loaded
+        _, snapshots, default = loaded
+        return snapshots.get(type_id, default)
+
+    async def _load(self):
+        """Загружает разделы из базы данных и строит фрагменты по типам соединителей"""
+        # Версию каталога запоминаем до чтения данных: изменения во время загрузки
+        # пометят загруженные разделы устаревшими
+        version = catalog_version.version
+        async with get_async_db_cursor() as cursor:
+            await cursor.execute("SELECT type_id, code, type_name FROM connector_types ORDER BY type_id")
+            types = cursor.fetchall()
+
+            shared = {
+                "technical_specs": await self._load_technical_specs(cursor),
+                "lifetime_table": await self._fetch(
+                    cursor, "lifetime_table",
+                    """
+                    SELECT lifetime_hours, max_temperature
+                    FROM connector_lifetime_by_temperature
+                    ORDER BY lifetime_hours
+                    """
+                ),
+                "overheat_table": await self._fetch(
+                    cursor, "overheat_table",
+                    """
+                    SELECT load_percent, overheat_temperature
+                    FROM contact_overheat_by_load
+                    ORDER BY load_percent DESC
+                    """
+                ),
+                "mechanical_factors": await self._load_mechanical_factors(cursor),
+                "climatic_factors": await self._fetch(
+                    cursor, "climatic_factors",
+                    "SELECT factor_name AS name, parameter_value AS value FROM climate_factors ORDER BY factor_id",
+                    fallback=_DEFAULT_CLIMATIC_FACTORS
+                ),
+                "dimension_tables": await self._load_dimension_tables(cursor),
+            }
+            layout = await self._fetch(
+                cursor, "contact_layout",
+                """
+                SELECT
+                    ep.size_code,
+                    ep.series_name AS connector_type,
+                    ep.contact_diameter,
+                    ep.contact_quantity AS contacts_quantity,
+                    ep.contact_combination_code::TEXT AS combination_code,
+                    ep.max_current AS max_current_summary,
+                    cmc.max_current AS max_current_contact,
+                    ep.max_working_voltage
+                FROM electromechanical_parameters ep
+                -- Ток на одиночный контакт определяется диаметром контакта
+                LEFT JOIN (
+                    SELECT cd.diameter, MIN(c.max_current) AS max_current
+                    FROM contact_diameters cd
+                    JOIN contact_max_current c ON c.diameter_id = cd.diameter_id
+                    GROUP BY cd.diameter
+                ) cmc ON cmc.diameter = ep.contact_diameter
+                ORDER BY ep.size_code, ep.series_name, ep.contact_diameter
+                """
+            )
+            order_base = await self._load_order_dictionaries(cursor)
+
+            snapshots = {}
+            for connector_type in types:
+                sections = dict(shared)
+                sections["contact_layout"] = [
+                    row for row in layout if row["connector_type"] == connector_type["code"]
+                ]
+                sections["order_info"] = await self._load_order_info(cursor, connector_type, order_base)
+                snapshots[connector_type["type_id"]] = self._build_snapshot(sections)
+
+        default = self._build_snapshot(dict(shared, contact_layout=layout, order_info=None))
+        logger.info("Загружены статические разделы карточек для типов: %s, версия %s", len(snapshots), version)
+        return version, snapshots, default
+
+    def _build_snapshot(self, sections):
+        """Проверяет разделы моделями ответа и сериализует их в JSON-фрагменты"""
+        fragments = {}
+        for name, model in STATIC_SECTIONS.items():
+            value = parse_obj_as(model, sections[name])
+            if isinstance(value, list):
+                value = [item.dict() for item in value]
+            elif value is not None:
+                value = value.dict()
+            fragments[name] = _dump(value)
+        return StaticSnapshot(fragments)
+
+    async def _fetch(self, cursor, section, query, params=None, fallback=_REQUIRED):
+        """
+        Выполняет запрос раздела.
+
+        Args:
+            fallback (Sequence): Строки раздела, если таблицы нет в базе; без
+                значения отсутствие таблицы, как и любая другая ошибка, передается вызывающему
+        """
+        try:
+            await cursor.execute(query, params)
+        except errors.UndefinedTable as e:
+            if fallback is _REQUIRED:
+                raise
+            logger.warning("Раздел %s загружен из значений по умолчанию: %s", section, e)
+            return [dict(row) for row in fallback]
+        return [dict(row) for row in cursor.fetchall()]
+
+    async def _load_technical_specs(self, cursor):
+        """Характеристики контактов по диаметрам и общие характеристики соединителей"""
+        contacts = await self._fetch(
+            cursor, "technical_specs",
+            """
+            SELECT cd.diameter, cr.max_resistance, cmc.max_current
+            FROM contact_diameters cd
+            LEFT JOIN contact_resistance cr ON cd.diameter_id = cr.diameter_id
+            LEFT JOIN contact_max_current cmc ON cd.diameter_id = cmc.diameter_id
+            ORDER BY cd.diameter
+            """
+        )
+        specs = []
+        resistance = {
+            f"диаметр контакта, {format_number(c['diameter'])} мм": f"не более {format_number(c['max_resistance'])} мОм"
+            for c in contacts if c["max_resistance"] is not None
+        }
+        if resistance:
+            specs.append({"param_name": "Сопротивление контактов", "param_value": resistance})
+        current = {
+            f"диаметр контакта, {format_number(c['diameter'])} мм": f"{format_number(c['max_current'])} А"
+            for c in contacts if c["max_current"] is not None
+        }
+        if current:
+            specs.append({"param_name": "Максимальный ток на одиночный контакт", "param_value": current})
+
+        specs.extend(await self._fetch(
+            cursor, "technical_specs",
+            """
+            SELECT spec_name AS param_name, spec_value AS param_value
+            FROM connector_technical_specs
+            ORDER BY spec_id
+            """
+        ))
+        return specs
+
+    async def _load_mechanical_factors(self, cursor):
+        """Механические факторы, сгруппированные по наименованию"""
+        rows = await self._fetch(
+            cursor, "mechanical_factors",
+            "SELECT factor_name, parameter_name, parameter_value FROM mechanical_factors ORDER BY factor_id",
+            fallback=_DEFAULT_MECHANICAL_FACTORS
+        )
+        factors = {}
+        for row in rows:
+            factors.setdefault(row["factor_name"], {})[row["parameter_name"]] = row["parameter_value"]
+        return [{"name": name, "parameters": parameters} for name, parameters in factors.items()]
+
+    async def _load_dimension_tables(self, cursor):
+        """Таблицы габаритных и установочных размеров"""
+        tables = []
+        for table_name, title, columns in _DIMENSION_TABLES:
+            try:
+                rows = await self._fetch(
+                    cursor, "dimension_tables",
+                    f"SELECT * FROM {table_name} ORDER BY dimension_id"
+                )
+            except errors.UndefinedTable as e:
+                # Таблицы размеров создаются скриптами database/Zapchasti
+                logger.warning("Раздел dimension_tables загружен из значений по умолчанию: %s", e)
+                return [dict(table) for table in _DEFAULT_DIMENSION_TABLES]
+            if not rows:
+                continue
+            tables.append({
+                "title": title,
+                "headers": [header for header, _ in columns],
+                "rows": [
+                    {header: format_number(row.get(column)) for header, column in columns}
+                    for row in rows
+                ],
+            })
+        return tables
+
+    async def _load_order_dictionaries(self, cursor):
+        """Справочники обозначений, общие для всех типов соединителей"""
+        async def mapping(section, query):
+            return {row["code"]: row["value"] for row in await self._fetch(cursor, section, query)}
+
+        return {
+            "body_types": await mapping("body_types", "SELECT code, name AS value FROM body_types ORDER BY body_type_id"),
+            "nozzle_types": await mapping("nozzle_types", "SELECT code, name AS value FROM nozzle_types ORDER BY nozzle_type_id"),
+            "nut_types": await mapping("nut_types", "SELECT code, description AS value FROM nut_types ORDER BY nut_type_id"),
+            "connector_parts": await mapping("connector_parts", "SELECT code, name AS value FROM connector_parts ORDER BY part_id"),
+            "contact_combinations": await mapping(
+                "contact_combinations",
+                "SELECT code, description AS value FROM contact_combinations ORDER BY code"
+            ),
+            "contact_coatings": await mapping(
+                "contact_coatings",
+                "SELECT code, material AS value FROM contact_coatings ORDER BY coating_id"
+            ),
+            "heat_resistance": await mapping(
+                "heat_resistance",
+                "SELECT code, temperature || '° C' AS value FROM heat_resistance ORDER BY resistance_id"
+            ),
+            "special_designs": await mapping(
+                "special_designs",
+                "SELECT code, name AS value FROM special_designs ORDER BY special_design_id"
+            ),
+            "climate_designs": ", ".join(
+                row["description"] for row in await self._fetch(
+                    cursor, "climate_designs",
+                    "SELECT description FROM climate_designs ORDER BY climate_id"
+                )
+            ),
+        }
+
+    async def _load_order_info(self, cursor, connector_type, order_base):
+        """Информация для заказа соединителей одного типа"""
+        sizes = await self._fetch(
+            cursor, "order_info",
+            """
+            SELECT DISTINCT csz.size_code
+            FROM connector_series cs
+            JOIN series_sizes ss ON ss.series_id = cs.series_id
+            JOIN connector_sizes csz ON csz.size_id = ss.size_id
+            WHERE cs.type_id = %s
+            ORDER BY csz.size_code
+            """,
+            (connector_type["type_id"],),
+            fallback=_DEFAULT_SIZE_CODES
+        )
+        quantities = await self._fetch(
+            cursor, "order_info",
+            """
+            SELECT DISTINCT contact_quantity
+            FROM electromechanical_parameters
+            WHERE series_name = %s
+            ORDER BY contact_quantity
+            """,
+            (connector_type["code"],)
+        )
+        examples = await self._fetch(
+            cursor, "order_info",
+            """
+            SELECT DISTINCT ON (c.part_id) cp.name AS part_name, c.full_code, c.gost
+            FROM connectors c
+            JOIN connector_parts cp ON cp.part_id = c.part_id
+            WHERE c.type_id = %s
+            ORDER BY c.part_id, c.connector_id
+            """,
+            (connector_type["type_id"],)
+        )
+        return dict(
+            order_base,
+            connector_type=connector_type["type_name"],
+            size_codes=[str(row["size_code"]) for row in sizes],
+            contacts_quantity=[str(row["contact_quantity"]) for row in quantities],
+            example_connector=[
+                f"{row['part_name'].capitalize()} {row['full_code']}  {row['gost']}" for row in examples
+            ],
+        )
+
+
+# Общее хранилище статических разделов
+static_sections = StaticSectionStore()
+catalog_version.subscribe(static_sections.on_catalog_change)
@@ -0,0 +1,365 @@
+"""
+Автодополнение обозначений соединителей.
+Наименования серий и полные коды соединителей хранятся в памяти процесса
+в отсортированных массивах нормализованных ключей (верхний регистр, без
+пробелов); подсказки по префиксу находятся двоичным поиском без обращений
+к базе. Популярность — количество просмотров карточек серий с момента
+запуска API; соединители наследуют популярность своего типа.
+Изменения каталога применяются к индексу построчно в фоне.
+"""
+import asyncio
+import bisect
+import collections
+import logging
+import os
+import time
+
+from api.database import get_async_db_cursor
+from api.services.catalog_version import catalog_version
+
+logger = logging.getLogger(__name__)
+
+SERIES = "series"
+CONNECTOR = "connector"
+
+# Пауза перед повторной попыткой построить или обновить индекс после ошибки, с
+SUGGEST_RETRY_INTERVAL = float(os.getenv("SUGGEST_RETRY_INTERVAL", "5"))
+
+
+def normalize_code(text):
+    """
+    Нормализует обозначение для поиска по префиксу: без пробелов, в верхнем регистре.
+
+    Args:
+        text (str): Обозначение или введенный текст
+
+    Returns:
+        str: Нормализованный ключ
+    """
+    return "".join(text.split()).upper()
+
+
+class _SortedEntries:
+    """Отсортированный по ключу массив записей (key, id, text)"""
+
+    def __init__(self, entries=()):
+        self.entries = sorted(entries)
+
+    def add(self, entry):
+        bisect.insort(self.entries, entry)
+
+    def remove(self, entry):
+        index = bisect.bisect_left(self.entries, entry)
+        if index < len(self.entries) and self.entries[index] == entry:
+            del self.entries[index]
+
+    def prefix(self, prefix, limit=None):
+        """Записи, ключ которых начинается с prefix, в порядке ключей"""
+        index = bisect.bisect_left(self.entries, (prefix,))
+        result = []
+        while index < len(self.entries) and self.entries[index][0].startswith(prefix):
+            result.append(self.entries[index])
+            if limit is not None and len(result) >= limit:
+                break
+            index += 1
+        return result
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SuggestIndex:
+    """
+    Префиксный индекс серий и соединителей.
+    Соединители разбиты по типам: внутри типа популярность одинакова, поэтому
+    для выбора k лучших достаточно k первых по ключу записей каждого типа.
+    """
+
+    def __init__(self):
+        self._series = _SortedEntries()
+        # series_id -> (запись, type_id)
+        self._series_by_id = {}
+        # type_id -> записи соединителей
+        self._connectors = collections.defaultdict(_SortedEntries)
+        # connector_id -> (запись, type_id)
+        self._connectors_by_id = {}
+        self._series_views = collections.Counter()
+        self._type_views = collections.Counter()
+        self._pending_series = set()
+        self._pending_connectors = set()
+        self._pending_full = False
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._task = None
+        # До этого момента (time.monotonic) после ошибки база не опрашивается
+        self._retry_at = 0.0
+        self.rebuilds = 0
+        self.updates = 0
+        self.failures = 0
+
+    # Популярность
+
+    def record_view(self, series_id):
+        """
+        Учитывает просмотр карточки серии.
+
+        Args:
+            series_id (int): Идентификатор серии (продукта)
+        """
+        item = self._series_by_id.get(series_id)
+        if item is None and self._loaded:
+            # Счетчики ведутся только для серий каталога
+            return
+        self._series_views[series_id] += 1
+        if item is not None:
+            self._type_views[item[1]] += 1
+
+    # Поиск
+
+    def suggest(self, text, limit=10):
+        """
+        Возвращает подсказки по введенному тексту.
+
+        Args:
+            text (str): Введенный текст
+            limit (int): Максимальное количество подсказок
+
+        Returns:
+            list: Подсказки в порядке убывания популярности
+        """
+        prefix = normalize_code(text)
+        if not prefix:
+            return []
+
+        candidates = []
+        for key, series_id, name in self._series.prefix(prefix):
+            candidates.append((-self._series_views[series_id], 0, key, SERIES, series_id, name))
+        for type_id, entries in self._connectors.items():
+            popularity = self._type_views[type_id]
+            for key, connector_id, full_code in entries.prefix(prefix, limit):
+                candidates.append((-popularity, 1, key, CONNECTOR, connector_id, full_code))
+
+        candidates.sort()
+        return [
+            {
+                "value": text_value,
+                "kind": kind,
+                "product_id": item_id if kind == SERIES else None,
+                "connector_id": item_id if kind == CONNECTOR else None,
+                "popularity": -score,
+            }
+            for score, _, _, kind, item_id, text_value in candidates[:limit]
+        ]
+
+    def find_connector(self, code):
+        """
+        Находит соединитель каталога по обозначению.
+
+        Args:
+            code (str): Обозначение соединителя
+
+        Returns:
+            int: Идентификатор соединителя или None
+        """
+        key = normalize_code(code)
+        for entries in self._connectors.values():
+            for entry in entries.prefix(key, 1):
+                if entry[0] == key:
+                    return entry[1]
+        return None
+
+    # Построение и обновление
+
+    def _put_series(self, row):
+        self._drop_series(row["series_id"])
+        entry = (normalize_code(row["series_name"]), row["series_id"], row["series_name"])
+        self._series.add(entry)
+        self._series_by_id[row["series_id"]] = (entry, row["type_id"])
+
+    def _drop_series(self, series_id):
+        item = self._series_by_id.pop(series_id, None)
+        if item is not None:
+            self._series.remove(item[0])
+
+    def _put_connector(self, row):
+        self._drop_connector(row["connector_id"])
+        entry = (normalize_code(row["full_code"]), row["connector_id"], row["full_code"])
+        self._connectors[row["type_id"]].add(entry)
+        self._connectors_by_id[row["connector_id"]] = (entry, row["type_id"])
+
+    def _drop_connector(self, connector_id):
+        item = self._connectors_by_id.pop(connector_id, None)
+        if item is not None:
+            self._connectors[item[1]].remove(item[0])
+
+    async def _fetch(self, cursor, series_ids=None, connector_ids=None):
+        """Читает серии и соединители: все или только указанные"""
+        if series_ids is None:
+            await cursor.execute("SELECT series_id, series_name, type_id FROM connector_series")
+        elif series_ids:
+            await cursor.execute(
+                "SELECT series_id, series_name, type_id FROM connector_series WHERE series_id = ANY(%s)",
+                (list(series_ids),)
+            )
+        series = cursor.fetchall() if series_ids is None or series_ids else []
+
+        if connector_ids is None:
+            await cursor.execute("SELECT connector_id, full_code, type_id FROM connectors")
+        elif connector_ids:
+            await cursor.execute(
+                "SELECT connector_id, full_code, type_id FROM connectors WHERE connector_id = ANY(%s)",
+                (list(connector_ids),)
+            )
+        connectors = cursor.fetchall() if connector_ids is None or connector_ids else []
+        return series, connectors
+
+    async def load(self):
+        """Строит индекс заново"""
+        async with self._lock:
+            await self._rebuild()
+
+    async def _rebuild(self):
+        self._pending_full = False
+        self._pending_series.clear()
+        self._pending_connectors.clear()
+        async with get_async_db_cursor() as cursor:
+            series, connectors = await self._fetch(cursor)
+
+        self._series = _SortedEntries()
+        self._series_by_id = {}
+        self._connectors = collections.defaultdict(_SortedEntries)
+        self._connectors_by_id = {}
+        for row in series:
+            self._put_series(row)
+        for row in connectors:
+            self._put_connector(row)
+        # Просмотры удаленных серий не хранятся, популярность типов
+        # пересчитывается по просмотрам серий
+        self._series_views = collections.Counter({
+            series_id: views for series_id, views in self._series_views.items()
+            if series_id in self._series_by_id
+        })
+        self._type_views = collections.Counter()
+        for series_id, views in self._series_views.items():
+            self._type_views[self._series_by_id[series_id][1]] += views
+        self._loaded = True
+        self.rebuilds += 1
+        logger.info("Индекс автодополнения построен: серий %s, соединителей %s",
+                    len(self._series_by_id), len(self._connectors_by_id))
+
+    async def _apply_pending(self):
+        """Применяет накопленные изменения каталога"""
+        if self._pending_full or not self._loaded:
+            await self._rebuild()
+            return
+        series_ids = set(self._pending_series)
+        connector_ids = set(self._pending_connectors)
+        self._pending_series.clear()
+        self._pending_connectors.clear()
+        if not series_ids and not connector_ids:
+            return
+
+        async with get_async_db_cursor() as cursor:
+            series, connectors = await self._fetch(cursor, series_ids, connector_ids)
+
+        # Удаленные строки отсутствуют в результате
+        for series_id in series_ids:
+            self._drop_series(series_id)
+        for row in series:
+            self._put_series(row)
+        for connector_id in connector_ids:
+            self._drop_connector(connector_id)
+        for row in connectors:
+            self._put_connector(row)
+        self.updates += 1
+
+    def _has_pending(self):
+        return self._pending_full or bool(self._pending_series) or bool(self._pending_connectors)
+
+    async def _update(self):
+        """Строит индекс или применяет накопленные изменения; после ошибки делает паузу"""
+        async with self._lock:
+            if time.monotonic() < self._retry_at:
+                return
+            try:
+                await self._apply_pending()
+            except Exception:
+                self.failures += 1
+                self._retry_at = time.monotonic() + SUGGEST_RETRY_INTERVAL
+                raise
+            self._retry_at = 0.0
+
+    async def refresh(self):
+        """
+        Готовит индекс к запросу подсказок.
+        Обращается к базе только если индекс еще не построен, и после ошибки
+        построения — не чаще раза в SUGGEST_RETRY_INTERVAL секунд. Накопленные
+        изменения каталога применяются в фоне: запрос обслуживается текущим
+        индексом и не ждет базу.
+
+        Returns:
+            bool: Индекс построен
+        """
+        if self._loaded:
+            if self._has_pending():
+                self._schedule()
+            return True
+        if time.monotonic() >= self._retry_at:
+            await self._update()
+        return self._loaded
+
+    def on_catalog_change(self, changes, version, full=False):
+        """
+        Запоминает измененные серии и соединители и запускает обновление индекса в фоне,
+        чтобы запросы подсказок не обращались к базе.
+        """
+        for change in changes:
+            if change.table_name == "connector_series" and change.row_id is not None:
+                self._pending_series.add(change.row_id)
+            elif change.table_name == "connectors" and change.row_id is not None:
+                self._pending_connectors.add(change.row_id)
+        if full:
+            self._pending_full = True
+        if self._has_pending():
+            self._schedule()
+
+    def _schedule(self):
+        """Запускает фоновое обновление, если оно не выполняется и не отложено после ошибки"""
+        if self._task is not None and not self._task.done():
+            return
+        if time.monotonic() < self._retry_at:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Изменения будут применены при следующем запросе подсказок
+            return
+        self._task = loop.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self._update()
+        except Exception:
+            logger.exception("Ошибка обновления индекса автодополнения")
+
+    def get_stats(self):
+        """
+        Возвращает состояние индекса.
+
+        Returns:
+            dict: Количество записей, построений и обновлений
+        """
+        return {
+            "loaded": self._loaded,
+            "series": len(self._series_by_id),
+            "connectors": len(self._connectors_by_id),
+            "rebuilds": self.rebuilds,
+            "incremental_updates": self.updates,
+            "failures": self.failures,
+            "tracked_views": sum(self._series_views.values()),
+        }
+
+
+# Общий индекс автодополнения
+suggest_index = SuggestIndex()
+catalog_version.subscribe(suggest_index.on_catalog_change)
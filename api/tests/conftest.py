@@ -0,0 +1,29 @@
+"""
+Общие фикстуры тестов API.
+Тесты, которым нужна база данных, используют фикстуру client и пропускаются,
+если база API (DB_NAME, DB_HOST, ...) недоступна.
+"""
+import psycopg2
+import pytest
+
+from database.connection.db_config import API_CONNECTION_STRING
+
+
+def _database_available():
+    try:
+        psycopg2.connect(API_CONNECTION_STRING, connect_timeout=2).close()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Клиент приложения с открытыми при запуске ресурсами (пул, кэши каталога)"""
+    if not _database_available():
+        pytest.skip("База данных API недоступна")
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,138 @@
+"""
+Тесты манифеста файлов: сканирование каталогов с повторным использованием
+хэшей неизмененных файлов, замена манифеста только при изменениях, порядок
+выбора изображения и чертежа продукта и выдача файлов по манифесту.
+"""
+import asyncio
+import os
+
+import pytest
+
+from api.services import assets
+from api.services.assets import AssetManifest, AssetSnapshot, asset_manifest, scan_directory
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def _snapshot(tmp_path, png=(), pdf=()):
+    for name in png:
+        _write(tmp_path / "png" / name, name.encode())
+    for name in pdf:
+        _write(tmp_path / "pdf" / name, name.encode())
+    return AssetSnapshot({
+        "png": scan_directory(tmp_path / "png"),
+        "pdf": scan_directory(tmp_path / "pdf"),
+        "word": {},
+    })
+
+
+def test_scan_reuses_hashes_of_unchanged_files(tmp_path, monkeypatch):
+    assert scan_directory(tmp_path / "missing") == {}
+    _write(tmp_path / "a.png", b"a")
+    _write(tmp_path / "b.pdf", b"b")
+    (tmp_path / "nested").mkdir()
+    first = scan_directory(tmp_path)
+    assert set(first) == {"a.png", "b.pdf"}
+    assert first["a.png"].media_type == "image/png" and first["b.pdf"].media_type == "application/pdf"
+
+    hashed = []
+    original = assets._content_hash
+
+    def content_hash(path):
+        hashed.append(os.path.basename(path))
+        return original(path)
+    monkeypatch.setattr(assets, "_content_hash", content_hash)
+    assert scan_directory(tmp_path, first) == first and hashed == []
+
+    _write(tmp_path / "a.png", b"changed")
+    second = scan_directory(tmp_path, first)
+    assert hashed == ["a.png"]
+    assert second["a.png"].content_hash != first["a.png"].content_hash
+    assert second["a.png"].size == 7
+
+
+def test_manifest_is_replaced_only_after_changes(tmp_path):
+    _write(tmp_path / "png" / "1.png", b"1")
+
+    async def scenario():
+        manifest = AssetManifest({"png": tmp_path / "png", "pdf": tmp_path / "pdf"}, poll_interval=60)
+        assert await manifest.refresh()
+        first = manifest.snapshot
+        assert not await manifest.refresh() and manifest.snapshot is first
+        _write(tmp_path / "pdf" / "drawing_3.pdf", b"pdf")
+        assert await manifest.refresh()
+        assert manifest.snapshot.get("pdf", "drawing_3.pdf") is not None
+        (tmp_path / "png" / "1.png").unlink()
+        assert await manifest.refresh() and manifest.snapshot.get("png", "1.png") is None
+        stats = manifest.get_stats()
+        assert stats["builds"] == 3 and stats["files"] == {"png": 0, "pdf": 1}
+    asyncio.run(scenario())
+
+
+def test_product_image_selection_order(tmp_path):
+    snapshot = _snapshot(tmp_path, png=["1.png", "2.png", "4.png", "product_7.png", "zz.png"])
+
+    def image(product_id, view=None):
+        asset = snapshot.product_image(product_id, view)
+        return os.path.basename(asset.path) if asset else None
+
+    assert image(7, "2") == "2.png" and image(7, "side") == "2.png"
+    # Отсутствующий вид: изображение продукта
+    assert image(7, "3") == "product_7.png" and image(7, "table") == "product_7.png"
+    assert image(5) == "1.png"
+    # Остаток от деления на 5 выбирает нумерованное изображение: 8 -> 4.png, 9 -> 5.png (нет)
+    assert image(8) == "4.png"
+    assert image(9) == "1.png"
+    assert AssetSnapshot({"png": {}}).product_image(1) is None
+
+
+def test_technical_drawing_selection_order(tmp_path):
+    snapshot = _snapshot(tmp_path, png=["drawing_2.png", "3.png", "4.png"], pdf=["b.pdf", "drawing_1.pdf", "a.pdf"])
+
+    def drawing(product_id):
+        asset = snapshot.technical_drawing(product_id)
+        return os.path.basename(asset.path) if asset else None
+
+    assert drawing(1) == "drawing_1.pdf"
+    assert drawing(2) == "drawing_2.png"
+    assert drawing(3) == "4.png"
+    # Без изображений: первый по имени PDF
+    pdf_only = AssetSnapshot({"png": {}, "pdf": snapshot.directories["pdf"]})
+    assert os.path.basename(pdf_only.technical_drawing(3).path) == "a.pdf"
+    only_numbered = _snapshot(tmp_path / "numbered", png=["3.png"])
+    assert os.path.basename(only_numbered.technical_drawing(3).path) == "3.png"
+    assert AssetSnapshot({"png": {}, "pdf": {}}).technical_drawing(1) is None
+
+
+@pytest.fixture
+def manifest(client, tmp_path, monkeypatch):
+    """Манифест приложения из временных каталогов"""
+    for name in ("1.png", "product_7.png"):
+        _write(tmp_path / "png" / name, name.encode())
+    _write(tmp_path / "pdf" / "drawing_7.pdf", b"%PDF drawing")
+    paths = {"png": tmp_path / "png", "pdf": tmp_path / "pdf", "word": tmp_path / "word"}
+    # Фоновая проверка каталогов не заменит манифест: каталоги те же
+    monkeypatch.setattr(asset_manifest, "paths", paths)
+    monkeypatch.setattr(asset_manifest, "_snapshot",
+                        AssetSnapshot({name: scan_directory(path) for name, path in paths.items()}))
+    return asset_manifest
+
+
+def test_files_are_served_from_manifest(client, manifest):
+    image = client.get("/api/Images/GetProductImage/7")
+    assert image.status_code == 200 and image.content == b"product_7.png"
+    assert image.headers["content-type"] == "image/png"
+    drawing = client.get("/api/Images/GetTechnicalDrawing/7")
+    assert drawing.content == b"%PDF drawing"
+    assert client.get("/api/Images/GetProductImage/6").content == b"1.png"
+
+
+def test_missing_file_is_404(client, manifest, monkeypatch):
+    monkeypatch.setattr(asset_manifest, "_snapshot", AssetSnapshot({"png": {}, "pdf": {}, "word": {}}))
+    response = client.get("/api/Images/GetProductImage/7")
+    assert response.status_code == 404
+    assert client.get("/api/Images/GetTechnicalDrawing/7").status_code == 404
@@ -0,0 +1,105 @@
+"""
+Тесты пакетного сопоставления спецификаций: разбор строк, разрешение
+порциями с параметрами-массивами и поток NDJSON /api/Products/ResolveBom.
+"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from api.services import bom
+from api.services.bom import iter_bom_entries, resolve_bom, spool_request_body
+
+CATALOG = [
+    {"connector_id": 1, "full_code": "2РМТ18Б7Ш1В1В"},
+    {"connector_id": 2, "full_code": "2РМТ14Б4Г1В1В"},
+]
+
+
+class FakeCursor:
+    """Курсор, выбирающий соединители CATALOG по массивам обозначений и идентификаторов"""
+
+    def __init__(self, queries):
+        self.queries = queries
+        self.rows = []
+
+    async def execute(self, query, params):
+        self.queries.append(params)
+        self.rows = [row for row in CATALOG
+                     if row["full_code"] in params["codes"] or row["connector_id"] in params["ids"]]
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    queries = []
+
+    @asynccontextmanager
+    async def cursor():
+        yield FakeCursor(queries)
+
+    monkeypatch.setattr(bom, "get_async_db_cursor", cursor)
+    return queries
+
+
+def _resolve(lines, chunk_size):
+    async def collect():
+        return b"".join([data async for data in resolve_bom(iter_bom_entries(lines), chunk_size)])
+    return [json.loads(line) for line in asyncio.run(collect()).decode("utf-8").splitlines()]
+
+
+def test_entries():
+    lines = ["2рмт 18 б7ш1в1в\n".encode("utf-8"), b"  \n", b"42\r\n", "²".encode("utf-8"), b"\xff\xfe\n"]
+    entries = list(iter_bom_entries(lines))
+    assert [(number, code, item_id) for number, _, code, item_id in entries] == [
+        (1, "2РМТ18Б7Ш1В1В", None),
+        (3, None, 42),
+        (4, "²", None),
+        (5, "��", None),
+    ]
+    assert entries[0][1] == "2рмт 18 б7ш1в1в"
+
+
+def test_resolve_in_chunks(queries):
+    lines = [line.encode("utf-8") for line in ("2РМТ18Б7Ш1В1В", "2", "99", "", "2рмт18б7ш1в1в", "1")]
+    records = _resolve(lines, chunk_size=2)
+    summary = records.pop()["summary"]
+    assert summary == {"total": 5, "found": 4, "not_found": 1, "queries": 3}
+    assert len(queries) == 3
+    assert queries[0] == {"codes": ["2РМТ18Б7Ш1В1В"], "ids": [2]}
+    assert [(record["line"], record["found"], record.get("connector_id")) for record in records] == [
+        (1, True, 1), (2, True, 2), (3, False, None), (5, True, 1), (6, True, 1),
+    ]
+    assert records[2]["error"] == "Соединитель с идентификатором 99 не найден"
+
+
+def test_empty_specification(queries):
+    assert _resolve([], chunk_size=10) == [{"summary": {"total": 0, "found": 0, "not_found": 0, "queries": 0}}]
+    assert queries == []
+
+
+def test_spool_moves_large_body_to_disk(monkeypatch):
+    monkeypatch.setattr(bom, "BOM_SPOOL_SIZE", 10)
+
+    async def stream():
+        for part in ("2РМТ\n", "12345\n", "67890\n"):
+            yield part.encode("utf-8")
+
+    spool = asyncio.run(spool_request_body(stream()))
+    assert spool._rolled
+    assert list(spool) == ["2РМТ\n".encode("utf-8"), b"12345\n", b"67890\n"]
+    spool.close()
+
+
+def test_resolve_bom_endpoint(client):
+    body = "\n".join(["2рмт 18 б7ш1в1в", "", "2РМТ16Б7Ш1В1В", "99999999999"]).encode("utf-8")
+    response = client.post("/api/Products/ResolveBom", content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record.get("found") for record in records[:-1]] == [True, False, False]
+    assert records[0]["full_code"] == "2РМТ18Б7Ш1В1В"
+    assert records[-1]["summary"] == {"total": 3, "found": 1, "not_found": 2, "queries": 1}
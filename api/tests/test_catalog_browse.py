@@ -0,0 +1,121 @@
+"""
+Тесты фасетного просмотра каталога: разбор значений фильтров, условие
+отбора строк и счетчики фасетов. Счетчики ответа /api/Products/Browse
+сравниваются с подсчетом по полному списку соединителей.
+"""
+import itertools
+
+import pytest
+
+from api.services.catalog_browse import InvalidFacetValueError, build_browse_query, resolve_filters
+from api.services.dictionaries import DictionarySnapshot
+
+# Поле соединителя в ответе и поле значения фасета, с которым оно совпадает
+ITEM_FIELDS = {
+    "type": ("connector_type", "value"),
+    "size": ("body_size", "value"),
+    "body_type": ("body_type", "name"),
+    "part": ("connector_part", "name"),
+    "coating": ("contact_coating", "name"),
+    "contacts": ("contacts_quantity", "value"),
+}
+
+
+@pytest.fixture
+def dictionary():
+    return DictionarySnapshot({
+        "connector_types": [
+            {"type_id": 1, "code": "2РМТ", "type_name": "2РМТ"},
+            {"type_id": 2, "code": "2РМДТ", "type_name": "2РМДТ"},
+        ],
+        "body_sizes": [{"size_id": 7, "size_value": "14"}, {"size_id": 8, "size_value": "18"}],
+        "contact_quantities": [{"quantity_id": 1, "quantity": 4}, {"quantity_id": 2, "quantity": 7}],
+    }, [], version=1)
+
+
+def test_resolve_filters(dictionary):
+    selected = resolve_filters(dictionary, {
+        "type": ["2РМДТ", " 2РМТ ", "2РМДТ"], "size": ["18"], "contacts": ["7"], "part": [],
+    })
+    assert selected == {"type": [2, 1], "size": [8], "contacts": [2]}
+
+
+def test_unknown_filter_value(dictionary):
+    with pytest.raises(InvalidFacetValueError) as error:
+        resolve_filters(dictionary, {"size": ["16"]})
+    assert "Доступные значения: 14, 18" in str(error.value)
+
+
+def test_rows_violating_at_most_one_filter_are_selected():
+    query, params = build_browse_query({}, 20, 0)
+    assert "WHERE TRUE" in query and params == {"limit": 20, "offset": 0}
+    query, _ = build_browse_query({"type": [1]}, 20, 0)
+    assert "WHERE TRUE" in query
+    query, params = build_browse_query({"type": [1], "size": [8], "contacts": [2]}, 20, 40)
+    assert query.count("c.type_id = ANY(%(type)s) AND c.size_id = ANY(%(size)s)") == 1
+    assert query.count(") OR (") == 2
+    assert params["offset"] == 40 and params["size"] == [8]
+
+
+def _browse(client, **params):
+    response = client.get("/api/Products/Browse", params={"page_size": 100, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _matches(item, facet_name, entries):
+    field, key = ITEM_FIELDS[facet_name]
+    return str(item[field]) in {entry[key] for entry in entries}
+
+
+def _expected_counts(everything, filters):
+    """Счетчики фасетов по полному списку: все фильтры, кроме фильтра самого фасета"""
+    chosen = {
+        name: [entry for entry in everything["facets"][name] if entry["value"] in values]
+        for name, values in filters.items()
+    }
+    counts = {}
+    for name, entries in everything["facets"].items():
+        others = [item for item in everything["items"]
+                  if all(_matches(item, other, chosen[other]) for other in chosen if other != name)]
+        counts[name] = {entry["value"]: sum(_matches(item, name, [entry]) for item in others)
+                        for entry in entries}
+    total = sum(all(_matches(item, name, chosen[name]) for name in chosen) for item in everything["items"])
+    return counts, total
+
+
+def test_facet_counts_match_full_list(client):
+    everything = _browse(client)
+    assert everything["total_count"] == len(everything["items"]) <= 100
+    facets = everything["facets"]
+    # Фильтры из первых двух значений фасетов, по одному и попарно
+    candidates = [
+        (name, [entry["value"] for entry in facets[name][:2]])
+        for name in ("type", "size", "part", "contacts") if facets[name]
+    ]
+    combinations = [dict([pair]) for pair in candidates] + [
+        dict(pairs) for pairs in itertools.combinations(candidates, 2)
+    ] + [dict(candidates)]
+    for filters in combinations:
+        page = _browse(client, **filters)
+        counts, total = _expected_counts(everything, filters)
+        assert page["total_count"] == len(page["items"]) == total, filters
+        for name, entries in page["facets"].items():
+            assert {entry["value"]: entry["count"] for entry in entries} == counts[name], (filters, name)
+            assert {entry["value"] for entry in entries if entry["selected"]} == set(filters.get(name, ())), name
+
+
+def test_pages_follow_full_list(client):
+    everything = _browse(client)
+    codes = []
+    for page in range(1, 100):
+        items = client.get("/api/Products/Browse", params={"page": page, "page_size": 7}).json()["items"]
+        if not items:
+            break
+        codes += [item["full_code"] for item in items]
+    assert codes == [item["full_code"] for item in everything["items"]]
+
+
+def test_unknown_value_is_rejected(client):
+    response = client.get("/api/Products/Browse", params={"size": "16"})
+    assert response.status_code == 400
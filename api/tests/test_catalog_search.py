@@ -0,0 +1,49 @@
+"""
+Тесты запроса к поисковому индексу catalog_search: слова запроса ищутся по
+началу, спецсимволы LIKE экранируются, триграммный поиск добавляется только
+при установленном pg_trgm. Ранжирование проверяется через /api/Products/Search.
+"""
+from api.services.catalog_search import CatalogSearch, escape_like, prefix_tsquery
+
+
+def test_escape_like():
+    assert escape_like("10%_a\\b") == "10\\%\\_a\\\\b"
+
+
+def test_prefix_tsquery():
+    assert prefix_tsquery("2РМТ 18") == "'2рмт':* & '18':*"
+    # Десятичная запятая приводится к точке, знаки препинания и кавычки отбрасываются
+    assert prefix_tsquery("ток 1,5 А!") == "'ток':* & '1.5':* & 'а':*"
+    assert prefix_tsquery("o'brien") == "'o':* & 'brien':*"
+    assert prefix_tsquery(" -- ") is None
+
+
+def test_query_without_trigram():
+    sql, params = CatalogSearch().build_query("2рмт 18", 10, trigram=False)
+    assert params == {
+        "query": "2рмт 18", "normalized": "2РМТ18", "limit": 10, "prefix": "'2рмт':* & '18':*",
+    }
+    assert "s.normalized_name = %(normalized)s" in sql
+    assert "to_tsquery('simple', %(prefix)s)" in sql
+    assert "ILIKE" not in sql and "similarity" not in sql
+
+
+def test_query_with_trigram_and_without_words():
+    sql, params = CatalogSearch().build_query("%%", 5, trigram=True)
+    assert "prefix" not in params and "to_tsquery" not in sql
+    assert params["like"] == "%\\%\\%%"
+    assert "s.search_text ILIKE %(like)s" in sql and "similarity(s.search_text, %(query)s)" in sql
+
+
+def test_exact_series_name_ranks_first(client):
+    response = client.get("/api/Products/Search", params={"query": "2рмт"})
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["product_name"] == "2РМТ"
+    assert [result["score"] for result in results] == sorted((result["score"] for result in results), reverse=True)
+
+
+def test_search_by_word_prefix(client):
+    response = client.get("/api/Products/Search", params={"query": "2РМД"})
+    assert response.status_code == 200
+    assert "2РМДТ" in [result["product_name"] for result in response.json()]
@@ -0,0 +1,105 @@
+"""
+Тесты графа совместимости: поиск соединителя по обозначению и
+идентификатору, обход в ширину с указанием шага и промежуточного
+соединителя, перестроение после изменения каталога.
+"""
+import asyncio
+
+import pytest
+
+from api.services.catalog_version import CatalogChange, catalog_version
+from api.services.compatibility import CompatibilityGraph, CompatibilitySnapshot
+
+CONNECTORS = [
+    {"connector_id": 1, "full_code": "2РМТ18Б7Ш1В1В"},
+    {"connector_id": 2, "full_code": "2РМТ18К7Г1В1В"},
+    {"connector_id": 3, "full_code": "2РМТ18Б7Г1В1В"},
+    {"connector_id": 4, "full_code": "2РМДТ18Б7Ш1В1В"},
+    {"connector_id": 5, "full_code": "2РМТ14Б4Ш1В1В"},
+]
+
+
+def _edges(*pairs):
+    """Симметричные связи совместимости"""
+    edges = []
+    for source, mate in pairs:
+        edges.append({"connector_id": source, "compatible_connector_id": mate, "description": f"{source}-{mate}"})
+        edges.append({"connector_id": mate, "compatible_connector_id": source, "description": f"{mate}-{source}"})
+    return edges
+
+
+@pytest.fixture
+def graph():
+    # 1 - 2, 1 - 3, 3 - 4; соединитель 5 без ответных частей
+    return CompatibilitySnapshot(CONNECTORS, _edges((1, 2), (1, 3), (3, 4)), version=1)
+
+
+def test_resolve(graph):
+    assert graph.resolve("2рмт 18 б7ш1в1в") == 1
+    assert graph.resolve("2PMT18K7Г1B1B") == 2
+    assert graph.resolve(" 4 ") == 4
+    assert graph.resolve("99") is None
+    assert graph.resolve("²") is None and graph.resolve("2РМТ") is None
+
+
+def test_direct_mates_are_sorted_by_code(graph):
+    mates = graph.mates(1)
+    assert [(mate["connector_id"], mate["depth"], mate["via_connector_id"]) for mate in mates] == [
+        (3, 1, None), (2, 1, None),
+    ]
+    assert mates[0]["description"] == "1-3" and mates[0]["full_code"] == "2РМТ18Б7Г1В1В"
+    assert graph.mates(5) == []
+    assert graph.edge_count == 6
+
+
+def test_transitive_mates(graph):
+    mates = graph.mates(2, depth=5)
+    # Исходный соединитель не возвращается, каждый соединитель — один раз, на ближайшем шаге
+    assert [(mate["connector_id"], mate["depth"], mate["via_connector_id"]) for mate in mates] == [
+        (1, 1, None), (3, 2, 1), (4, 3, 3),
+    ]
+    assert mates[2]["description"] == "3-4"
+    assert [mate["connector_id"] for mate in graph.mates(2, depth=2)] == [1, 3]
+
+
+def test_lookup(graph):
+    results = graph.lookup(["5", "нет такого", "2РМТ18Б7Ш1В1В"], depth=1)
+    assert [(result["input"], result["found"], result["connector_id"]) for result in results] == [
+        ("5", True, 5), ("нет такого", False, None), ("2РМТ18Б7Ш1В1В", True, 1),
+    ]
+    assert results[1]["error"] == "Соединитель нет такого не найден"
+    assert [mate["connector_id"] for mate in results[2]["mates"]] == [3, 2]
+
+
+class CountingGraph(CompatibilityGraph):
+    async def _load(self):
+        self.loads += 1
+        return CompatibilitySnapshot(CONNECTORS, [], catalog_version.version)
+
+
+def test_rebuild_after_catalog_change(monkeypatch):
+    monkeypatch.setattr(catalog_version, "version", 1)
+
+    async def scenario():
+        graph = CountingGraph()
+        first = await graph.get()
+        graph.on_catalog_change([CatalogChange(1, "connector_series", 5, 1)], version=2)
+        assert await graph.get() is first
+        catalog_version.version = 3
+        graph.on_catalog_change([CatalogChange(2, "compatible_connectors", 7, None)], version=3)
+        assert (await graph.get()).version == 3 and graph.loads == 2
+        snapshots = await asyncio.gather(*(graph.get() for _ in range(5)))
+        assert len(set(map(id, snapshots))) == 1 and graph.loads == 2
+    asyncio.run(scenario())
+
+
+def test_mates_endpoint(client):
+    response = client.post("/api/Products/Mates", json={"items": ["1", "²"], "depth": 2})
+    assert response.status_code == 200
+    found, missing = response.json()
+    assert found["found"] and 61 in [mate["connector_id"] for mate in found["mates"] if mate["depth"] == 1]
+    assert all(mate["connector_id"] != 1 for mate in found["mates"])
+    assert not missing["found"]
+    reverse = client.post("/api/Products/Mates", json={"items": ["61"]}).json()[0]
+    assert 1 in [mate["connector_id"] for mate in reverse["mates"]]
+    assert client.post("/api/Products/Mates", json={"items": ["1"], "depth": 6}).status_code == 422
@@ -0,0 +1,96 @@
+"""
+Тесты условных запросов к файлам: сравнение If-None-Match и
+If-Modified-Since, заголовки кэширования для адресов с версией содержимого
+и ответ 304 на повторную проверку документа без обращения к базе данных.
+"""
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from api.routers import documents
+from api.services.assets import AssetSnapshot, asset_manifest, cache_headers, is_not_modified, scan_directory
+
+ETAG = '"abc"'
+MTIME = 1_700_000_000.5
+
+
+def _request(method="GET", **headers):
+    return SimpleNamespace(method=method, headers={name.replace("_", "-"): value for name, value in headers.items()})
+
+
+def test_if_none_match():
+    assert is_not_modified(_request(if_none_match='"abc"'), ETAG, MTIME)
+    assert is_not_modified(_request(if_none_match='"x", W/"abc"'), ETAG, MTIME)
+    assert is_not_modified(_request(if_none_match="*"), ETAG, MTIME)
+    assert not is_not_modified(_request(if_none_match='"abcd"'), ETAG, MTIME)
+    assert not is_not_modified(_request(), ETAG, MTIME)
+    assert not is_not_modified(_request("POST", if_none_match='"abc"'), ETAG, MTIME)
+
+
+def test_if_modified_since():
+    # Last-Modified передается без долей секунды
+    assert is_not_modified(_request(if_modified_since=formatdate(int(MTIME), usegmt=True)), ETAG, MTIME)
+    assert not is_not_modified(_request(if_modified_since=formatdate(MTIME - 1, usegmt=True)), ETAG, MTIME)
+    assert not is_not_modified(_request(if_modified_since="вчера"), ETAG, MTIME)
+    # If-None-Match имеет приоритет над If-Modified-Since
+    assert not is_not_modified(
+        _request(if_none_match='"old"', if_modified_since=formatdate(MTIME + 60, usegmt=True)), ETAG, MTIME
+    )
+
+
+@pytest.fixture
+def manifest(client, tmp_path, monkeypatch):
+    """Манифест приложения из временных каталогов"""
+    (tmp_path / "png").mkdir()
+    (tmp_path / "pdf").mkdir()
+    (tmp_path / "png" / "product_7.png").write_bytes(b"image")
+    (tmp_path / "pdf" / "doc_1.pdf").write_bytes(b"%PDF document")
+    paths = {"png": tmp_path / "png", "pdf": tmp_path / "pdf", "word": tmp_path / "word"}
+    # Фоновая проверка каталогов не заменит манифест: каталоги те же
+    monkeypatch.setattr(asset_manifest, "paths", paths)
+    monkeypatch.setattr(asset_manifest, "_snapshot",
+                        AssetSnapshot({name: scan_directory(path) for name, path in paths.items()}))
+    return asset_manifest.snapshot
+
+
+def test_cache_headers_and_versioned_urls(client, manifest):
+    asset = manifest.get("png", "product_7.png")
+    headers = cache_headers(asset, SimpleNamespace(query_params={}))
+    assert headers["ETag"] == f'"{asset.content_hash}"'
+    assert "immutable" not in headers["Cache-Control"]
+    versioned = cache_headers(asset, SimpleNamespace(query_params={"v": asset.content_hash}))
+    assert versioned["Cache-Control"].endswith("immutable")
+
+    urls = client.get("/api/Images/GetProductImages/7").json()
+    assert urls[0] == f"/api/Images/GetProductImage/7?v={asset.content_hash}"
+    response = client.get(urls[0])
+    assert response.status_code == 200 and response.headers["cache-control"].endswith("immutable")
+
+
+def test_image_revalidation(client, manifest):
+    response = client.get("/api/Images/GetProductImage/7")
+    assert response.status_code == 200 and response.content == b"image"
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    not_modified = client.get("/api/Images/GetProductImage/7", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert client.get("/api/Images/GetProductImage/7",
+                      headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/api/Images/GetProductImage/7",
+                      headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_document_revalidation_skips_database(client, manifest, monkeypatch):
+    response = client.get("/api/Documents/GetDocumentById/1")
+    assert response.status_code == 200 and response.content == b"%PDF document"
+    etag = response.headers["etag"]
+
+    def unavailable():
+        raise AssertionError("обращение к базе данных")
+    monkeypatch.setattr(documents, "get_async_db_cursor", unavailable)
+    not_modified = client.get("/api/Documents/GetDocumentById/1", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.headers["etag"] == etag
+    # Без валидатора файл отдается только после проверки документа в базе
+    assert client.get("/api/Documents/GetDocumentById/1").status_code == 500
@@ -0,0 +1,45 @@
+"""
+Тесты пулов соединений API: импорт API не меняет общий пул пакета database,
+синхронный пул API подключается к базе API. Тесты не обращаются к базе данных.
+"""
+from database.connection import db_connector
+from database.connection.connection_pool import connection_pool
+from database.connection.db_config import API_CONNECTION_STRING
+from api.database import api_connection_pool, get_db_cursor
+
+
+def test_shared_pool_keeps_database_package_factory():
+    assert connection_pool.connection_factory is db_connector.get_connection
+    assert api_connection_pool is not connection_pool
+
+
+def test_api_pool_connects_to_api_database():
+    factory = api_connection_pool.connection_factory
+    assert factory.func is db_connector.get_connection
+    assert factory.args == (API_CONNECTION_STRING,)
+
+
+def test_api_cursor_uses_api_pool(monkeypatch):
+    calls = []
+
+    class Cursor:
+        def close(self):
+            calls.append("close")
+
+    class Connection:
+        closed = 0
+
+        def cursor(self, cursor_factory=None):
+            return Cursor()
+
+    conn = Connection()
+    monkeypatch.setattr(api_connection_pool, "get_connection", lambda: calls.append("get") or conn)
+    monkeypatch.setattr(api_connection_pool, "release_connection",
+                        lambda released: calls.append(("release", released)))
+    with get_db_cursor():
+        pass
+    assert calls == ["get", "close", ("release", conn)]
+
+
+def test_unpooled_connection_keeps_old_name():
+    assert db_connector.get_db_connection is db_connector.get_unpooled_connection
@@ -0,0 +1,167 @@
+"""
+Тесты проверки токовой нагрузки контактов: раскладка допустимых токов по
+контактам, нагрузка и перегрев по кривой, проверка теплостойкости,
+ошибки по отдельным соединителям и перечитывание справочных данных.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from api.services.catalog_version import CatalogChange, catalog_version
+from api.services.derating import OVERHEAT, OVERLOAD, DeratingEngine, DeratingSnapshot
+
+# Кривая перегрева из базовых данных contact_overheat_by_load
+OVERHEAT_ROWS = [
+    {"load_percent": load, "overheat_temperature": temperature}
+    for load, temperature in (
+        (25, 20), (50, 25), (75, 30), (85, 40), (100, 50), (110, 65),
+        (120, 80), (150, 120), (180, 130), (220, 150),
+    )
+]
+
+POSITIONS = [
+    {"combination_id": 1, "diameter": 1.0, "max_current": 8},
+    {"combination_id": 2, "diameter": 1.0, "max_current": 8},
+    {"combination_id": 2, "diameter": 2.0, "max_current": 18},
+    {"combination_id": 3, "diameter": 1.5, "max_current": None},
+]
+
+PARAMETERS = [
+    {"series_name": "2РМТ", "size_code": "22", "contact_combination_code": "4",
+     "contact_diameter": 1.0, "contact_quantity": 2},
+    {"series_name": "2РМТ", "size_code": "22", "contact_combination_code": "4",
+     "contact_diameter": 2.0, "contact_quantity": 1},
+]
+
+
+def _connector(connector_id, full_code, combination_id, quantity, size="14", combination_code="1",
+               heat_resistance=100):
+    return {
+        "connector_id": connector_id, "full_code": full_code, "combination_id": combination_id,
+        "type_name": "2РМТ", "size_value": size, "contact_quantity": quantity,
+        "combination_code": combination_code, "heat_resistance": heat_resistance,
+    }
+
+
+CONNECTORS = [
+    _connector(1, "2РМТ14Б3Ш1В1В", 1, 3),
+    # Сочетание двух диаметров: два контакта 1,0 и один 2,0
+    _connector(2, "2РМТ22Б3Ш4В1В", 2, 3, size="22", combination_code="4"),
+    # Количество контактов каждого диаметра не задано
+    _connector(3, "2РМТ18Б3Ш4В1В", 2, 3, size="18", combination_code="4"),
+    _connector(4, "2РМТ14Б3Ш5В1В", 3, 3),
+    _connector(5, "2РМТ14Б3Ш1В1Т", 1, 3, heat_resistance=None),
+]
+
+
+@pytest.fixture
+def snapshot():
+    return DeratingSnapshot(CONNECTORS, POSITIONS, PARAMETERS, OVERHEAT_ROWS, version=1)
+
+
+def test_load_and_overheat(snapshot):
+    report = snapshot.evaluate([("1", [4, 8, 10])])
+    result = report["items"][0]
+    assert result["full_code"] == "2РМТ14Б3Ш1В1В" and not result["ok"]
+    # Нагрузка 125%: перегрев 80 + (120 - 80) * (125 - 120) / (150 - 120) = 86,7
+    assert result["max_load_percent"] == 125.0
+    assert result["max_overheat_temperature"] == 86.7
+    assert result["max_contact_temperature"] is None
+    assert result["violations"] == [{
+        "contact": 3, "current": 10.0, "max_current": 8.0, "load_percent": 125.0,
+        "overheat_temperature": 86.7, "contact_temperature": None, "reasons": [OVERLOAD],
+    }]
+    assert report["summary"] == {"connectors": 1, "failed_connectors": 1, "contacts": 3, "violations": 1}
+
+
+def test_overheat_is_checked_against_heat_resistance(snapshot):
+    # Нагрузка 100% дает перегрев 50 °C, 75% — 30 °C
+    cool = snapshot.evaluate([("1", [8, 6])], ambient_temperature=40)["items"][0]
+    assert cool["ok"] and cool["max_contact_temperature"] == 90.0
+
+    hot, unlimited = snapshot.evaluate([("1", [8, 6]), ("5", [8, 6])], ambient_temperature=60)["items"]
+    assert not hot["ok"] and hot["max_contact_temperature"] == 110.0
+    assert [(v["contact"], v["contact_temperature"], v["reasons"]) for v in hot["violations"]] == [
+        (1, 110.0, [OVERHEAT]),
+    ]
+    # Без теплостойкости перегрев не проверяется
+    assert unlimited["ok"] and unlimited["heat_resistance"] is None
+
+
+def test_mixed_diameters_follow_combination_positions(snapshot):
+    result = snapshot.evaluate([("2", [9, 1, 17])])["items"][0]
+    assert result["max_load_percent"] == 112.5
+    assert [(v["contact"], v["max_current"]) for v in result["violations"]] == [(1, 8.0)]
+
+
+def test_errors_are_reported_per_connector(snapshot):
+    report = snapshot.evaluate([
+        ("1", [1, 1, 1, 1]), ("нет такого", [1]), ("²", [1]), ("3", [1]), ("4", [1]), ("1", [1]),
+    ])
+    errors = [result["error"] for result in report["items"]]
+    assert errors == [
+        "Задано токов: 4, контактов у соединителя: 3",
+        "Соединитель нет такого не найден",
+        "Соединитель ² не найден",
+        "Количество контактов каждого диаметра не задано",
+        "Допустимый ток контакта не задан",
+        None,
+    ]
+    assert report["items"][-1]["ok"] and report["items"][-1]["max_load_percent"] == 12.5
+    assert report["summary"] == {"connectors": 6, "failed_connectors": 5, "contacts": 1, "violations": 0}
+
+
+def test_batch_matches_per_connector_evaluation(snapshot):
+    rng = np.random.default_rng(21)
+    items = [
+        (str(rng.choice([1, 2, 5])), rng.uniform(0, 20, rng.integers(1, 4)).round(2).tolist())
+        for _ in range(200)
+    ]
+    batch = snapshot.evaluate(items, ambient_temperature=30)
+    single = [snapshot.evaluate([item], ambient_temperature=30)["items"][0] for item in items]
+    assert batch["items"] == single
+    assert batch["summary"]["violations"] == sum(len(result["violations"]) for result in single)
+
+
+class CountingEngine(DeratingEngine):
+    async def _load(self):
+        self.loads += 1
+        return DeratingSnapshot(CONNECTORS, POSITIONS, PARAMETERS, OVERHEAT_ROWS, catalog_version.version)
+
+
+def test_reload_after_catalog_change(monkeypatch):
+    monkeypatch.setattr(catalog_version, "version", 1)
+
+    async def scenario():
+        engine = CountingEngine()
+        first = await engine.get()
+        engine.on_catalog_change([CatalogChange(1, "connector_series", 5, 1)], version=2)
+        assert await engine.get() is first
+        catalog_version.version = 3
+        engine.on_catalog_change([CatalogChange(2, "contact_overheat_by_load", 4, None)], version=3)
+        assert not engine.get_stats()["fresh"]
+        report = await engine.evaluate([("1", [1, 2])])
+        assert report["summary"]["contacts"] == 2
+        stats = engine.get_stats()
+        assert stats["fresh"] and stats["version"] == 3 and stats["loads"] == 2
+        assert stats["contacts_evaluated"] == 2
+    asyncio.run(scenario())
+
+
+def test_derating_endpoint(client):
+    # Соединитель 1 базовых данных: два контакта диаметром 1,0 (8 А), теплостойкость 100 °C
+    response = client.post("/api/Products/Derating", json={
+        "items": [{"connector": "1", "currents": [4, 10]}, {"connector": "²", "currents": [1]}],
+        "ambient_temperature": 20,
+    })
+    assert response.status_code == 200
+    report = response.json()
+    result = report["items"][0]
+    assert result["max_load_percent"] == 125.0 and result["max_contact_temperature"] == 106.7
+    assert [(v["contact"], v["reasons"]) for v in result["violations"]] == [(2, [OVERLOAD, OVERHEAT])]
+    assert not report["items"][1]["found"]
+    assert report["summary"]["failed_connectors"] == 2
+    assert client.post("/api/Products/Derating", json={
+        "items": [{"connector": "1", "currents": []}]
+    }).status_code == 422
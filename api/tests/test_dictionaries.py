@@ -0,0 +1,126 @@
+"""
+Тесты кэша справочников: поиск по снимку, неизменяемость снимка,
+перезагрузка после изменения справочников в журнале каталога и по сроку
+жизни без журнала. Тесты снимка и кэша не обращаются к базе данных.
+"""
+import asyncio
+
+import pytest
+
+from api.services.catalog_version import CatalogChange, catalog_version
+from api.services.dictionaries import DictionaryCache, DictionarySnapshot
+
+TABLES = {
+    "connector_types": [
+        {"type_id": 1, "code": "2РМТ", "type_name": "2РМТ"},
+        {"type_id": 2, "code": "2РМДТ", "type_name": "Двойной 2РМДТ"},
+    ],
+    "connector_sizes": [{"size_id": 2, "size_code": 18}, {"size_id": 1, "size_code": 14}],
+    "connector_series": [
+        {"series_id": 5, "series_name": "2РМТ 18", "type_id": 1},
+        {"series_id": 6, "series_name": "2РМДТ", "type_id": 2},
+    ],
+}
+
+
+@pytest.fixture
+def snapshot():
+    return DictionarySnapshot(TABLES, ["2РМТ18", "2РМДТ22"], version=3)
+
+
+def test_find_type_by_id_code_and_name(snapshot):
+    assert snapshot.find_type(1)["code"] == "2РМТ"
+    assert snapshot.find_type("2РМДТ")["type_id"] == 2
+    assert snapshot.find_type("Двойной 2РМДТ")["type_id"] == 2
+    assert snapshot.find_type(3) is None and snapshot.find_type("2рмт") is None
+
+
+def test_sizes(snapshot):
+    assert snapshot.find_size(18)["size_id"] == 2
+    assert snapshot.find_size(16) is None
+    assert snapshot.size_codes() == [14, 18]
+
+
+def test_matches(snapshot):
+    assert [row["type_id"] for row in snapshot.match_types("рмдт")] == [2]
+    assert [row["series_id"] for row in snapshot.match_series("2рмт", "2РМТ")] == [5]
+    assert [row["series_id"] for row in snapshot.match_series("x", "2РМТ18")] == [5]
+    assert snapshot.match_em_series("22") == ["2РМДТ22"]
+
+
+def test_snapshot_is_read_only(snapshot):
+    with pytest.raises(TypeError):
+        snapshot.tables["connector_types"] = ()
+    with pytest.raises(TypeError):
+        snapshot.table("connector_types")[0]["code"] = "X"
+    assert snapshot.table("missing_table") == ()
+    assert snapshot.lookup("connector_series", "series_name")["2РМДТ"]["series_id"] == 6
+
+
+def test_em_parameters_table_may_be_missing():
+    snapshot = DictionarySnapshot(TABLES, None, version=1)
+    assert not snapshot.has_em_parameters and snapshot.em_series_names == ()
+
+
+class CountingCache(DictionaryCache):
+    """Кэш, загружающий снимок из памяти с учетом загрузок"""
+
+    async def _load(self):
+        self.loads += 1
+        await asyncio.sleep(0)
+        return DictionarySnapshot(TABLES, [], catalog_version.version)
+
+
+def test_reload_after_dictionary_change(monkeypatch):
+    monkeypatch.setattr(catalog_version, "available", True)
+    monkeypatch.setattr(catalog_version, "version", 1)
+
+    async def scenario():
+        cache = CountingCache()
+        first = await cache.get()
+        assert await cache.get() is first and cache.loads == 1
+
+        # Таблица connectors в снимок не входит
+        cache.on_catalog_change([CatalogChange(1, "connectors", 7, 1)], version=2)
+        assert await cache.get() is first
+
+        catalog_version.version = 3
+        cache.on_catalog_change([CatalogChange(2, "body_sizes", 1, None)], version=3)
+        second = await cache.get()
+        assert second is not first and second.version == 3 and cache.loads == 2
+
+        catalog_version.version = 4
+        cache.on_catalog_change([], version=4, full=True)
+        assert (await cache.get()).version == 4
+    asyncio.run(scenario())
+
+
+def test_concurrent_requests_load_once(monkeypatch):
+    monkeypatch.setattr(catalog_version, "available", True)
+
+    async def scenario():
+        cache = CountingCache()
+        snapshots = await asyncio.gather(*(cache.get() for _ in range(10)))
+        assert len(set(map(id, snapshots))) == 1 and cache.loads == 1
+    asyncio.run(scenario())
+
+
+def test_ttl_without_change_journal(monkeypatch):
+    monkeypatch.setattr(catalog_version, "available", False)
+
+    async def scenario():
+        cache = CountingCache(ttl=60)
+        first = await cache.get()
+        assert await cache.get() is first
+        cache.ttl = 0
+        assert await cache.get() is not first and cache.loads == 2
+    asyncio.run(scenario())
+
+
+def test_filters_are_validated_against_dictionaries(client):
+    response = client.get("/api/Products/GetCatalogItems", params={"type_filter": "НЕТ"})
+    assert response.status_code == 400
+    response = client.get("/api/Products/GetCatalogItems", params={"size_filter": "16"})
+    assert response.status_code == 400 and "14, 18, 22" in response.json()["detail"]
+    response = client.get("/api/Products/GetCatalogItems", params={"type_filter": "2РМТ", "size_filter": "18"})
+    assert response.status_code == 200
@@ -0,0 +1,44 @@
+"""
+Тесты пакетного получения карточек /api/Products/GetByIds: порядок и повторы
+идентификаторов, отсутствующие продукты, ограничение размера пакета и
+совпадение карточек с GetById.
+"""
+from api.routers.products import MAX_BATCH_IDS
+
+
+def _get_by_ids(client, ids):
+    return client.get("/api/Products/GetByIds", params=[("ids", product_id) for product_id in ids])
+
+
+def test_items_follow_request_order(client):
+    response = _get_by_ids(client, [6, 999999, 5, 6])
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["product_id"] for item in items] == [6, 999999, 5, 6]
+    assert items[1] == {"product_id": 999999, "product": None, "error": "Продукт не найден"}
+    assert items[0] == items[3]
+    assert all(item["error"] is None for item in items if item["product_id"] != 999999)
+
+
+def test_products_match_get_by_id(client):
+    items = _get_by_ids(client, [5, 6]).json()
+    for item in items:
+        single = client.get("/api/Products/GetById", params={"product_id": item["product_id"]})
+        assert item["product"] == single.json()
+
+
+def test_missing_products_in_one_round_trip(client):
+    # Отсутствующих продуктов нет в кэше: все они запрашиваются одним запросом
+    # (и, возможно, одной подготовкой выражения)
+    response = _get_by_ids(client, range(900001, 900051))
+    assert response.status_code == 200
+    assert 1 <= int(response.headers["X-DB-Round-Trips"]) <= 2
+    assert all(item["product"] is None for item in response.json())
+
+
+def test_batch_size_limit(client):
+    assert _get_by_ids(client, range(1, MAX_BATCH_IDS + 1)).status_code == 200
+    response = _get_by_ids(client, range(1, MAX_BATCH_IDS + 2))
+    assert response.status_code == 400
+    assert str(MAX_BATCH_IDS) in response.json()["detail"]
+    assert client.get("/api/Products/GetByIds").status_code == 422
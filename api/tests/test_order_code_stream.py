@@ -0,0 +1,40 @@
+"""
+Тесты потоковой выдачи обозначений для заказа: количество в заголовке
+X-Total-Count, форматы text и ndjson, фильтры по сегментам.
+"""
+import json
+
+
+def test_text_stream(client):
+    response = client.get("/api/Products/OrderCodes", params={"type": "2РМТ", "size": "18"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    codes = response.text.splitlines()
+    assert len(codes) == int(response.headers["X-Total-Count"]) > 0
+    assert len(set(codes)) == len(codes)
+    assert all(code.startswith("2РМТ18") for code in codes)
+    # Соединитель из каталога входит в число допустимых обозначений
+    assert "2РМТ18Б7Ш1В1В" in codes
+
+
+def test_ndjson_stream(client):
+    response = client.get("/api/Products/OrderCodes",
+                          params={"type": "2РМТ", "body_type": "К", "format": "ndjson"})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == int(response.headers["X-Total-Count"])
+    for row in rows:
+        assert row["body_type"] == "К"
+        parts = [row[name] for name in ("type", "size", "body_type", "nozzle_type", "quantity", "part",
+                                        "combination", "coating", "heat_resistance", "climate")]
+        assert row["code"] == "".join(part for part in parts if part is not None)
+    assert {row["nozzle_type"] for row in rows} > {None}
+
+
+def test_empty_and_invalid_filters(client):
+    response = client.get("/api/Products/OrderCodes", params={"body_type": "Б", "nozzle_type": "П"})
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "0" and response.text == ""
+    invalid = client.get("/api/Products/OrderCodes", params={"size": "99"})
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"].startswith("Размер корпуса: недопустимое значение '99'")
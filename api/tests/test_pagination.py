@@ -0,0 +1,110 @@
+"""
+Тесты постраничной навигации: токены продолжения и кэш количества серий
+в группах. Тесты токенов и кэша не обращаются к базе данных.
+"""
+import pytest
+
+from api.services.catalog_version import CatalogChange, catalog_version
+from api.services.pagination import (
+    GroupCountCache, InvalidCursorError, decode_cursor, encode_cursor,
+)
+
+
+@pytest.fixture
+def tracked(monkeypatch):
+    """Отслеживание изменений каталога включено"""
+    monkeypatch.setattr(catalog_version, "available", True)
+
+
+def _series_change(type_id):
+    return CatalogChange(1, "connector_series", 1, type_id)
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(5, "2РМТ18", 42)
+    assert "=" not in token
+    assert decode_cursor(token, 5, (str, int)) == ("2РМТ18", 42)
+
+
+def test_cursor_of_another_list_is_rejected():
+    token = encode_cursor(5, "2РМТ18", 42)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, 6, (str, int))
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, 5, (str, int, int))
+
+
+@pytest.mark.parametrize("token", ["", "!!!", "bm90IGpzb24", encode_cursor(5, 42, "2РМТ18")])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, 5, (str, int))
+
+
+def test_counts_are_not_cached_without_change_tracking(monkeypatch):
+    monkeypatch.setattr(catalog_version, "available", False)
+    cache = GroupCountCache()
+    cache.put(1, 10, version=1)
+    assert cache.get(1) is None
+
+
+def test_stale_count_is_not_stored(tracked):
+    cache = GroupCountCache()
+    cache.put(1, 10, version=1)
+    cache.on_catalog_change([_series_change(1)], version=2)
+    assert cache.get(1) is None
+    # Количество прочитано до изменения группы
+    cache.put(1, 10, version=1)
+    assert cache.get(1) is None
+    cache.put(1, 11, version=2)
+    assert cache.get(1) == 11
+
+
+def test_change_of_one_group_keeps_others(tracked):
+    cache = GroupCountCache()
+    cache.put(1, 10, version=1)
+    cache.put(2, 20, version=1)
+    cache.on_catalog_change([_series_change(1)], version=2)
+    assert cache.get(1) is None and cache.get(2) == 20
+
+
+def test_change_without_group_resets_all(tracked):
+    cache = GroupCountCache()
+    cache.put(1, 10, version=1)
+    cache.put(2, 20, version=1)
+    cache.on_catalog_change([_series_change(None)], version=3)
+    assert cache.get(1) is None and cache.get(2) is None
+    cache.put(2, 20, version=2)
+    assert cache.get(2) is None
+
+
+def test_cache_size_is_bounded(tracked):
+    cache = GroupCountCache(max_entries=3)
+    for group_id in range(1, 4):
+        cache.put(group_id, group_id * 10, version=1)
+    # Группа 1 использовалась недавно, вытесняется группа 2
+    assert cache.get(1) == 10
+    for group_id in range(1000, 1100):
+        cache.put(group_id, 0, version=1)
+    assert len(cache._counts) == 3 and cache.evictions == 100
+    assert cache.get(1) is None and cache.get(2) is None
+    assert cache.get(1099) == 0
+
+
+def test_group_pages_follow_cursor(client):
+    groups = client.get("/api/Groups/GetGroups").json()
+    group_id = groups[0]["group_id"]
+    first = client.get("/api/Products/GetProductsByGroupId",
+                       params={"group_id": group_id, "page_size": 1}).json()
+    assert first["items"]
+    seen = [item["product_id"] for item in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor is not None:
+        page = client.get("/api/Products/GetProductsByGroupId",
+                          params={"group_id": group_id, "page_size": 1, "cursor": cursor}).json()
+        seen += [item["product_id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+    assert len(seen) == len(set(seen)) == first["total_count"]
+    # Токен другой группы
+    response = client.get("/api/Products/GetProductsByGroupId",
+                          params={"group_id": group_id, "cursor": encode_cursor(group_id + 1, "", 0)})
+    assert response.status_code == 400
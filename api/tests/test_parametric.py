@@ -0,0 +1,46 @@
+"""
+Тесты параметрического поиска: построение условий диапазонов и сверка
+тока на контакт с начальными данными.
+"""
+import pytest
+
+from api.services.parametric import InvalidRangeError, build_parametric_query, validate_ranges
+
+# Максимальный ток на одиночный контакт по диаметру контакта, А
+SEED_CONTACT_CURRENT = {1.0: 8.0, 1.5: 15.0, 2.0: 18.0, 3.0: 32.0}
+
+
+def test_current_filters_on_contact_current():
+    query, params = build_parametric_query({"current": (15, None)}, "current", True, 50, 0)
+    assert "cmc.max_current >= %(current_min)s::NUMERIC" in query
+    assert "ep.max_voltage" not in query
+    assert params["current_min"] == 15
+
+
+def test_integer_bounds_are_tightened():
+    _, params = build_parametric_query({"contacts": (3.5, 7.5)}, "series", False, 50, 0)
+    assert params["contacts_min"] == 4
+    assert params["contacts_max"] == 7
+
+
+def test_inverted_range_is_rejected():
+    with pytest.raises(InvalidRangeError):
+        validate_ranges({"current": (20, 10)})
+    validate_ranges({"current": (10, None), "diameter": (1.5, 1.5)})
+
+
+def test_current_range_matches_seed(client):
+    response = client.get("/api/Products/Parametric", params={
+        "current_min": 15, "sort": "current", "descending": "true"
+    })
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items
+    for item in items:
+        assert item["max_current_contact"] == SEED_CONTACT_CURRENT[item["contact_diameter"]]
+        assert item["max_current_contact"] >= 15
+    currents = [item["max_current_contact"] for item in items]
+    assert currents == sorted(currents, reverse=True)
+    # Исполнения с контактами 1,0 мм (8 А) не проходят фильтр
+    assert all(item["contact_diameter"] >= 1.5 for item in items)
+    assert {(item["size_code"], item["max_current_summary"]) for item in items} >= {(18, 50.0), (22, 80.0)}
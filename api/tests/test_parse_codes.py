@@ -0,0 +1,23 @@
+"""
+Тесты пакетного разбора обозначений /api/Products/ParseCodes.
+"""
+
+
+def test_parse_codes(client):
+    codes = ["2РМТ18Б7Ш1В1В", "2рмт 18 б7ш1в1в", "2PMT18Б7Ш1B1B", "2РМТ16Б7Ш1В1В"]
+    response = client.post("/api/Products/ParseCodes", json={"codes": codes})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["valid_count"] == 3 and body["invalid_count"] == 1
+    results = body["results"]
+    assert [result["code"] for result in results] == codes
+    # Варианты ввода одного обозначения разбираются одинаково
+    assert {result["normalized_code"] for result in results[:3]} == {"2РМТ18Б7Ш1В1В"}
+    assert len({result["connector_id"] for result in results[:3]}) == 1
+    assert results[0]["components"] == results[1]["components"]
+    assert not results[3]["valid"] and results[3]["errors"]
+    assert results[3]["connector_id"] is None
+
+
+def test_parse_codes_limits(client):
+    assert client.post("/api/Products/ParseCodes", json={"codes": []}).status_code == 422
@@ -0,0 +1,150 @@
+"""
+Тесты кэша карточек продуктов: вытеснение по количеству и объему,
+инвалидация по продукту, типу и всему каталогу, отказ сохранять ответы,
+построенные до изменения каталога. Тесты не обращаются к базе данных.
+"""
+import time
+
+import pytest
+
+from api.services.catalog_version import CatalogChange, catalog_version
+from api.services.product_cache import ProductDetailCache
+
+
+@pytest.fixture(autouse=True)
+def tracked(monkeypatch):
+    """Отслеживание изменений каталога включено"""
+    monkeypatch.setattr(catalog_version, "available", True)
+
+
+def _change(table_name, row_id=None, type_id=None):
+    return CatalogChange(1, table_name, row_id, type_id)
+
+
+def _check_indexes(cache):
+    """Индексы ключей по продуктам и типам совпадают с записями кэша"""
+    by_product, by_type = {}, {}
+    for key, entry in cache._entries.items():
+        by_product.setdefault(key[0], set()).add(key)
+        by_type.setdefault(entry.type_id, set()).add(key)
+    assert cache._product_keys == by_product
+    assert cache._type_keys == by_type
+    assert cache._bytes == sum(len(entry.body) for entry in cache._entries.values())
+
+
+def test_put_and_get():
+    cache = ProductDetailCache()
+    cache.put(1, "base", 10, b"{}", version=1)
+    assert cache.get(1, "base") == b"{}"
+    assert cache.get(1, "detailed") is None
+    assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 1
+
+
+def test_nothing_is_cached_without_change_tracking(monkeypatch):
+    monkeypatch.setattr(catalog_version, "available", False)
+    cache = ProductDetailCache()
+    cache.put(1, "base", 10, b"{}", version=1)
+    assert cache.get(1, "base") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ProductDetailCache(max_entries=2)
+    cache.put(1, "base", 10, b"1", version=1)
+    cache.put(2, "base", 10, b"2", version=1)
+    cache.get(1, "base")
+    cache.put(3, "base", 10, b"3", version=1)
+    assert cache.get(2, "base") is None
+    assert cache.get(1, "base") == b"1" and cache.get(3, "base") == b"3"
+    assert cache.get_stats()["evictions"] == 1
+    _check_indexes(cache)
+
+
+def test_eviction_by_size():
+    cache = ProductDetailCache(max_bytes=10)
+    cache.put(1, "base", 10, b"x" * 6, version=1)
+    cache.put(2, "base", 10, b"y" * 6, version=1)
+    assert cache.get(1, "base") is None and cache.get(2, "base") == b"y" * 6
+    # Ответ больше всего кэша не сохраняется и ничего не вытесняет
+    cache.put(3, "base", 10, b"z" * 11, version=1)
+    assert cache.get(2, "base") == b"y" * 6
+    assert cache.get_stats()["bytes"] == 6
+    _check_indexes(cache)
+
+
+def test_product_change_invalidates_its_variants():
+    cache = ProductDetailCache()
+    cache.put(1, "base", 10, b"1", version=1)
+    cache.put(1, "detailed", 10, b"1d", version=1)
+    cache.put(2, "base", 10, b"2", version=1)
+    cache.on_catalog_change([_change("connector_series", row_id=1)], version=2)
+    assert cache.get(1, "base") is None and cache.get(1, "detailed") is None
+    assert cache.get(2, "base") == b"2"
+    assert cache.get_stats()["invalidations"] == 2
+    # Ответ, построенный до изменения, не сохраняется
+    cache.put(1, "base", 10, b"old", version=1)
+    assert cache.get(1, "base") is None
+    cache.put(1, "base", 10, b"new", version=2)
+    assert cache.get(1, "base") == b"new"
+    _check_indexes(cache)
+
+
+def test_connector_change_invalidates_products_of_its_type():
+    cache = ProductDetailCache()
+    cache.put(1, "base", 10, b"1", version=1)
+    cache.put(2, "base", 20, b"2", version=1)
+    cache.on_catalog_change([_change("connectors", row_id=5, type_id=10)], version=2)
+    assert cache.get(1, "base") is None and cache.get(2, "base") == b"2"
+    cache.put(1, "base", 10, b"old", version=1)
+    assert cache.get(1, "base") is None
+    _check_indexes(cache)
+
+
+def test_dictionary_change_invalidates_everything():
+    cache = ProductDetailCache()
+    cache.put(1, "base", 10, b"1", version=1)
+    cache.put(2, "base", 20, b"2", version=1)
+    cache.on_catalog_change([_change("contact_coatings", row_id=3)], version=2)
+    assert cache.get_stats()["entries"] == 0
+    cache.on_catalog_change([_change("compatible_connectors", row_id=3)], version=3)
+    cache.put(1, "base", 10, b"1", version=2)
+    assert cache.get(1, "base") == b"1"
+    _check_indexes(cache)
+
+
+def test_evicted_product_version_still_rejects_old_responses():
+    cache = ProductDetailCache(max_entries=1)
+    cache.on_catalog_change([_change("connector_series", row_id=1)], version=5)
+    cache.put(1, "base", 10, b"1", version=5)
+    # Последняя запись продукта вытесняется, его версия забывается
+    cache.put(2, "base", 10, b"2", version=5)
+    assert cache.get_stats()["tracked_products"] == 0
+    # Ответ, построенный до забытой версии, не сохраняется
+    cache.put(1, "base", 10, b"old", version=4)
+    assert cache.get(1, "base") is None
+
+
+def test_eviction_keeps_version_of_product_with_other_variants():
+    cache = ProductDetailCache(max_entries=2)
+    cache.on_catalog_change([_change("connector_series", row_id=1)], version=5)
+    cache.put(1, "base", 10, b"1", version=5)
+    cache.put(1, "detailed", 10, b"1d", version=5)
+    cache.get(1, "base")
+    cache.put(2, "base", 10, b"2", version=5)
+    # Вытеснена расширенная карточка, краткая осталась
+    assert cache.get(1, "base") == b"1"
+    assert cache.get_stats()["tracked_products"] == 1
+    _check_indexes(cache)
+
+
+def test_eviction_is_not_quadratic():
+    size = 20000
+    cache = ProductDetailCache(max_entries=size)
+    for product_id in range(size):
+        cache.put(product_id, "base", product_id % 7, b"x", version=1)
+    started = time.perf_counter()
+    for product_id in range(size, 2 * size):
+        cache.put(product_id, "base", product_id % 7, b"x", version=1)
+    # Построчный просмотр кэша при каждом вытеснении занимал бы минуты
+    assert time.perf_counter() - started < 5
+    assert cache.get_stats()["evictions"] == size
+    _check_indexes(cache)
@@ -0,0 +1,104 @@
+"""
+Тесты сборки карточки продукта: значения по умолчанию без электромеханических
+параметров, приведение характеристик контактов, резервные источники
+характеристик и получение карточки одним обращением к базе.
+"""
+import asyncio
+
+import psycopg2
+
+from api.services.product_detail import build_product_detail, fetch_product_rows
+
+
+def _row(**values):
+    row = {
+        "series_id": 5, "series_name": "2РМТ", "description": None, "type_id": 1,
+        "connector_type_name": "2РМТ", "em_params": None, "contacts": [],
+    }
+    row.update(values)
+    return row
+
+
+def test_defaults_without_em_parameters():
+    detail = build_product_detail(_row(connector_type_name=None))
+    assert detail["connector_id"] == 5 and detail["full_code"] == "2РМТ"
+    assert detail["connector_type"] == "Неизвестный тип"
+    assert detail["gost"] == "ГОСТ В 23476.8-86"
+    assert detail["contacts_quantity"] == 0 and detail["heat_resistance"] == 100
+    assert detail["documentation"][0]["description"] == "Спецификация для 2РМТ"
+
+
+def test_em_parameters_and_contacts():
+    detail = build_product_detail(_row(
+        description="Соединители 2РМТ",
+        em_params={"contacts_quantity": 7, "body_size": "18", "heat_resistance": 200},
+        contacts=[
+            {"diameter": 1.0, "max_resistance": 5.0, "max_current": 8},
+            {"diameter": 1.5, "max_resistance": None, "max_current": None},
+        ],
+    ))
+    assert detail["contacts_quantity"] == 7 and detail["body_size"] == "18"
+    assert detail["heat_resistance"] == 200 and detail["body_type"] == "стандартный"
+    assert detail["contacts_info"] == [
+        {"diameter": 1.0, "max_resistance": 5.0, "max_current": 8.0},
+        {"diameter": 1.5, "max_resistance": None, "max_current": None},
+    ]
+    assert detail["documentation"][0]["description"] == "Соединители 2РМТ"
+
+
+class FakeCursor:
+    """Курсор, у которого отсутствуют первые missing источников характеристик контактов"""
+
+    def __init__(self, missing, rows):
+        self.missing = missing
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query, params=None):
+        self.queries.append((query, params))
+        if len(self.queries) <= self.missing:
+            raise psycopg2.ProgrammingError("relation does not exist")
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_fetch_falls_back_to_contact_specs_view():
+    cursor = FakeCursor(missing=1, rows=[_row(series_id=5), _row(series_id=6)])
+    rows = asyncio.run(fetch_product_rows(cursor, (5, 6)))
+    assert sorted(rows) == [5, 6]
+    assert len(cursor.queries) == 2
+    query, params = cursor.queries[-1]
+    assert "v_contact_specs" in query and params == ([5, 6],)
+
+
+def test_fetch_without_contact_tables():
+    cursor = FakeCursor(missing=2, rows=[_row()])
+    assert list(asyncio.run(fetch_product_rows(cursor, [5]))) == [5]
+    assert "WHERE FALSE" in cursor.queries[-1][0]
+
+
+def _round_trips(response):
+    # Повторный запрос на соединении один раз подготавливается (PREPARE) кэшем
+    # подготовленных выражений: это одно дополнительное обращение
+    return int(response.headers["X-DB-Round-Trips"])
+
+
+def test_product_detail_in_one_round_trip(client):
+    response = client.get("/api/Products/GetById", params={"product_id": 5})
+    assert response.status_code == 200
+    assert _round_trips(response) <= 2
+    detail = response.json()
+    assert detail["full_code"] == "2РМТ"
+    assert [contact["diameter"] for contact in detail["contacts_info"]] == [1.0, 1.5, 2.0, 3.0]
+    assert detail["contacts_info"][0] == {"diameter": 1.0, "max_resistance": 5.0, "max_current": 8.0}
+
+    detailed = client.get("/api/Products/GetDetailedById/5")
+    assert detailed.status_code == 200
+    assert _round_trips(detailed) <= 2
+    assert detailed.json()["contacts_info"] == detail["contacts_info"]
+
+
+def test_missing_product(client):
+    assert client.get("/api/Products/GetById", params={"product_id": 999999}).status_code == 404
+    assert client.get("/api/Products/GetDetailedById/999999").status_code == 404
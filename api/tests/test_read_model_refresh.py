@@ -0,0 +1,117 @@
+"""
+Тесты планирования обновлений представления соединителей в API:
+объединение изменений, повторное обновление после изменений во время
+обновления, пропуск таблиц, не входящих в представление, и ошибки.
+"""
+import asyncio
+
+from api.services.catalog_version import CatalogChange
+from api.services.read_model import ConnectorsReadModel
+from database.read_model import CONNECTORS_FALLBACK_VIEW, CONNECTORS_VIEW
+
+
+class RecordingReadModel(ConnectorsReadModel):
+    """Представление без базы данных: обновления только подсчитываются"""
+
+    def __init__(self):
+        super().__init__(delay=0)
+        self.available = True
+        self.started = asyncio.Event()
+        self.proceed = asyncio.Event()
+        self.proceed.set()
+        self.fail = False
+
+    async def refresh(self):
+        self.started.set()
+        await self.proceed.wait()
+        if self.fail:
+            raise RuntimeError("refresh failed")
+        self.refreshes += 1
+        return 0.0
+
+
+def _change(table_name):
+    return [CatalogChange(1, table_name, 1, None)]
+
+
+async def _idle(model):
+    while model._task is not None and not model._task.done():
+        await asyncio.sleep(0)
+
+
+def test_relation_falls_back_until_view_exists():
+    model = ConnectorsReadModel()
+    assert model.relation == CONNECTORS_FALLBACK_VIEW
+    model.available = True
+    assert model.relation == CONNECTORS_VIEW
+
+
+def test_changes_are_coalesced():
+    async def scenario():
+        model = RecordingReadModel()
+        for version in range(1, 6):
+            model.on_catalog_change(_change("connectors"), version)
+        await _idle(model)
+        assert model.refreshes == 1 and model._refreshed_version == 5
+    asyncio.run(scenario())
+
+
+def test_change_during_refresh_schedules_another():
+    async def scenario():
+        model = RecordingReadModel()
+        model.proceed.clear()
+        model.on_catalog_change(_change("connectors"), 1)
+        await model.started.wait()
+        model.on_catalog_change(_change("body_types"), 2)
+        model.proceed.set()
+        await _idle(model)
+        assert model.refreshes == 2 and model._refreshed_version == 2
+    asyncio.run(scenario())
+
+
+def test_untracked_tables_and_unavailable_view_are_ignored():
+    async def scenario():
+        model = RecordingReadModel()
+        model.on_catalog_change(_change("contact_max_current"), 1)
+        assert model._task is None
+        model.on_catalog_change([], 2, full=True)
+        await _idle(model)
+        assert model.refreshes == 1
+
+        model.available = False
+        model.on_catalog_change(_change("connectors"), 3)
+        await _idle(model)
+        assert model.refreshes == 1
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_is_counted_and_retried_on_next_change():
+    async def scenario():
+        model = RecordingReadModel()
+        model.fail = True
+        model.on_catalog_change(_change("connectors"), 1)
+        await _idle(model)
+        assert model.failures == 1 and model.refreshes == 0 and model._refreshed_version == 0
+        model.fail = False
+        model.on_catalog_change(_change("connectors"), 2)
+        await _idle(model)
+        assert model.refreshes == 1 and model._refreshed_version == 2
+    asyncio.run(scenario())
+
+
+def test_stop_cancels_pending_refresh():
+    async def scenario():
+        model = RecordingReadModel()
+        model.proceed.clear()
+        model.on_catalog_change(_change("connectors"), 1)
+        await model.started.wait()
+        await model.stop()
+        assert model._task is None and model.refreshes == 0
+    asyncio.run(scenario())
+
+
+def test_read_model_diagnostics(client):
+    stats = client.get("/api/Diagnostics/ReadModel").json()
+    assert stats["relation"] in (CONNECTORS_VIEW, CONNECTORS_FALLBACK_VIEW)
+    if stats["available"]:
+        assert stats["pending_changes"] is not None and stats["refreshed_at"] is not None
@@ -0,0 +1,149 @@
+"""
+Тесты кэша результатов поиска: ключ по нормализованному тексту, попадания
+и вытеснение, срок жизни, объединение одновременных промахов (single-flight)
+и сброс при изменении каталога. Тесты не обращаются к базе данных.
+"""
+import asyncio
+
+import pytest
+
+from api.services.catalog_version import catalog_version
+from api.services.search_cache import SearchResultCache, search_cache_key
+from api.services.search_planner import FULL_CODE, SIZE, TEXT, TYPE_CODE, SearchPlan
+
+
+def _plan(kind, query, stages):
+    return SearchPlan(kind, query, query.replace(" ", ""), None, None, stages, None)
+
+
+def test_cache_key():
+    # Этапы в базе ищут ровно тот текст, с которым выполняются
+    assert search_cache_key(_plan(TEXT, "  золото   серебро ", ("index",)), 10) == (TEXT, "золото серебро", 10)
+    assert search_cache_key(_plan(TYPE_CODE, "2 РМДТ", ("index",)), 10) == (TYPE_CODE, "2РМДТ", 10)
+    # Обозначения и размеры разрешаются по справочникам без учета регистра
+    assert search_cache_key(_plan(FULL_CODE, "2рмт18б7ш1в1в", ("code",)), 5) == (FULL_CODE, "2РМТ18Б7Ш1В1В", 5)
+    assert search_cache_key(_plan(SIZE, "18", ("size",)), 5) != search_cache_key(_plan(SIZE, "18", ("size",)), 6)
+
+
+class Search:
+    """Поиск с учетом вызовов; завершается, когда тест устанавливает release"""
+
+    def __init__(self, results=("result",)):
+        self.results = list(results)
+        self.calls = 0
+        self.release = None
+        self.error = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.results, [("index", 0.001)], 1
+
+
+def test_hit_after_miss():
+    async def scenario():
+        cache, search = SearchResultCache(ttl=60, max_entries=10), Search()
+        assert await cache.get_or_search("key", search) == (["result"], [("index", 0.001)], 1, "miss")
+        assert await cache.get_or_search("key", search) == (["result"], [], 0, "hit")
+        assert search.calls == 1
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_are_coalesced():
+    async def scenario():
+        cache, search = SearchResultCache(ttl=60, max_entries=10), Search()
+        search.release = asyncio.Event()
+        requests = [asyncio.ensure_future(cache.get_or_search("key", search)) for _ in range(10)]
+        await asyncio.sleep(0)
+        search.release.set()
+        sources = sorted(result[3] for result in await asyncio.gather(*requests))
+        assert sources == ["coalesced"] * 9 + ["miss"]
+        assert search.calls == 1
+        stats = cache.get_stats()
+        assert stats["misses"] == 1 and stats["coalesced"] == 9 and stats["inflight"] == 0
+    asyncio.run(scenario())
+
+
+def test_cancelled_request_does_not_cancel_shared_search():
+    async def scenario():
+        cache, search = SearchResultCache(ttl=60, max_entries=10), Search()
+        search.release = asyncio.Event()
+        first = asyncio.ensure_future(cache.get_or_search("key", search))
+        second = asyncio.ensure_future(cache.get_or_search("key", search))
+        await asyncio.sleep(0)
+        first.cancel()
+        search.release.set()
+        assert (await second)[0] == ["result"]
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert (await cache.get_or_search("key", search))[3] == "hit"
+        assert search.calls == 1
+    asyncio.run(scenario())
+
+
+def test_failed_search_is_not_cached():
+    async def scenario():
+        cache, search = SearchResultCache(ttl=60, max_entries=10), Search()
+        search.release = asyncio.Event()
+        search.error = RuntimeError("database is down")
+        requests = [asyncio.ensure_future(cache.get_or_search("key", search)) for _ in range(3)]
+        await asyncio.sleep(0)
+        search.release.set()
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        search.release, search.error = None, None
+        assert (await cache.get_or_search("key", search))[3] == "miss"
+        assert search.calls == 2
+    asyncio.run(scenario())
+
+
+def test_expired_entries_are_searched_again():
+    async def scenario():
+        cache, search = SearchResultCache(ttl=0, max_entries=10), Search()
+        await cache.get_or_search("key", search)
+        assert (await cache.get_or_search("key", search))[3] == "miss"
+        assert cache.get_stats()["entries"] == 1
+    asyncio.run(scenario())
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def scenario():
+        cache, search = SearchResultCache(ttl=60, max_entries=2), Search()
+        for key in ("a", "b"):
+            await cache.get_or_search(key, search)
+        await cache.get_or_search("a", search)
+        await cache.get_or_search("c", search)
+        assert cache.get("b") is None and cache.get("a") is not None
+        assert cache.get_stats()["evictions"] == 1
+        disabled = SearchResultCache(ttl=60, max_entries=0)
+        await disabled.get_or_search("a", search)
+        assert disabled.get_stats()["entries"] == 0
+    asyncio.run(scenario())
+
+
+def test_catalog_change_during_search(monkeypatch):
+    monkeypatch.setattr(catalog_version, "version", 0)
+
+    async def scenario():
+        cache, search = SearchResultCache(ttl=60, max_entries=10), Search()
+        await cache.get_or_search("old", search)
+        search.release = asyncio.Event()
+        running = asyncio.ensure_future(cache.get_or_search("key", search))
+        await asyncio.sleep(0)
+
+        catalog_version.version = 1
+        cache.on_catalog_change([], version=1)
+        assert cache.get("old") is None and cache.get_stats()["invalidations"] == 1
+        # Новый запрос не присоединяется к поиску, начатому до изменения
+        fresh = asyncio.ensure_future(cache.get_or_search("key", search))
+        await asyncio.sleep(0)
+        search.release.set()
+        assert (await running)[3] == "miss" and (await fresh)[3] == "miss"
+        assert search.calls == 3
+        # Результат, полученный до изменения, не сохраняется; сохраняется новый
+        assert cache.get_stats()["entries"] == 1
+    asyncio.run(scenario())
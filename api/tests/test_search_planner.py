@@ -0,0 +1,104 @@
+"""
+Тесты планировщика поиска: классификация запросов по снимку справочников,
+ранжирование серий по обозначению и объединенный запрос для базы без
+поискового индекса. Тесты планировщика не обращаются к базе данных.
+"""
+import pytest
+
+from api.services.dictionaries import DictionarySnapshot
+from api.services.search_planner import (
+    FULL_CODE, NUMERIC, SERIES, SIZE, TEXT, TYPE_CODE, INT4_MAX, INT4_MIN,
+    _search_by_code, build_catalog_query, classify_query, integer_value, search_text,
+)
+
+TABLES = {
+    "connector_types": [
+        {"type_id": 1, "code": "2РМТ", "type_name": "2РМТ", "description": "Соединители типа 2РМТ"},
+        {"type_id": 2, "code": "2РМДТ", "type_name": "2РМДТ", "description": "Соединители типа 2РМДТ"},
+    ],
+    "connector_sizes": [{"size_id": 1, "size_code": 14}, {"size_id": 2, "size_code": 18}],
+    "connector_series": [
+        {"series_id": 10, "series_name": "2РМТ14", "type_id": 1},
+        {"series_id": 11, "series_name": "2РМТ18", "type_id": 1},
+        {"series_id": 12, "series_name": "2РМТ", "type_id": 1},
+        {"series_id": 13, "series_name": "2РМДТ18", "type_id": 2},
+    ],
+    "series_sizes": [{"series_id": 12, "size_id": 2}],
+    "body_sizes": [{"size_value": "14"}, {"size_value": "18"}],
+    "body_types": [{"code": "Б", "name": "блочный"}, {"code": "К", "name": "кабельный"}],
+    "nozzle_types": [{"code": "П", "name": "прямой"}],
+    "contact_quantities": [{"quantity": 4}, {"quantity": 7}],
+    "connector_parts": [{"code": "Ш", "name": "вилка"}, {"code": "Г", "name": "розетка"}],
+    "contact_combinations": [{"code": "1", "description": "все контакты 1,0"}],
+    "contact_coatings": [{"code": "В", "material": "золото"}],
+    "heat_resistance": [{"code": "1", "temperature": 100}],
+    "climate_designs": [{"code": "В", "description": "Всеклиматическое"}],
+}
+
+
+@pytest.fixture(scope="module")
+def dictionary():
+    return DictionarySnapshot(TABLES, ["2РМТ18"], version=1)
+
+
+def test_classify_query(dictionary):
+    assert classify_query(dictionary, "18").kind == SIZE
+    assert classify_query(dictionary, "2РМТ18Б7Ш1В1В").kind == FULL_CODE
+    assert classify_query(dictionary, "2РМДТ").kind == TYPE_CODE
+    assert classify_query(dictionary, "2рмт 14").kind == SERIES
+    assert classify_query(dictionary, "1,5").kind == NUMERIC
+    assert classify_query(dictionary, "золото").kind == TEXT
+
+
+def test_stages_by_kind(dictionary):
+    assert classify_query(dictionary, "2РМТ18Б7Ш1В1В").stages == ("code",)
+    assert classify_query(dictionary, "18").stages == ("size",)
+    assert classify_query(dictionary, "7").stages == ("index",)
+
+
+def test_integer_value_fits_int4():
+    assert integer_value(7.0) == 7
+    assert integer_value(float(INT4_MAX)) == INT4_MAX
+    assert integer_value(float(INT4_MIN)) == INT4_MIN
+    assert integer_value(float(INT4_MAX + 1)) is None
+    assert integer_value(float(INT4_MIN - 1)) is None
+    assert integer_value(1.5) is None
+    assert integer_value(None) is None
+
+
+def test_large_numbers_are_not_compared_with_integer_columns(dictionary):
+    for query in ("99999999999", "-2147483649", "1e300"):
+        plan = classify_query(dictionary, query)
+        assert plan.kind == NUMERIC
+        sql, params = build_catalog_query(dictionary, plan, 10)
+        assert "contact_quantity" not in sql, query
+        assert "contact_diameter" in sql and params["number"] == plan.numeric_value
+
+    sql, _ = build_catalog_query(dictionary, classify_query(dictionary, "2147483647"), 10)
+    assert "ep.contact_quantity = %(number)s::INTEGER" in sql
+
+
+def test_non_finite_numbers_are_text(dictionary):
+    for query in ("inf", "-Infinity", "nan", "1e400"):
+        plan = classify_query(dictionary, query)
+        assert plan.kind == TEXT and plan.numeric_value is None, query
+
+
+def test_search_text(dictionary):
+    assert search_text(classify_query(dictionary, "  золото   серебро ")) == "золото серебро"
+    assert search_text(classify_query(dictionary, "2 РМДТ")) == "2РМДТ"
+
+
+def test_full_code_ranks_series_of_the_same_size_first(dictionary):
+    plan = classify_query(dictionary, "2РМТ18Б7Ш1В1В")
+    results = _search_by_code(dictionary, plan, 10)
+    # Серия с размером в наименовании, затем серия, выпускаемая в этом размере
+    # по series_sizes; серии другого размера — с меньшим весом
+    assert [(result["product_name"], result["score"]) for result in results] == [
+        ("2РМТ18", 1.0), ("2РМТ", 1.0), ("2РМТ14", 0.5),
+    ]
+
+
+def test_numeric_search_out_of_int4_range(client):
+    response = client.get("/api/Products/Search", params={"query": "99999999999"})
+    assert response.status_code in (200, 400)
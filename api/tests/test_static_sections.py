@@ -0,0 +1,41 @@
+"""
+Тесты статических разделов карточки продукта, загружаемых из базы данных.
+Значения сверяются с начальными данными (database/schema/05_initial_data.sql
+и таблица contact_max_current).
+"""
+
+# Максимальный ток на одиночный контакт по диаметру контакта, А
+SEED_CONTACT_CURRENT = {1.0: 8.0, 1.5: 15.0, 2.0: 18.0, 3.0: 32.0}
+
+# Суммарный ток исполнений (размер, серия, диаметр, количество контактов), А
+SEED_SUMMARY_CURRENT = {
+    (14, "2РМТ", 1.0, 4): 27.0,
+    (18, "2РМДТ", 1.5, 4): 50.0,
+    (18, "2РМТ", 1.0, 7): 40.0,
+    (22, "2РМТ", 2.0, 2): 80.0,
+    (22, "2РМТ", 1.0, 10): 58.0,
+}
+
+
+def _layout(client, product_id):
+    response = client.get(f"/api/Products/GetDetailedById/{product_id}")
+    assert response.status_code == 200
+    return response.json()["contact_layout"]
+
+
+def test_contact_current_comes_from_contact_diameter(client):
+    layout = _layout(client, 5)
+    assert layout
+    for row in layout:
+        assert row["connector_type"] == "2РМТ"
+        assert row["max_current_contact"] == SEED_CONTACT_CURRENT[row["contact_diameter"]]
+        # Рабочее напряжение не подставляется вместо тока
+        assert row["max_current_contact"] != row["max_working_voltage"]
+
+
+def test_summary_current_matches_seed(client):
+    for product_id in (5, 6):
+        for row in _layout(client, product_id):
+            key = (row["size_code"], row["connector_type"], row["contact_diameter"], row["contacts_quantity"])
+            if key in SEED_SUMMARY_CURRENT:
+                assert row["max_current_summary"] == SEED_SUMMARY_CURRENT[key]
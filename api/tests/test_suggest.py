@@ -0,0 +1,166 @@
+"""
+Тесты индекса автодополнения: подсказки по префиксу и популярности, поиск
+соединителя по обозначению, фоновое применение изменений каталога и пауза
+после ошибки построения. Вместо базы данных используются строки в памяти.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from api.services import suggest
+from api.services.catalog_version import CatalogChange
+from api.services.suggest import CONNECTOR, SERIES, SuggestIndex
+
+
+class FakeCatalog:
+    """Серии и соединители каталога с учетом обращений к базе"""
+
+    def __init__(self):
+        self.series = {
+            1: {"series_id": 1, "series_name": "2РМТ18", "type_id": 1},
+            2: {"series_id": 2, "series_name": "2РМТ14", "type_id": 1},
+            3: {"series_id": 3, "series_name": "2РМДТ18", "type_id": 2},
+        }
+        self.connectors = {
+            10: {"connector_id": 10, "full_code": "2РМТ18Б7Ш1В1В", "type_id": 1},
+            11: {"connector_id": 11, "full_code": "2РМДТ18Б7Г1В1В", "type_id": 2},
+        }
+        self.fetches = 0
+        self.fail = False
+
+    async def fetch(self, cursor, series_ids=None, connector_ids=None):
+        self.fetches += 1
+        if self.fail:
+            raise ConnectionError("connection refused")
+        series = [row for key, row in self.series.items() if series_ids is None or key in series_ids]
+        connectors = [row for key, row in self.connectors.items() if connector_ids is None or key in connector_ids]
+        return series, connectors
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    @asynccontextmanager
+    async def cursor():
+        yield None
+
+    monkeypatch.setattr(suggest, "get_async_db_cursor", cursor)
+    return FakeCatalog()
+
+
+def _index(catalog):
+    index = SuggestIndex()
+    index._fetch = catalog.fetch
+    return index
+
+
+def _values(items):
+    return [(item["kind"], item["value"]) for item in items]
+
+
+def test_suggest_by_prefix_and_popularity(catalog):
+    async def scenario():
+        index = _index(catalog)
+        assert await index.refresh()
+        assert _values(index.suggest("2рмт 1", 10)) == [
+            (SERIES, "2РМТ14"), (SERIES, "2РМТ18"), (CONNECTOR, "2РМТ18Б7Ш1В1В"),
+        ]
+        index.record_view(1)
+        index.record_view(1)
+        # Просмотры серии поднимают и ее, и соединители ее типа
+        assert _values(index.suggest("2РМ", 3)) == [
+            (SERIES, "2РМТ18"), (CONNECTOR, "2РМТ18Б7Ш1В1В"), (SERIES, "2РМДТ18"),
+        ]
+        assert index.suggest("2РМТ18", 1)[0]["popularity"] == 2
+        assert index.suggest("  ", 10) == []
+    asyncio.run(scenario())
+
+
+def test_find_connector(catalog):
+    async def scenario():
+        index = _index(catalog)
+        await index.refresh()
+        assert index.find_connector("2рмт18 б7ш1в1в") == 10
+        assert index.find_connector("2РМТ18Б7Ш1В") is None
+    asyncio.run(scenario())
+
+
+def test_loaded_index_does_not_query_database(catalog):
+    async def scenario():
+        index = _index(catalog)
+        await index.refresh()
+        for _ in range(100):
+            assert await index.refresh()
+        assert catalog.fetches == 1
+    asyncio.run(scenario())
+
+
+def test_catalog_changes_are_applied_in_background(catalog):
+    async def scenario():
+        index = _index(catalog)
+        await index.refresh()
+        catalog.series[4] = {"series_id": 4, "series_name": "2РМТ22", "type_id": 1}
+        del catalog.connectors[10]
+        index.on_catalog_change([
+            CatalogChange(1, "connector_series", 4, 1),
+            CatalogChange(2, "connectors", 10, 1),
+        ], version=2)
+        # Запрос обслуживается текущим индексом, не дожидаясь обновления
+        assert await index.refresh()
+        assert index.find_connector("2РМТ18Б7Ш1В1В") == 10
+        await index._task
+        assert index.find_connector("2РМТ18Б7Ш1В1В") is None
+        assert _values(index.suggest("2РМТ22", 10)) == [(SERIES, "2РМТ22")]
+        assert index.get_stats()["incremental_updates"] == 1
+        assert index.get_stats()["rebuilds"] == 1
+    asyncio.run(scenario())
+
+
+def test_failed_build_is_retried_after_pause(catalog):
+    async def scenario():
+        index = _index(catalog)
+        catalog.fail = True
+        with pytest.raises(ConnectionError):
+            await index.refresh()
+        # До конца паузы база не опрашивается
+        for _ in range(10):
+            assert not await index.refresh()
+        assert catalog.fetches == 1 and index.get_stats()["failures"] == 1
+
+        catalog.fail = False
+        index._retry_at = 0.0
+        assert await index.refresh()
+        assert catalog.fetches == 2 and index.find_connector("2РМТ18Б7Ш1В1В") == 10
+    asyncio.run(scenario())
+
+
+def test_concurrent_requests_build_index_once(catalog):
+    async def scenario():
+        index = _index(catalog)
+        results = await asyncio.gather(*(index.refresh() for _ in range(10)))
+        assert all(results)
+        assert catalog.fetches == 1
+    asyncio.run(scenario())
+
+
+def test_failed_background_update_is_paused(catalog):
+    async def scenario():
+        index = _index(catalog)
+        await index.refresh()
+        catalog.fail = True
+        index.on_catalog_change([CatalogChange(1, "connector_series", 1, 1)], version=2)
+        await index._task
+        assert index.get_stats()["failures"] == 1
+        # Изменения остаются в очереди, но повторяются только после паузы
+        for _ in range(10):
+            assert await index.refresh()
+        assert index._task.done() and catalog.fetches == 2
+    asyncio.run(scenario())
+
+
+def test_suggest_endpoint(client):
+    response = client.get("/api/Products/Suggest", params={"q": "2рмт", "limit": 5})
+    assert response.status_code == 200
+    items = response.json()
+    assert 0 < len(items) <= 5
+    assert all(item["value"].replace(" ", "").upper().startswith("2РМТ") for item in items)
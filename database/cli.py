@@ -5,6 +5,7 @@
 import argparse
 import os
 import sys
+import time
 from database.connection import execute_script_file
 
 def init_db():
@@ -95,6 +96,158 @@ def execute_query_file(file_path):
         print(f"Ошибка при выполнении запроса из файла: {file_path}")
         sys.exit(1)
 
+def benchmark_lifetime(points, seed):
+    """
+    Сравнивает расчет срока службы функцией calculate_lifetime_at_temperature
+    с векторизованным расчетом по кривой в памяти и проверяет совпадение результатов
+    """
+    # NumPy нужен только этой команде
+    import numpy as np
+    import psycopg2.extras
+    from database.connection.db_connector import pooled_connection
+    from database.lifetime_curve import LifetimeCurve, to_sql_integer
+
+    rng = np.random.default_rng(seed)
+    temperatures = rng.uniform(40, 180, points)
+    sql_temperatures = to_sql_integer(temperatures).tolist()
+
+    with pooled_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            # Вызов функции на каждую температуру
+            started = time.perf_counter()
+            per_call = []
+            for temperature in sql_temperatures:
+                cursor.execute(
+                    "SELECT max_lifetime_hours FROM calculate_lifetime_at_temperature(%s)", (temperature,)
+                )
+                row = cursor.fetchone()
+                per_call.append(row["max_lifetime_hours"] if row else None)
+            per_call_time = time.perf_counter() - started
+
+            # Один запрос на весь пакет
+            started = time.perf_counter()
+            cursor.execute(
+                """
+                SELECT (SELECT max_lifetime_hours FROM calculate_lifetime_at_temperature(t.value)) AS lifetime
+                FROM unnest(%s::INTEGER[]) WITH ORDINALITY AS t(value, position)
+                ORDER BY t.position
+                """,
+                (sql_temperatures,)
+            )
+            batch = [row["lifetime"] for row in cursor.fetchall()]
+            batch_time = time.perf_counter() - started
+
+            # Загрузка кривой и векторизованный расчет
+            started = time.perf_counter()
+            cursor.execute("SELECT lifetime_hours, max_temperature FROM connector_lifetime_by_temperature")
+            curve = LifetimeCurve(cursor.fetchall())
+            load_time = time.perf_counter() - started
+        conn.rollback()
+
+    started = time.perf_counter()
+    lifetimes, defined = curve.evaluate(temperatures)
+    vectorized_time = time.perf_counter() - started
+    vectorized = [hours if is_defined else None for hours, is_defined in zip(lifetimes.tolist(), defined.tolist())]
+
+    print(f"Температур: {points}, точек кривой: {len(curve)}")
+    print(f"SQL, запрос на температуру: {per_call_time * 1000:.1f} мс")
+    print(f"SQL, один запрос на пакет:  {batch_time * 1000:.1f} мс")
+    print(f"NumPy: загрузка кривой {load_time * 1000:.1f} мс, расчет {vectorized_time * 1000:.3f} мс")
+
+    mismatches = [
+        (temperature, expected, actual)
+        for temperature, expected, actual in zip(sql_temperatures, per_call, vectorized)
+        if expected != actual
+    ]
+    if mismatches or batch != per_call:
+        for temperature, expected, actual in mismatches[:10]:
+            print(f"Расхождение при {temperature} °C: SQL {expected}, NumPy {actual}")
+        print("Результаты не совпадают!")
+        sys.exit(1)
+    print("Результаты совпадают.")
+
+def order_codes(filters, load, count_only):
+    """
+    Перечисляет допустимые обозначения для заказа: выводит их построчно,
+    выводит только количество или загружает в таблицу order_codes
+    """
+    import psycopg2.extras
+    from database.connection.db_connector import pooled_connection
+    from database.order_codes import (
+        OrderCodeConfigurator, UnknownSegmentValueError, load_order_code_tables, copy_order_codes
+    )
+
+    parsed = {}
+    for item in filters or ():
+        name, separator, value = item.partition('=')
+        if not separator:
+            print(f"Фильтр должен иметь вид сегмент=значение: {item}")
+            sys.exit(1)
+        parsed[name.strip()] = value.strip()
+
+    with pooled_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            configurator = OrderCodeConfigurator(load_order_code_tables(cursor))
+        conn.rollback()
+        try:
+            if count_only:
+                print(configurator.count(parsed))
+            elif load:
+                started = time.perf_counter()
+                rows = copy_order_codes(conn, configurator, parsed)
+                print(f"Загружено обозначений: {rows} за {time.perf_counter() - started:.2f} с")
+            else:
+                for code in configurator.iter_codes(parsed):
+                    sys.stdout.write(code + "\n")
+        except UnknownSegmentValueError as e:
+            print(f"Ошибка фильтра: {e}")
+            sys.exit(1)
+
+def refresh_read_model(status_only):
+    """
+    Обновляет материализованное представление mv_connectors_full
+    или выводит его состояние
+    """
+    import psycopg2.extras
+    from database.connection.db_connector import pooled_connection
+    from database.read_model import CONNECTORS_VIEW, refresh_connectors_view, connectors_view_status
+
+    with pooled_connection() as conn:
+        if not status_only:
+            duration = refresh_connectors_view(conn)
+            print(f"Представление {CONNECTORS_VIEW} обновлено за {duration * 1000:.1f} мс")
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            status = connectors_view_status(cursor)
+        conn.rollback()
+    if status is None:
+        print(f"Обновления {CONNECTORS_VIEW} не записаны")
+        return
+    duration = f", {status['duration_ms']} мс" if status["duration_ms"] is not None else ""
+    print(f"Последнее обновление: {status['refreshed_at']}{duration}")
+    if status["pending_changes"]:
+        print(f"Не учтено изменений каталога: {status['pending_changes']}, "
+              f"первое {status['stale_seconds']:.0f} с назад")
+    else:
+        print("Представление актуально")
+
+def prune_changes(days):
+    """
+    Удаляет записи журнала изменений каталога catalog_changes старше заданного
+    количества дней (функция prune_catalog_changes, миграция 016)
+    """
+    from database.connection.db_connector import pooled_connection
+
+    with pooled_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT prune_catalog_changes(%s * INTERVAL '1 day')", (days,))
+                deleted = cursor.fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    print(f"Удалено записей журнала изменений: {deleted}")
+
 def main():
     """Основная функция командной строки"""
     parser = argparse.ArgumentParser(description='Утилита для работы с базой данных соединителей')
@@ -109,6 +262,32 @@ def main():
     exec_parser = subparsers.add_parser('execute', help='Выполнить SQL запрос из файла')
     exec_parser.add_argument('file', help='Путь к SQL файлу для выполнения')
     
+    # Команда benchmark-lifetime
+    bench_parser = subparsers.add_parser('benchmark-lifetime',
+                                         help='Сравнить расчет срока службы в SQL и NumPy')
+    bench_parser.add_argument('--points', type=int, default=2000, help='Количество температур')
+    bench_parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора температур')
+    
+    # Команда order-codes
+    codes_parser = subparsers.add_parser('order-codes', help='Перечислить допустимые обозначения для заказа')
+    codes_parser.add_argument('--filter', action='append', metavar='СЕГМЕНТ=ЗНАЧЕНИЕ',
+                              help='Фиксированное значение сегмента, например type=2РМТ или size=18')
+    codes_parser.add_argument('--load', action='store_true',
+                              help='Загрузить обозначения в таблицу order_codes командой COPY')
+    codes_parser.add_argument('--count', action='store_true', help='Вывести только количество обозначений')
+    
+    # Команда refresh-read-model
+    read_model_parser = subparsers.add_parser('refresh-read-model',
+                                              help='Обновить материализованное представление соединителей')
+    read_model_parser.add_argument('--status', action='store_true',
+                                   help='Только вывести состояние представления')
+    
+    # Команда prune-changes
+    prune_parser = subparsers.add_parser('prune-changes',
+                                         help='Удалить старые записи журнала изменений каталога')
+    prune_parser.add_argument('--days', type=float, default=7,
+                              help='Срок хранения записей, дней (по умолчанию 7)')
+    
     args = parser.parse_args()
     
     if args.command == 'init-db':
@@ -118,6 +297,14 @@ def main():
             init_db()
     elif args.command == 'execute':
         execute_query_file(args.file)
+    elif args.command == 'benchmark-lifetime':
+        benchmark_lifetime(args.points, args.seed)
+    elif args.command == 'order-codes':
+        order_codes(args.filter, args.load, args.count)
+    elif args.command == 'refresh-read-model':
+        refresh_read_model(args.status)
+    elif args.command == 'prune-changes':
+        prune_changes(args.days)
     else:
         parser.print_help()
 
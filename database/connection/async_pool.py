@@ -0,0 +1,428 @@
+"""
+Модуль асинхронного пула соединений с базой данных.
+Использует асинхронный режим psycopg2: запросы отправляются без блокировки,
+а ожидание ответа сервера выполняется через цикл событий asyncio.
+"""
+import asyncio
+import collections
+import select
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from database.connection.db_config import (
+    API_CONNECTION_STRING, DB_POOL_MAX_LIFETIME, DB_POOL_MAX_IDLE, DB_POOL_TIMEOUT,
+    DB_POOL_CHECK_IDLE, DB_ASYNC_POOL_MIN_SIZE, DB_ASYNC_POOL_MAX_SIZE
+)
+from database.connection.connection_pool import PoolTimeoutError, PoolStats
+from database.connection.statement_cache import get_statement_cache, prepare_wrapped_sql
+
+
+async def wait_for_connection(conn):
+    """
+    Ожидает завершения текущей асинхронной операции соединения.
+
+    Args:
+        conn (psycopg2.connection): Соединение в асинхронном режиме
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state not in (extensions.POLL_READ, extensions.POLL_WRITE):
+            raise psycopg2.OperationalError(f"Неожиданное состояние соединения: {state}")
+
+        fd = conn.fileno()
+        waiter = loop.create_future()
+
+        def _wake():
+            if not waiter.done():
+                waiter.set_result(None)
+
+        try:
+            if state == extensions.POLL_READ:
+                loop.add_reader(fd, _wake)
+            else:
+                loop.add_writer(fd, _wake)
+        except NotImplementedError:
+            # Цикл событий без поддержки add_reader (например, Proactor в Windows):
+            # ожидаем готовность сокета в пуле потоков, не блокируя цикл событий
+            readers, writers = ([fd], []) if state == extensions.POLL_READ else ([], [fd])
+            await loop.run_in_executor(None, select.select, readers, writers, [])
+            continue
+
+        try:
+            await waiter
+        finally:
+            if state == extensions.POLL_READ:
+                loop.remove_reader(fd)
+            else:
+                loop.remove_writer(fd)
+
+
+class AsyncCursor:
+    """
+    Обертка над курсором асинхронного соединения.
+    Метод execute ожидает ответа сервера через цикл событий,
+    методы fetch* работают с уже полученным на клиенте результатом.
+    Повторяющиеся запросы выполняются через кэш подготовленных выражений.
+    """
+
+    def __init__(self, conn, cursor):
+        self.connection = conn
+        self._cursor = cursor
+        # Количество обращений к серверу через этот курсор
+        self.round_trips = 0
+
+    async def execute(self, query, params=None):
+        """
+        Выполняет SQL запрос, не блокируя цикл событий.
+
+        Args:
+            query (str): SQL запрос
+            params (tuple, dict, optional): Параметры запроса
+        """
+        cache = get_statement_cache(self.connection)
+        prepared = cache.plan(query, params)
+        if prepared.prepare_sql is not None:
+            await self._prepare(cache, prepared)
+            if prepared.name is None:
+                await self._execute(query, params)
+                return
+        try:
+            await self._execute(prepared.query, prepared.params)
+        except Exception:
+            if prepared.name is not None:
+                cache.forget(prepared)
+            raise
+
+    async def _execute(self, query, params=None):
+        """Отправляет запрос и ожидает его завершения"""
+        self.round_trips += 1
+        self._cursor.execute(query, params)
+        await wait_for_connection(self.connection)
+
+    async def _prepare(self, cache, prepared):
+        """Подготавливает выражение; при ошибке запрос выполняется без подготовки"""
+        prepare_sql, rollback_sql = prepare_wrapped_sql(self.connection, prepared.prepare_sql)
+        try:
+            await self._execute(prepare_sql)
+        except Exception:
+            if rollback_sql is not None:
+                await self._execute(rollback_sql)
+            cache.mark_failed(prepared)
+            prepared.name = None
+            return
+        cache.mark_prepared(prepared)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        if not self._cursor.closed:
+            self._cursor.close()
+
+
+class _PooledConnection:
+    """Соединение пула с временем создания и последнего использования"""
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class AsyncConnectionPool:
+    """
+    Асинхронный пул соединений с базой данных.
+    Ожидающие соединения корутины обслуживаются в порядке очереди (FIFO).
+    Все операции выполняются в одном цикле событий, поэтому блокировки не нужны.
+    Как и в синхронном пуле, соединение, простаивавшее дольше check_idle
+    секунд, проверяется запросом перед выдачей.
+    """
+
+    def __init__(self, min_size=DB_ASYNC_POOL_MIN_SIZE, max_size=DB_ASYNC_POOL_MAX_SIZE,
+                 max_lifetime=DB_POOL_MAX_LIFETIME, max_idle=DB_POOL_MAX_IDLE,
+                 timeout=DB_POOL_TIMEOUT, check_idle=DB_POOL_CHECK_IDLE, dsn=API_CONNECTION_STRING):
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.dsn = dsn
+        self._idle = collections.deque()
+        self._waiters = collections.deque()
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
+        self.stats = PoolStats()
+
+    async def _connect(self):
+        """Создает новое асинхронное соединение"""
+        conn = psycopg2.connect(self.dsn, client_encoding='UTF8', async_=True)
+        try:
+            await wait_for_connection(conn)
+            with conn.cursor() as cursor:
+                cursor.execute("SET search_path TO public;")
+                await wait_for_connection(conn)
+        except BaseException:
+            conn.close()
+            raise
+        self.stats.connections_created += 1
+        return _PooledConnection(conn)
+
+    def _is_expired(self, entry, now):
+        """Проверяет, нужно ли закрыть соединение вместо повторного использования"""
+        if entry.conn.closed:
+            return True
+        if now - entry.created_at > self.max_lifetime:
+            return True
+        return now - entry.last_used > self.max_idle and self._size > self.min_size
+
+    def _sweep(self, now):
+        """
+        Закрывает устаревшие свободные соединения, начиная с дольше всех
+        простаивающих (слева), пока размер пула выше min_size.
+        """
+        if not self._idle:
+            return
+        kept = collections.deque()
+        while self._idle:
+            entry = self._idle.popleft()
+            if self._is_expired(entry, now):
+                self._discard(entry)
+            else:
+                kept.append(entry)
+        self._idle = kept
+
+    async def _validate(self, entry):
+        """
+        Проверяет долго простаивавшее соединение перед выдачей.
+
+        Returns:
+            bool: True, если соединение пригодно к использованию
+        """
+        if time.monotonic() - entry.last_used <= self.check_idle:
+            return True
+        try:
+            with entry.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                await wait_for_connection(entry.conn)
+        except asyncio.CancelledError:
+            # Проверка прервана: состояние соединения неизвестно
+            self._discard(entry)
+            raise
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, entry):
+        """Закрывает соединение и освобождает место в пуле"""
+        self._size -= 1
+        self.stats.connections_closed += 1
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+        # Освободившееся место передаем первому ожидающему: он создаст соединение сам
+        self._wake_waiter(None)
+
+    def _wake_waiter(self, entry):
+        """Передает соединение (или свободное место) первому ожидающему"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            if entry is None:
+                self._size += 1
+            waiter.set_result(entry)
+            return True
+        return False
+
+    def _give_back(self, entry):
+        """Возвращает в пул переданное соединение или место (entry is None), которые не были использованы"""
+        if entry is None:
+            self._size -= 1
+            self._wake_waiter(None)
+        elif not self._wake_waiter(entry):
+            self._idle.append(entry)
+
+    async def _connect_reserved(self):
+        """Создает соединение для зарезервированного места; при ошибке место освобождается"""
+        try:
+            return await self._connect()
+        except BaseException:
+            self._size -= 1
+            self._wake_waiter(None)
+            raise
+
+    def _expire_waiter(self, waiter):
+        """Завершает ожидание тайм-аутом, если соединение так и не было передано"""
+        if not waiter.done():
+            self.stats.timeouts += 1
+            waiter.set_exception(PoolTimeoutError(
+                f"Не удалось получить соединение из пула за {self.timeout} с"
+            ))
+
+    async def _wait(self, deadline):
+        """
+        Встает в очередь и ждет соединение или свободное место.
+
+        Returns:
+            _PooledConnection: Переданное соединение или None, если передано место
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(max(0.0, deadline - time.monotonic()), self._expire_waiter, waiter)
+        try:
+            return await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # Соединение или место уже переданы, но ожидающая корутина
+                # отменена (клиент отключился): возвращаем их в пул
+                self._give_back(waiter.result())
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            timer.cancel()
+
+    async def open(self):
+        """Открывает пул и создает минимальное количество соединений"""
+        self._closed = False
+        while self._size < self.min_size:
+            self._size += 1
+            try:
+                entry = await self._connect()
+            except BaseException:
+                self._size -= 1
+                raise
+            self._idle.append(entry)
+
+    async def acquire(self):
+        """
+        Получает соединение из пула.
+
+        Returns:
+            psycopg2.connection: Асинхронное соединение с базой данных
+
+        Raises:
+            PoolTimeoutError: Если соединение не освободилось за время ожидания
+        """
+        if self._closed:
+            raise psycopg2.InterfaceError("Пул соединений закрыт")
+
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = None
+        while True:
+            self._sweep(time.monotonic())
+            if self._idle:
+                entry = self._idle.pop()
+            elif self._size < self.max_size:
+                self._size += 1
+                entry = await self._connect_reserved()
+                break
+            else:
+                entry = await self._wait(deadline)
+                waited = time.monotonic() - started
+                if entry is None:
+                    # Место зарезервировано освободившим его соединением
+                    entry = await self._connect_reserved()
+                    break
+            if await self._validate(entry):
+                break
+            self.stats.validations_failed += 1
+            self._discard(entry)
+
+        self._in_use[id(entry.conn)] = entry
+        self.stats.record_checkout(waited)
+        return entry.conn
+
+    async def release(self, conn):
+        """
+        Возвращает соединение в пул.
+
+        Args:
+            conn (psycopg2.connection): Соединение для возврата
+        """
+        entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            return
+
+        try:
+            if conn.closed or conn.isexecuting():
+                raise psycopg2.InterfaceError("Соединение в неопределенном состоянии")
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                # Незавершенную транзакцию откатываем до возврата в пул
+                with conn.cursor() as cursor:
+                    cursor.execute("ROLLBACK")
+                    await wait_for_connection(conn)
+        except asyncio.CancelledError:
+            # Отмена прервала откат: состояние соединения неизвестно
+            self._discard(entry)
+            raise
+        except Exception:
+            self._discard(entry)
+            return
+
+        now = time.monotonic()
+        if self._closed or now - entry.created_at > self.max_lifetime:
+            self._discard(entry)
+            return
+
+        entry.last_used = now
+        if not self._wake_waiter(entry):
+            self._idle.append(entry)
+        self._sweep(now)
+
+    def get_stats(self):
+        """
+        Возвращает состояние пула и статистику ожидания соединений.
+
+        Returns:
+            dict: Размер пула, число свободных и занятых соединений, ожидающих корутин
+        """
+        stats = {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "waiting": sum(1 for waiter in self._waiters if not waiter.done()),
+        }
+        stats.update(self.stats.as_dict())
+        return stats
+
+    async def close(self):
+        """Закрывает пул и все свободные соединения"""
+        self._closed = True
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(psycopg2.InterfaceError("Пул соединений закрыт"))
+        while self._idle:
+            self._discard(self._idle.pop())
+
+
+# Глобальный асинхронный пул; открывается при запуске API
+async_connection_pool = AsyncConnectionPool()
@@ -1,104 +1,385 @@
 """
 Модуль для управления пулом соединений с базой данных.
 Позволяет повторно использовать соединения для большей эффективности.
+Один пул на процесс используется и API, и утилитами пакета database,
+поэтому воркер держит предсказуемое количество подключений к PostgreSQL.
+
+Блокировка пула защищает только учет соединений и никогда не удерживается
+во время сетевых операций или ожидания: потоки, которым не хватило соединения,
+встают в очередь (FIFO), и освобождаемое соединение передается первому из них.
 """
-import queue
+import collections
 import threading
-from database.connection.db_connector import get_connection, close_connection
+import time
+from psycopg2 import extensions
+from database.connection import db_connector
+from database.connection.db_config import (
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_MAX_LIFETIME,
+    DB_POOL_MAX_IDLE, DB_POOL_TIMEOUT, DB_POOL_CHECK_IDLE
+)
+
+
+class PoolTimeoutError(Exception):
+    """Исключение, возникающее, если свободное соединение не получено за отведенное время"""
+
+
+class PoolStats:
+    """
+    Статистика выдачи соединений пула: количество выдач, ожиданий
+    и время ожидания свободного соединения.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.validations_failed = 0
+
+    def record_checkout(self, waited):
+        """
+        Учитывает выдачу соединения.
+
+        Args:
+            waited (float, optional): Время ожидания в секундах, если поток ждал
+        """
+        self.checkouts += 1
+        if waited is not None:
+            self.waits += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def as_dict(self):
+        """Возвращает статистику в виде словаря"""
+        return {
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "wait_time_total": round(self.wait_time_total, 6),
+            "wait_time_avg": round(self.wait_time_total / self.waits, 6) if self.waits else 0.0,
+            "wait_time_max": round(self.wait_time_max, 6),
+            "connections_created": self.connections_created,
+            "connections_closed": self.connections_closed,
+            "validations_failed": self.validations_failed,
+        }
+
+
+class _PoolEntry:
+    """Соединение пула с временем создания и последнего возврата"""
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class _Waiter:
+    """Поток, ожидающий соединение; результат передается ему напрямую"""
+    __slots__ = ("event", "entry", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.entry = None
+        self.error = None
+
 
 class ConnectionPool:
     """
     Класс для управления пулом соединений с базой данных.
-    Обеспечивает эффективное повторное использование соединений.
+    Соединения создаются лениво при первом запросе, простаивающие сверх
+    min_connections закрываются, а отработавшие max_lifetime — заменяются.
+    Соединение, простаивавшее дольше check_idle секунд, проверяется
+    запросом перед выдачей вместо проверки при каждом возврате.
     """
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls, max_connections=5):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(ConnectionPool, cls).__new__(cls)
-                cls._instance._initialized = False
-            return cls._instance
-    
-    def __init__(self, max_connections=5):
-        if self._initialized:
-            return
-            
+
+    def __init__(self, min_connections=DB_POOL_MIN_SIZE, max_connections=DB_POOL_MAX_SIZE,
+                 max_lifetime=DB_POOL_MAX_LIFETIME, max_idle=DB_POOL_MAX_IDLE,
+                 timeout=DB_POOL_TIMEOUT, check_idle=DB_POOL_CHECK_IDLE,
+                 connection_factory=db_connector.get_connection):
+        self.min_connections = min(min_connections, max_connections)
         self.max_connections = max_connections
-        self.pool = queue.Queue(maxsize=max_connections)
-        self.used_connections = 0
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.connection_factory = connection_factory
+        self.stats = PoolStats()
+        # Свободные соединения: последнее возвращенное выдается первым,
+        # чтобы лишние соединения дольше простаивали и закрывались
+        self._idle = collections.deque()
+        self._waiters = collections.deque()
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
         self._lock = threading.Lock()
-        self._initialized = True
-        
-        # Предварительное заполнение пула соединениями
-        for _ in range(max_connections // 2):
-            self._add_connection()
-    
-    def _add_connection(self):
-        """Добавляет новое соединение в пул"""
-        if self.used_connections < self.max_connections:
-            conn = get_connection()
-            self.pool.put(conn)
-            self.used_connections += 1
-    
+
+    def _create_entry(self):
+        """Создает соединение для зарезервированного места в пуле (без блокировки)"""
+        try:
+            entry = _PoolEntry(self.connection_factory())
+        except BaseException:
+            with self._lock:
+                self._size -= 1
+                # Место не занято: передаем его следующему ожидающему
+                self._handoff(None)
+            raise
+        with self._lock:
+            self.stats.connections_created += 1
+        return entry
+
+    def _close_entry(self, entry):
+        """Закрывает соединение вне блокировки пула"""
+        try:
+            db_connector.close_connection(entry.conn)
+        except Exception:
+            pass
+
+    def _handoff(self, entry):
+        """
+        Передает соединение (или свободное место, если entry is None) первому
+        ожидающему потоку. Вызывается под блокировкой пула.
+
+        Returns:
+            bool: True, если ожидающий поток получил соединение или место
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if entry is None:
+                self._size += 1
+            else:
+                waiter.entry = entry
+            waiter.event.set()
+            return True
+        return False
+
+    def _is_expired(self, entry, now):
+        """Проверяет, превышен ли срок жизни соединения или время простоя"""
+        if entry.conn.closed:
+            return True
+        if now - entry.created_at > self.max_lifetime:
+            return True
+        return now - entry.last_used > self.max_idle and self._size > self.min_connections
+
+    def _sweep(self, now):
+        """
+        Убирает из свободных устаревшие соединения, начиная с дольше всех
+        простаивающих (слева), пока размер пула выше min_connections.
+        Вызывается под блокировкой; закрыть соединения нужно вне ее.
+
+        Returns:
+            list: Удаленные из пула записи
+        """
+        expired = []
+        if not self._idle:
+            return expired
+        kept = collections.deque()
+        while self._idle:
+            entry = self._idle.popleft()
+            if self._is_expired(entry, now):
+                self._discard(entry)
+                expired.append(entry)
+            else:
+                kept.append(entry)
+        self._idle = kept
+        return expired
+
+    def _validate(self, entry):
+        """
+        Проверяет долго простаивавшее соединение перед выдачей.
+
+        Returns:
+            bool: True, если соединение пригодно к использованию
+        """
+        if time.monotonic() - entry.last_used <= self.check_idle:
+            return True
+        try:
+            with entry.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            entry.conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        """Удаляет соединение из учета пула; вызывается под блокировкой"""
+        self._size -= 1
+        self.stats.connections_closed += 1
+        # Освободившееся место отдаем ожидающему: он создаст соединение сам
+        self._handoff(None)
+
+    def _wait(self, deadline):
+        """
+        Встает в очередь ожидания и ждет соединение без удержания блокировки.
+
+        Returns:
+            _PoolEntry: Переданное соединение или None, если передано свободное место
+        """
+        waiter = _Waiter()
+        self._waiters.append(waiter)
+        self._lock.release()
+        try:
+            waiter.event.wait(max(0.0, deadline - time.monotonic()))
+        finally:
+            self._lock.acquire()
+
+        if not waiter.event.is_set():
+            self._waiters.remove(waiter)
+            self.stats.timeouts += 1
+            raise PoolTimeoutError(
+                f"Не удалось получить соединение из пула за {self.timeout} с"
+            )
+        if waiter.error is not None:
+            raise waiter.error
+        return waiter.entry
+
+    def open(self):
+        """Создает min_connections соединений заранее (например, при запуске сервиса)"""
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_connections:
+                    return
+                self._size += 1
+            entry = self._create_entry()
+            self.release_connection(entry.conn, _entry=entry)
+
     def get_connection(self):
         """
-        Получает соединение из пула или создает новое, если пул пуст.
-        
+        Получает соединение из пула или создает новое, если свободных нет.
+
         Returns:
             psycopg2.connection: Соединение с базой данных
+
+        Raises:
+            PoolTimeoutError: Если свободное соединение не появилось за время ожидания
         """
-        with self._lock:
-            try:
-                # Пытаемся получить соединение из пула без ожидания
-                conn = self.pool.get(block=False)
-                return conn
-            except queue.Empty:
-                # Если пул пуст, создаем новое соединение
-                if self.used_connections < self.max_connections:
-                    conn = get_connection()
-                    self.used_connections += 1
-                    return conn
-                else:
-                    # Если достигнут максимум соединений, ждем освобождения
-                    conn = self.pool.get(block=True, timeout=30)
-                    return conn
-    
-    def release_connection(self, conn):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+
+        while True:
+            entry = None
+            create = False
+            with self._lock:
+                if self._closed:
+                    raise ConnectionError("Пул соединений закрыт")
+                # Устаревшие и лишние простаивающие соединения закрываем
+                expired = self._sweep(time.monotonic())
+                if self._idle:
+                    entry = self._idle.pop()
+
+                if entry is None:
+                    if self._size < self.max_connections and not self._waiters:
+                        # Резервируем место и создаем соединение вне блокировки
+                        self._size += 1
+                        create = True
+                    else:
+                        waited = True
+                        entry = self._wait(deadline)
+                        create = entry is None
+
+            for stale in expired:
+                self._close_entry(stale)
+
+            if create:
+                entry = self._create_entry()
+            elif not self._validate(entry):
+                with self._lock:
+                    self.stats.validations_failed += 1
+                    self._discard(entry)
+                self._close_entry(entry)
+                continue
+
+            with self._lock:
+                self._in_use[id(entry.conn)] = entry
+                self.stats.record_checkout(time.monotonic() - started if waited else None)
+            return entry.conn
+
+    def release_connection(self, conn, _entry=None):
         """
         Возвращает соединение в пул.
-        
+
         Args:
             conn (psycopg2.connection): Соединение для возврата в пул
         """
-        if conn:
-            # Проверка, что соединение активно
-            try:
-                with conn.cursor() as cursor:
-                    cursor.execute("SELECT 1")
-                # Возвращаем соединение в пул
-                self.pool.put(conn)
-            except Exception:
-                # Если соединение неактивно, закрываем его и создаем новое
-                close_connection(conn)
-                self.used_connections -= 1
-                self._add_connection()
-    
+        if not conn:
+            return
+        with self._lock:
+            entry = _entry or self._in_use.pop(id(conn), None)
+        if entry is None:
+            # Соединение не выдавалось пулом или уже было возвращено
+            return
+
+        try:
+            # Сбрасываем незавершенную транзакцию перед повторным использованием
+            if conn.closed or conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                raise ConnectionError("Соединение закрыто")
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.autocommit = False
+            healthy = True
+        except Exception:
+            healthy = False
+
+        now = time.monotonic()
+        with self._lock:
+            if not healthy or self._closed or now - entry.created_at > self.max_lifetime:
+                # Неисправное или отработавшее свой срок соединение закрываем
+                self._discard(entry)
+                expired = [entry]
+            else:
+                entry.last_used = now
+                if not self._handoff(entry):
+                    self._idle.append(entry)
+                expired = self._sweep(now)
+        for stale in expired:
+            self._close_entry(stale)
+
+    def get_stats(self):
+        """
+        Возвращает состояние пула и статистику ожидания соединений.
+
+        Returns:
+            dict: Размер пула, число свободных и занятых соединений, ожидающих потоков
+        """
+        with self._lock:
+            stats = {
+                "min_size": self.min_connections,
+                "max_size": self.max_connections,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiting": len(self._waiters),
+            }
+            stats.update(self.stats.as_dict())
+        return stats
+
     def close_all(self):
-        """Закрывает все соединения в пуле"""
-        while not self.pool.empty():
-            conn = self.pool.get()
-            close_connection(conn)
-            self.used_connections -= 1
-        
-# Создаем глобальный объект для доступа к пулу соединений
+        """Закрывает все свободные соединения; занятые закрываются при возврате"""
+        with self._lock:
+            self._closed = True
+            for waiter in self._waiters:
+                waiter.error = ConnectionError("Пул соединений закрыт")
+                waiter.event.set()
+            self._waiters.clear()
+            idle = list(self._idle)
+            self._idle.clear()
+            for entry in idle:
+                self._size -= 1
+                self.stats.connections_closed += 1
+        for entry in idle:
+            self._close_entry(entry)
+
+# Общий пул процесса; соединения создаются при первом обращении
 connection_pool = ConnectionPool()
 
 def get_connection_from_pool():
     """
     Получает соединение из пула.
-    
+
     Returns:
         psycopg2.connection: Соединение с базой данных
     """
@@ -107,8 +388,8 @@ def get_connection_from_pool():
 def release_connection_to_pool(conn):
     """
     Возвращает соединение в пул.
-    
+
     Args:
         conn (psycopg2.connection): Соединение для возврата
     """
-    connection_pool.release_connection(conn) 
\ No newline at end of file
+    connection_pool.release_connection(conn)
@@ -17,4 +17,27 @@ DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 DB_SCHEMA = os.getenv('DB_SCHEMA', 'connector_schema')
 
 # Connection string for psycopg2
-CONNECTION_STRING = f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={DB_PASSWORD}" 
\ No newline at end of file
+CONNECTION_STRING = f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={DB_PASSWORD}" 
+
+# The API has always defaulted to the iset_katalog database when DB_NAME is not set
+API_DB_NAME = os.getenv('DB_NAME', 'iset_katalog')
+API_CONNECTION_STRING = f"host={DB_HOST} port={DB_PORT} dbname={API_DB_NAME} user={DB_USER} password={DB_PASSWORD}"
+
+# Connection pool parameters (shared by api and database packages)
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+# Maximum connection age in seconds before it is recycled
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+# Idle connections above DB_POOL_MIN_SIZE are closed after this many seconds
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))
+# Connections idle longer than this many seconds are probed before checkout
+DB_POOL_CHECK_IDLE = float(os.getenv('DB_POOL_CHECK_IDLE', '30'))
+# Maximum time in seconds to wait for a free connection
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+# Asynchronous pool used by the API route handlers
+DB_ASYNC_POOL_MIN_SIZE = int(os.getenv('DB_ASYNC_POOL_MIN_SIZE', '1'))
+DB_ASYNC_POOL_MAX_SIZE = int(os.getenv('DB_ASYNC_POOL_MAX_SIZE', '20'))
+# Per-connection prepared statement cache (0 disables it)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '100'))
+# A query is prepared once it has run this many times on a connection
+DB_STATEMENT_CACHE_THRESHOLD = int(os.getenv('DB_STATEMENT_CACHE_THRESHOLD', '2'))
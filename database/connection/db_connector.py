@@ -2,33 +2,44 @@
 Модуль для установления соединения с базой данных PostgreSQL.
 Предоставляет функции для создания и управления соединениями.
 """
+from contextlib import contextmanager
 import psycopg2
 import psycopg2.extras
 from database.connection.db_config import CONNECTION_STRING, DB_SCHEMA
 
-def get_connection():
+def get_connection(dsn=CONNECTION_STRING):
     """
     Создает и возвращает новое соединение с базой данных.
+    Используется пулом соединений как фабрика, поэтому напрямую
+    вызывать ее следует только для служебных задач.
+    
+    Args:
+        dsn (str): Строка подключения
     
     Returns:
         psycopg2.connection: Объект соединения с базой данных
     """
     try:
-        conn = psycopg2.connect(CONNECTION_STRING)
+        conn = psycopg2.connect(dsn, client_encoding='UTF8')
         conn.autocommit = False
         
         # Устанавливаем схему поиска
         with conn.cursor() as cursor:
             cursor.execute(f"SET search_path TO public;")
+        conn.commit()
         
         return conn
     except Exception as e:
         print(f"Ошибка подключения к базе данных: {e}")
         raise
 
-def get_db_connection():
+def get_unpooled_connection():
     """
-    Создает и возвращает новое соединение с базой данных с явной установкой кодировки UTF-8.
+    Создает отдельное соединение с базой данных вне пула, с явной установкой
+    кодировки UTF-8 и в режиме autocommit. Предназначена для служебных задач,
+    которым не подходит соединение из пула (длительное обслуживание, LISTEN).
+    Такие соединения не ограничены размером пула, вызывающий закрывает их сам
+    (close_connection). Для обычной работы используйте pooled_connection.
     
     Returns:
         psycopg2.connection: Объект соединения с базой данных с установленной кодировкой UTF-8
@@ -48,6 +59,29 @@ def get_db_connection():
         print(f"Ошибка подключения к базе данных с UTF-8 кодировкой: {e}")
         raise
 
+# Прежнее имя get_unpooled_connection, оставлено для совместимости
+get_db_connection = get_unpooled_connection
+
+@contextmanager
+def pooled_connection():
+    """
+    Контекстный менеджер, выдающий соединение из общего пула процесса.
+    Соединения пула создаются с кодировкой UTF-8 и схемой поиска public.
+    
+    Yields:
+        psycopg2.connection: Соединение с базой данных из пула
+    """
+    # Импорт внутри функции: модуль пула сам зависит от этого модуля
+    from database.connection.connection_pool import (
+        get_connection_from_pool, release_connection_to_pool
+    )
+    
+    conn = get_connection_from_pool()
+    try:
+        yield conn
+    finally:
+        release_connection_to_pool(conn)
+
 def close_connection(conn):
     """
     Закрывает соединение с базой данных.
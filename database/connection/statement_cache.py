@@ -0,0 +1,350 @@
+"""
+Модуль кэша подготовленных выражений (PREPARE/EXECUTE).
+Часто повторяющиеся запросы подготавливаются на сервере один раз для каждого
+соединения, после чего выполняются через EXECUTE без повторного разбора и
+планирования. Кэш каждого соединения ограничен по размеру (LRU), вытесненные
+выражения освобождаются командой DEALLOCATE.
+"""
+import collections
+import hashlib
+import re
+import threading
+import weakref
+
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+
+from database.connection.db_config import (
+    DB_STATEMENT_CACHE_SIZE, DB_STATEMENT_CACHE_THRESHOLD
+)
+
+# Плейсхолдеры psycopg2: %s, %(name)s и экранированный знак процента %%
+_PLACEHOLDER_RE = re.compile(r"%%|%\((\w+)\)s|%s")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Подготавливаются только запросы на чтение
+_CACHEABLE_PREFIXES = ("SELECT", "WITH")
+
+
+class StatementCacheStats:
+    """Суммарные счетчики кэша подготовленных выражений по всем соединениям"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.prepared = 0
+        self.evictions = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self):
+        """Возвращает статистику в виде словаря"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "prepared": self.prepared,
+                "evictions": self.evictions,
+                "failures": self.failures,
+                "max_size": DB_STATEMENT_CACHE_SIZE,
+                "prepare_threshold": DB_STATEMENT_CACHE_THRESHOLD,
+            }
+
+
+statement_cache_stats = StatementCacheStats()
+
+# Запросы, которые сервер не смог подготовить (например, тип параметра не выводится);
+# такие запросы всегда выполняются обычным способом
+_unpreparable = set()
+
+
+class _Statement:
+    """Запись кэша: число выполнений и имя подготовленного выражения"""
+    __slots__ = ("executions", "name")
+
+    def __init__(self):
+        self.executions = 0
+        self.name = None
+
+
+class PreparedQuery:
+    """
+    Результат разбора запроса кэшем.
+
+    Attributes:
+        prepare_sql (str): Команда PREPARE, которую нужно выполнить перед запросом, или None
+        query (str): Запрос для выполнения (EXECUTE или исходный текст)
+        params (tuple, dict): Параметры запроса
+        fingerprint (str): Отпечаток запроса
+    """
+    __slots__ = ("prepare_sql", "query", "params", "fingerprint", "name")
+
+    def __init__(self, query, params, fingerprint=None, name=None, prepare_sql=None):
+        self.prepare_sql = prepare_sql
+        self.query = query
+        self.params = params
+        self.fingerprint = fingerprint
+        self.name = name
+
+
+def fingerprint_query(query):
+    """
+    Вычисляет отпечаток запроса: хэш текста без учета пробельных символов.
+
+    Args:
+        query (str): SQL запрос
+
+    Returns:
+        str: Отпечаток запроса
+    """
+    normalized = _WHITESPACE_RE.sub(" ", query).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _convert_placeholders(query, params):
+    """
+    Заменяет плейсхолдеры psycopg2 на параметры $1..$n.
+
+    Returns:
+        str: Текст для PREPARE или None, если запрос нельзя подготовить
+    """
+    names = []
+    positional = 0
+    named_index = {}
+    is_named = []
+
+    def replace(match):
+        nonlocal positional
+        token = match.group(0)
+        if token == "%%":
+            # PREPARE выполняется без подстановки параметров
+            return "%"
+        name = match.group(1)
+        if name is None:
+            positional += 1
+            is_named.append(False)
+            names.append(None)
+            return f"${len(names)}"
+        is_named.append(True)
+        if name not in named_index:
+            names.append(name)
+            named_index[name] = len(names)
+        return f"${named_index[name]}"
+
+    converted = _PLACEHOLDER_RE.sub(replace, query)
+    if not names or (any(is_named) and not all(is_named)):
+        return None
+
+    if isinstance(params, dict):
+        if not all(is_named) or any(name not in params for name in names):
+            return None
+        values = [params[name] for name in names]
+    else:
+        if any(is_named) or len(params) != positional:
+            return None
+        values = list(params)
+
+    # Кортежи (IN %s) разворачиваются psycopg2 в список значений и не
+    # соответствуют одному параметру подготовленного выражения
+    if any(isinstance(value, tuple) for value in values):
+        return None
+    return converted
+
+
+class StatementCache:
+    """
+    Кэш подготовленных выражений одного соединения.
+    Запрос подготавливается после DB_STATEMENT_CACHE_THRESHOLD выполнений,
+    количество отслеживаемых запросов ограничено DB_STATEMENT_CACHE_SIZE.
+    """
+
+    def __init__(self, max_size=DB_STATEMENT_CACHE_SIZE, threshold=DB_STATEMENT_CACHE_THRESHOLD):
+        self.max_size = max_size
+        self.threshold = threshold
+        self._statements = collections.OrderedDict()
+        self._counter = 0
+        # Вытесненные выражения освобождаются вместе со следующей подготовкой
+        self._deallocate = []
+
+    def __len__(self):
+        return sum(1 for statement in self._statements.values() if statement.name)
+
+    def plan(self, query, params):
+        """
+        Определяет, как выполнить запрос: через подготовленное выражение или напрямую.
+
+        Args:
+            query (str): SQL запрос
+            params (tuple, dict, optional): Параметры запроса
+
+        Returns:
+            PreparedQuery: Описание выполнения запроса
+        """
+        if self.max_size <= 0 or not isinstance(query, str):
+            return PreparedQuery(query, params)
+        stripped = query.strip().rstrip(";")
+        if ";" in stripped or not stripped[:6].upper().startswith(_CACHEABLE_PREFIXES):
+            return PreparedQuery(query, params)
+
+        fingerprint = fingerprint_query(stripped)
+        if fingerprint in _unpreparable:
+            return PreparedQuery(query, params)
+
+        statement = self._statements.get(fingerprint)
+        if statement is not None:
+            self._statements.move_to_end(fingerprint)
+            if statement.name is not None:
+                statement_cache_stats.increment("hits")
+                return PreparedQuery(self._execute_sql(statement.name, query, params),
+                                     params, fingerprint, statement.name)
+        else:
+            statement = self._statements[fingerprint] = _Statement()
+            self._evict()
+
+        statement_cache_stats.increment("misses")
+        statement.executions += 1
+        if statement.executions < self.threshold:
+            return PreparedQuery(query, params, fingerprint)
+
+        if params is None:
+            prepare_body = stripped
+        else:
+            prepare_body = _convert_placeholders(stripped, params)
+            if prepare_body is None:
+                _unpreparable.add(fingerprint)
+                return PreparedQuery(query, params)
+
+        self._counter += 1
+        name = f"iset_ps_{self._counter}"
+        prepare_sql = "".join(f"DEALLOCATE {old}; " for old in self._deallocate)
+        prepare_sql += f"PREPARE {name} AS {prepare_body}"
+        self._deallocate.clear()
+        return PreparedQuery(self._execute_sql(name, query, params),
+                             params, fingerprint, name, prepare_sql)
+
+    def _execute_sql(self, name, query, params):
+        """Формирует команду EXECUTE для уже подготовленного выражения"""
+        if params is None:
+            return f"EXECUTE {name}"
+        if isinstance(params, dict):
+            names = []
+            for match in _PLACEHOLDER_RE.finditer(query):
+                if match.group(1) and match.group(1) not in names:
+                    names.append(match.group(1))
+            return f"EXECUTE {name} ({', '.join(f'%({n})s' for n in names)})"
+        return f"EXECUTE {name} ({', '.join(['%s'] * len(params))})"
+
+    def _evict(self):
+        """Вытесняет давно не использовавшиеся запросы сверх лимита"""
+        while len(self._statements) > self.max_size:
+            _, statement = self._statements.popitem(last=False)
+            if statement.name is not None:
+                self._deallocate.append(statement.name)
+                statement_cache_stats.increment("evictions")
+
+    def mark_prepared(self, prepared):
+        """Отмечает успешную подготовку выражения на сервере"""
+        statement = self._statements.get(prepared.fingerprint)
+        if statement is not None:
+            statement.name = prepared.name
+        else:
+            # Запись успели вытеснить: освобождаем выражение при следующей подготовке
+            self._deallocate.append(prepared.name)
+        statement_cache_stats.increment("prepared")
+
+    def mark_failed(self, prepared):
+        """Отмечает запрос, который сервер не смог подготовить"""
+        self._statements.pop(prepared.fingerprint, None)
+        _unpreparable.add(prepared.fingerprint)
+        statement_cache_stats.increment("failures")
+
+    def forget(self, prepared):
+        """
+        Удаляет запрос из кэша, если его выполнение завершилось ошибкой:
+        состояние подготовленного выражения на сервере в этом случае не гарантируется.
+        """
+        statement = self._statements.pop(prepared.fingerprint, None)
+        if statement is not None and statement.name is not None:
+            self._deallocate.append(statement.name)
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_statement_cache(conn):
+    """
+    Возвращает кэш подготовленных выражений соединения.
+    Кэш живет, пока существует соединение: подготовленные выражения
+    принадлежат серверной сессии.
+
+    Args:
+        conn (psycopg2.connection): Соединение с базой данных
+
+    Returns:
+        StatementCache: Кэш соединения
+    """
+    cache = _caches.get(conn)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(conn)
+            if cache is None:
+                cache = _caches[conn] = StatementCache()
+    return cache
+
+
+def prepare_wrapped_sql(conn, prepare_sql):
+    """
+    Возвращает команды для подготовки выражения с учетом состояния транзакции.
+    Внутри открытой транзакции подготовка выполняется в точке сохранения,
+    чтобы ошибка подготовки не прерывала транзакцию.
+
+    Returns:
+        tuple: (команда подготовки, команда отката при ошибке или None)
+    """
+    if conn.info.transaction_status == extensions.TRANSACTION_STATUS_INTRANS:
+        return (f"SAVEPOINT iset_prepare; {prepare_sql}; RELEASE SAVEPOINT iset_prepare",
+                "ROLLBACK TO SAVEPOINT iset_prepare; RELEASE SAVEPOINT iset_prepare")
+    return prepare_sql, None
+
+
+class PreparedStatementCursor(RealDictCursor):
+    """
+    Курсор, выполняющий повторяющиеся запросы через подготовленные выражения.
+    Поведение и формат строк совпадают с RealDictCursor.
+    """
+
+    def execute(self, query, vars=None):
+        cache = get_statement_cache(self.connection)
+        prepared = cache.plan(query, vars)
+        if prepared.prepare_sql is not None:
+            self._prepare(cache, prepared)
+            if prepared.name is None:
+                return super().execute(query, vars)
+        try:
+            return super().execute(prepared.query, prepared.params)
+        except Exception:
+            if prepared.name is not None:
+                cache.forget(prepared)
+            raise
+
+    def _prepare(self, cache, prepared):
+        """Подготавливает выражение; при ошибке запрос выполняется без подготовки"""
+        prepare_sql, rollback_sql = prepare_wrapped_sql(self.connection, prepared.prepare_sql)
+        was_idle = self.connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        try:
+            super().execute(prepare_sql)
+        except Exception:
+            if rollback_sql is not None:
+                super().execute(rollback_sql)
+            elif was_idle and not self.connection.autocommit:
+                self.connection.rollback()
+            cache.mark_failed(prepared)
+            prepared.name = None
+            return
+        cache.mark_prepared(prepared)
@@ -0,0 +1,234 @@
+"""
+Разбор и построение условных обозначений соединителей (2РМТ18Б7Ш1В1В).
+Грамматика обозначения задана таблицей сегментов; допустимые значения
+сегментов берутся из справочных таблиц. Для набора справочников грамматика
+компилируется в одно регулярное выражение, поэтому разбор корректного
+обозначения выполняется за один проход без обращений к базе данных.
+Порядок сегментов совпадает с функцией parse_connector_code
+(database/functions/01_connector_functions.sql).
+"""
+import collections
+import re
+
+CodeSegment = collections.namedtuple(
+    "CodeSegment",
+    ["name", "title", "table", "column", "label_columns", "optional", "after"]
+)
+
+# Сегменты обозначения в порядке следования:
+# имя, наименование, справочник, столбец кода, столбцы описания,
+# необязательный сегмент, условие (код предыдущего сегмента) появления сегмента
+CODE_SEGMENTS = (
+    CodeSegment("type", "Тип соединителя", "connector_types", "type_name",
+                ("description", "type_name"), False, None),
+    CodeSegment("size", "Размер корпуса", "body_sizes", "size_value",
+                ("description", "size_value"), False, None),
+    CodeSegment("body_type", "Тип корпуса", "body_types", "code",
+                ("description", "name"), False, None),
+    # Патрубок бывает только у кабельных соединителей
+    CodeSegment("nozzle_type", "Тип патрубка", "nozzle_types", "code",
+                ("description", "name"), True, ("body_type", "К")),
+    CodeSegment("quantity", "Количество контактов", "contact_quantities", "quantity",
+                ("description", "quantity"), False, None),
+    CodeSegment("part", "Часть соединителя", "connector_parts", "code",
+                ("description", "name"), False, None),
+    CodeSegment("combination", "Сочетание контактов", "contact_combinations", "code",
+                ("description",), True, None),
+    CodeSegment("coating", "Покрытие контактов", "contact_coatings", "code",
+                ("description", "material"), False, None),
+    CodeSegment("heat_resistance", "Теплостойкость", "heat_resistance", "code",
+                ("description", "temperature"), False, None),
+    CodeSegment("climate", "Климатическое исполнение", "climate_designs", "code",
+                ("description",), True, None),
+)
+
+# Латинские буквы, которые при вводе часто подменяют кириллические
+_HOMOGLYPHS = str.maketrans("ABEKMHOPCTXY", "АВЕКМНОРСТХУ")
+
+
+def normalize_connector_code(code):
+    """
+    Приводит введенное обозначение к каноническому виду: без пробелов,
+    в верхнем регистре, с кириллическими буквами вместо похожих латинских.
+
+    Args:
+        code (str): Обозначение соединителя
+
+    Returns:
+        str: Нормализованное обозначение
+    """
+    return "".join(code.split()).upper().translate(_HOMOGLYPHS)
+
+
+def _label(row, columns):
+    """Первое непустое описание значения справочника"""
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ""):
+            return str(value)
+    return ""
+
+
+def _alternation(values):
+    """Альтернатива значений; длинные значения проверяются первыми"""
+    return "|".join(re.escape(value) for value in sorted(values, key=lambda v: (-len(v), v)))
+
+
+class ConnectorCodeParser:
+    """
+    Разборщик обозначений, скомпилированный для конкретного набора справочников.
+
+    Args:
+        tables (Mapping): Имя справочной таблицы -> последовательность строк (словарей)
+    """
+
+    def __init__(self, tables):
+        # Для каждого сегмента: код значения -> (строка справочника, описание)
+        self._values = {}
+        # Для каждого сегмента: нормализованный код -> код значения в справочнике.
+        # Обозначение нормализуется перед разбором, поэтому и коды справочников
+        # сопоставляются в нормализованном виде (патрубок "Пс" -> "ПС")
+        self._codes = {}
+        for segment in CODE_SEGMENTS:
+            values = {}
+            codes = {}
+            for row in tables.get(segment.table, ()):
+                value = str(row[segment.column])
+                values.setdefault(value, (row, _label(row, segment.label_columns)))
+                codes.setdefault(normalize_connector_code(value), value)
+            self._values[segment.name] = values
+            self._codes[segment.name] = codes
+
+        self._segment_patterns = {}
+        parts = []
+        for segment in CODE_SEGMENTS:
+            alternatives = _alternation(self._codes[segment.name]) or "(?!)"
+            self._segment_patterns[segment.name] = re.compile(f"(?:{alternatives})")
+            group = f"(?P<{segment.name}>{alternatives})"
+            if segment.after is not None:
+                # Сегмент допустим только после указанного кода предыдущего сегмента
+                after = re.escape(normalize_connector_code(segment.after[1]))
+                group = f"(?:(?<={after}){group})"
+            if segment.optional:
+                group = f"(?:{group})?"
+            parts.append(group)
+        self._pattern = re.compile("".join(parts))
+
+    def parse(self, code):
+        """
+        Разбирает обозначение соединителя.
+
+        Args:
+            code (str): Обозначение соединителя
+
+        Returns:
+            dict: code, normalized_code, valid, components (список сегментов) и errors
+        """
+        normalized = normalize_connector_code(code)
+        match = self._pattern.fullmatch(normalized)
+        if match is not None:
+            components = [
+                self._component(segment, match.group(segment.name))
+                for segment in CODE_SEGMENTS
+                if match.group(segment.name) is not None
+            ]
+            return {
+                "code": code,
+                "normalized_code": normalized,
+                "valid": True,
+                "components": components,
+                "errors": [],
+            }
+        components, errors = self._diagnose(normalized)
+        return {
+            "code": code,
+            "normalized_code": normalized,
+            "valid": False,
+            "components": components,
+            "errors": errors,
+        }
+
+    def parse_many(self, codes):
+        """
+        Разбирает набор обозначений.
+
+        Args:
+            codes (Iterable[str]): Обозначения соединителей
+
+        Returns:
+            list: Результаты разбора в порядке обозначений
+        """
+        return [self.parse(code) for code in codes]
+
+    def build(self, components):
+        """
+        Собирает обозначение из кодов сегментов (аналог generate_connector_code).
+
+        Args:
+            components (Mapping): Имя сегмента -> код значения
+
+        Returns:
+            str: Обозначение соединителя
+        """
+        return "".join(
+            str(components[segment.name]) for segment in CODE_SEGMENTS
+            if components.get(segment.name) is not None
+        )
+
+    def values(self, segment_name):
+        """
+        Возвращает допустимые коды сегмента.
+
+        Args:
+            segment_name (str): Имя сегмента
+
+        Returns:
+            list: Коды значений в порядке справочника
+        """
+        return list(self._values[segment_name])
+
+    def _component(self, segment, matched):
+        """Сегмент разобранного обозначения по совпавшему нормализованному коду"""
+        value = self._codes[segment.name][matched]
+        _, label = self._values[segment.name][value]
+        return {
+            "name": segment.name,
+            "title": segment.title,
+            "value": value,
+            "description": label,
+        }
+
+    def _diagnose(self, code):
+        """
+        Пошаговый разбор некорректного обозначения для сообщения об ошибке.
+        Сегменты сопоставляются жадно слева направо, как в parse_connector_code.
+        """
+        components = []
+        errors = []
+        position = 0
+        previous = {}
+        for segment in CODE_SEGMENTS:
+            if segment.after is not None and previous.get(segment.after[0]) != segment.after[1]:
+                continue
+            match = self._segment_patterns[segment.name].match(code, position)
+            if match is None or not match.group(0):
+                if segment.optional:
+                    continue
+                expected = ", ".join(self._values[segment.name]) or "нет значений в справочнике"
+                found = code[position:position + 3] or "конец обозначения"
+                errors.append(
+                    f"{segment.title}: недопустимое значение '{found}' в позиции {position + 1}, "
+                    f"ожидается одно из: {expected}"
+                )
+                break
+            component = self._component(segment, match.group(0))
+            components.append(component)
+            previous[segment.name] = component["value"]
+            position = match.end()
+        else:
+            if position < len(code):
+                errors.append(f"Лишние символы '{code[position:]}' в позиции {position + 1}")
+        if not errors:
+            # Жадный разбор прошел, но полное выражение не совпало: сегменты неоднозначны
+            errors.append("Обозначение не соответствует формату кода соединителя")
+        return components, errors
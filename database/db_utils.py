@@ -1,22 +1,9 @@
 """
 Утилиты для работы с базой данных
 """
-import psycopg2
-import os
-from dotenv import load_dotenv
-
-# Загружаем переменные окружения
-load_dotenv()
-
-# Параметры подключения
-DB_HOST = os.getenv('DB_HOST', 'localhost')
-DB_PORT = os.getenv('DB_PORT', '5432')
-DB_NAME = os.getenv('DB_NAME', 'connector_catalog')
-DB_USER = os.getenv('DB_USER', 'postgres')
-DB_PASSWORD = os.getenv('DB_PASSWORD', 'aboba1337')
-
-# Строка подключения
-CONNECTION_STRING = f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} user={DB_USER} password={DB_PASSWORD}"
+from database.connection.connection_pool import (
+    get_connection_from_pool, release_connection_to_pool
+)
 
 
 def execute_query(query, params=None):
@@ -32,10 +19,8 @@ def execute_query(query, params=None):
     """
     conn = None
     try:
-        conn = psycopg2.connect(CONNECTION_STRING)
+        conn = get_connection_from_pool()
         with conn.cursor() as cursor:
-            # Устанавливаем схему поиска
-            cursor.execute("SET search_path TO public;")
             cursor.execute(query, params)
             if cursor.description:
                 return cursor.fetchall()
@@ -48,7 +33,7 @@ def execute_query(query, params=None):
         return None
     finally:
         if conn:
-            conn.close()
+            release_connection_to_pool(conn)
 
 
 def execute_query_single_result(query, params=None):
@@ -64,10 +49,8 @@ def execute_query_single_result(query, params=None):
     """
     conn = None
     try:
-        conn = psycopg2.connect(CONNECTION_STRING)
+        conn = get_connection_from_pool()
         with conn.cursor() as cursor:
-            # Устанавливаем схему поиска
-            cursor.execute("SET search_path TO public;")
             cursor.execute(query, params)
             if cursor.description:
                 return cursor.fetchone()
@@ -80,7 +63,7 @@ def execute_query_single_result(query, params=None):
         return None
     finally:
         if conn:
-            conn.close()
+            release_connection_to_pool(conn)
 
 
 def execute_dml_query(query, params=None):
@@ -96,7 +79,7 @@ def execute_dml_query(query, params=None):
     """
     conn = None
     try:
-        conn = psycopg2.connect(CONNECTION_STRING)
+        conn = get_connection_from_pool()
         with conn.cursor() as cursor:
             cursor.execute(query, params)
             rowcount = cursor.rowcount
@@ -109,4 +92,4 @@ def execute_dml_query(query, params=None):
         return -1
     finally:
         if conn:
-            conn.close() 
\ No newline at end of file
+            release_connection_to_pool(conn) 
\ No newline at end of file
@@ -163,8 +163,10 @@ BEGIN
     WHERE 
         (p_temperature >= max_temperature OR 
         (p_temperature < max_temperature AND p_temperature >= next_temperature))
+    -- Наработка не может превышать значение ни одной точки кривой с меньшей
+    -- температурой, поэтому выбирается наименьшее из подходящих значений
     ORDER BY 
-        calculated_lifetime DESC
+        calculated_lifetime ASC
     LIMIT 1;
 END;
 $$ LANGUAGE plpgsql;
@@ -0,0 +1,85 @@
+"""
+Векторизованный расчет минимальной наработки соединителя по температуре.
+Кривая наработки (connector_lifetime_by_temperature) хранится в массивах
+NumPy, и наработка для массива температур вычисляется без циклов по точкам.
+Результаты совпадают с функцией calculate_lifetime_at_temperature
+(database/functions/01_connector_functions.sql), включая целочисленную
+арифметику PostgreSQL: деление с отбрасыванием дробной части и приведение
+температуры к INTEGER с округлением.
+"""
+import numpy as np
+
+
+def to_sql_integer(values):
+    """
+    Приводит значения к целым так же, как PostgreSQL приводит NUMERIC к INTEGER:
+    округление до ближайшего целого, половины — от нуля.
+
+    Args:
+        values (array_like): Числа
+
+    Returns:
+        numpy.ndarray: Целые числа (int64)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+class LifetimeCurve:
+    """
+    Кусочно-линейная кривая наработки.
+
+    Args:
+        rows (Iterable): Строки connector_lifetime_by_temperature
+            (словари с lifetime_hours и max_temperature)
+    """
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: row["max_temperature"])
+        self.temperatures = np.array([row["max_temperature"] for row in rows], dtype=np.int64)
+        self.lifetimes = np.array([row["lifetime_hours"] for row in rows], dtype=np.int64)
+        # Минимальная наработка среди точек с температурой не выше данной
+        self._prefix_min = np.minimum.accumulate(self.lifetimes) if len(rows) else self.lifetimes
+
+    def __len__(self):
+        return len(self.temperatures)
+
+    def evaluate(self, temperatures):
+        """
+        Вычисляет наработку для массива температур.
+
+        Функция calculate_lifetime_at_temperature выбирает наименьшее значение
+        среди точек кривой с температурой не выше заданной и интерполяции на
+        отрезке, содержащем температуру. Ниже первой точки кривой наработка
+        не определена.
+
+        Args:
+            temperatures (array_like): Температуры, °C
+
+        Returns:
+            tuple: (наработка, ч — numpy.ndarray int64; маска определенных значений — numpy.ndarray bool)
+        """
+        points = to_sql_integer(temperatures)
+        result = np.zeros(points.shape, dtype=np.int64)
+        if not len(self.temperatures):
+            return result, np.zeros(points.shape, dtype=bool)
+
+        # Индекс последней точки кривой с температурой не выше заданной
+        index = np.searchsorted(self.temperatures, points, side="right") - 1
+        defined = index >= 0
+        safe_index = np.where(defined, index, 0)
+        result = np.where(defined, self._prefix_min[safe_index], 0)
+
+        # Интерполяция на отрезке [T(i), T(i + 1)): L(i+1) - (L(i+1) - L(i)) * (T(i+1) - t) / (T(i+1) - T(i))
+        inside = defined & (index < len(self.temperatures) - 1)
+        if inside.any():
+            low = safe_index[inside]
+            high = low + 1
+            upper_lifetime = self.lifetimes[high]
+            numerator = (upper_lifetime - self.lifetimes[low]) * (self.temperatures[high] - points[inside])
+            denominator = self.temperatures[high] - self.temperatures[low]
+            # Целочисленное деление PostgreSQL отбрасывает дробную часть (округление к нулю)
+            quotient = np.sign(numerator) * (np.abs(numerator) // denominator)
+            interpolated = upper_lifetime - quotient
+            result[inside] = np.minimum(result[inside], interpolated)
+        return result, defined
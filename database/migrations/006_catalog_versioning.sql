@@ -0,0 +1,139 @@
+-- Миграция 006: Журнал изменений каталога для версионирования кэшей API
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '006_catalog_versioning') THEN
+        RAISE EXCEPTION 'Миграция 006_catalog_versioning уже применена';
+    END IF;
+END $$;
+
+-- Журнал изменений каталога: каждая измененная строка отслеживаемых таблиц
+-- получает запись с возрастающим номером, по которому API определяет версию каталога
+CREATE TABLE IF NOT EXISTS catalog_changes (
+    change_id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    row_id INTEGER,
+    type_id INTEGER,
+    operation VARCHAR(10) NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE catalog_changes IS 'Журнал изменений каталога для инвалидации кэшей API';
+COMMENT ON COLUMN catalog_changes.row_id IS 'Идентификатор измененной строки (NULL для справочных таблиц)';
+COMMENT ON COLUMN catalog_changes.type_id IS 'Тип соединителя измененной строки, если он известен';
+
+-- Время последнего изменения серии, по аналогии с connectors.updated_at
+ALTER TABLE connector_series ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION update_series_timestamp()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_series_timestamp ON connector_series;
+CREATE TRIGGER update_series_timestamp
+BEFORE UPDATE ON connector_series
+FOR EACH ROW
+EXECUTE FUNCTION update_series_timestamp();
+
+-- Запись изменения в журнал. Первый аргумент триггера — имя столбца
+-- с идентификатором строки; без аргумента изменение относится ко всей таблице
+CREATE OR REPLACE FUNCTION log_catalog_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    new_row JSONB;
+    old_row JSONB;
+    id_column TEXT := CASE WHEN TG_NARGS > 0 THEN TG_ARGV[0] END;
+BEGIN
+    IF TG_LEVEL = 'STATEMENT' THEN
+        INSERT INTO catalog_changes (table_name, operation)
+        VALUES (TG_TABLE_NAME, TG_OP);
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP <> 'DELETE' THEN
+        new_row := to_jsonb(NEW);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        old_row := to_jsonb(OLD);
+    END IF;
+
+    IF old_row IS NOT NULL THEN
+        INSERT INTO catalog_changes (table_name, row_id, type_id, operation)
+        VALUES (TG_TABLE_NAME, (old_row ->> id_column)::INTEGER,
+                (old_row ->> 'type_id')::INTEGER, TG_OP);
+    END IF;
+
+    -- При обновлении новая версия строки записывается отдельно, только если
+    -- изменились идентификатор или тип (строка могла перейти в другой тип)
+    IF new_row IS NOT NULL AND (
+        old_row IS NULL
+        OR (old_row ->> id_column) IS DISTINCT FROM (new_row ->> id_column)
+        OR (old_row ->> 'type_id') IS DISTINCT FROM (new_row ->> 'type_id')
+    ) THEN
+        INSERT INTO catalog_changes (table_name, row_id, type_id, operation)
+        VALUES (TG_TABLE_NAME, (new_row ->> id_column)::INTEGER,
+                (new_row ->> 'type_id')::INTEGER, TG_OP);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Изменения серий и соединителей инвалидируют только затронутые продукты
+DROP TRIGGER IF EXISTS log_catalog_change ON connector_series;
+CREATE TRIGGER log_catalog_change
+AFTER INSERT OR UPDATE OR DELETE ON connector_series
+FOR EACH ROW
+EXECUTE FUNCTION log_catalog_change('series_id');
+
+DO $$
+BEGIN
+    IF to_regclass('connectors') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS log_catalog_change ON connectors;
+        CREATE TRIGGER log_catalog_change
+        AFTER INSERT OR UPDATE OR DELETE ON connectors
+        FOR EACH ROW
+        EXECUTE FUNCTION log_catalog_change('connector_id');
+    END IF;
+END $$;
+
+-- Таблицы, данные которых входят в карточку любого продукта:
+-- их изменение инвалидирует все закэшированные карточки
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'connector_types', 'electromechanical_parameters',
+        'contact_diameters', 'contact_resistance', 'contact_max_current'
+    ]
+    LOOP
+        IF to_regclass(tbl) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS log_catalog_change ON %I', tbl);
+            EXECUTE format(
+                'CREATE TRIGGER log_catalog_change
+                 AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                 FOR EACH STATEMENT
+                 EXECUTE FUNCTION log_catalog_change()', tbl);
+        END IF;
+    END LOOP;
+END $$;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('006_catalog_versioning', '1.0');
+
+-- Завершение транзакции
+COMMIT;
@@ -0,0 +1,53 @@
+-- Миграция 007: Отслеживание изменений таблиц статических разделов карточки продукта
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '007_static_sections_tracking') THEN
+        RAISE EXCEPTION 'Миграция 007_static_sections_tracking уже применена';
+    END IF;
+END $$;
+
+-- Технические характеристики, таблицы наработки и перегрева, условия эксплуатации,
+-- габаритные размеры и справочники кода заказа загружаются API один раз;
+-- их изменение записывается в журнал и приводит к перезагрузке разделов
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'connector_technical_specs', 'connector_lifetime_by_temperature',
+        'contact_overheat_by_load', 'mechanical_factors', 'climate_factors',
+        'device_part_dimensions', 'cable_part_dimensions',
+        'straight_shielded_nozzle_dimensions', 'straight_unshielded_nozzle_dimensions',
+        'angled_shielded_nozzle_dimensions', 'angled_unshielded_nozzle_dimensions',
+        'body_types', 'nozzle_types', 'nut_types', 'connector_parts',
+        'contact_combinations', 'contact_coatings', 'heat_resistance',
+        'special_designs', 'climate_designs', 'series_sizes', 'connector_sizes'
+    ]
+    LOOP
+        IF to_regclass(tbl) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS log_catalog_change ON %I', tbl);
+            EXECUTE format(
+                'CREATE TRIGGER log_catalog_change
+                 AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                 FOR EACH STATEMENT
+                 EXECUTE FUNCTION log_catalog_change()', tbl);
+        END IF;
+    END LOOP;
+END $$;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('007_static_sections_tracking', '1.0');
+
+-- Завершение транзакции
+COMMIT;
@@ -0,0 +1,29 @@
+-- Миграция 008: Составной индекс для постраничной навигации по сериям группы
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '008_series_keyset_index') THEN
+        RAISE EXCEPTION 'Миграция 008_series_keyset_index уже применена';
+    END IF;
+END $$;
+
+-- Индекс соответствует порядку выдачи GetProductsByGroupId: страницы по токену
+-- продолжения читаются поиском (series_name, series_id) > (...) без OFFSET
+CREATE INDEX IF NOT EXISTS idx_connector_series_type_name
+ON connector_series(type_id, series_name, series_id);
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('008_series_keyset_index', '1.0');
+
+-- Завершение транзакции
+COMMIT;
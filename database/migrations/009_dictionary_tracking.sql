@@ -0,0 +1,45 @@
+-- Миграция 009: Отслеживание изменений оставшихся справочных таблиц
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '009_dictionary_tracking') THEN
+        RAISE EXCEPTION 'Миграция 009_dictionary_tracking уже применена';
+    END IF;
+END $$;
+
+-- API хранит все справочники из 01_base_tables.sql в памяти; изменения таблиц,
+-- которые еще не записываются в журнал каталога, тоже должны сбрасывать кэш
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'body_sizes', 'contact_quantities', 'combination_diameter_map', 'connection_types'
+    ]
+    LOOP
+        IF to_regclass(tbl) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS log_catalog_change ON %I', tbl);
+            EXECUTE format(
+                'CREATE TRIGGER log_catalog_change
+                 AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                 FOR EACH STATEMENT
+                 EXECUTE FUNCTION log_catalog_change()', tbl);
+        END IF;
+    END LOOP;
+END $$;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('009_dictionary_tracking', '1.0');
+
+-- Завершение транзакции
+COMMIT;
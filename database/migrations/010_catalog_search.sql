@@ -0,0 +1,158 @@
+-- Миграция 010: Индексированный поиск по каталогу (полнотекстовый и триграммный)
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '010_catalog_search') THEN
+        RAISE EXCEPTION 'Миграция 010_catalog_search уже применена';
+    END IF;
+END $$;
+
+-- Расширение pg_trgm нужно для поиска по подстроке; без него поиск
+-- выполняется только по словам и их началам
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    ELSE
+        RAISE NOTICE 'Расширение pg_trgm недоступно, триграммный индекс не создается';
+    END IF;
+END $$;
+
+-- Поисковые документы серий: наименование, тип, размеры корпуса,
+-- электромеханические параметры и описание в одной строке
+CREATE TABLE IF NOT EXISTS catalog_search (
+    series_id INTEGER PRIMARY KEY REFERENCES connector_series(series_id) ON DELETE CASCADE,
+    series_name VARCHAR(50) NOT NULL,
+    normalized_name VARCHAR(50) NOT NULL,
+    search_text TEXT NOT NULL,
+    document TSVECTOR NOT NULL
+);
+COMMENT ON TABLE catalog_search IS 'Поисковые документы серий соединителей для /api/Products/Search';
+COMMENT ON COLUMN catalog_search.normalized_name IS 'Наименование серии без пробелов в верхнем регистре';
+COMMENT ON COLUMN catalog_search.search_text IS 'Текст для поиска по подстроке (триграммный индекс)';
+COMMENT ON COLUMN catalog_search.document IS 'Полнотекстовый документ: A - серия, B - тип, C - размеры и параметры, D - описание';
+
+-- Пересчет поисковых документов одной серии или всего каталога (NULL)
+CREATE OR REPLACE FUNCTION refresh_catalog_search(p_series_id INTEGER DEFAULT NULL)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM catalog_search
+    WHERE p_series_id IS NULL OR series_id = p_series_id;
+
+    INSERT INTO catalog_search (series_id, series_name, normalized_name, search_text, document)
+    SELECT
+        cs.series_id,
+        cs.series_name,
+        UPPER(REPLACE(cs.series_name, ' ', '')),
+        concat_ws(' ', cs.series_name, REPLACE(cs.series_name, ' ', ''), ct.code, ct.type_name,
+                  sizes.codes, cs.description),
+        setweight(to_tsvector('simple', concat_ws(' ', cs.series_name, REPLACE(cs.series_name, ' ', ''))), 'A')
+        || setweight(to_tsvector('simple', concat_ws(' ', ct.code, ct.type_name)), 'B')
+        || setweight(to_tsvector('simple', concat_ws(' ', sizes.codes, params.params)), 'C')
+        || setweight(to_tsvector('russian', COALESCE(cs.description, '')), 'D')
+    FROM connector_series cs
+    JOIN connector_types ct ON ct.type_id = cs.type_id
+    LEFT JOIN LATERAL (
+        SELECT string_agg(DISTINCT csz.size_code::TEXT, ' ') AS codes
+        FROM series_sizes ss
+        JOIN connector_sizes csz ON csz.size_id = ss.size_id
+        WHERE ss.series_id = cs.series_id
+    ) sizes ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT string_agg(DISTINCT value, ' ') AS params
+        FROM electromechanical_parameters ep,
+             unnest(ARRAY[ep.contact_quantity::TEXT, ep.contact_diameter::TEXT, ep.max_current::TEXT]) AS value
+        WHERE ep.series_name = cs.series_name
+    ) params ON TRUE
+    WHERE p_series_id IS NULL OR cs.series_id = p_series_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Триггер пересчета. Первый аргумент — столбец с идентификатором серии;
+-- без аргумента (триггер уровня оператора) пересчитывается весь каталог
+CREATE OR REPLACE FUNCTION catalog_search_refresh_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_id INTEGER;
+    new_id INTEGER;
+BEGIN
+    IF TG_LEVEL = 'STATEMENT' THEN
+        PERFORM refresh_catalog_search(NULL);
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP <> 'INSERT' THEN
+        old_id := (to_jsonb(OLD) ->> TG_ARGV[0])::INTEGER;
+        PERFORM refresh_catalog_search(old_id);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_id := (to_jsonb(NEW) ->> TG_ARGV[0])::INTEGER;
+        IF new_id IS DISTINCT FROM old_id THEN
+            PERFORM refresh_catalog_search(new_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Изменения серий и их размеров пересчитывают документы затронутых серий
+DROP TRIGGER IF EXISTS catalog_search_refresh ON connector_series;
+CREATE TRIGGER catalog_search_refresh
+AFTER INSERT OR UPDATE ON connector_series
+FOR EACH ROW
+EXECUTE FUNCTION catalog_search_refresh_trigger('series_id');
+
+DROP TRIGGER IF EXISTS catalog_search_refresh ON series_sizes;
+CREATE TRIGGER catalog_search_refresh
+AFTER INSERT OR UPDATE OR DELETE ON series_sizes
+FOR EACH ROW
+EXECUTE FUNCTION catalog_search_refresh_trigger('series_id');
+
+-- Изменения справочников пересчитывают весь каталог
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY[
+        'connector_types', 'connector_sizes', 'electromechanical_parameters'
+    ]
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS catalog_search_refresh ON %I', tbl);
+        EXECUTE format(
+            'CREATE TRIGGER catalog_search_refresh
+             AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+             FOR EACH STATEMENT
+             EXECUTE FUNCTION catalog_search_refresh_trigger()', tbl);
+    END LOOP;
+END $$;
+
+-- Начальное заполнение
+SELECT refresh_catalog_search(NULL);
+
+-- Индексы: точное совпадение наименования, полнотекстовый поиск и поиск по подстроке
+CREATE INDEX IF NOT EXISTS idx_catalog_search_normalized_name ON catalog_search(normalized_name);
+CREATE INDEX IF NOT EXISTS idx_catalog_search_document ON catalog_search USING GIN(document);
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        CREATE INDEX IF NOT EXISTS idx_catalog_search_text_trgm
+        ON catalog_search USING GIN(search_text gin_trgm_ops);
+    END IF;
+END $$;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('010_catalog_search', '1.0');
+
+-- Завершение транзакции
+COMMIT;
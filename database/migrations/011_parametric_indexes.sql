@@ -0,0 +1,50 @@
+-- Миграция 011: Индексы для параметрического поиска по электрическим характеристикам
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '011_parametric_indexes') THEN
+        RAISE EXCEPTION 'Миграция 011_parametric_indexes уже применена';
+    END IF;
+END $$;
+
+-- Диапазонные условия /api/Products/Parametric по каждому параметру проверяются
+-- по своему B-tree индексу, несколько условий объединяются через BitmapAnd
+CREATE INDEX IF NOT EXISTS idx_em_parameters_max_current
+ON electromechanical_parameters(max_current);
+
+CREATE INDEX IF NOT EXISTS idx_em_parameters_contact_diameter
+ON electromechanical_parameters(contact_diameter);
+
+CREATE INDEX IF NOT EXISTS idx_em_parameters_contact_quantity
+ON electromechanical_parameters(contact_quantity);
+
+CREATE INDEX IF NOT EXISTS idx_em_parameters_working_voltage
+ON electromechanical_parameters(max_working_voltage);
+
+-- Соединение параметров с сериями по наименованию
+CREATE INDEX IF NOT EXISTS idx_em_parameters_series_name
+ON electromechanical_parameters(series_name);
+
+-- Теплостойкость задается для соединителей: проверка существования соединителя
+-- типа серии с подходящей теплостойкостью выполняется по индексу
+CREATE INDEX IF NOT EXISTS idx_connectors_type_resistance
+ON connectors(type_id, resistance_id);
+
+CREATE INDEX IF NOT EXISTS idx_heat_resistance_temperature
+ON heat_resistance(temperature);
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('011_parametric_indexes', '1.0');
+
+-- Завершение транзакции
+COMMIT;
@@ -0,0 +1,37 @@
+-- Миграция 012: Отслеживание изменений совместимости соединителей
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '012_compatibility_tracking') THEN
+        RAISE EXCEPTION 'Миграция 012_compatibility_tracking уже применена';
+    END IF;
+END $$;
+
+-- API хранит граф совместимости в памяти; изменения compatible_connectors
+-- записываются в журнал каталога, чтобы граф был перестроен
+DO $$
+BEGIN
+    IF to_regclass('compatible_connectors') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS log_catalog_change ON compatible_connectors;
+        CREATE TRIGGER log_catalog_change
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON compatible_connectors
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION log_catalog_change();
+    END IF;
+END $$;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('012_compatibility_tracking', '1.0');
+
+-- Завершение транзакции
+COMMIT;
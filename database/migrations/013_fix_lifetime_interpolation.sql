@@ -0,0 +1,69 @@
+-- Миграция 013: Исправление расчета срока службы при заданной температуре
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '013_fix_lifetime_interpolation') THEN
+        RAISE EXCEPTION 'Миграция 013_fix_lifetime_interpolation уже применена';
+    END IF;
+END $$;
+
+-- Условию отбора удовлетворяют все точки кривой с температурой не выше заданной,
+-- и сортировка по убыванию возвращала наибольшую наработку кривой (для 130 °C —
+-- 100000 ч вместо интерполированных 2600 ч). Функция выбирает наименьшее значение
+CREATE OR REPLACE FUNCTION calculate_lifetime_at_temperature(p_temperature INTEGER)
+RETURNS TABLE (
+    max_lifetime_hours INTEGER,
+    temperature INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH temperature_ranges AS (
+        SELECT 
+            lifetime_hours,
+            max_temperature,
+            LEAD(lifetime_hours) OVER (ORDER BY max_temperature DESC) AS next_lifetime,
+            LEAD(max_temperature) OVER (ORDER BY max_temperature DESC) AS next_temperature
+        FROM 
+            connector_lifetime_by_temperature
+        ORDER BY 
+            max_temperature DESC
+    )
+    SELECT 
+        CASE 
+            WHEN p_temperature >= max_temperature THEN lifetime_hours
+            WHEN p_temperature < max_temperature AND p_temperature >= next_temperature 
+                THEN lifetime_hours - 
+                    (lifetime_hours - next_lifetime) * 
+                    (max_temperature - p_temperature) / 
+                    (max_temperature - next_temperature)
+            ELSE NULL
+        END AS calculated_lifetime,
+        p_temperature
+    FROM 
+        temperature_ranges
+    WHERE 
+        (p_temperature >= max_temperature OR 
+        (p_temperature < max_temperature AND p_temperature >= next_temperature))
+    -- Наработка не может превышать значение ни одной точки кривой с меньшей
+    -- температурой, поэтому выбирается наименьшее из подходящих значений
+    ORDER BY 
+        calculated_lifetime ASC
+    LIMIT 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('013_fix_lifetime_interpolation', '1.0');
+
+-- Завершение транзакции
+COMMIT;
@@ -0,0 +1,50 @@
+-- Миграция 014: Таблица допустимых обозначений для заказа
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '014_order_codes') THEN
+        RAISE EXCEPTION 'Миграция 014_order_codes уже применена';
+    END IF;
+END $$;
+
+-- Все допустимые обозначения, построенные по справочникам
+-- (заполняется командой python -m database.cli order-codes --load)
+CREATE TABLE IF NOT EXISTS order_codes (
+    full_code VARCHAR(50) PRIMARY KEY,
+    type VARCHAR(50) NOT NULL,
+    size VARCHAR(10) NOT NULL,
+    body_type VARCHAR(10) NOT NULL,
+    nozzle_type VARCHAR(10),
+    quantity INTEGER NOT NULL,
+    part VARCHAR(10) NOT NULL,
+    combination VARCHAR(10) NOT NULL,
+    coating VARCHAR(10) NOT NULL,
+    heat_resistance VARCHAR(10) NOT NULL,
+    climate VARCHAR(10) NOT NULL
+);
+
+COMMENT ON TABLE order_codes IS 'Допустимые обозначения соединителей для заказа';
+
+-- Поиск обозначений по началу кода
+CREATE INDEX IF NOT EXISTS idx_order_codes_prefix
+ON order_codes (full_code varchar_pattern_ops);
+
+-- Выборка обозначений по типу и размеру
+CREATE INDEX IF NOT EXISTS idx_order_codes_type_size
+ON order_codes (type, size);
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('014_order_codes', '1.0');
+
+-- Завершение транзакции
+COMMIT;
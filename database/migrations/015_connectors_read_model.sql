@@ -0,0 +1,54 @@
+-- Миграция 015: Материализованное представление соединителей
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '015_connectors_read_model') THEN
+        RAISE EXCEPTION 'Миграция 015_connectors_read_model уже применена';
+    END IF;
+END $$;
+
+-- Плоская копия v_connectors_full: чтение соединителей не соединяет
+-- connectors с двенадцатью справочниками при каждом запросе
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_connectors_full AS
+SELECT * FROM v_connectors_full
+WITH DATA;
+
+COMMENT ON MATERIALIZED VIEW mv_connectors_full IS 'Полная информация о соединителях (материализованная копия v_connectors_full)';
+
+-- Уникальный индекс обязателен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_connectors_full_id
+ON mv_connectors_full (connector_id);
+
+-- Поиск соединителей по обозначению
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_connectors_full_code
+ON mv_connectors_full (full_code);
+
+-- Состояние материализованных представлений: момент и длительность последнего
+-- обновления и последняя запись журнала catalog_changes, учтенная обновлением
+CREATE TABLE IF NOT EXISTS materialized_view_refreshes (
+    view_name VARCHAR(100) PRIMARY KEY,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    duration_ms NUMERIC(12, 3),
+    last_change_id BIGINT NOT NULL DEFAULT 0
+);
+COMMENT ON TABLE materialized_view_refreshes IS 'Последние обновления материализованных представлений';
+
+INSERT INTO materialized_view_refreshes (view_name, last_change_id)
+SELECT 'mv_connectors_full', COALESCE(MAX(change_id), 0) FROM catalog_changes
+ON CONFLICT (view_name) DO NOTHING;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('015_connectors_read_model', '1.0');
+
+-- Завершение транзакции
+COMMIT;
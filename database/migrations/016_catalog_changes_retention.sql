@@ -0,0 +1,61 @@
+-- Миграция 016: Очистка журнала изменений каталога
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '016_catalog_changes_retention') THEN
+        RAISE EXCEPTION 'Миграция 016_catalog_changes_retention уже применена';
+    END IF;
+END $$;
+
+-- Поиск границы очистки по времени записи
+CREATE INDEX IF NOT EXISTS idx_catalog_changes_changed_at
+ON catalog_changes (changed_at);
+
+-- Удаление записей журнала старше retention. Записи, еще не учтенные
+-- материализованными представлениями (materialized_view_refreshes.last_change_id),
+-- сохраняются: по ним определяется устаревание представлений.
+-- Процессы API читают журнал каждые несколько секунд, поэтому срок хранения
+-- должен многократно превышать интервал опроса (CATALOG_POLL_INTERVAL).
+CREATE OR REPLACE FUNCTION prune_catalog_changes(retention INTERVAL)
+RETURNS INTEGER AS $$
+DECLARE
+    cutoff BIGINT;
+    view_cursor BIGINT;
+    deleted INTEGER;
+BEGIN
+    SELECT MAX(change_id) INTO cutoff
+    FROM catalog_changes
+    WHERE changed_at < CURRENT_TIMESTAMP - retention;
+
+    IF cutoff IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    IF to_regclass('materialized_view_refreshes') IS NOT NULL THEN
+        EXECUTE 'SELECT MIN(last_change_id) FROM materialized_view_refreshes' INTO view_cursor;
+        cutoff := LEAST(cutoff, COALESCE(view_cursor, cutoff));
+    END IF;
+
+    DELETE FROM catalog_changes WHERE change_id <= cutoff;
+    GET DIAGNOSTICS deleted = ROW_COUNT;
+    RETURN deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION prune_catalog_changes(INTERVAL) IS 'Удаляет записи журнала изменений каталога старше заданного срока';
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('016_catalog_changes_retention', '1.0');
+
+-- Завершение транзакции
+COMMIT;
@@ -0,0 +1,84 @@
+-- Миграция 017: Таблицы условий эксплуатации (механические и климатические факторы)
+-- Версия: 1.0
+-- Дата: 2026-10-18
+
+-- Начало транзакции
+BEGIN;
+
+-- Установка кодировки клиента UTF-8
+SET client_encoding TO 'UTF8';
+
+-- Проверка, что миграция еще не применялась
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM migrations WHERE migration_name = '017_operating_conditions') THEN
+        RAISE EXCEPTION 'Миграция 017_operating_conditions уже применена';
+    END IF;
+END $$;
+
+-- Раздел "Условия эксплуатации" расширенной карточки продукта читается из этих
+-- таблиц (api/services/static_sections.py). Раньше они создавались только
+-- скриптами из database/Zapchasti, поэтому в стандартной базе их могло не быть
+CREATE TABLE IF NOT EXISTS mechanical_factors (
+    factor_id SERIAL PRIMARY KEY,
+    factor_name VARCHAR(100),
+    parameter_name VARCHAR(100),
+    parameter_value VARCHAR(100)
+);
+COMMENT ON TABLE mechanical_factors IS 'Механические факторы условий эксплуатации';
+
+CREATE TABLE IF NOT EXISTS climate_factors (
+    factor_id SERIAL PRIMARY KEY,
+    factor_name VARCHAR(200),
+    parameter_value VARCHAR(100)
+);
+COMMENT ON TABLE climate_factors IS 'Климатические факторы условий эксплуатации';
+
+-- Начальные значения (ранее возвращались API как константы); уже заполненные таблицы не изменяются
+INSERT INTO mechanical_factors (factor_name, parameter_name, parameter_value)
+SELECT v.factor_name, v.parameter_name, v.parameter_value
+FROM (VALUES
+    (1, 'Синусоидальная вибрация', 'диапазон частот', '1 – 5 000 Гц'),
+    (2, 'Синусоидальная вибрация', 'амплитуда ускорения', '490 м/с² (50 g)'),
+    (3, 'Механический удар одиночного действия', 'пиковое ударное ускорение', '5 000 м/с² (500 g)'),
+    (4, 'Механический удар многократного действия', 'пиковое ударное ускорение', '1 000 м/с² (100 g)')
+) AS v(position, factor_name, parameter_name, parameter_value)
+WHERE NOT EXISTS (SELECT 1 FROM mechanical_factors)
+ORDER BY v.position;
+
+INSERT INTO climate_factors (factor_name, parameter_value)
+SELECT v.factor_name, v.parameter_value
+FROM (VALUES
+    (1, 'Повышенная рабочая температура среды', '100 °C'),
+    (2, 'Пониженная предельная температура среды', 'минус 60 °C'),
+    (3, 'Атмосферное пониженное рабочее давление', '1,33х10⁻⁴ Па (1х10⁻⁶ мм рт. ст.)'),
+    (4, 'Повышенная относительная влажность воздуха при температуре +40 °C (без конденсации влаги)', '98 %')
+) AS v(position, factor_name, parameter_value)
+WHERE NOT EXISTS (SELECT 1 FROM climate_factors)
+ORDER BY v.position;
+
+-- Изменения таблиц записываются в журнал (как в миграции 007, если таблиц тогда не было)
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    IF to_regproc('log_catalog_change') IS NULL THEN
+        RETURN;
+    END IF;
+    FOREACH tbl IN ARRAY ARRAY['mechanical_factors', 'climate_factors']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS log_catalog_change ON %I', tbl);
+        EXECUTE format(
+            'CREATE TRIGGER log_catalog_change
+             AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+             FOR EACH STATEMENT
+             EXECUTE FUNCTION log_catalog_change()', tbl);
+    END LOOP;
+END $$;
+
+-- Запись информации о текущей миграции
+INSERT INTO migrations (migration_name, version)
+VALUES ('017_operating_conditions', '1.0');
+
+-- Завершение транзакции
+COMMIT;
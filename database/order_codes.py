@@ -0,0 +1,256 @@
+"""
+Перечисление всех допустимых обозначений для заказа соединителей.
+Обозначения строятся по сегментам CODE_SEGMENTS из значений справочников так
+же, как функция generate_connector_code. Перебор выполняется генераторами:
+недопустимые сочетания отсекаются на уровне сегмента, где они возникают
+(размер, отсутствующий у серии типа; патрубок у некабельного корпуса), а
+независимые оставшиеся сегменты перебираются itertools.product. Полное
+декартово произведение в памяти не строится, поэтому обозначения можно
+передавать потоком или загружать в таблицу order_codes командой COPY.
+"""
+import itertools
+
+from database.connector_code import CODE_SEGMENTS
+
+# Справочные таблицы, необходимые для перечисления обозначений
+ORDER_CODE_TABLES = tuple(segment.table for segment in CODE_SEGMENTS) + (
+    "connector_series", "series_sizes", "connector_sizes",
+)
+
+# Столбцы таблицы order_codes в порядке COPY
+ORDER_CODE_COLUMNS = ("full_code",) + tuple(segment.name for segment in CODE_SEGMENTS)
+
+# Сегменты, значения которых не зависят от предыдущих
+_HEAD_SEGMENTS = ("type", "size", "body_type", "nozzle_type")
+_TAIL_SEGMENTS = tuple(segment.name for segment in CODE_SEGMENTS if segment.name not in _HEAD_SEGMENTS)
+
+_SEGMENTS = {segment.name: segment for segment in CODE_SEGMENTS}
+
+
+class UnknownSegmentValueError(ValueError):
+    """Неизвестный сегмент или значение фильтра отсутствует в справочнике сегмента"""
+
+
+def load_order_code_tables(cursor):
+    """
+    Читает справочники, необходимые для перечисления обозначений.
+
+    Args:
+        cursor: Курсор psycopg2 с RealDictCursor
+
+    Returns:
+        dict: Имя таблицы -> список строк
+    """
+    tables = {}
+    for table in ORDER_CODE_TABLES:
+        cursor.execute(f"SELECT * FROM {table} ORDER BY 1")
+        tables[table] = cursor.fetchall()
+    return tables
+
+
+class OrderCodeConfigurator:
+    """
+    Перечислитель обозначений, построенный для конкретного набора справочников.
+
+    Args:
+        tables (Mapping): Имя справочной таблицы -> последовательность строк (словарей)
+    """
+
+    def __init__(self, tables):
+        # Для каждого сегмента: коды значений в порядке справочника без повторов
+        self._values = {}
+        for segment in CODE_SEGMENTS:
+            values = []
+            for row in tables.get(segment.table, ()):
+                value = str(row[segment.column])
+                if value not in values:
+                    values.append(value)
+            self._values[segment.name] = tuple(values)
+
+        # Допустимые размеры корпуса для типа соединителя по series_sizes;
+        # тип без записей в series_sizes допускает все размеры
+        size_codes = {row["size_id"]: str(row["size_code"]) for row in tables.get("connector_sizes", ())}
+        series_types = {row["series_id"]: row["type_id"] for row in tables.get("connector_series", ())}
+        type_names = {row["type_id"]: str(row["type_name"]) for row in tables.get("connector_types", ())}
+        self._type_sizes = {}
+        for row in tables.get("series_sizes", ()):
+            type_name = type_names.get(series_types.get(row["series_id"]))
+            size = size_codes.get(row["size_id"])
+            if type_name is not None and size is not None:
+                self._type_sizes.setdefault(type_name, set()).add(size)
+
+    def values(self, segment_name):
+        """
+        Возвращает допустимые коды сегмента.
+
+        Args:
+            segment_name (str): Имя сегмента
+
+        Returns:
+            tuple: Коды значений в порядке справочника
+        """
+        return self._values[segment_name]
+
+    def _pools(self, filters):
+        """Значения сегментов с учетом фильтров"""
+        for name in filters:
+            if name not in _SEGMENTS:
+                raise UnknownSegmentValueError(
+                    f"Неизвестный сегмент '{name}', ожидается одно из: {', '.join(_SEGMENTS)}"
+                )
+        pools = {}
+        for segment in CODE_SEGMENTS:
+            values = self._values[segment.name]
+            selected = filters.get(segment.name)
+            if selected is not None:
+                selected = str(selected)
+                if selected not in values:
+                    raise UnknownSegmentValueError(
+                        f"{segment.title}: недопустимое значение '{selected}', "
+                        f"ожидается одно из: {', '.join(values) or 'нет значений в справочнике'}"
+                    )
+                values = (selected,)
+            pools[segment.name] = values
+        return pools
+
+    def _sizes(self, type_name, sizes):
+        allowed = self._type_sizes.get(type_name)
+        if allowed is None:
+            return sizes
+        return tuple(size for size in sizes if size in allowed)
+
+    def _nozzles(self, body_type, nozzles, nozzle_filter):
+        condition = _SEGMENTS["nozzle_type"].after
+        if body_type != condition[1]:
+            # Патрубок бывает только у кабельных соединителей
+            return () if nozzle_filter is not None else (None,)
+        if nozzle_filter is not None:
+            return nozzles
+        # Патрубок кабельного соединителя не обязателен
+        return (None,) + nozzles
+
+    def _heads(self, pools, filters):
+        """Перебирает допустимые сочетания типа, размера, корпуса и патрубка"""
+        for type_name in pools["type"]:
+            for size in self._sizes(type_name, pools["size"]):
+                for body_type in pools["body_type"]:
+                    for nozzle in self._nozzles(body_type, pools["nozzle_type"], filters.get("nozzle_type")):
+                        yield (type_name, size, body_type, nozzle)
+
+    def iter_components(self, filters=None):
+        """
+        Лениво перебирает допустимые обозначения.
+
+        Args:
+            filters (Mapping): Имя сегмента -> фиксированный код значения
+
+        Yields:
+            tuple: Коды сегментов в порядке CODE_SEGMENTS (None для отсутствующего патрубка)
+
+        Raises:
+            UnknownSegmentValueError: Если сегмент неизвестен или значение отсутствует в справочнике
+        """
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        pools = self._pools(filters)
+        tail_pools = [pools[name] for name in _TAIL_SEGMENTS]
+        for head in self._heads(pools, filters):
+            for tail in itertools.product(*tail_pools):
+                yield head + tail
+
+    def iter_codes(self, filters=None):
+        """
+        Лениво перебирает допустимые обозначения.
+
+        Args:
+            filters (Mapping): Имя сегмента -> фиксированный код значения
+
+        Yields:
+            str: Обозначение соединителя
+        """
+        for components in self.iter_components(filters):
+            yield "".join(value for value in components if value is not None)
+
+    def count(self, filters=None):
+        """
+        Считает допустимые обозначения без их перебора.
+
+        Args:
+            filters (Mapping): Имя сегмента -> фиксированный код значения
+
+        Returns:
+            int: Количество обозначений
+        """
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        pools = self._pools(filters)
+        tail_size = 1
+        for name in _TAIL_SEGMENTS:
+            tail_size *= len(pools[name])
+        return sum(1 for _ in self._heads(pools, filters)) * tail_size
+
+
+def _copy_field(value):
+    """Значение поля в текстовом формате COPY"""
+    if value is None:
+        return "\\N"
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+class _CopyStream:
+    """
+    Файлоподобный объект для copy_expert: строки формата COPY формируются
+    из генератора по мере чтения.
+    """
+
+    def __init__(self, rows):
+        self._lines = (
+            "\t".join(_copy_field(value) for value in row) + "\n" for row in rows
+        )
+        self._buffer = ""
+        self.rows = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+            self.rows += 1
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _order_code_rows(configurator, filters):
+    """Строки order_codes: обозначение и коды сегментов"""
+    for components in configurator.iter_components(filters):
+        yield ("".join(value for value in components if value is not None),) + components
+
+
+def copy_order_codes(conn, configurator, filters=None):
+    """
+    Заменяет содержимое таблицы order_codes перечисленными обозначениями.
+    Обозначения передаются командой COPY потоком из генератора в одной
+    транзакции: до ее завершения читатели видят прежнее содержимое.
+
+    Args:
+        conn (psycopg2.connection): Соединение с базой данных
+        configurator (OrderCodeConfigurator): Перечислитель обозначений
+        filters (Mapping): Имя сегмента -> фиксированный код значения
+
+    Returns:
+        int: Количество загруженных обозначений
+    """
+    stream = _CopyStream(_order_code_rows(configurator, filters))
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM order_codes")
+            cursor.copy_expert(
+                f"COPY order_codes ({', '.join(ORDER_CODE_COLUMNS)}) FROM STDIN",
+                stream
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return stream.rows
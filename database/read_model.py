@@ -0,0 +1,121 @@
+"""
+Материализованное представление соединителей mv_connectors_full
+(миграция 015_connectors_read_model.sql).
+Представление обновляется командой REFRESH MATERIALIZED VIEW CONCURRENTLY:
+читатели видят прежнее содержимое до завершения обновления и не
+блокируются. Каждое обновление записывается в materialized_view_refreshes
+вместе с последней учтенной записью журнала catalog_changes, поэтому
+устаревание представления определяется по журналу в любом процессе.
+Запросы модуля используются утилитой командной строки и API.
+"""
+import time
+
+from psycopg2.extras import RealDictCursor
+
+CONNECTORS_VIEW = "mv_connectors_full"
+# Обычное представление, которое читается, пока материализованное не создано
+CONNECTORS_FALLBACK_VIEW = "v_connectors_full"
+
+# Таблицы, из которых строится v_connectors_full
+CONNECTORS_VIEW_SOURCES = (
+    "connectors", "connector_types", "body_sizes", "body_types", "nozzle_types",
+    "nut_types", "contact_quantities", "connector_parts", "contact_combinations",
+    "contact_coatings", "heat_resistance", "climate_designs", "connection_types",
+)
+
+AVAILABLE_QUERY = f"SELECT to_regclass('{CONNECTORS_VIEW}') IS NOT NULL AS available"
+
+# Последняя запись журнала до обновления: изменения после нее могут не попасть в обновление
+LAST_CHANGE_QUERY = "SELECT COALESCE(MAX(change_id), 0) AS last_change_id FROM catalog_changes"
+
+REFRESH_QUERY = f"REFRESH MATERIALIZED VIEW CONCURRENTLY {CONNECTORS_VIEW}"
+
+RECORD_REFRESH_QUERY = """
+    INSERT INTO materialized_view_refreshes (view_name, refreshed_at, duration_ms, last_change_id)
+    VALUES (%(view_name)s, CURRENT_TIMESTAMP, %(duration_ms)s, %(last_change_id)s)
+    ON CONFLICT (view_name) DO UPDATE SET
+        refreshed_at = EXCLUDED.refreshed_at,
+        duration_ms = EXCLUDED.duration_ms,
+        last_change_id = GREATEST(materialized_view_refreshes.last_change_id, EXCLUDED.last_change_id)
+"""
+
+STATUS_QUERY = """
+    SELECT
+        r.refreshed_at,
+        r.duration_ms,
+        r.last_change_id,
+        pending.changes AS pending_changes,
+        pending.oldest AS stale_since,
+        EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - pending.oldest) AS stale_seconds
+    FROM materialized_view_refreshes r
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) AS changes, MIN(changed_at) AS oldest
+        FROM catalog_changes
+        WHERE change_id > r.last_change_id AND table_name = ANY(%(sources)s)
+    ) pending
+    WHERE r.view_name = %(view_name)s
+"""
+
+
+def refresh_params(duration, last_change_id):
+    """
+    Параметры RECORD_REFRESH_QUERY.
+
+    Args:
+        duration (float): Длительность обновления, с
+        last_change_id (int): Последняя запись журнала, учтенная обновлением
+
+    Returns:
+        dict: Параметры запроса
+    """
+    return {
+        "view_name": CONNECTORS_VIEW,
+        "duration_ms": round(duration * 1000, 3),
+        "last_change_id": last_change_id,
+    }
+
+
+def status_params():
+    """Параметры STATUS_QUERY"""
+    return {"view_name": CONNECTORS_VIEW, "sources": list(CONNECTORS_VIEW_SOURCES)}
+
+
+def refresh_connectors_view(conn):
+    """
+    Обновляет mv_connectors_full и записывает обновление.
+
+    Args:
+        conn (psycopg2.connection): Соединение с базой данных
+
+    Returns:
+        float: Длительность обновления, с
+    """
+    try:
+        # Курсор задается явно: у соединения может быть другая фабрика курсоров
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(LAST_CHANGE_QUERY)
+            last_change_id = cursor.fetchone()["last_change_id"]
+            started = time.perf_counter()
+            cursor.execute(REFRESH_QUERY)
+            duration = time.perf_counter() - started
+            cursor.execute(RECORD_REFRESH_QUERY, refresh_params(duration, last_change_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return duration
+
+
+def connectors_view_status(cursor):
+    """
+    Возвращает состояние mv_connectors_full.
+
+    Args:
+        cursor: Курсор psycopg2 с RealDictCursor
+
+    Returns:
+        dict: Момент и длительность последнего обновления, количество и возраст
+            изменений, не попавших в представление; None, если обновлений не было
+    """
+    cursor.execute(STATUS_QUERY, status_params())
+    return cursor.fetchone()
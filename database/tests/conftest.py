@@ -0,0 +1,24 @@
+"""
+Общие фикстуры тестов пакета database.
+Тесты, которым нужна база данных, используют фикстуру connection и
+пропускаются, если база (DB_NAME, DB_HOST, ...) недоступна.
+"""
+import psycopg2
+import pytest
+from psycopg2.extras import RealDictCursor
+
+from database.connection.db_config import CONNECTION_STRING
+
+
+@pytest.fixture
+def connection():
+    """Соединение с базой; изменения теста откатываются"""
+    try:
+        conn = psycopg2.connect(CONNECTION_STRING, connect_timeout=2, cursor_factory=RealDictCursor)
+    except psycopg2.Error:
+        pytest.skip("База данных недоступна")
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
@@ -0,0 +1,245 @@
+"""
+Тесты асинхронного пула соединений: очередь ожидания, тайм-ауты, отмена
+ожидающей корутины после передачи ей соединения или места, проверка
+простаивавших соединений и закрытие устаревших. Вместо соединений с базой
+используются заглушки.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from psycopg2 import extensions
+
+from database.connection.async_pool import AsyncConnectionPool, _PooledConnection
+from database.connection.connection_pool import PoolTimeoutError
+
+
+class FakeAsyncConnection:
+    """Заглушка асинхронного psycopg2.connection: запросы завершаются сразу"""
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = 0
+        self.broken = False
+        self.queries = []
+        self.info = SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def poll(self):
+        return extensions.POLL_OK
+
+    def isexecuting(self):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise ConnectionError("server closed the connection unexpectedly")
+        self.conn.queries.append(query)
+        if query == "ROLLBACK":
+            self.conn.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+def _pool(**options):
+    settings = dict(min_size=0, max_size=2, max_lifetime=60, max_idle=60, timeout=2, check_idle=60)
+    settings.update(options)
+    pool = AsyncConnectionPool(**settings)
+    created = []
+
+    async def connect():
+        conn = FakeAsyncConnection(len(created) + 1)
+        created.append(conn)
+        pool.stats.connections_created += 1
+        return _PooledConnection(conn)
+
+    pool._connect = connect
+    return pool, created
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+def test_connections_are_reused():
+    async def scenario():
+        pool, created = _pool()
+        conn = await pool.acquire()
+        await pool.release(conn)
+        assert await pool.acquire() is conn
+        assert len(created) == 1
+    asyncio.run(scenario())
+
+
+def test_release_rolls_back_open_transaction():
+    async def scenario():
+        pool, _ = _pool()
+        conn = await pool.acquire()
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        await pool.release(conn)
+        assert conn.queries == ["ROLLBACK"]
+        assert pool.get_stats()["idle"] == 1
+    asyncio.run(scenario())
+
+
+def test_timeout_when_pool_is_exhausted():
+    async def scenario():
+        pool, _ = _pool(max_size=1, timeout=0.05)
+        held = await pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            await pool.acquire()
+        stats = pool.get_stats()
+        assert stats["timeouts"] == 1 and stats["waiting"] == 0
+        await pool.release(held)
+        assert await pool.acquire() is held
+    asyncio.run(scenario())
+
+
+def test_waiters_are_served_in_arrival_order():
+    async def scenario():
+        pool, created = _pool(max_size=1)
+        held = await pool.acquire()
+        order = []
+
+        async def worker(number):
+            conn = await pool.acquire()
+            order.append(number)
+            await pool.release(conn)
+
+        tasks = []
+        for number in range(5):
+            tasks.append(asyncio.ensure_future(worker(number)))
+            await _until(lambda: pool.get_stats()["waiting"] == number + 1)
+        await pool.release(held)
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2, 3, 4]
+        assert len(created) == 1
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_returns_handed_over_connection():
+    async def scenario():
+        pool, created = _pool(max_size=1)
+        held = await pool.acquire()
+        task = asyncio.ensure_future(pool.acquire())
+        await _until(lambda: pool.get_stats()["waiting"] == 1)
+
+        # Соединение передано ожидающему, но запрос клиента отменен раньше,
+        # чем ожидающий успел его получить
+        await pool.release(held)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        stats = pool.get_stats()
+        assert stats["idle"] == 1 and stats["in_use"] == 0 and stats["size"] == 1
+        assert await pool.acquire() is held
+        assert len(created) == 1
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_returns_reserved_slot():
+    async def scenario():
+        pool, created = _pool(max_size=1)
+        held = await pool.acquire()
+        task = asyncio.ensure_future(pool.acquire())
+        await _until(lambda: pool.get_stats()["waiting"] == 1)
+
+        # Соединение потеряно: ожидающему передается место, но его отменяют
+        held.closed = 1
+        await pool.release(held)
+        assert pool.get_stats()["size"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert pool.get_stats()["size"] == 0
+        conn = await pool.acquire()
+        assert conn is not held and len(created) == 2
+    asyncio.run(scenario())
+
+
+def test_pool_survives_repeated_disconnects():
+    async def scenario():
+        pool, _ = _pool(max_size=2)
+
+        async def request():
+            conn = await pool.acquire()
+            try:
+                await asyncio.sleep(0)
+            finally:
+                await pool.release(conn)
+
+        for _ in range(20):
+            tasks = [asyncio.ensure_future(request()) for _ in range(6)]
+            await asyncio.sleep(0)
+            for task in tasks[::2]:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        stats = pool.get_stats()
+        assert stats["in_use"] == 0 and stats["waiting"] == 0
+        assert stats["size"] == stats["idle"] <= 2
+        held = [await pool.acquire(), await pool.acquire()]
+        assert len(set(map(id, held))) == 2
+    asyncio.run(scenario())
+
+
+def test_idle_connection_is_validated_before_checkout():
+    async def scenario():
+        pool, created = _pool(check_idle=0)
+        conn = await pool.acquire()
+        await pool.release(conn)
+        conn.broken = True
+        fresh = await pool.acquire()
+        assert fresh is not conn and conn.closed
+        assert pool.get_stats()["validations_failed"] == 1
+        assert len(created) == 2
+
+        await pool.release(fresh)
+        assert await pool.acquire() is fresh
+        assert fresh.queries == ["SELECT 1"]
+    asyncio.run(scenario())
+
+
+def test_idle_connections_above_min_size_are_closed_oldest_first():
+    async def scenario():
+        pool, _ = _pool(min_size=1, max_size=3, max_idle=0.05)
+        conns = [await pool.acquire() for _ in range(3)]
+        await pool.release(conns[0])
+        await pool.release(conns[1])
+        time.sleep(0.1)
+        await pool.release(conns[2])
+        assert [conn.closed for conn in conns] == [1, 1, 0]
+        stats = pool.get_stats()
+        assert stats["size"] == 1 and stats["idle"] == 1
+    asyncio.run(scenario())
+
+
+def test_connections_past_max_lifetime_are_replaced():
+    async def scenario():
+        pool, created = _pool(min_size=2, max_size=2, max_lifetime=0.05)
+        old = [await pool.acquire() for _ in range(2)]
+        for conn in old:
+            await pool.release(conn)
+        time.sleep(0.1)
+        conn = await pool.acquire()
+        assert conn not in old and all(c.closed for c in old)
+        assert len(created) == 3
+    asyncio.run(scenario())
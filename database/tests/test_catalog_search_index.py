@@ -0,0 +1,87 @@
+"""
+Тесты поискового индекса catalog_search (миграция 010): триггеры
+пересчитывают документы при изменении серий, их размеров и справочников.
+"""
+import pytest
+
+
+def _document(cursor, series_id):
+    cursor.execute("SELECT * FROM catalog_search WHERE series_id = %s", (series_id,))
+    return cursor.fetchone()
+
+
+def _matches(cursor, series_id, tsquery):
+    cursor.execute(
+        "SELECT document @@ to_tsquery('simple', %s) AS found FROM catalog_search WHERE series_id = %s",
+        (tsquery, series_id)
+    )
+    return cursor.fetchone()["found"]
+
+
+@pytest.fixture
+def cursor(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('catalog_search') IS NOT NULL AS available")
+        if not cursor.fetchone()["available"]:
+            pytest.skip("Миграция 010 не применена")
+        yield cursor
+
+
+def test_index_covers_all_series(cursor):
+    cursor.execute("""
+        SELECT COUNT(*) AS missing FROM connector_series cs
+        LEFT JOIN catalog_search s USING (series_id)
+        WHERE s.series_id IS NULL OR s.series_name <> cs.series_name
+    """)
+    assert cursor.fetchone()["missing"] == 0
+
+
+def test_series_insert_update_and_delete(cursor):
+    # Ключи задаются явно: базовые данные загружаются с явными ключами, и
+    # последовательности могут от них отставать
+    cursor.execute("""
+        INSERT INTO connector_series (series_id, series_name, description, type_id)
+        SELECT (SELECT MAX(series_id) + 1 FROM connector_series), '2РМТ 99', 'Опытная серия', type_id
+        FROM connector_types WHERE code = '2РМТ'
+        RETURNING series_id
+    """)
+    series_id = cursor.fetchone()["series_id"]
+    document = _document(cursor, series_id)
+    assert document["normalized_name"] == "2РМТ99"
+    assert _matches(cursor, series_id, "'2рмт99':*")
+
+    cursor.execute("UPDATE connector_series SET description = 'Серия для испытаний' WHERE series_id = %s",
+                   (series_id,))
+    assert "испытаний" in _document(cursor, series_id)["search_text"]
+
+    cursor.execute("DELETE FROM connector_series WHERE series_id = %s", (series_id,))
+    assert _document(cursor, series_id) is None
+
+
+def test_series_sizes_change_refreshes_series(cursor):
+    cursor.execute("""
+        INSERT INTO connector_sizes (size_id, size_code)
+        SELECT MAX(size_id) + 1, 99 FROM connector_sizes
+        RETURNING size_id
+    """)
+    size_id = cursor.fetchone()["size_id"]
+    cursor.execute("SELECT series_id FROM connector_series ORDER BY series_id LIMIT 1")
+    series_id = cursor.fetchone()["series_id"]
+    assert not _matches(cursor, series_id, "'99'")
+    cursor.execute(
+        "INSERT INTO series_sizes (id, series_id, size_id) SELECT MAX(id) + 1, %s, %s FROM series_sizes",
+        (series_id, size_id)
+    )
+    assert _matches(cursor, series_id, "'99'")
+    cursor.execute("DELETE FROM series_sizes WHERE size_id = %s", (size_id,))
+    assert not _matches(cursor, series_id, "'99'")
+
+
+def test_dictionary_change_refreshes_catalog(cursor):
+    cursor.execute("SELECT type_id, code FROM connector_types ORDER BY type_id LIMIT 1")
+    connector_type = cursor.fetchone()
+    cursor.execute("UPDATE connector_types SET type_name = 'Опытный тип' WHERE type_id = %s",
+                   (connector_type["type_id"],))
+    cursor.execute("SELECT series_id FROM connector_series WHERE type_id = %s", (connector_type["type_id"],))
+    for row in cursor.fetchall():
+        assert _matches(cursor, row["series_id"], "'опытный' & 'тип'")
@@ -0,0 +1,271 @@
+"""
+Тесты синхронного пула соединений: очередь ожидания (FIFO), передача
+соединения и места ожидающим, тайм-ауты, проверка простаивавших соединений
+и закрытие устаревших. Вместо соединений с базой используются заглушки.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from psycopg2 import extensions
+
+from database.connection.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Заглушка psycopg2.connection с тем, что использует пул"""
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = 0
+        self.autocommit = False
+        self.broken = False
+        self.rollbacks = 0
+        self.info = SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query):
+        if self.conn.broken:
+            raise ConnectionError("server closed the connection unexpectedly")
+
+
+class Factory:
+    """Фабрика соединений-заглушек с учетом созданных соединений"""
+
+    def __init__(self):
+        self.created = []
+        self.fail = 0
+
+    def __call__(self):
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("connection refused")
+        conn = FakeConnection(len(self.created) + 1)
+        self.created.append(conn)
+        return conn
+
+
+def _pool(**options):
+    factory = Factory()
+    settings = dict(min_connections=0, max_connections=2, max_lifetime=60, max_idle=60,
+                    timeout=2, check_idle=60)
+    settings.update(options)
+    return ConnectionPool(connection_factory=factory, **settings), factory
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнено"
+        time.sleep(0.001)
+
+
+def test_connections_are_created_lazily_and_reused():
+    pool, factory = _pool()
+    assert not factory.created
+    conn = pool.get_connection()
+    pool.release_connection(conn)
+    assert pool.get_connection() is conn
+    assert len(factory.created) == 1
+    assert pool.get_stats()["in_use"] == 1
+
+
+def test_release_rolls_back_open_transaction():
+    pool, _ = _pool()
+    conn = pool.get_connection()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    conn.autocommit = True
+    pool.release_connection(conn)
+    assert conn.rollbacks == 1 and conn.autocommit is False
+    assert pool.get_stats()["idle"] == 1
+
+
+def test_timeout_when_pool_is_exhausted():
+    pool, _ = _pool(max_connections=1, timeout=0.05)
+    held = pool.get_connection()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.get_connection()
+    assert time.monotonic() - started >= 0.05
+    stats = pool.get_stats()
+    assert stats["timeouts"] == 1 and stats["waiting"] == 0
+    pool.release_connection(held)
+    assert pool.get_connection() is held
+
+
+def test_waiters_are_served_in_arrival_order():
+    pool, factory = _pool(max_connections=1)
+    held = pool.get_connection()
+    order = []
+
+    def worker(number):
+        conn = pool.get_connection()
+        order.append(number)
+        pool.release_connection(conn)
+
+    threads = []
+    for number in range(5):
+        thread = threading.Thread(target=worker, args=(number,))
+        thread.start()
+        threads.append(thread)
+        # Следующий поток встает в очередь только после предыдущего
+        _wait_for(lambda: pool.get_stats()["waiting"] == number + 1)
+
+    pool.release_connection(held)
+    for thread in threads:
+        thread.join(2)
+    assert order == [0, 1, 2, 3, 4]
+    assert len(factory.created) == 1
+    stats = pool.get_stats()
+    assert stats["waits"] == 5 and stats["waiting"] == 0
+
+
+def test_concurrent_checkouts_never_exceed_max_size():
+    pool, factory = _pool(max_connections=3)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            conn = pool.get_connection()
+            with lock:
+                active.append(conn)
+                peak.append(len(active))
+            time.sleep(0.0005)
+            with lock:
+                active.remove(conn)
+            pool.release_connection(conn)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert max(peak) <= 3
+    assert len(factory.created) <= 3
+    stats = pool.get_stats()
+    assert stats["checkouts"] == 400 and stats["in_use"] == 0
+
+
+def test_discarded_connection_passes_slot_to_waiter():
+    pool, factory = _pool(max_connections=1)
+    held = pool.get_connection()
+    received = []
+    thread = threading.Thread(target=lambda: received.append(pool.get_connection()))
+    thread.start()
+    _wait_for(lambda: pool.get_stats()["waiting"] == 1)
+
+    # Соединение потеряно: пул закрывает его и отдает место ожидающему
+    held.closed = 1
+    pool.release_connection(held)
+    thread.join(2)
+    assert received and received[0] is not held
+    assert len(factory.created) == 2
+    assert pool.get_stats()["size"] == 1
+
+
+def test_failed_connect_releases_reserved_slot():
+    pool, factory = _pool(max_connections=1)
+    factory.fail = 1
+    with pytest.raises(ConnectionError):
+        pool.get_connection()
+    assert pool.get_stats()["size"] == 0
+    assert pool.get_connection() is factory.created[0]
+
+
+def test_idle_connection_is_validated_before_checkout():
+    pool, factory = _pool(check_idle=0)
+    conn = pool.get_connection()
+    pool.release_connection(conn)
+    # Сервер закрыл соединение, пока оно простаивало
+    conn.broken = True
+    fresh = pool.get_connection()
+    assert fresh is not conn and conn.closed
+    assert pool.get_stats()["validations_failed"] == 1
+    assert len(factory.created) == 2
+
+
+def test_idle_connections_above_min_size_are_closed_oldest_first():
+    pool, factory = _pool(min_connections=1, max_connections=3, max_idle=0.05)
+    first, second, third = (pool.get_connection() for _ in range(3))
+    pool.release_connection(first)
+    pool.release_connection(second)
+    time.sleep(0.1)
+    # Последнее возвращенное соединение выдается первым, а давно простаивающие
+    # внизу очереди закрываются при возврате, до min_connections
+    pool.release_connection(third)
+    assert first.closed and second.closed and not third.closed
+    stats = pool.get_stats()
+    assert stats["size"] == 1 and stats["idle"] == 1
+    assert pool.get_connection() is third
+    assert len(factory.created) == 3
+
+
+def test_pool_shrinks_to_min_size_on_checkout():
+    pool, _ = _pool(min_connections=1, max_connections=3, max_idle=0.05)
+    conns = [pool.get_connection() for _ in range(3)]
+    for conn in conns:
+        pool.release_connection(conn)
+    time.sleep(0.1)
+    conn = pool.get_connection()
+    assert conn is conns[-1]
+    assert [c.closed for c in conns] == [1, 1, 0]
+    assert pool.get_stats()["size"] == 1
+
+
+def test_connections_past_max_lifetime_are_replaced():
+    pool, factory = _pool(min_connections=2, max_connections=2, max_lifetime=0.05)
+    old = [pool.get_connection() for _ in range(2)]
+    for conn in old:
+        pool.release_connection(conn)
+    time.sleep(0.1)
+    # Срок жизни не зависит от min_connections: закрываются и соединения внизу очереди
+    conn = pool.get_connection()
+    assert conn not in old
+    assert all(c.closed for c in old)
+    assert len(factory.created) == 3
+
+
+def test_close_all_wakes_waiters():
+    pool, _ = _pool(max_connections=1)
+    held = pool.get_connection()
+    errors = []
+
+    def worker():
+        try:
+            pool.get_connection()
+        except ConnectionError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    _wait_for(lambda: pool.get_stats()["waiting"] == 1)
+    pool.close_all()
+    thread.join(2)
+    assert len(errors) == 1
+    # Занятое соединение закрывается при возврате
+    pool.release_connection(held)
+    assert held.closed
+    assert pool.get_stats()["size"] == 0
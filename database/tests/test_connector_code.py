@@ -0,0 +1,133 @@
+"""
+Тесты разборщика обозначений соединителей: нормализация ввода, сегменты с
+буквами в нижнем регистре (патрубок "Пс") и совпадение результатов с функцией
+parse_connector_code (database/functions/01_connector_functions.sql).
+"""
+import pytest
+
+from database.connector_code import CODE_SEGMENTS, ConnectorCodeParser, normalize_connector_code
+
+TABLES = {
+    "connector_types": [
+        {"type_name": "2РМТ", "description": "Соединители типа 2РМТ"},
+        {"type_name": "2РМДТ", "description": "Соединители типа 2РМДТ"},
+    ],
+    "body_sizes": [{"size_value": "14"}, {"size_value": "18"}, {"size_value": "22"}],
+    "body_types": [{"code": "Б", "name": "блочный"}, {"code": "К", "name": "кабельный"}],
+    "nozzle_types": [
+        {"code": "П", "name": "прямой"}, {"code": "Пс", "name": "прямой с экраном"},
+        {"code": "У", "name": "угловой"},
+    ],
+    "contact_quantities": [{"quantity": 4}, {"quantity": 7}, {"quantity": 10}],
+    "connector_parts": [{"code": "Ш", "name": "вилка"}, {"code": "Г", "name": "розетка"}],
+    "contact_combinations": [{"code": "1", "description": "все контакты 1,0"}],
+    "contact_coatings": [{"code": "В", "material": "золото"}, {"code": "А", "material": "серебро"}],
+    "heat_resistance": [{"code": "1", "temperature": 100}, {"code": "В", "temperature": 200}],
+    "climate_designs": [{"code": "В", "description": "Всеклиматическое"}],
+}
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return ConnectorCodeParser(TABLES)
+
+
+def _values(result):
+    return {component["name"]: component["value"] for component in result["components"]}
+
+
+def test_normalize_connector_code():
+    assert normalize_connector_code(" 2pmt 18 kп ") == "2РМТ18КП"
+    assert normalize_connector_code("2РМДТ22Б10Г1А1В") == "2РМДТ22Б10Г1А1В"
+
+
+def test_parse_full_code(parser):
+    result = parser.parse("2РМТ18Б7Ш1В1В")
+    assert result["valid"] and not result["errors"]
+    assert _values(result) == {
+        "type": "2РМТ", "size": "18", "body_type": "Б", "quantity": "7", "part": "Ш",
+        "combination": "1", "coating": "В", "heat_resistance": "1", "climate": "В",
+    }
+    assert result["components"][0]["description"] == "Соединители типа 2РМТ"
+
+
+def test_nozzle_code_with_lowercase_letter(parser):
+    for code in ("2РМТ18КПс7Ш1В1В", "2РМТ18КПС7Ш1В1В", "2рмт18кпс7ш1в1в"):
+        result = parser.parse(code)
+        assert result["valid"], code
+        # Значение сегмента возвращается в виде кода справочника
+        assert _values(result)["nozzle_type"] == "Пс"
+        assert result["normalized_code"] == "2РМТ18КПС7Ш1В1В"
+    assert _values(parser.parse("2РМТ18КП7Ш1В1В"))["nozzle_type"] == "П"
+
+
+def test_latin_homoglyphs(parser):
+    result = parser.parse("2PMT18KП7Ш1B1B")
+    assert result["valid"]
+    assert _values(result)["body_type"] == "К"
+
+
+def test_nozzle_only_after_cable_body(parser):
+    result = parser.parse("2РМТ18БПс7Ш1В1В")
+    assert not result["valid"]
+    assert [component["name"] for component in result["components"]] == ["type", "size", "body_type"]
+    assert result["errors"][0].startswith("Количество контактов")
+
+
+def test_optional_segments(parser):
+    values = _values(parser.parse("2РМДТ22Б10Г А1"))
+    assert "combination" not in values and "climate" not in values
+    assert values["coating"] == "А"
+
+
+def test_invalid_code_reports_segment(parser):
+    result = parser.parse("2РМТ16Б7Ш1В1В")
+    assert not result["valid"]
+    assert result["errors"] == [
+        "Размер корпуса: недопустимое значение '16Б' в позиции 5, ожидается одно из: 14, 18, 22"
+    ]
+    trailing = parser.parse("2РМТ18Б7Ш1В1ВХ")
+    assert trailing["errors"] == ["Лишние символы 'Х' в позиции 14"]
+
+
+def test_build_round_trip(parser):
+    for code in ("2РМТ18КПс7Ш1В1В", "2РМДТ22Б10Г1А1"):
+        assert parser.build(_values(parser.parse(code))) == code
+
+
+def _load_tables(cursor):
+    tables = {}
+    for segment in CODE_SEGMENTS:
+        cursor.execute(f"SELECT * FROM {segment.table}")
+        tables[segment.table] = cursor.fetchall()
+    return tables
+
+
+def _sql_parse(cursor, code):
+    cursor.execute("SELECT component_name, component_value FROM parse_connector_code(%s)", (code,))
+    return [(row["component_name"], row["component_value"]) for row in cursor.fetchall()]
+
+
+def test_matches_sql_function(connection):
+    with connection.cursor() as cursor:
+        # Патрубок "Пс" принимается функцией, но может отсутствовать в справочнике
+        cursor.execute("""
+            INSERT INTO nozzle_types (name, code)
+            SELECT 'прямой с экраном', 'Пс'
+            WHERE NOT EXISTS (SELECT 1 FROM nozzle_types WHERE code = 'Пс')
+        """)
+        parser = ConnectorCodeParser(_load_tables(cursor))
+        cases = {
+            "2РМТ18Б7Ш1В1В": "2РМТ18Б7Ш1В1В",
+            "2РМТ18КПс7Ш1В1В": "2РМТ18КПс7Ш1В1В",
+            "2РМТ18КП7Ш1В1В": "2РМТ18КП7Ш1В1В",
+            "2РМДТ18КУ4Г5А1В": "2РМДТ18КУ4Г5А1В",
+            # Ввод в нижнем регистре и с латинскими буквами
+            "2рмт18кпс7ш1в1в": "2РМТ18КПс7Ш1В1В",
+            "2PMT22KП10Ш1A1": "2РМТ22КП10Ш1А1",
+        }
+        for code, canonical in cases.items():
+            result = parser.parse(code)
+            assert result["valid"], (code, result["errors"])
+            parsed = [(component["title"], component["value"]) for component in result["components"]]
+            assert parsed == _sql_parse(cursor, canonical), code
@@ -0,0 +1,133 @@
+"""
+Тесты векторизованного расчета наработки по температуре: приведение к
+INTEGER, интерполяция с целочисленным делением PostgreSQL и выбор
+наименьшего значения по кривой. Эталоном служит построчный расчет по
+формуле calculate_lifetime_at_temperature (миграция 013).
+Тесты не обращаются к базе данных.
+"""
+import numpy as np
+
+from database.lifetime_curve import LifetimeCurve, to_sql_integer
+
+# Точки кривой из базовых данных connector_lifetime_by_temperature
+CURVE_ROWS = [
+    {"max_temperature": temperature, "lifetime_hours": lifetime}
+    for temperature, lifetime in (
+        (75, 100000), (79, 80000), (84, 50000), (88, 40000), (92, 30000),
+        (94, 25000), (96, 20000), (100, 15000), (105, 10000), (113, 7500),
+        (120, 5000), (125, 3000), (150, 1000),
+    )
+]
+
+
+def _sql_div(numerator, denominator):
+    """Целочисленное деление PostgreSQL: дробная часть отбрасывается"""
+    quotient = abs(numerator) // abs(denominator)
+    return quotient if (numerator >= 0) == (denominator > 0) else -quotient
+
+
+def _reference_lifetime(rows, temperature):
+    """Построчный расчет calculate_lifetime_at_temperature для целой температуры"""
+    rows = sorted(rows, key=lambda row: row["max_temperature"], reverse=True)
+    candidates = []
+    for position, row in enumerate(rows):
+        lifetime, max_temperature = row["lifetime_hours"], row["max_temperature"]
+        if temperature >= max_temperature:
+            candidates.append(lifetime)
+        elif position + 1 < len(rows) and temperature >= rows[position + 1]["max_temperature"]:
+            next_row = rows[position + 1]
+            candidates.append(lifetime - _sql_div(
+                (lifetime - next_row["lifetime_hours"]) * (max_temperature - temperature),
+                max_temperature - next_row["max_temperature"],
+            ))
+    return min(candidates) if candidates else None
+
+
+def _assert_matches_reference(rows, temperatures):
+    lifetimes, defined = LifetimeCurve(rows).evaluate(temperatures)
+    for temperature, lifetime, is_defined in zip(to_sql_integer(temperatures), lifetimes, defined):
+        expected = _reference_lifetime(rows, int(temperature))
+        if expected is None:
+            assert not is_defined, temperature
+        else:
+            assert is_defined and lifetime == expected, (temperature, lifetime, expected)
+
+
+def test_to_sql_integer_rounds_half_away_from_zero():
+    values = [0.5, 1.5, 2.5, -0.5, -1.5, -2.5, 2.4999, -2.4999, 7.0]
+    assert to_sql_integer(values).tolist() == [1, 2, 3, -1, -2, -3, 2, -2, 7]
+    assert to_sql_integer(values).dtype == np.int64
+
+
+def test_curve_points_return_their_lifetime():
+    temperatures = [row["max_temperature"] for row in CURVE_ROWS]
+    lifetimes, defined = LifetimeCurve(CURVE_ROWS).evaluate(temperatures)
+    assert defined.all()
+    assert lifetimes.tolist() == [row["lifetime_hours"] for row in CURVE_ROWS]
+
+
+def test_interpolation_truncates_division():
+    # 50000 - (50000 - 80000) * (84 - 80) / (84 - 79) = 74000
+    # 40000 - (40000 - 50000) * (88 - 85) / (88 - 84) = 47500
+    # 5000 - (5000 - 7500) * (120 - 114) / (120 - 113) = 5000 - (-2142,86 -> -2142) = 7142
+    # 1000 - (1000 - 3000) * (150 - 149) / (150 - 125) = 1080
+    lifetimes, _ = LifetimeCurve(CURVE_ROWS).evaluate([80, 85, 114, 149])
+    assert lifetimes.tolist() == [74000, 47500, 7142, 1080]
+
+
+def test_lifetime_is_limited_by_lower_temperature_points():
+    rows = [
+        {"max_temperature": 60, "lifetime_hours": 500},
+        {"max_temperature": 70, "lifetime_hours": 900},
+        {"max_temperature": 80, "lifetime_hours": 400},
+        {"max_temperature": 90, "lifetime_hours": 800},
+    ]
+    lifetimes, defined = LifetimeCurve(rows).evaluate([65, 70, 85, 95])
+    assert defined.all()
+    assert lifetimes.tolist() == [500, 500, 400, 400]
+
+
+def test_below_first_point_is_undefined():
+    lifetimes, defined = LifetimeCurve(CURVE_ROWS).evaluate([-40, 74, 74.4, 74.5, 200])
+    assert defined.tolist() == [False, False, False, True, True]
+    assert lifetimes.tolist() == [0, 0, 0, 100000, 1000]
+
+
+def test_fractional_temperatures_are_rounded_before_lookup():
+    curve = LifetimeCurve(CURVE_ROWS)
+    rounded, _ = curve.evaluate([79.5, 83.5, 99.49])
+    exact, _ = curve.evaluate([80, 84, 99])
+    assert rounded.tolist() == exact.tolist()
+
+
+def test_matches_reference_on_monotonic_curve():
+    _assert_matches_reference(CURVE_ROWS, np.arange(60, 170, 0.5))
+
+
+def test_matches_reference_on_irregular_curve():
+    rows = [
+        {"max_temperature": 105, "lifetime_hours": 1200},
+        {"max_temperature": -20, "lifetime_hours": 3000},
+        {"max_temperature": 40, "lifetime_hours": 7000},
+        {"max_temperature": 55, "lifetime_hours": 2500},
+        {"max_temperature": 85, "lifetime_hours": 2600},
+    ]
+    _assert_matches_reference(rows, np.arange(-30, 120, 0.5))
+
+
+def test_unsorted_rows_are_sorted_by_temperature():
+    curve = LifetimeCurve(list(reversed(CURVE_ROWS)))
+    assert curve.temperatures.tolist() == sorted(row["max_temperature"] for row in CURVE_ROWS)
+    assert len(curve) == len(CURVE_ROWS)
+
+
+def test_empty_curve_is_undefined():
+    lifetimes, defined = LifetimeCurve([]).evaluate([20, 80])
+    assert lifetimes.tolist() == [0, 0]
+    assert defined.tolist() == [False, False]
+
+
+def test_evaluate_keeps_input_shape():
+    lifetimes, defined = LifetimeCurve(CURVE_ROWS).evaluate(np.array([[75, 80], [150, 10]]))
+    assert lifetimes.shape == defined.shape == (2, 2)
+    assert lifetimes.tolist() == [[100000, 74000], [1000, 0]]
@@ -0,0 +1,160 @@
+"""
+Тесты перечисления обозначений для заказа: отсечение размеров, которых нет
+у серии типа, патрубок только у кабельного корпуса, фильтры по сегментам,
+подсчет без перебора и загрузка в таблицу order_codes командой COPY.
+"""
+import itertools
+
+import pytest
+
+from database.connector_code import ConnectorCodeParser
+from database.order_codes import (
+    ORDER_CODE_COLUMNS, OrderCodeConfigurator, UnknownSegmentValueError, _CopyStream,
+    copy_order_codes, load_order_code_tables,
+)
+
+TABLES = {
+    "connector_types": [
+        {"type_id": 1, "type_name": "2РМТ"},
+        {"type_id": 2, "type_name": "2РМДТ"},
+        {"type_id": 3, "type_name": "2РМГ"},
+    ],
+    "body_sizes": [{"size_value": "14"}, {"size_value": "18"}, {"size_value": "22"}],
+    "body_types": [{"code": "Б"}, {"code": "К"}],
+    "nozzle_types": [{"code": "П"}, {"code": "Пс"}, {"code": "У"}],
+    "contact_quantities": [{"quantity": 4}, {"quantity": 7}],
+    "connector_parts": [{"code": "Ш"}, {"code": "Г"}],
+    "contact_combinations": [{"code": "1"}, {"code": "5"}],
+    "contact_coatings": [{"code": "В"}],
+    "heat_resistance": [{"code": "1"}],
+    "climate_designs": [{"code": "В"}],
+    "connector_series": [{"series_id": 5, "type_id": 1}, {"series_id": 6, "type_id": 2}],
+    "connector_sizes": [{"size_id": 1, "size_code": "14"}, {"size_id": 2, "size_code": "18"}],
+    # 2РМТ выпускается размерами 14 и 18, 2РМДТ — только 18; у 2РМГ ограничений нет
+    "series_sizes": [
+        {"series_id": 5, "size_id": 1}, {"series_id": 5, "size_id": 2}, {"series_id": 6, "size_id": 2},
+    ],
+}
+
+# Независимые сегменты после патрубка: количество, часть, сочетание
+TAIL = 2 * 2 * 2
+
+
+@pytest.fixture(scope="module")
+def configurator():
+    return OrderCodeConfigurator(TABLES)
+
+
+def _heads(configurator, filters=None):
+    return sorted({components[:4] for components in configurator.iter_components(filters)},
+                  key=lambda head: tuple(value or "" for value in head))
+
+
+def test_sizes_are_limited_by_series(configurator):
+    sizes = {}
+    for type_name, size, _, _ in _heads(configurator):
+        sizes.setdefault(type_name, set()).add(size)
+    assert sizes == {"2РМТ": {"14", "18"}, "2РМДТ": {"18"}, "2РМГ": {"14", "18", "22"}}
+
+
+def test_nozzle_only_for_cable_body(configurator):
+    heads = _heads(configurator, {"type": "2РМДТ"})
+    assert heads == [
+        ("2РМДТ", "18", "Б", None),
+        ("2РМДТ", "18", "К", None),
+        ("2РМДТ", "18", "К", "П"),
+        ("2РМДТ", "18", "К", "Пс"),
+        ("2РМДТ", "18", "К", "У"),
+    ]
+    # Фильтр по патрубку исключает блочный корпус
+    assert {head[2] for head in _heads(configurator, {"nozzle_type": "У"})} == {"К"}
+    assert configurator.count({"body_type": "Б", "nozzle_type": "П"}) == 0
+
+
+def test_count_matches_enumeration(configurator):
+    cases = [
+        None, {"type": "2РМТ"}, {"type": "2РМДТ", "size": "14"}, {"body_type": "К"},
+        {"nozzle_type": "Пс", "part": "Г"}, {"quantity": 7, "type": None},
+    ]
+    for filters in cases:
+        codes = list(configurator.iter_codes(filters))
+        assert configurator.count(filters) == len(codes) == len(set(codes)), filters
+    # (2 + 1 + 3 размера) * (1 блочный + 4 варианта кабельного) * TAIL
+    assert configurator.count() == 6 * 5 * TAIL
+
+
+def test_codes_are_valid_and_parse_back(configurator):
+    parser = ConnectorCodeParser(TABLES)
+    names = ORDER_CODE_COLUMNS[1:]
+    for components in itertools.islice(configurator.iter_components(), 0, None, 7):
+        code = "".join(value for value in components if value is not None)
+        result = parser.parse(code)
+        assert result["valid"], (code, result["errors"])
+        parsed = {component["name"]: component["value"] for component in result["components"]}
+        expected = {name: value for name, value in zip(names, components) if value is not None}
+        assert parsed == expected
+
+
+def test_enumeration_is_lazy():
+    tables = dict(TABLES, contact_quantities=[{"quantity": number} for number in range(1000)],
+                  contact_combinations=[{"code": str(number)} for number in range(1000)])
+    configurator = OrderCodeConfigurator(tables)
+    assert configurator.count() == 6 * 5 * 2 * 1000 * 1000
+    first = next(configurator.iter_codes())
+    assert first == "2РМТ14Б0Ш0В1В"
+
+
+def test_unknown_segment_or_value(configurator):
+    with pytest.raises(UnknownSegmentValueError, match="Неизвестный сегмент 'color'"):
+        configurator.count({"color": "red"})
+    with pytest.raises(UnknownSegmentValueError, match="Размер корпуса: недопустимое значение '16'"):
+        list(configurator.iter_codes({"size": "16"}))
+
+
+def test_copy_stream_escapes_fields():
+    stream = _CopyStream(iter([("a\tb", None), ("c\\d", "e\nf")]))
+    chunks = []
+    while True:
+        chunk = stream.read(3)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    assert "".join(chunks) == "a\\tb\t\\N\nc\\\\d\te\\nf\n"
+    assert stream.rows == 2
+
+
+class TransactionConnection:
+    """Соединение теста: commit не выполняется, чтобы фикстура откатила изменения"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.commits = 0
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self._conn.rollback()
+
+
+def test_copy_order_codes(connection):
+    with connection.cursor() as cursor:
+        configurator = OrderCodeConfigurator(load_order_code_tables(cursor))
+        conn = TransactionConnection(connection)
+        rows = copy_order_codes(conn, configurator, {"type": "2РМТ", "size": "18"})
+        assert rows == configurator.count({"type": "2РМТ", "size": "18"}) > 0
+        assert conn.commits == 1
+        cursor.execute("""
+            SELECT COUNT(*) AS codes, COUNT(nozzle_type) AS with_nozzle,
+                   COUNT(*) FILTER (WHERE body_type <> 'К' AND nozzle_type IS NOT NULL) AS invalid,
+                   COUNT(*) FILTER (WHERE type <> '2РМТ' OR size <> '18') AS other
+            FROM order_codes
+        """)
+        stats = cursor.fetchone()
+        assert stats["codes"] == rows and stats["with_nozzle"] > 0
+        assert stats["invalid"] == stats["other"] == 0
+        cursor.execute("SELECT full_code FROM order_codes ORDER BY full_code LIMIT 1")
+        assert cursor.fetchone()["full_code"].startswith("2РМТ18")
@@ -0,0 +1,70 @@
+"""
+Тесты материализованного представления соединителей: совпадение с
+v_connectors_full, устаревание по журналу catalog_changes и обновление
+с записью последней учтенной записи журнала.
+"""
+import pytest
+
+from database.read_model import CONNECTORS_VIEW, connectors_view_status, refresh_connectors_view
+
+
+class TransactionConnection:
+    """Соединение теста: commit не выполняется, чтобы фикстура откатила изменения"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.commits = 0
+
+    def cursor(self, **options):
+        return self._conn.cursor(**options)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self._conn.rollback()
+
+
+@pytest.fixture
+def cursor(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL AS available", (CONNECTORS_VIEW,))
+        if not cursor.fetchone()["available"]:
+            pytest.skip("Миграция 015 не применена")
+        yield cursor
+
+
+def _difference(cursor):
+    cursor.execute(f"""
+        SELECT COUNT(*) AS rows FROM (
+            (SELECT * FROM v_connectors_full EXCEPT ALL SELECT * FROM {CONNECTORS_VIEW})
+            UNION ALL
+            (SELECT * FROM {CONNECTORS_VIEW} EXCEPT ALL SELECT * FROM v_connectors_full)
+        ) difference
+    """)
+    return cursor.fetchone()["rows"]
+
+
+def test_refresh_applies_pending_changes(connection, cursor):
+    conn = TransactionConnection(connection)
+    refresh_connectors_view(conn)
+    assert _difference(cursor) == 0
+    assert connectors_view_status(cursor)["pending_changes"] == 0
+
+    cursor.execute("UPDATE connectors SET gost = 'ГОСТ тест' WHERE connector_id = 1")
+    # Изменение таблицы, из которой представление не строится, не делает его устаревшим
+    cursor.execute("UPDATE contact_max_current SET max_current = max_current")
+    status = connectors_view_status(cursor)
+    assert status["pending_changes"] == 1 and status["stale_seconds"] is not None
+    assert _difference(cursor) == 2
+
+    duration = refresh_connectors_view(conn)
+    assert duration >= 0 and conn.commits == 2
+    assert _difference(cursor) == 0
+    cursor.execute(f"SELECT gost FROM {CONNECTORS_VIEW} WHERE connector_id = 1")
+    assert cursor.fetchone()["gost"] == "ГОСТ тест"
+
+    status = connectors_view_status(cursor)
+    cursor.execute("SELECT MAX(change_id) AS change_id FROM catalog_changes")
+    assert status["last_change_id"] == cursor.fetchone()["change_id"]
+    assert status["pending_changes"] == 0 and status["duration_ms"] is not None
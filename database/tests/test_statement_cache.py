@@ -0,0 +1,194 @@
+"""
+Тесты кэша подготовленных выражений: преобразование плейсхолдеров,
+вытеснение (LRU, DEALLOCATE) и подготовка внутри транзакции.
+Тесты не обращаются к базе данных.
+"""
+from types import SimpleNamespace
+
+import pytest
+from psycopg2 import extensions
+
+from database.connection import statement_cache
+from database.connection.statement_cache import (
+    StatementCache, _convert_placeholders, fingerprint_query, prepare_wrapped_sql
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_unpreparable(monkeypatch):
+    """Список неподготавливаемых запросов общий для процесса: каждый тест начинает с пустого"""
+    monkeypatch.setattr(statement_cache, "_unpreparable", set())
+
+
+def _prepare(cache, query, params=None):
+    """Выполняет запрос через кэш до подготовки и отмечает выражение подготовленным"""
+    prepared = cache.plan(query, params)
+    while prepared.prepare_sql is None and prepared.name is None:
+        prepared = cache.plan(query, params)
+    if prepared.prepare_sql is not None:
+        cache.mark_prepared(prepared)
+    return prepared
+
+
+def test_positional_placeholders():
+    assert _convert_placeholders("SELECT * FROM t WHERE a = %s AND b = %s", (1, 2)) == \
+        "SELECT * FROM t WHERE a = $1 AND b = $2"
+
+
+def test_named_placeholders_reuse_parameter_number():
+    converted = _convert_placeholders(
+        "SELECT * FROM t WHERE a = %(a)s AND b = %(b)s OR c = %(a)s", {"a": 1, "b": 2}
+    )
+    assert converted == "SELECT * FROM t WHERE a = $1 AND b = $2 OR c = $1"
+
+
+def test_mixed_named_and_positional_placeholders_are_not_prepared():
+    query = "SELECT * FROM t WHERE a = %s AND b = %(b)s"
+    assert _convert_placeholders(query, (1,)) is None
+    assert _convert_placeholders(query, {"b": 1}) is None
+
+
+def test_escaped_percent():
+    converted = _convert_placeholders("SELECT * FROM t WHERE name LIKE '2РМТ%%' AND id = %s", (1,))
+    assert converted == "SELECT * FROM t WHERE name LIKE '2РМТ%' AND id = $1"
+
+
+def test_escaped_percent_only_is_not_prepared():
+    # Без параметров плейсхолдеров нет: такой запрос выполняется без подготовки
+    assert _convert_placeholders("SELECT '100%%'", ()) is None
+
+
+def test_tuple_parameters_are_not_prepared():
+    assert _convert_placeholders("SELECT * FROM t WHERE id IN %s", ((1, 2, 3),)) is None
+    assert _convert_placeholders("SELECT * FROM t WHERE id IN %(ids)s", {"ids": (1, 2)}) is None
+
+
+def test_list_parameters_are_prepared():
+    # Список передается psycopg2 как массив и соответствует одному параметру
+    assert _convert_placeholders("SELECT * FROM t WHERE id = ANY(%s)", ([1, 2],)) == \
+        "SELECT * FROM t WHERE id = ANY($1)"
+
+
+def test_parameter_mismatch_is_not_prepared():
+    assert _convert_placeholders("SELECT * FROM t WHERE a = %s AND b = %s", (1,)) is None
+    assert _convert_placeholders("SELECT * FROM t WHERE a = %(a)s", {"b": 1}) is None
+    assert _convert_placeholders("SELECT * FROM t WHERE a = %(a)s", (1,)) is None
+
+
+def test_fingerprint_ignores_whitespace():
+    assert fingerprint_query("SELECT  *\n FROM t") == fingerprint_query("SELECT * FROM t")
+    assert fingerprint_query("SELECT * FROM t") != fingerprint_query("SELECT * FROM u")
+
+
+def test_query_is_prepared_after_threshold():
+    cache = StatementCache(max_size=10, threshold=2)
+    query = "SELECT * FROM t WHERE id = %s"
+
+    first = cache.plan(query, (1,))
+    assert first.prepare_sql is None and first.name is None
+    assert first.query == query
+
+    second = cache.plan(query, (2,))
+    assert second.prepare_sql == "PREPARE iset_ps_1 AS SELECT * FROM t WHERE id = $1"
+    assert second.query == "EXECUTE iset_ps_1 (%s)"
+    assert second.params == (2,)
+    cache.mark_prepared(second)
+
+    third = cache.plan(query, (3,))
+    assert third.prepare_sql is None
+    assert third.query == "EXECUTE iset_ps_1 (%s)"
+    assert len(cache) == 1
+
+
+def test_named_parameters_execute():
+    cache = StatementCache(max_size=10, threshold=1)
+    prepared = cache.plan("SELECT * FROM t WHERE b = %(b)s AND a = %(a)s OR c = %(b)s", {"a": 1, "b": 2})
+    assert prepared.prepare_sql == "PREPARE iset_ps_1 AS SELECT * FROM t WHERE b = $1 AND a = $2 OR c = $1"
+    assert prepared.query == "EXECUTE iset_ps_1 (%(b)s, %(a)s)"
+
+
+def test_only_single_read_queries_are_cached():
+    cache = StatementCache(max_size=10, threshold=1)
+    for query in ("UPDATE t SET a = 1", "SELECT 1; SELECT 2"):
+        prepared = cache.plan(query, None)
+        assert prepared.prepare_sql is None and prepared.query == query
+    assert cache.plan("  with x AS (SELECT 1) SELECT * FROM x", None).prepare_sql is not None
+
+
+def test_disabled_cache():
+    cache = StatementCache(max_size=0, threshold=1)
+    prepared = cache.plan("SELECT 1", None)
+    assert prepared.prepare_sql is None and prepared.query == "SELECT 1"
+
+
+def test_unpreparable_query_runs_directly():
+    cache = StatementCache(max_size=10, threshold=1)
+    query = "SELECT * FROM t WHERE id IN %s"
+    assert cache.plan(query, ((1, 2),)).prepare_sql is None
+    # Запрос запомнен как неподготавливаемый и больше не учитывается кэшем
+    prepared = cache.plan(query, ((1, 2),))
+    assert prepared.prepare_sql is None and prepared.fingerprint is None
+
+
+def test_least_recently_used_statement_is_evicted_and_deallocated():
+    cache = StatementCache(max_size=2, threshold=1)
+    _prepare(cache, "SELECT 1")   # iset_ps_1
+    _prepare(cache, "SELECT 2")   # iset_ps_2
+    # После обращения к первому запросу давно не использовавшимся становится второй
+    assert cache.plan("SELECT 1", None).query == "EXECUTE iset_ps_1"
+
+    third = cache.plan("SELECT 3", None)
+    assert third.prepare_sql == "DEALLOCATE iset_ps_2; PREPARE iset_ps_3 AS SELECT 3"
+    cache.mark_prepared(third)
+
+    # Вытесненное выражение освобождено только один раз
+    fourth = cache.plan("SELECT 4", None)
+    assert fourth.prepare_sql == "DEALLOCATE iset_ps_1; PREPARE iset_ps_4 AS SELECT 4"
+
+
+def test_evicted_before_preparation_is_deallocated_later():
+    cache = StatementCache(max_size=1, threshold=1)
+    pending = cache.plan("SELECT 1", None)
+    # Запись вытеснена другим запросом до завершения подготовки
+    other = cache.plan("SELECT 2", None)
+    cache.mark_prepared(pending)
+    cache.mark_prepared(other)
+    assert cache.plan("SELECT 3", None).prepare_sql.startswith("DEALLOCATE iset_ps_1; ")
+
+
+def test_forget_deallocates_statement():
+    cache = StatementCache(max_size=10, threshold=1)
+    prepared = _prepare(cache, "SELECT 1")
+    cache.forget(prepared)
+    assert len(cache) == 0
+    again = cache.plan("SELECT 1", None)
+    assert again.prepare_sql == "DEALLOCATE iset_ps_1; PREPARE iset_ps_2 AS SELECT 1"
+
+
+def test_failed_preparation_is_not_retried():
+    cache = StatementCache(max_size=10, threshold=1)
+    prepared = cache.plan("SELECT %s", (1,))
+    cache.mark_failed(prepared)
+    retry = cache.plan("SELECT %s", (1,))
+    assert retry.prepare_sql is None and retry.query == "SELECT %s"
+
+
+def _connection(status):
+    return SimpleNamespace(info=SimpleNamespace(transaction_status=status))
+
+
+def test_prepare_inside_transaction_uses_savepoint():
+    prepare_sql, rollback_sql = prepare_wrapped_sql(
+        _connection(extensions.TRANSACTION_STATUS_INTRANS), "PREPARE iset_ps_1 AS SELECT 1"
+    )
+    assert prepare_sql == ("SAVEPOINT iset_prepare; PREPARE iset_ps_1 AS SELECT 1; "
+                           "RELEASE SAVEPOINT iset_prepare")
+    assert rollback_sql == "ROLLBACK TO SAVEPOINT iset_prepare; RELEASE SAVEPOINT iset_prepare"
+
+
+def test_prepare_outside_transaction_runs_directly():
+    prepare_sql, rollback_sql = prepare_wrapped_sql(
+        _connection(extensions.TRANSACTION_STATUS_IDLE), "PREPARE iset_ps_1 AS SELECT 1"
+    )
+    assert prepare_sql == "PREPARE iset_ps_1 AS SELECT 1"
+    assert rollback_sql is None